@@ -1,29 +1,31 @@
 # api/account.py
 
-import requests
 import copy
+from api import resilience
 from api.auth import generate_jwt_token
 from core import config
+from utils.log import get_logger
+
+log = get_logger("api.account")
 
 def get_accounts():
-    print("[account.py] get_accounts() 실행됨")
+    log.debug("get_accounts() 실행됨")
 
-    headers = {
+    # 중복 요청(hedge)마다 새 토큰을 만들도록 헤더 대신 함수를 넘깁니다.
+    headers = lambda: {
         'Authorization': generate_jwt_token(copy.deepcopy({}))
     }
 
     try:
-        response = requests.get(f"{config.SERVER_URL}/v1/accounts", headers=headers)
+        response = resilience.get("accounts", f"{config.SERVER_URL}/v1/accounts", headers=headers)
 
         if response.status_code == 200:
             accounts = response.json()
-            print("[account.py] 계좌 조회 성공")
-            print("[DEBUG] 현재 계좌 정보:", accounts)
+            log.debug("계좌 조회 성공 - 현재 계좌 정보: %s", accounts)
             return accounts
         else:
-            print("[account.py] 계좌 조회 실패")
             raise Exception(f"[Upbit API] 계좌 조회 실패: {response.status_code} - {response.text}")
 
     except Exception as e:
-        print(f"[account.py] 예외 발생: {e}")
+        log.error("계좌 조회 중 예외 발생: %s", e)
         raise
@@ -3,7 +3,7 @@
 import jwt
 import uuid
 import hashlib
-from urllib.parse import urlencode
+from urllib.parse import urlencode, unquote
 
 from datetime import datetime, timedelta
 
@@ -17,7 +17,8 @@ def _generate_payload(query: dict = None) -> dict:
     }
 
     if query is not None:
-        query_string = urlencode(query).encode()
+        # 배열 파라미터(uuids[] 등)는 키를 반복한 형태로, 이스케이프하지 않은 문자열을 해시합니다. (업비트 규격)
+        query_string = unquote(urlencode(query, doseq=True)).encode()
         m = hashlib.sha512()
         m.update(query_string)
         query_hash = m.hexdigest()
@@ -3,16 +3,21 @@ import time
 import copy
 from core import config
 from api.auth import generate_jwt_token
+from api import resilience
 
 
 def send_order(market: str, side: str, ord_type: str,
-               volume: float = None, unit_price: float = None, amount_krw: float = None) -> dict:
+               volume: float = None, unit_price: float = None, amount_krw: float = None,
+               identifier: str = None) -> dict:
     url = f"{config.SERVER_URL}/v1/orders"
     body = {
         "market": market,
         "side": side,
         "ord_type": ord_type,
     }
+    # identifier: 우리가 정한 주문 id (거래소에서 중복 불가). 응답을 못 받았어도 이 값으로 주문을 다시 찾을 수 있습니다.
+    if identifier:
+        body["identifier"] = identifier
 
     if ord_type == "limit":
         body.update({
@@ -80,7 +85,7 @@ def get_order_results_by_uuids_safe(uuids, batch_size=20):
         for uuid in batch:
             query = {"uuid": uuid}
             headers = {"Authorization": generate_jwt_token(query)}
-            response = requests.get(f"{config.SERVER_URL}/v1/order", params=query, headers=headers)
+            response = resilience.get("orders", f"{config.SERVER_URL}/v1/order", params=query, headers=headers)
 
             if response.status_code == 200:
                 results.append(response.json())
@@ -105,13 +110,15 @@ def cancel_orders_by_uuids(uuid_list):
         return {}  # ✅ 로그 생략
 
 
-def get_orders(state: str, market: str = None) -> list:
+def get_orders(state: str, market: str = None, page: int = 1, limit: int = 100) -> list:
     """
     주문 리스트를 조회합니다.
 
     Args:
         state (str): 주문 상태 (wait, done, cancel)
         market (str, optional): 마켓 ID. Defaults to None.
+        page (int, optional): 페이지 번호 (최신 주문부터). Defaults to 1.
+        limit (int, optional): 페이지당 주문 수 (최대 100). Defaults to 100.
 
     Returns:
         list: 주문 리스트
@@ -119,8 +126,8 @@ def get_orders(state: str, market: str = None) -> list:
     url = f"{config.SERVER_URL}/v1/orders"
     query = {
         "state": state,
-        "page": 1,
-        "limit": 100,
+        "page": page,
+        "limit": limit,
         "order_by": "desc",
     }
     if market:
@@ -128,9 +135,75 @@ def get_orders(state: str, market: str = None) -> list:
 
     headers = {"Authorization": generate_jwt_token(copy.deepcopy(query))}
 
-    response = requests.get(url, params=query, headers=headers)
+    response = resilience.get("orders", url, params=query, headers=headers)
 
     if response.status_code == 200:
         return response.json()
     else:
         raise Exception(f"❌ 주문 내역 조회 실패: {response.status_code} - {response.text}")
+
+
+def iter_orders(state: str, market: str = None, limit: int = 100, max_pages: int = None):
+    """
+    주문 내역을 최신 주문부터 한 페이지씩 넘기며 모두 조회합니다.
+    호출한 쪽에서 원하는 지점(예: 이미 저장한 uuid)에 도달하면 반복을 멈추면 됩니다.
+
+    Args:
+        state (str): 주문 상태 (wait, done, cancel)
+        market (str, optional): 마켓 ID. Defaults to None.
+        limit (int, optional): 페이지당 주문 수 (최대 100). Defaults to 100.
+        max_pages (int, optional): 최대 페이지 수. None이면 마지막 페이지까지 조회합니다.
+
+    Yields:
+        dict: 주문 정보
+    """
+    page = 1
+    while max_pages is None or page <= max_pages:
+        orders = get_orders(state, market=market, page=page, limit=limit)
+        yield from orders
+        if len(orders) < limit:
+            break
+        page += 1
+        time.sleep(0.1)  # 초당 요청 수 제한 대응
+
+
+def get_order_by_identifier(identifier: str):
+    """
+    send_order(identifier=...)로 낸 주문을 조회합니다. 해당 주문이 없으면 None을 반환합니다.
+    """
+    url = f"{config.SERVER_URL}/v1/order"
+    query = {"identifier": identifier}
+    headers = {"Authorization": generate_jwt_token(copy.deepcopy(query))}
+
+    response = resilience.get("orders", url, params=query, headers=headers)
+
+    if response.status_code == 200:
+        return response.json()
+    elif response.status_code == 404:
+        return None
+    else:
+        raise Exception(f"❌ 주문 조회 실패: {response.status_code} - {response.text}")
+
+
+def get_orders_by_uuids(uuids: list) -> list:
+    """
+    여러 주문의 현재 상태를 한 번에 조회합니다. (최대 100개)
+
+    Args:
+        uuids (list): 주문 uuid 목록
+
+    Returns:
+        list: 주문 리스트
+    """
+    if not uuids:
+        return []
+    url = f"{config.SERVER_URL}/v1/orders/uuids"
+    query = {"uuids[]": list(uuids)}
+    headers = {"Authorization": generate_jwt_token(copy.deepcopy(query))}
+
+    response = resilience.get("orders", url, params=query, headers=headers)
+
+    if response.status_code == 200:
+        return response.json()
+    else:
+        raise Exception(f"❌ 주문 일괄 조회 실패: {response.status_code} - {response.text}")
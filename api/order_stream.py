@@ -0,0 +1,102 @@
+# api/order_stream.py
+
+import json
+import threading
+import time
+import uuid
+
+from api.auth import generate_jwt_token
+from utils.log import get_logger
+
+log = get_logger("api.order_stream")
+
+try:
+    import websocket  # websocket-client
+except ImportError:  # 설치되지 않은 환경에서는 REST 재조회만 사용합니다.
+    websocket = None
+
+PRIVATE_WS_URL = "wss://api.upbit.com/websocket/v1/private"
+
+
+class MyOrderStream:
+    """
+    # --- [내 주문/자산 실시간 스트림] ---
+    # 업비트 private WebSocket(myOrder, myAsset)을 구독하여, 체결/취소가 일어나는 즉시 콜백을 호출합니다.
+    # 연결이 끊기면 on_disconnect를 호출하고(REST 재조회용), 잠시 후 자동으로 다시 연결합니다.
+    """
+
+    def __init__(self, on_order, on_asset=None, on_disconnect=None, reconnect_delay: float = 3.0):
+        self.on_order = on_order
+        self.on_asset = on_asset
+        self.on_disconnect = on_disconnect
+        self.reconnect_delay = reconnect_delay
+        self.connected = False
+        self._stop = threading.Event()
+        self._ws = None
+        self._thread = None
+
+    @staticmethod
+    def available() -> bool:
+        return websocket is not None
+
+    def start(self) -> bool:
+        if websocket is None:
+            log.warning("⚠️ websocket-client 미설치 → 실시간 체결 알림 없이 REST 재조회만 사용합니다.")
+            return False
+        self._thread = threading.Thread(target=self._run, name="my-order-stream", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._ws is not None:
+            self._ws.close()
+
+    def _subscribe_message(self) -> str:
+        request = [
+            {"ticket": str(uuid.uuid4())},
+            {"type": "myOrder"},
+            {"type": "myAsset"},
+            {"format": "DEFAULT"},
+        ]
+        return json.dumps(request)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                PRIVATE_WS_URL,
+                header={"Authorization": generate_jwt_token()},
+                on_open=self._handle_open,
+                on_message=self._handle_message,
+                on_error=self._handle_error,
+                on_close=self._handle_close,
+            )
+            self._ws.run_forever(ping_interval=60, ping_timeout=10)
+            if self._stop.is_set():
+                break
+            time.sleep(self.reconnect_delay)
+
+    def _handle_open(self, ws) -> None:
+        ws.send(self._subscribe_message())
+        self.connected = True
+        log.info("✅ 실시간 주문 스트림 연결")
+
+    def _handle_message(self, ws, message) -> None:
+        if isinstance(message, bytes):
+            message = message.decode("utf-8")
+        data = json.loads(message)
+        if data.get("type") == "myOrder":
+            self.on_order(data)
+        elif data.get("type") == "myAsset" and self.on_asset is not None:
+            self.on_asset(data)
+
+    def _handle_error(self, ws, error) -> None:
+        log.warning("스트림 오류: %s", error)
+
+    def _handle_close(self, ws, status_code, reason) -> None:
+        was_connected = self.connected
+        self.connected = False
+        if was_connected:
+            log.warning("⚠️ 실시간 주문 스트림 끊김: %s %s", status_code, reason)
+            if self.on_disconnect is not None:
+                self.on_disconnect()
@@ -1,11 +1,14 @@
 # api/price.py
 
-import requests
 from typing import List, Dict, Optional
+from api import resilience
+from utils.log import get_logger
+
+log = get_logger("api.price")
 
 
 def get_second_candles(market: str, to: Optional[str] = None, count: int = 1) -> List[Dict]:
-    print(f"[price.py] get_second_candles() 실행됨 - market={market}, count={count}")
+    log.debug("get_second_candles() 실행됨 - market=%s, count=%s", market, count)
 
     url = "https://api.upbit.com/v1/candles/seconds"
     headers = {"accept": "application/json"}
@@ -17,27 +20,26 @@ def get_second_candles(market: str, to: Optional[str] = None, count: int = 1) ->
     if to:
         params["to"] = to
 
-    response = requests.get(url, params=params, headers=headers)
+    response = resilience.get("candles", url, params=params, headers=headers)
 
     if response.status_code != 200:
-        print("[price.py] 초봉 조회 실패")
         raise Exception(f"초봉 조회 실패: {response.status_code}, {response.text}")
 
-    print(f"[price.py] 초봉 조회 성공 - {len(response.json())}개 데이터")
-    return response.json()
+    candles = response.json()
+    log.debug("초봉 조회 성공 - %d개 데이터", len(candles))
+    return candles
 
 
 def get_current_ask_price(market: str) -> float:
     """
     업비트 호가 정보 중 최우선 매도호가(ask_price)를 반환
     """
-    print(f"[price.py] get_current_ask_price() 실행됨 - market={market}")
 
     url = "https://api.upbit.com/v1/orderbook"
     headers = {"accept": "application/json"}
     params = {"markets": market}
 
-    response = requests.get(url, headers=headers, params=params)
+    response = resilience.get("orderbook", url, params=params, headers=headers)
 
     if response.status_code != 200:
         raise Exception(f"[호가 조회 실패] {response.status_code} - {response.text}")
@@ -49,9 +51,39 @@ def get_current_ask_price(market: str) -> float:
         raise Exception("[호가 데이터 없음]")
 
     ask_price = orderbook_units[0]["ask_price"]  # 최우선 매도 호가
-    print(f"[price.py] 매도 호가: {ask_price}")
+    log.debug("%s 매도 호가: %s", market, ask_price)
     return ask_price
 
+def get_orderbooks(markets: List[str]) -> List[Dict]:
+    """
+    여러 마켓의 호가(전체 단계)를 한 번에 조회합니다. 업비트 응답(list of dict)을 그대로 반환합니다.
+    """
+    if not markets:
+        return []
+    log.debug("get_orderbooks() 실행됨 - markets=%d개", len(markets))
+
+    url = "https://api.upbit.com/v1/orderbook"
+    headers = {"accept": "application/json"}
+    params = {"markets": ",".join(markets)}
+
+    response = resilience.get("orderbook", url, params=params, headers=headers)
+
+    if response.status_code != 200:
+        raise Exception(f"[호가 조회 실패] {response.status_code} - {response.text}")
+
+    return response.json()
+
+def get_current_ask_prices(markets: List[str]) -> Dict[str, float]:
+    """
+    여러 마켓의 최우선 매도호가를 한 번의 호가 조회로 가져옵니다.
+    """
+    prices = {}
+    for orderbook in get_orderbooks(markets):
+        units = orderbook.get("orderbook_units", [])
+        if units:
+            prices[orderbook["market"]] = units[0]["ask_price"]
+    return prices
+
 def get_minute_candles(market: str, unit: int = 1, to: Optional[str] = None, count: int = 1) -> List[Dict]:
     """
     업비트에서 분(Minute) 단위 캔들 데이터를 가져옵니다.
@@ -62,7 +94,7 @@ def get_minute_candles(market: str, unit: int = 1, to: Optional[str] = None, cou
     :param count: 요청할 캔들 개수 (최대 200)
     :return: 캔들 리스트 (dict)
     """
-    print(f"[price.py] get_minute_candles() 실행됨 - market={market}, unit={unit}, count={count}, to={to}")
+    log.debug("get_minute_candles() 실행됨 - market=%s, unit=%s, count=%s, to=%s", market, unit, count, to)
 
     url = f"https://api.upbit.com/v1/candles/minutes/{unit}"
     headers = {"accept": "application/json"}
@@ -74,13 +106,14 @@ def get_minute_candles(market: str, unit: int = 1, to: Optional[str] = None, cou
     if to:
         params["to"] = to
 
-    response = requests.get(url, headers=headers, params=params)
+    response = resilience.get("candles", url, params=params, headers=headers)
 
     if response.status_code != 200:
         raise Exception(f"[분봉 조회 실패] {response.status_code} - {response.text}")
 
-    print(f"[price.py] 분봉 캔들 조회 성공 - {len(response.json())}개 데이터")
-    return response.json()
+    candles = response.json()
+    log.debug("분봉 캔들 조회 성공 - %d개 데이터", len(candles))
+    return candles
 
 
 
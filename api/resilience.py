@@ -0,0 +1,253 @@
+# api/resilience.py
+
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from utils.log import get_logger, fields
+
+log = get_logger("api.resilience")
+
+# --- 엔드포인트별 보호 장치 ---
+# 모든 조회(GET)는 엔드포인트 이름별로 지연 시간 분포를 기록하고, 그 분포로 제한 시간과 재요청 시점을 정합니다.
+# - 제한 시간: p99 × TIMEOUT_FACTOR (MIN_TIMEOUT ~ 엔드포인트 기본값 사이). 기록이 MIN_SAMPLES 개 미만이면 기본값
+# - 회로 차단기: 연속 실패(제한 시간 초과, 5xx/429 포함)가 failure_threshold 번이면 reset_timeout 초 동안 곧바로 실패시키고,
+#               그 뒤 한 번만 시험 요청(half-open)을 보내 성공하면 다시 닫습니다.
+# - 중복 요청(hedge): 같은 결과를 주는 조회는 p95 만큼 기다려도 응답이 없으면 같은 요청을 한 번 더 보내 먼저 온 응답을 씁니다.
+#                     (인증 조회는 요청마다 새 토큰을 만들어야 하므로 headers에 함수를 넘깁니다)
+DEFAULT_TIMEOUT = 10.0
+MIN_TIMEOUT = 1.0
+TIMEOUT_FACTOR = 3.0
+MIN_SAMPLES = 20
+
+# 엔드포인트 이름 → 설정. 시세/계좌처럼 거래 사이클이 기다리는 조회만 중복 요청을 허용합니다.
+ENDPOINT_SETTINGS = {
+    "orderbook": {"timeout": 5.0, "hedge": True},
+    "accounts": {"timeout": 5.0, "hedge": True},
+    "orders": {"timeout": 10.0, "hedge": False},
+    "candles": {"timeout": 10.0, "hedge": False},
+}
+
+
+class CircuitOpenError(Exception):
+    """회로 차단기가 열려 있어 요청을 보내지 않았습니다."""
+
+
+class LatencyHistogram:
+    """
+    # --- [지연 시간 분포] ---
+    # 1ms ~ 약 2분을 로그 간격(2^(1/4) 배)으로 나눈 칸에 횟수를 셉니다. 기록 비용은 칸 번호 계산 한 번입니다.
+    # decay_every 번 기록할 때마다 횟수를 절반으로 줄여, 최근 지연 시간이 분위수에 더 크게 반영됩니다.
+    """
+    BASE = 0.001
+    STEPS_PER_DOUBLING = 4
+    BUCKETS = 4 * 17
+
+    def __init__(self, decay_every: int = 1000):
+        self.decay_every = decay_every
+        self._lock = threading.Lock()
+        self._counts = [0.0] * (self.BUCKETS + 1)
+        self._recorded = 0
+        self.total = 0
+
+    @classmethod
+    def bound(cls, index: int) -> float:
+        """index 칸의 상한(초)"""
+        return cls.BASE * 2 ** (index / cls.STEPS_PER_DOUBLING)
+
+    def record(self, seconds: float) -> None:
+        index = 0 if seconds <= self.BASE else math.ceil(math.log2(seconds / self.BASE) * self.STEPS_PER_DOUBLING)
+        with self._lock:
+            self._counts[min(index, self.BUCKETS)] += 1
+            self._recorded += 1
+            self.total += 1
+            if self._recorded >= self.decay_every:
+                self._counts = [count / 2 for count in self._counts]
+                self._recorded = 0
+
+    def quantile(self, q: float):
+        """q 분위수(초, 칸 상한 기준). 기록이 없으면 None"""
+        with self._lock:
+            weight = sum(self._counts)
+            if weight <= 0:
+                return None
+            target, running = q * weight, 0.0
+            for index, count in enumerate(self._counts):
+                running += count
+                if running >= target:
+                    return self.bound(index)
+        return self.bound(self.BUCKETS)
+
+    def snapshot(self) -> dict:
+        return {"count": self.total, **{name: self.quantile(q) for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}}
+
+
+class CircuitBreaker:
+    """
+    # --- [회로 차단기] ---
+    # closed(정상) → 연속 실패 failure_threshold 번 → open(곧바로 실패) → reset_timeout 후 half_open(시험 요청 하나만 허용)
+    # 시험 요청이 성공하면 closed, 실패하면 다시 open 으로 돌아갑니다.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.rejected = 0
+
+    def allow(self) -> None:
+        """요청을 보내도 되면 그대로 돌아오고, 아니면 CircuitOpenError를 냅니다."""
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self.state, self._probing = self.HALF_OPEN, False
+            if self.state == self.CLOSED or (self.state == self.HALF_OPEN and not self._probing):
+                self._probing = self.state == self.HALF_OPEN
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f"{self.name} 회로 차단 중 (연속 실패 {self.failures}회)")
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                log.info("%s 회로 복구", self.name, extra=fields(endpoint=self.name, state=self.CLOSED))
+            self.state, self.failures, self._probing = self.CLOSED, 0, False
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    log.warning("%s 회로 차단 (연속 실패 %d회, %.0f초 후 재시도)", self.name, self.failures,
+                                self.reset_timeout, extra=fields(endpoint=self.name, state=self.OPEN))
+                self.state, self._opened_at, self._probing = self.OPEN, self._clock(), False
+
+
+class Endpoint:
+    """엔드포인트 하나의 지연 시간 분포 + 회로 차단기 + 제한 시간/중복 요청 정책"""
+
+    def __init__(self, name: str, timeout: float = DEFAULT_TIMEOUT, hedge: bool = False,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.default_timeout = timeout
+        self.hedge = hedge
+        self.latency = LatencyHistogram()
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def timeout(self) -> float:
+        p99 = self.latency.quantile(0.99) if self.latency.total >= MIN_SAMPLES else None
+        if p99 is None:
+            return self.default_timeout
+        return min(self.default_timeout, max(MIN_TIMEOUT, p99 * TIMEOUT_FACTOR))
+
+    def hedge_delay(self):
+        """중복 요청을 보내기까지 기다릴 시간 (기록이 모자라면 None → 중복 요청 안 함)"""
+        if not self.hedge or self.latency.total < MIN_SAMPLES:
+            return None
+        return self.latency.quantile(0.95)
+
+    def _attempt(self, fn, timeout: float):
+        started = time.perf_counter()
+        try:
+            return fn(timeout)
+        finally:
+            self.latency.record(time.perf_counter() - started)
+
+    def call(self, fn, is_failure=None):
+        """
+        fn(timeout)을 보호 장치 안에서 실행합니다. 실패(예외 또는 is_failure(결과))는 회로 차단기에 기록됩니다.
+        """
+        self.breaker.allow()
+        timeout = self.timeout()
+        delay = self.hedge_delay()
+        try:
+            if delay is None:
+                result = self._attempt(fn, timeout)
+            else:
+                result = self._hedged(fn, timeout, delay)
+        except Exception:
+            self.breaker.on_failure()
+            raise
+        if is_failure is not None and is_failure(result):
+            self.breaker.on_failure()
+        else:
+            self.breaker.on_success()
+        return result
+
+    def _hedged(self, fn, timeout: float, delay: float):
+        first = _pool().submit(self._attempt, fn, timeout)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        self.hedged += 1
+        second = _pool().submit(self._attempt, fn, timeout)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self) -> dict:
+        return {**self.latency.snapshot(), "timeout": round(self.timeout(), 3), "state": self.breaker.state,
+                "rejected": self.breaker.rejected, "hedged": self.hedged, "hedge_wins": self.hedge_wins}
+
+
+_endpoints = {}
+_endpoints_lock = threading.Lock()
+_executor = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _endpoints_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api-hedge")
+    return _executor
+
+
+def get_endpoint(name: str) -> Endpoint:
+    """이름별로 하나의 Endpoint를 프로세스 안에서 함께 사용합니다."""
+    endpoint = _endpoints.get(name)
+    if endpoint is None:
+        with _endpoints_lock:
+            endpoint = _endpoints.setdefault(name, Endpoint(name, **ENDPOINT_SETTINGS.get(name, {})))
+    return endpoint
+
+
+def endpoint_stats() -> dict:
+    return {name: endpoint.stats() for name, endpoint in sorted(_endpoints.items())}
+
+
+def _server_failure(response) -> bool:
+    # 4xx(잘못된 요청, 없는 주문 등)는 엔드포인트 장애가 아닙니다. 요청 한도 초과(429)와 5xx만 실패로 봅니다.
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def get(endpoint: str, url: str, params=None, headers=None) -> requests.Response:
+    """
+    보호 장치를 거쳐 GET 요청을 보냅니다. 응답 코드 처리는 호출한 쪽에서 합니다.
+    headers: dict 또는 요청마다 새 헤더를 만드는 함수 (인증 토큰의 nonce는 한 번만 쓸 수 있음)
+    """
+    def send(timeout: float):
+        request_headers = headers() if callable(headers) else headers
+        return requests.get(url, params=params, headers=request_headers, timeout=timeout)
+
+    return get_endpoint(endpoint).call(send, is_failure=_server_failure)
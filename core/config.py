@@ -1,14 +1,36 @@
 import os
-from dotenv import load_dotenv
 
-# .env 파일 불러오기
-load_dotenv()
+# 설정은 처음 사용할 때 읽습니다. (import 만으로는 .env를 읽지 않고, 키가 없어도 오류가 나지 않습니다)
+# 시뮬레이터/테스트처럼 거래소 키가 필요 없는 도구는 api 모듈을 불러와도 바로 실행할 수 있습니다.
+# 키가 필요한 값(ACCESS_KEY, SECRET_KEY)은 처음 읽을 때 없으면 예전과 같은 오류를 냅니다.
 
-ACCESS_KEY = os.getenv("UPBIT_OPEN_API_ACCESS_KEY")
-SECRET_KEY = os.getenv("UPBIT_OPEN_API_SECRET_KEY")
-SERVER_URL = os.getenv("UPBIT_OPEN_API_SERVER_URL", "https://api.upbit.com")
+_DEFAULTS = {
+    "SERVER_URL": ("UPBIT_OPEN_API_SERVER_URL", "https://api.upbit.com"),
+    "ACCESS_KEY": ("UPBIT_OPEN_API_ACCESS_KEY", None),
+    "SECRET_KEY": ("UPBIT_OPEN_API_SECRET_KEY", None),
+}
+_REQUIRED = ("ACCESS_KEY", "SECRET_KEY")
+_loaded = False
 
-# 옵션: 환경변수가 없을 때 경고
-if not ACCESS_KEY or not SECRET_KEY:
-    raise ValueError("API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
 
+def load_env() -> None:
+    """.env 파일을 한 번만 불러옵니다. (환경변수에 이미 있는 값은 덮어쓰지 않음)"""
+    global _loaded
+    if _loaded:
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+    _loaded = True
+
+
+def __getattr__(name: str):
+    if name not in _DEFAULTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    load_env()
+    env_name, default = _DEFAULTS[name]
+    value = os.getenv(env_name, default)
+    if name in _REQUIRED and not value:
+        raise ValueError("API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
+    # 한 번 읽은 값은 모듈 속성으로 남겨서 다음부터는 바로 사용합니다.
+    globals()[name] = value
+    return value
@@ -1,78 +1,453 @@
 
 
+import os
 import time
 import pandas as pd
+from datetime import datetime
 from apscheduler.schedulers.blocking import BlockingScheduler
 from strategy.buy_entry import run_buy_entry_flow
 from strategy.sell_entry import run_sell_entry_flow
-from manager.order_executor import execute_buy_orders, execute_sell_orders
-from utils.file_utils import load_csv
+from manager.order_executor import (
+    execute_buy_orders, execute_sell_orders, recover_orders,
+    buy_intent, sell_intent, begin_intents, submit_intent, record_intent,
+)
+from manager.intent_journal import IntentJournal, JOURNAL_DIR
+from manager.setting_manager import SettingManager
+from manager.order_sync import run_order_sync_job
+from manager.fill_tracker import FillTracker
+from manager.market_snapshot import OpenOrdersCache, SnapshotPublisher, read_ladder
+from manager.ladder_store import get_ladder_store
+from strategy.casino_strategy import replan_market
+from strategy.records import buy_orders_from_df, buy_orders_to_df
+from api.account import get_accounts
 from api.price import get_current_ask_price
+from api.resilience import CircuitOpenError, endpoint_stats
+from core.pipeline import Pipeline, Stage
+from core.sharding import ShardedRuntime
+from utils.log import get_logger, fields
+
+log = get_logger("core.main")
+
+# setting.csv는 시작 시 한 번 읽고, 이후에는 파일이 바뀔 때만 다시 읽습니다.
+setting_manager = None
+
+
+def get_setting_manager() -> SettingManager:
+    global setting_manager
+    if setting_manager is None:
+        setting_manager = SettingManager("setting.csv")
+    return setting_manager
+
+
+# 주문 체결/취소를 실시간으로 추적합니다. (private WebSocket, 끊기면 REST 재조회)
+fill_tracker = FillTracker()
+scheduler = None
+pipeline = None
+runtime = None
+# 주문 의도 저널: 주문 전송 ~ DB 기록 사이에 재시작되어도 주문을 잃거나 같은 단계를 두 번 내지 않도록 합니다.
+journal = None
+# 사이클마다 시세 / 계좌 / 미체결 주문 / 사다리를 공유 스냅샷(DB market_snapshot)에 게시합니다. 대시보드는 이것만 읽습니다.
+open_orders_cache = OpenOrdersCache()
+snapshot_publisher = SnapshotPublisher("engine")
+
+# TRADING_RUNTIME=pipeline 이면 시세 조회 / 전략 / 주문 실행 / DB 기록을 각각 다른 스레드 단계로 나눠 실행합니다.
+TRADING_RUNTIME = os.getenv("TRADING_RUNTIME", "scheduler")
+EXECUTOR_WORKERS = int(os.getenv("PIPELINE_EXECUTOR_WORKERS", "2"))
+PERSIST_WORKERS = int(os.getenv("PIPELINE_PERSIST_WORKERS", "1"))
+# TRADING_RUNTIME=sharded 이면 마켓을 SHARD_COUNT 개의 작업자 프로세스에 나눠 처리합니다. (core/sharding.py)
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", str(os.cpu_count() or 1)))
+
+
+def on_fill_event(event) -> None:
+    """체결/취소가 감지되면 다음 1분을 기다리지 않고 곧바로 거래 사이클을 실행하도록 예약합니다."""
+    # 부분 체결(trade)은 건너뛰고, 완료(done) / 취소(cancel)만 반영합니다. 사다리 칸은 먼저 등록된 리스너가 이미 고쳤습니다.
+    if (scheduler is None and pipeline is None and runtime is None) or event.kind not in ("done", "cancel"):
+        return
+    log.info("%s %s 감지 → 거래 사이클 즉시 실행", event.market, event.kind)
+    if runtime is not None:
+        # 해당 마켓을 맡은 샤드만 바로 실행합니다.
+        runtime.trigger(event.market)
+    elif pipeline is not None:
+        pipeline.trigger()
+    else:
+        scheduler.modify_job("trading_cycle", next_run_time=datetime.now())
+
+
+def read_market_data():
+    """설정 스냅샷과 설정된 마켓의 현재가를 읽습니다. 현재가를 하나도 못 읽으면 None을 반환합니다."""
+    # 설정은 검증된 스냅샷을 그대로 사용하고, 파일 감시가 놓친 변경은 수정 시각으로 한 번 더 확인합니다.
+    manager = get_setting_manager()
+    manager.check()
+    snapshot = manager.snapshot
+
+    current_prices = read_prices(snapshot.markets)
+    if not current_prices:
+        return None
+    return snapshot, current_prices
+
+
+def read_prices(markets: list) -> dict:
+    """매매 판단의 가장 중요한 기준인 현재 코인 가격을 Upbit API를 통해 조회합니다. (실패한 마켓은 빠짐)"""
+    current_prices = {}
+    for market in markets:
+        try:
+            current_prices[market] = get_current_ask_price(market)
+        except CircuitOpenError as e:
+            # 호가 조회 회로가 차단되면 남은 마켓도 곧바로 실패하므로 이번 사이클은 여기까지만 읽습니다.
+            log.warning("현재가 조회 중단: %s", e)
+            break
+        except Exception as e:
+            log.warning("%s 현재가 조회 실패: %s", market, e)
+    if markets and not current_prices:
+        log.error("현재가 정보를 가져올 수 없습니다.")
+    return current_prices
+
+
+def publish_snapshot(markets: list, current_prices: dict = None, accounts: list = None,
+                     publisher: SnapshotPublisher = None, with_open_orders: bool = True) -> None:
+    """이번 사이클의 상태를 대시보드용 스냅샷으로 게시합니다. 실패해도 거래 사이클은 계속됩니다."""
+    publisher = publisher or snapshot_publisher
+    open_orders = ladder = None
+    try:
+        if with_open_orders:
+            open_orders = open_orders_cache.get()
+        if markets:
+            ladder = read_ladder(markets)
+    except Exception as e:
+        log.warning("스냅샷 준비 실패: %s", e)
+    publisher.publish(prices=current_prices, accounts=accounts, open_orders=open_orders, ladder=ladder)
+
+
+def plan_orders(snapshot, current_prices: dict, accounts: list = None, changed_markets: dict = None) -> tuple:
+    """
+    거래 기록을 읽고 전략을 실행해, 거래소로 보내야 하는 (매수 주문, 매도 주문) DataFrame을 반환합니다.
+    accounts / changed_markets를 주지 않으면 계좌를 직접 조회하고, 설정 변경은 설정 관리자에서 꺼내 옵니다.
+    """
+    setting_df = snapshot.setting_df
+    markets = snapshot.markets
+
+    # 거래 기록은 Parquet 로그(logs/)에서 설정된 마켓의 행만 골라 읽으므로, 기록이 쌓여도 로드 비용이 늘지 않습니다.
+    store = get_ladder_store()
+    loaded_buy_df, sell_log_df = store.load(markets)
+    buy_log_df = loaded_buy_df
+
+    # 설정이 바뀐 마켓의 미체결 주문만 새 설정으로 다시 계산합니다. 나머지 마켓의 주문은 그대로 둡니다.
+    if changed_markets is None:
+        changed_markets, _ = get_setting_manager().pop_changes()
+    if changed_markets:
+        buy_book = buy_orders_from_df(buy_log_df)
+        for market, previous in changed_markets.items():
+            replan_market(snapshot.by_market[market], buy_book, previous)
+        # 설정 변경은 pop_changes()로 한 번만 전달되므로, 다시 계산한 사다리는 곧바로 저장합니다.
+        # 걸려 있던 주문(wait → update)은 주문 실행 시 기존 주문을 취소하고 새 조건으로 바꿉니다. (begin_intents)
+        store.save("bid", buy_orders_to_df(buy_book), loaded_buy_df)
+        loaded_buy_df = buy_log_df = store.read("bid", markets)
+
+    # 현재 가격과 과거 기록을 바탕으로, strategy 폴더의 핵심 로직을 실행합니다.
+    # 이 단계에서 "살까?", "팔까?"를 고민하여 실제 실행할 주문 목록을 생성합니다.
+    buy_plan_df = run_buy_entry_flow(setting_df, buy_log_df, current_prices, accounts)
+    sell_plan_df = run_sell_entry_flow(setting_df, sell_log_df, accounts)
+    if buy_plan_df.empty and changed_markets:
+        # 보유 코인이 있어 매수 전략을 건너뛴 사이클에도, 설정 변경으로 다시 계산한 칸은 바로 반영합니다.
+        buy_plan_df = buy_log_df[buy_log_df["market"].isin(list(changed_markets))]
+
+    # 계획한 사다리를 저장한 뒤, 새로 보내야 하는("update") 칸만 실행합니다. (접수 / 체결 상태는 이후에 저장소가 고침)
+    buy_plan_df = store.save("bid", buy_plan_df, loaded_buy_df)
+    sell_plan_df = store.save("ask", sell_plan_df, sell_log_df)
+    return _pending(buy_plan_df), _pending(sell_plan_df)
+
+
+def _pending(plan_df: pd.DataFrame) -> pd.DataFrame:
+    if plan_df.empty:
+        return plan_df
+    return plan_df[plan_df["filled"] == "update"].reset_index(drop=True)
 
-import traceback
 
 def trading_cycle():
     """한 번의 전체 매매 사이클을 실행합니다."""
     # --- [1. 사이클 시작] ---
     # 이 함수는 스케줄러에 의해 1분마다 호출되며, 자동매매의 전체 과정을 담당합니다.
-    print("\n---")
-    print(f"[{pd.Timestamp.now()}] 새로운 거래 사이클 시작")
+    log.info("새로운 거래 사이클 시작")
+    started = time.perf_counter()
     try:
-        
-        # --- [2. 설정 및 로그 로드] ---
-        # 사용자가 정의한 매매 설정(setting.csv)과 과거의 거래 기록(log)을 불러옵니다.
-        # 이 데이터를 기반으로 다음 행동을 결정합니다.
-        setting_df = load_csv("setting.csv")
-        buy_log_df = load_csv("buy_log.csv")
-        sell_log_df = load_csv("sell_log.csv")
-
-        # --- [3. 현재 시장 상황 파악] ---
-        # 매매 판단의 가장 중요한 기준인 현재 코인 가격을 Upbit API를 통해 조회합니다.
-        markets = setting_df['market'].tolist()
-        current_prices = {}
-        for market in markets:
-            try:
-                current_prices[market] = get_current_ask_price(market)
-            except Exception as e:
-                print(f"[main] {market} 현재가 조회 실패: {e}")
-        if not current_prices:
-            print("[main] 현재가 정보를 가져올 수 없습니다.")
+
+        # --- [2. 현재 시장 상황 파악] ---
+        # 사용자가 정의한 매매 설정(setting.csv)과 현재 코인 가격을 불러옵니다.
+        market_data = read_market_data()
+        if market_data is None:
             return
 
-        # --- [4. 매매 전략 실행 (두뇌)] ---
-        # 현재 가격과 과거 기록을 바탕으로, strategy 폴더의 핵심 로직을 실행합니다.
-        # 이 단계에서 "살까?", "팔까?"를 고민하여 실제 실행할 주문 목록을 생성합니다.
-        buy_orders_to_execute = run_buy_entry_flow(setting_df, buy_log_df, current_prices)
-        sell_orders_to_execute = run_sell_entry_flow(setting_df, sell_log_df)
+        # --- [3. 매매 전략 실행 (두뇌)] ---
+        # 과거의 거래 기록(log)을 불러와 실제 실행할 주문 목록을 생성합니다.
+        # 계좌는 한 번만 조회해서 매수/매도 전략과 스냅샷 게시에 함께 사용합니다.
+        snapshot, current_prices = market_data
+        accounts = get_accounts()
+        buy_orders_to_execute, sell_orders_to_execute = plan_orders(snapshot, current_prices, accounts)
 
-        # --- [5. 주문 실행 (손과 발)] ---
+        # --- [4. 주문 실행 (손과 발)] ---
         # 전략에 의해 생성된 주문 목록이 있다면, manager 폴더의 실행 로직을 통해
         # Upbit 거래소에 실제 매수/매도 주문을 넣습니다.
         if not buy_orders_to_execute.empty:
-            execute_buy_orders(buy_orders_to_execute)
+            execute_buy_orders(buy_orders_to_execute, fill_tracker, journal)
         
         if not sell_orders_to_execute.empty:
-            execute_sell_orders(sell_orders_to_execute)
+            execute_sell_orders(sell_orders_to_execute, fill_tracker, journal)
+
+        # --- [5. 스냅샷 게시] ---
+        # 주문을 넣었다면 미체결 주문을 다시 조회하고, 대시보드가 거래소를 조회하지 않도록 이번 사이클 상태를 게시합니다.
+        if not (buy_orders_to_execute.empty and sell_orders_to_execute.empty):
+            open_orders_cache.invalidate()
+        publish_snapshot(snapshot.markets, current_prices, accounts)
 
     except Exception as e:
         # 예외 처리: 어떤 오류가 발생하더라도 시스템 전체가 멈추지 않도록 방지합니다.
-        error_details = traceback.format_exc()
-        print(f"[main] 거래 사이클 중 예외 발생: {e}")
-        print(f"[main] 상세 오류:\n{error_details}")
+        log.exception("거래 사이클 중 예외 발생: %s", e)
     finally:
-        print("[main] 거래 사이클 종료")
-        print("---")
+        seconds = time.perf_counter() - started
+        log.info("거래 사이클 종료 (%.2fs)", seconds, extra=fields(seconds=round(seconds, 3)))
+
+
+# --- [파이프라인 실행 방식] ---
+# 시세 조회 → 전략 → 주문 실행(작업자 여러 개) → DB 기록 단계가 크기가 정해진 큐로 이어집니다.
+# 주문 전송이나 DB 기록이 느려도 다음 시세 조회와 전략 실행은 기다리지 않습니다.
+
+class MarketTick:
+    """시세 조회 단계 → 전략 단계"""
+    __slots__ = ("time", "snapshot", "prices")
+
+    def __init__(self, time, snapshot, prices):
+        self.time = time
+        self.snapshot = snapshot
+        self.prices = prices
+
+
+class OrderIntent:
+    """전략 단계 → 주문 실행 단계 (주문 한 건, manager/order_executor.buy_intent / sell_intent 와 같은 필드)"""
+    __slots__ = ("table", "market", "side", "level", "price", "amount", "volume")
+
+    def __init__(self, table, market, side, level, price, amount=None, volume=None):
+        self.table = table
+        self.market = market
+        self.side = side
+        self.level = level
+        self.price = price
+        self.amount = amount
+        self.volume = volume
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class OrderRecord:
+    """주문 실행 단계 → DB 기록 단계"""
+    __slots__ = ("intent", "statuses", "entry")
+
+    def __init__(self, intent, statuses, entry=None):
+        self.intent = intent
+        self.statuses = statuses
+        self.entry = entry
+
+
+def market_data_source():
+    market_data = read_market_data()
+    if market_data is None:
+        return None
+    return MarketTick(pd.Timestamp.now(), *market_data)
+
+
+def strategy_stage(tick: MarketTick, emit) -> None:
+    log.info("새로운 거래 사이클 시작 (pipeline, 시세 시각 %s)", tick.time)
+    accounts = get_accounts()
+    buy_orders_df, sell_orders_df = plan_orders(tick.snapshot, tick.prices, accounts)
+    # 주문 실행 단계는 따로 돌아가므로, 여기서는 전략 직전 상태를 게시합니다. (미체결 주문은 주문 전송 시 다시 조회)
+    publish_snapshot(tick.snapshot.markets, tick.prices, accounts)
+    for order in buy_orders_df.to_dict("records"):
+        emit(OrderIntent(**buy_intent(order["market"], order["target_price"], order["buy_amount"], order["buy_type"])))
+    for order in sell_orders_df.to_dict("records"):
+        emit(OrderIntent(**sell_intent(order["market"], order["target_sell_price"], order["quantity"])))
+
+
+def executor_stage(intent: OrderIntent, emit) -> None:
+    order = intent.as_dict()
+    entry = None
+    if journal is not None:
+        # 주문을 보내기 전에 의도를 저널에 남깁니다. 같은 단계의 주문이 진행 중이면 건너뛰거나 취소 후 바꿉니다.
+        journaled = begin_intents(journal, [order])
+        if not journaled:
+            return
+        entry = journaled[0][1]
+    statuses = submit_intent(order, entry, fill_tracker, journal)
+    if statuses:
+        open_orders_cache.invalidate()
+        emit(OrderRecord(order, statuses, entry))
+
+
+def persist_stage(record: OrderRecord, emit) -> None:
+    record_intent(record.intent, record.statuses, record.entry, journal)
+    log.info("✅ %s 주문 DB 기록 (상태: %s)", record.intent["market"], record.statuses[0].get("state"),
+             extra=fields(market=record.intent["market"], uuid=record.statuses[0].get("uuid")))
+
+
+def build_pipeline(executor_workers: int = EXECUTOR_WORKERS, persist_workers: int = PERSIST_WORKERS) -> Pipeline:
+    stages = [
+        # 전략은 거래 기록을 읽고 쓰므로 하나의 작업자가 순서대로 처리하고, 밀린 시세는 최신 것만 남깁니다.
+        Stage("strategy", strategy_stage, workers=1, maxsize=1, conflate=True),
+        # 같은 마켓의 주문은 같은 작업자가 순서대로 넣습니다.
+        Stage("executor", executor_stage, workers=executor_workers, maxsize=100, key=lambda intent: intent.market),
+        Stage("persist", persist_stage, workers=persist_workers, maxsize=1000),
+    ]
+    return Pipeline(market_data_source, stages, interval=60)
+
+
+# --- [샤드 실행 방식] ---
+# 마켓을 일관된 해싱으로 여러 작업자 프로세스에 나눕니다. 작업자는 자기 마켓의 거래 기록 / 주문 저널만 다루고,
+# 계좌 조회와 KRW 예산(MIN_CASH_RATIO)은 부모 프로세스가 모든 샤드에 대해 한 번에 관리합니다.
+
+# 작업자 프로세스 안에서만 사용하는 저널 (샤드마다 logs/journal/shard-<번호>)
+shard_journal = None
+# 작업자 프로세스의 스냅샷 조각 ("shard-<번호>": 맡은 마켓의 시세 / 사다리)
+shard_publisher = None
+
+
+def read_settings() -> tuple:
+    """부모 프로세스: 설정 스냅샷과 마지막 호출 이후 바뀐 마켓을 반환합니다."""
+    manager = get_setting_manager()
+    manager.check()
+    changed_markets, _ = manager.pop_changes()
+    return manager.snapshot, changed_markets
+
+
+def shard_cycle(shard: int, tick, budget) -> None:
+    """작업자 프로세스: 이 샤드가 맡은 마켓만으로 거래 사이클을 한 번 실행합니다."""
+    global shard_journal, shard_publisher
+    if shard_publisher is None:
+        shard_publisher = SnapshotPublisher(f"shard-{shard}")
+    if shard_journal is None:
+        # 부모의 저널 파일을 함께 쓰지 않도록 샤드마다 따로 두고, 처음 한 번은 진행 중이던 주문을 모두 대조합니다.
+        shard_journal = IntentJournal(os.path.join(JOURNAL_DIR, f"shard-{shard}")).recover()
+        recover_orders(shard_journal, min_age=0)
+    else:
+        # 체결 알림은 부모 프로세스가 받으므로, 끝난 주문은 사이클마다 거래소와 대조해서 닫습니다.
+        recover_orders(shard_journal, min_age=60)
+
+    markets = tick.snapshot.markets
+    log.info("샤드 %d 거래 사이클 시작 (마켓 %d개)", shard, len(markets), extra=fields(shard=shard))
+    if not markets:
+        return
+    current_prices = read_prices(markets)
+    if not current_prices:
+        return
+    buy_orders_to_execute, sell_orders_to_execute = plan_orders(tick.snapshot, current_prices,
+                                                                tick.accounts, tick.changed)
+    if not buy_orders_to_execute.empty:
+        execute_buy_orders(buy_orders_to_execute, None, shard_journal, budget)
+    if not sell_orders_to_execute.empty:
+        execute_sell_orders(sell_orders_to_execute, None, shard_journal)
+    publish_snapshot(markets, current_prices, publisher=shard_publisher, with_open_orders=False)
+
+
+def read_accounts() -> list:
+    """부모 프로세스: 사이클마다 계좌를 한 번 조회하고, 계좌 / 미체결 주문을 "engine" 조각으로 게시합니다."""
+    accounts = get_accounts()
+    # 작업자가 넣은 주문은 부모의 체결 추적기가 모르므로, 미체결 주문은 사이클마다 다시 조회합니다.
+    open_orders_cache.invalidate()
+    publish_snapshot([], accounts=accounts)
+    return accounts
+
+
+def build_runtime(shards: int = SHARD_COUNT) -> ShardedRuntime:
+    return ShardedRuntime(shards, shard_cycle, read_settings, read_accounts, interval=60)
+
+
+def reconcile_journal(min_age: float = 60) -> None:
+    try:
+        recover_orders(journal, fill_tracker, min_age=min_age)
+    except Exception as e:
+        log.warning("저널 대조 실패: %s", e)
+
+
+def log_endpoint_stats() -> None:
+    """엔드포인트별 지연 시간(p50/p95/p99) / 제한 시간 / 회로 상태 / 중복 요청 횟수를 남깁니다."""
+    for name, stats in endpoint_stats().items():
+        log.info("API %s 지연 p95=%s 회로=%s", name, stats["p95"], stats["state"], extra=fields(endpoint=name, **stats))
+
+
+def add_scheduled_jobs(sched, with_trading_cycle: bool = True) -> None:
+    if with_trading_cycle:
+        sched.add_job(trading_cycle, 'interval', minutes=1, id="trading_cycle", max_instances=1, coalesce=True)
+    # 실시간 스트림이 끊긴 동안에는 미체결 주문을 15초마다 REST로 일괄 재조회합니다.
+    sched.add_job(fill_tracker.reconcile_if_stream_down, 'interval', seconds=15)
+    # 응답을 받지 못한 주문 / 놓친 완료 알림은 1분마다 저널과 거래소를 대조해 정리합니다.
+    sched.add_job(reconcile_journal, 'interval', minutes=1)
+    # 거래소 주문 내역은 10분마다 로컬 DB로 동기화합니다. (대시보드/분석은 DB를 읽습니다)
+    sched.add_job(run_order_sync_job, 'interval', minutes=10, next_run_time=datetime.now())
+    sched.add_job(log_endpoint_stats, 'interval', minutes=10)
 
 if __name__ == "__main__":
     # --- [0. 스케줄러 시작] ---
     # 이 프로그램의 시작점입니다.
     # APScheduler를 사용하여 1분마다 trading_cycle 함수를 주기적으로 실행시킵니다.
     # Docker 컨테이너가 실행되면 이 부분이 가장 먼저 작동합니다.
-    print(f"[Scheduler] 자동 거래 시스템 스케줄러를 시작합니다.")
-    scheduler = BlockingScheduler()
-    scheduler.add_job(trading_cycle, 'interval', minutes=1)
-    
-    try:
-        scheduler.start()
-    except (KeyboardInterrupt, SystemExit):
-        print("[Scheduler] 스케줄러를 종료합니다.")
\ No newline at end of file
+    log.info("자동 거래 시스템 스케줄러를 시작합니다. (실행 방식: %s)", TRADING_RUNTIME)
+    if TRADING_RUNTIME == "sharded":
+        # 작업자 프로세스는 다른 스레드(파일 감시, 체결 스트림)를 띄우기 전에 먼저 만듭니다.
+        runtime = build_runtime()
+        runtime.start()
+    get_setting_manager().start()
+    # 저널의 스냅샷 이후 기록만 읽어 진행 중이던 주문을 복구하고, 거래소 주문과 맞춰 봅니다.
+    journal = IntentJournal().recover()
+    reconcile_journal(min_age=0)
+    fill_tracker.add_listener(journal.on_fill_event)
+    # 사다리 칸을 완료/취소로 고친 뒤에 거래 사이클을 실행해야, 사이클이 새 상태로 다음 주문을 계획합니다.
+    fill_tracker.add_listener(get_ladder_store().on_fill_event)
+    fill_tracker.add_listener(on_fill_event)
+    fill_tracker.add_listener(open_orders_cache.invalidate)
+    fill_tracker.start()
+
+    if runtime is not None:
+        # 샤드 실행 중에도 이전 실행 방식의 저널(logs/journal)은 남은 주문이 없어질 때까지 계속 대조합니다.
+        from apscheduler.schedulers.background import BackgroundScheduler
+        background = BackgroundScheduler()
+        add_scheduled_jobs(background, with_trading_cycle=False)
+        background.start()
+        try:
+            runtime.wait()
+        except (KeyboardInterrupt, SystemExit):
+            log.info("샤드 실행기를 종료합니다. (진행 중인 사이클 처리 후 종료)")
+        finally:
+            runtime.stop()
+            log.info("샤드 처리 현황: %s", runtime.stats())
+            background.shutdown()
+            get_setting_manager().stop()
+            fill_tracker.stop()
+            journal.shutdown()
+    elif TRADING_RUNTIME == "pipeline":
+        # 주기 작업(재조회/동기화)만 백그라운드 스케줄러에 두고, 거래 사이클은 파이프라인이 실행합니다.
+        from apscheduler.schedulers.background import BackgroundScheduler
+        background = BackgroundScheduler()
+        add_scheduled_jobs(background, with_trading_cycle=False)
+        background.start()
+        pipeline = build_pipeline()
+        pipeline.start()
+        try:
+            pipeline.wait()
+        except (KeyboardInterrupt, SystemExit):
+            log.info("파이프라인을 종료합니다. (남은 주문/기록 처리 후 종료)")
+        finally:
+            pipeline.stop()
+            log.info("파이프라인 처리 현황: %s", pipeline.stats())
+            background.shutdown()
+            get_setting_manager().stop()
+            fill_tracker.stop()
+            journal.shutdown()
+    else:
+        scheduler = BlockingScheduler()
+        add_scheduled_jobs(scheduler)
+
+        try:
+            scheduler.start()
+        except (KeyboardInterrupt, SystemExit):
+            log.info("스케줄러를 종료합니다.")
+            get_setting_manager().stop()
+            fill_tracker.stop()
+            journal.shutdown()
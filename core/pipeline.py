@@ -0,0 +1,189 @@
+# core/pipeline.py
+
+import queue
+import threading
+import time
+import zlib
+from utils.log import get_logger
+
+log = get_logger("core.pipeline")
+
+# 단계 사이에 흘려보내는 종료 신호
+STOP = object()
+
+
+class Channel:
+    """
+    # --- [단계 사이의 큐] ---
+    # 크기가 정해진 큐입니다. 가득 차면 보내는 쪽이 기다리므로(backpressure) 느린 단계 앞에 메시지가 무한정 쌓이지 않습니다.
+    # conflate=True 이면 기다리지 않고 가장 오래된 메시지를 버립니다. (시세처럼 최신 값만 의미 있는 경우)
+    """
+
+    def __init__(self, name: str, maxsize: int = 100, conflate: bool = False):
+        self.name = name
+        self.conflate = conflate
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.high_water = 0
+
+    def put(self, item) -> None:
+        if item is STOP or not self.conflate:
+            self._queue.put(item)
+        else:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    try:
+                        old = self._queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                    if old is STOP:
+                        # 종료 신호는 버리지 않습니다.
+                        self._queue.put(STOP)
+                        return
+                    self.dropped += 1
+        self.high_water = max(self.high_water, self._queue.qsize())
+
+    def get(self):
+        return self._queue.get()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+def route_by_key(key: str, n: int) -> int:
+    """같은 키(마켓)는 항상 같은 작업자로 보내서 마켓별 처리 순서를 지킵니다."""
+    return zlib.crc32(key.encode()) % n if n > 1 else 0
+
+
+class Stage:
+    """
+    # --- [파이프라인 단계] ---
+    # workers 개의 스레드가 각자의 입력 큐에서 메시지를 꺼내 handler(message, emit)를 호출합니다.
+    # - emit(message)는 다음 단계로 메시지를 넘깁니다. (다음 단계 큐가 가득 차면 기다림)
+    # - key(message)가 있으면 같은 키의 메시지는 같은 작업자가 순서대로 처리합니다.
+    # - handler에서 난 예외는 출력만 하고 다음 메시지를 계속 처리합니다.
+    """
+
+    def __init__(self, name: str, handler, workers: int = 1, maxsize: int = 100,
+                 conflate: bool = False, key=None):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.key = key
+        self.inboxes = [Channel(f"{name}[{i}]", maxsize, conflate) for i in range(workers)]
+        self.next = None
+        self.processed = 0
+        self.failed = 0
+        self._threads = []
+        self._count_lock = threading.Lock()
+
+    def put(self, message) -> None:
+        index = route_by_key(self.key(message), self.workers) if self.key else self._least_loaded()
+        self.inboxes[index].put(message)
+
+    def _least_loaded(self) -> int:
+        return min(range(self.workers), key=lambda i: self.inboxes[i].qsize())
+
+    def emit(self, message) -> None:
+        if self.next is not None:
+            self.next.put(message)
+
+    def start(self) -> None:
+        for i, inbox in enumerate(self.inboxes):
+            thread = threading.Thread(target=self._work, args=(inbox,), name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self, inbox: Channel) -> None:
+        while True:
+            message = inbox.get()
+            if message is STOP:
+                return
+            try:
+                self.handler(message, self.emit)
+                ok = True
+            except Exception as e:
+                ok = False
+                log.exception("%s 처리 중 예외 발생: %s", self.name, e)
+            with self._count_lock:
+                self.processed += 1
+                self.failed += 0 if ok else 1
+
+    def close(self, timeout: float = None) -> None:
+        """입력 큐에 남은 메시지를 모두 처리한 뒤 작업자를 종료합니다."""
+        for inbox in self.inboxes:
+            inbox.put(STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def stats(self) -> dict:
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "queued": sum(inbox.qsize() for inbox in self.inboxes),
+            "high_water": max(inbox.high_water for inbox in self.inboxes),
+            "dropped": sum(inbox.dropped for inbox in self.inboxes),
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+
+class Pipeline:
+    """
+    # --- [다단계 실행기] ---
+    # source()가 interval 마다(또는 trigger() 호출 시 바로) 만든 메시지를 첫 단계로 넘기고,
+    # 각 단계는 독립된 스레드에서 돌아가므로 한 단계가 느려도 앞 단계는 계속 진행합니다.
+    # stop()은 source를 멈춘 뒤 앞 단계부터 차례로 남은 메시지를 모두 처리하고 종료합니다.
+    """
+
+    def __init__(self, source, stages: list, interval: float = 60.0):
+        self.source = source
+        self.stages = stages
+        self.interval = interval
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next = next_stage
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        for stage in reversed(self.stages):
+            stage.start()
+        self._thread = threading.Thread(target=self._run_source, name="pipeline-source", daemon=True)
+        self._thread.start()
+
+    def trigger(self) -> None:
+        """다음 주기를 기다리지 않고 source를 바로 한 번 실행합니다."""
+        self._wake.set()
+
+    def _run_source(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                message = self.source()
+                if message is not None:
+                    self.stages[0].put(message)
+            except Exception as e:
+                log.exception("source 처리 중 예외 발생: %s", e)
+            self._wake.wait(max(0.0, self.interval - (time.monotonic() - started)))
+            self._wake.clear()
+
+    def stop(self, timeout: float = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        for stage in self.stages:
+            stage.close(timeout)
+
+    def wait(self) -> None:
+        """KeyboardInterrupt가 들어올 때까지 기다립니다."""
+        while not self._stop.is_set():
+            self._stop.wait(1.0)
+
+    def stats(self) -> list:
+        return [stage.stats() for stage in self.stages]
@@ -0,0 +1,372 @@
+# core/sharding.py
+
+import bisect
+import hashlib
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+from strategy.limits import MIN_CASH_RATIO
+from utils.log import get_logger, fields
+
+log = get_logger("core.sharding")
+
+RING_REPLICAS = 100      # 샤드 하나당 링 위에 놓는 가상 노드 수 (많을수록 고르게 나뉨)
+RESERVATION_TTL = 600    # 확정/취소되지 않은 예약은 이 시간(초)이 지나면 풀어 줍니다. (작업자가 죽은 경우)
+
+
+class HashRing:
+    """
+    # --- [일관된 해싱 링] ---
+    # 마켓을 샤드(작업자 프로세스)에 나눠 줍니다. 샤드마다 가상 노드를 여러 개 두어 고르게 나누고,
+    # 마켓이 추가/삭제되어도 다른 마켓의 담당 샤드는 바뀌지 않습니다.
+    # 샤드 수를 바꿔도(재시작) 새 샤드 몫의 마켓만 옮겨 가므로, 나머지 마켓의 저널/상태는 그대로 이어집니다.
+    """
+
+    def __init__(self, shards: list, replicas: int = RING_REPLICAS):
+        if not shards:
+            raise ValueError("샤드가 하나 이상 있어야 합니다.")
+        points = sorted((_hash(f"{shard}#{i}"), shard) for shard in shards for i in range(replicas))
+        self.shards = list(shards)
+        self._hashes = [h for h, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def owner(self, key: str):
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+    def assign(self, keys) -> dict:
+        """{샤드: [키, ...]} (키가 없는 샤드도 빈 목록으로 포함)"""
+        assignment = {shard: [] for shard in self.shards}
+        for key in keys:
+            assignment[self.owner(key)].append(key)
+        return assignment
+
+
+def _hash(key: str) -> int:
+    # crc32는 "KRW-..."처럼 비슷한 짧은 문자열을 고르게 흩뜨리지 못하므로 md5 앞 8바이트를 사용합니다.
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class BudgetCoordinator:
+    """
+    # --- [계좌 전체 예산 조정자] ---
+    # 샤드들은 같은 업비트 계좌의 KRW를 나눠 쓰므로, 매수 주문은 보내기 전에 여기서 금액을 예약합니다.
+    # 시뮬레이터와 같은 규칙으로 허용합니다: 남은 현금 >= 주문 금액, 현금 비율 >= MIN_CASH_RATIO
+    # - refresh(accounts): 사이클마다 계좌 조회 결과로 현금/총자산을 다시 계산합니다.
+    # - reserve → commit(주문 전송됨) / release(전송 안 됨)
+    #   commit된 예약은 다음 refresh의 계좌 잔고(locked)에 반영되므로 그때 지웁니다.
+    # 부모 프로세스에서 BudgetManager로 띄우고, 작업자 프로세스는 프록시로 호출합니다.
+    """
+
+    def __init__(self, min_cash_ratio: float = MIN_CASH_RATIO, ttl: float = RESERVATION_TTL):
+        self.min_cash_ratio = min_cash_ratio
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._cash = 0.0          # 주문 가능 KRW (계좌 balance)
+        self._total = 0.0         # KRW(balance + locked) + 코인 평가금액(평균 매입가 기준)
+        self._as_of = None        # 마지막 refresh에 사용한 계좌 조회 시각
+        self._pending = {}        # 예약 id -> (금액, 예약 시각)  아직 전송 전
+        self._committed = {}      # 예약 id -> (금액, 확정 시각) 전송됨, 계좌 잔고에는 아직 반영 전일 수 있음
+        self.granted = 0
+        self.denied = 0
+
+    def refresh(self, accounts: list, as_of: float = None) -> None:
+        """
+        계좌 조회 결과(api.account.get_accounts)로 현금/총자산을 갱신합니다.
+        as_of: 계좌를 조회하기 시작한 시각 (time.time()). 그 전에 확정된 예약은 잔고에 반영된 것으로 보고 지웁니다.
+        """
+        as_of = time.time() if as_of is None else as_of
+        cash, total = 0.0, 0.0
+        for account in accounts:
+            balance, locked = float(account["balance"]), float(account["locked"])
+            if account["currency"] == "KRW":
+                cash = balance
+                total += balance + locked
+            else:
+                total += (balance + locked) * float(account.get("avg_buy_price") or 0)
+        with self._lock:
+            self._cash, self._total, self._as_of = cash, total, as_of
+            self._committed = {rid: v for rid, v in self._committed.items() if v[1] >= as_of}
+            expired = [rid for rid, (_, at) in self._pending.items() if as_of - at > self.ttl]
+            for rid in expired:
+                del self._pending[rid]
+
+    def reserve(self, market: str, amount: float):
+        """금액을 예약합니다. 허용되면 예약 id, 예산이 부족하면 None을 반환합니다."""
+        with self._lock:
+            if self._as_of is None:
+                self.denied += 1
+                return None
+            cash = self._available()
+            cash_ratio = cash / self._total if self._total > 0 else 0.0
+            if cash < amount or cash_ratio < self.min_cash_ratio:
+                self.denied += 1
+                log.info("💸 %s 매수 %.0f원 보류 - 주문 가능 %.0f원, 현금 비율 %.1f%% (최소 %.0f%%)",
+                         market, amount, cash, cash_ratio * 100, self.min_cash_ratio * 100,
+                         extra=fields(market=market, amount=amount, available=cash))
+                return None
+            rid = next(self._ids)
+            self._pending[rid] = (amount, time.time())
+            self.granted += 1
+            return rid
+
+    def commit(self, rid) -> None:
+        """예약한 주문이 거래소로 전송되었습니다. (결과를 모르는 경우 포함)"""
+        with self._lock:
+            reserved = self._pending.pop(rid, None)
+            if reserved is not None:
+                self._committed[rid] = (reserved[0], time.time())
+
+    def release(self, rid) -> None:
+        """예약한 주문을 보내지 않았습니다. 금액을 돌려놓습니다."""
+        with self._lock:
+            self._pending.pop(rid, None)
+
+    def available(self) -> float:
+        with self._lock:
+            return self._available()
+
+    def _available(self) -> float:
+        reserved = sum(a for a, _ in self._pending.values()) + sum(a for a, _ in self._committed.values())
+        return self._cash - reserved
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"cash": self._cash, "total": self._total, "available": self._available(),
+                    "pending": len(self._pending), "committed": len(self._committed),
+                    "granted": self.granted, "denied": self.denied}
+
+
+class BudgetManager(BaseManager):
+    """BudgetCoordinator 하나를 별도 프로세스에 두고, 부모/작업자 프로세스가 프록시로 함께 사용합니다."""
+
+
+BudgetManager.register("BudgetCoordinator", BudgetCoordinator)
+
+
+class ShardTick:
+    """부모 → 작업자: 이번 사이클에 처리할 마켓 설정과 계좌 조회 결과"""
+    __slots__ = ("cycle", "snapshot", "changed", "accounts")
+
+    def __init__(self, cycle, snapshot, changed, accounts):
+        self.cycle = cycle
+        self.snapshot = snapshot    # 이 샤드가 맡은 마켓만 담은 SettingSnapshot
+        self.changed = changed      # 설정이 바뀐 마켓 {market: 이전 Setting 또는 None}
+        self.accounts = accounts
+
+
+class ShardReport:
+    """작업자 → 부모: 사이클 한 번의 처리 결과"""
+    __slots__ = ("shard", "cycle", "markets", "seconds", "error")
+
+    def __init__(self, shard, cycle, markets, seconds, error=None):
+        self.shard = shard
+        self.cycle = cycle
+        self.markets = markets
+        self.seconds = seconds
+        self.error = error
+
+
+def _shard_main(shard: int, handler, inbox, reports, budget) -> None:
+    """작업자 프로세스 본체: 틱을 받을 때마다 handler(shard, tick, budget)를 실행하고 결과를 보고합니다."""
+    while True:
+        tick = inbox.get()
+        if tick is None:
+            return
+        started = time.perf_counter()
+        error = None
+        try:
+            handler(shard, tick, budget)
+        except Exception as e:
+            error = str(e)
+            log.exception("샤드 %d 처리 중 예외 발생: %s", shard, e)
+        reports.put(ShardReport(shard, tick.cycle, len(tick.snapshot.settings), time.perf_counter() - started, error))
+
+
+class ShardedRuntime:
+    """
+    # --- [샤드 실행기] ---
+    # 마켓을 일관된 해싱으로 shards 개의 작업자 프로세스에 나누고, interval 마다(또는 trigger 시) 각 작업자에게
+    # 자기 몫의 마켓 설정 + 계좌 조회 결과를 보냅니다. 작업자는 자기 마켓의 시세 조회 / 전략 / 주문만 처리하므로
+    # 마켓 수가 늘어도 샤드를 늘리면 마켓당 사이클 시간이 일정하고, 한 마켓의 예외가 다른 샤드를 늦추지 않습니다.
+    # - 계좌는 부모가 사이클마다 한 번만 조회해서(account_source) 예산 조정자를 갱신하고 작업자에게 나눠 줍니다.
+    # - 작업자가 아직 이전 틱을 처리 중이면 새 틱은 보내지 않습니다. (최신 틱만 의미 있음)
+    # - 죽은 작업자는 다음 사이클에 같은 샤드 번호로 다시 띄웁니다.
+    """
+
+    def __init__(self, shards: int, handler, setting_source, account_source, interval: float = 60.0,
+                 min_cash_ratio: float = MIN_CASH_RATIO):
+        self.shards = shards
+        self.handler = handler
+        self.setting_source = setting_source    # () -> (SettingSnapshot, {변경된 마켓: 이전 Setting})
+        self.account_source = account_source    # () -> 계좌 목록
+        self.interval = interval
+        self.min_cash_ratio = min_cash_ratio
+        self.ring = HashRing(list(range(shards)))
+        self.budget = None
+        self._manager = None
+        self._ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else mp.get_context()
+        self._reports = self._ctx.Queue()
+        self._inboxes = {}
+        self._processes = {}
+        self._busy = set()
+        self._cycle = 0
+        self._pending_shards = set()
+        self._pending_changes = {}
+        self._stats = {shard: {"cycles": 0, "failed": 0, "skipped": 0, "restarts": 0, "markets": 0,
+                               "last_seconds": 0.0, "max_seconds": 0.0} for shard in range(shards)}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, dispatcher: bool = True) -> None:
+        """예산 조정자와 작업자 프로세스를 띄웁니다. dispatcher=False 이면 주기 실행 없이 dispatch()를 직접 호출합니다."""
+        self._manager = BudgetManager()
+        self._manager.start()
+        self.budget = self._manager.BudgetCoordinator(self.min_cash_ratio)
+        for shard in range(self.shards):
+            self._spawn(shard)
+        if dispatcher:
+            self._thread = threading.Thread(target=self._run, name="shard-dispatcher", daemon=True)
+            self._thread.start()
+        log.info("샤드 %d개 시작", self.shards)
+
+    def _spawn(self, shard: int) -> None:
+        inbox = self._ctx.Queue(maxsize=1)
+        process = self._ctx.Process(target=_shard_main, name=f"shard-{shard}",
+                                    args=(shard, self.handler, inbox, self._reports, self.budget), daemon=True)
+        process.start()
+        self._inboxes[shard] = inbox
+        self._processes[shard] = process
+        self._busy.discard(shard)
+
+    def trigger(self, market: str = None) -> None:
+        """다음 주기를 기다리지 않고 바로 한 번 실행합니다. market을 주면 그 마켓을 맡은 샤드만 실행합니다."""
+        with self._lock:
+            self._pending_shards.update([self.ring.owner(market)] if market else range(self.shards))
+        self._wake.set()
+
+    def _run(self) -> None:
+        next_full = time.monotonic()
+        while not self._stop.is_set():
+            self._collect_reports()
+            now = time.monotonic()
+            with self._lock:
+                targets, self._pending_shards = self._pending_shards, set()
+            if now >= next_full:
+                targets = set(range(self.shards))
+                next_full = now + self.interval
+            if targets:
+                try:
+                    self.dispatch(targets)
+                except Exception as e:
+                    log.exception("사이클 분배 중 예외 발생: %s", e)
+            self._wake.wait(max(0.0, min(1.0, next_full - time.monotonic())))
+            self._wake.clear()
+
+    def dispatch(self, targets=None) -> dict:
+        """계좌를 한 번 조회해 예산을 갱신하고, 대상 샤드에 자기 마켓의 틱을 보냅니다. {샤드: 마켓 목록}을 반환합니다."""
+        targets = set(range(self.shards)) if targets is None else set(targets)
+        snapshot, changed = self.setting_source()
+        # 설정 변경 알림은 해당 샤드에 실제로 틱을 보낼 때까지 모아 둡니다.
+        for market, previous in changed.items():
+            self._pending_changes.setdefault(market, previous)
+        as_of = time.time()
+        accounts = self.account_source()
+        self.budget.refresh(accounts, as_of)
+
+        from manager.setting_manager import SettingSnapshot
+        self._cycle += 1
+        sent = {}
+        for shard, markets in self.ring.assign(snapshot.markets).items():
+            if shard not in targets:
+                continue
+            if not self._processes[shard].is_alive():
+                log.warning("⚠️ 샤드 %d 작업자가 종료됨 → 다시 시작", shard)
+                self._stats[shard]["restarts"] += 1
+                self._spawn(shard)
+            if shard in self._busy:
+                self._stats[shard]["skipped"] += 1
+                continue
+            shard_changed = {m: self._pending_changes[m] for m in markets if m in self._pending_changes}
+            tick = ShardTick(self._cycle, SettingSnapshot(snapshot.version, [snapshot.by_market[m] for m in markets]),
+                             shard_changed, accounts)
+            try:
+                self._inboxes[shard].put_nowait(tick)
+            except queue.Full:
+                self._stats[shard]["skipped"] += 1
+                continue
+            for market in shard_changed:
+                del self._pending_changes[market]
+            self._busy.add(shard)
+            sent[shard] = markets
+        return sent
+
+    def _collect_reports(self, timeout: float = None) -> list:
+        """작업자 보고를 모두 읽어 통계에 반영합니다. timeout을 주면 첫 보고를 그만큼 기다립니다."""
+        reports = []
+        while True:
+            try:
+                report = self._reports.get(timeout=timeout) if timeout and not reports else self._reports.get_nowait()
+            except queue.Empty:
+                return reports
+            self._busy.discard(report.shard)
+            stats = self._stats[report.shard]
+            stats["cycles"] += 1
+            stats["failed"] += 1 if report.error else 0
+            stats["markets"] = report.markets
+            stats["last_seconds"] = report.seconds
+            stats["max_seconds"] = max(stats["max_seconds"], report.seconds)
+            log.log(logging.WARNING if report.error else logging.INFO,
+                    "샤드 %d 사이클 %d 종료: 마켓 %d개, %.2fs%s", report.shard, report.cycle, report.markets,
+                    report.seconds, f" (실패: {report.error})" if report.error else "",
+                    extra=fields(shard=report.shard, markets=report.markets, seconds=round(report.seconds, 3)))
+            reports.append(report)
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """dispatch()로 보낸 틱을 모든 샤드가 처리할 때까지 기다립니다. (분배 스레드 없이 직접 실행할 때 사용)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._busy:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            self._collect_reports(timeout=0.05)
+        return True
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """진행 중인 사이클을 마친 뒤 작업자를 종료합니다."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for shard, process in self._processes.items():
+            try:
+                # 처리 중인 틱이 있으면 그 뒤에 종료 신호가 들어갑니다.
+                self._inboxes[shard].put(None, timeout=timeout if process.is_alive() else 0.1)
+            except queue.Full:
+                pass
+        for shard, process in self._processes.items():
+            process.join(timeout)
+            if process.is_alive():
+                log.warning("⚠️ 샤드 %d 작업자가 제시간에 끝나지 않아 강제 종료", shard)
+                process.terminate()
+        self._collect_reports()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def wait(self) -> None:
+        """KeyboardInterrupt가 들어올 때까지 기다립니다."""
+        while not self._stop.is_set():
+            self._stop.wait(1.0)
+
+    def stats(self) -> dict:
+        return {"shards": {shard: dict(s) for shard, s in self._stats.items()},
+                "budget": self.budget.stats() if self.budget is not None else None}
@@ -0,0 +1,441 @@
+# data/candle_store.py
+
+import os
+import threading
+import time
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.file_utils import append_log, load_log
+from utils.log import get_logger
+
+log = get_logger("data.candle_store")
+
+CANDLE_DIR = os.path.join("data", "candles")
+
+# 캔들 단위: 분 단위 정수(1, 3, 5, ...) 또는 초봉(SECONDS)
+SECONDS = "1s"
+# 초봉은 하루 86,400개이므로 날짜별 디렉터리(data/candles/<market>/1s/<YYYY-MM-DD>)에 나눠 저장합니다.
+SECOND_FLUSH_ROWS = 20_000        # 받아 오는 중 이만큼 모이면 저장 (중간에 멈춰도 저장한 곳부터 이어 받음)
+SECOND_REQUEST_INTERVAL = 0.1     # 초봉 요청 간격(초) — 업비트 시세 조회 한도(초당 10회)
+FETCH_RETRIES = 5                 # 조회 실패 시 재시도 횟수 (모두 실패하면 예외)
+RETRY_BACKOFF = 1.0               # 재시도 대기(초): RETRY_BACKOFF × 1, 2, 4, ...
+
+CANDLE_COLUMNS = ["time", "market", "open", "high", "low", "close", "volume", "value"]
+CANDLE_SCHEMA = pa.schema([
+    ("time", pa.timestamp("us")),
+    ("market", pa.string()),
+    ("open", pa.float64()),
+    ("high", pa.float64()),
+    ("low", pa.float64()),
+    ("close", pa.float64()),
+    ("volume", pa.float64()),
+    ("value", pa.float64()),
+])
+
+# 업비트 응답 컬럼 ↔ 저장소 컬럼
+UPBIT_COLUMNS = {
+    "candle_date_time_kst": "time",
+    "market": "market",
+    "opening_price": "open",
+    "high_price": "high",
+    "low_price": "low",
+    "trade_price": "close",
+    "candle_acc_trade_volume": "volume",
+    "candle_acc_trade_price": "value",
+}
+
+# 업비트 분봉은 UTC 00:00 기준으로 나뉘므로, KST 시각에서 9시간을 뺀 뒤 묶습니다. (240분봉이 09시, 13시 ... 에 시작)
+_BUCKET_OFFSET_NS = 9 * 3600 * 10**9
+
+
+def now_kst() -> pd.Timestamp:
+    return pd.Timestamp.now(tz="Asia/Seoul").tz_localize(None)
+
+
+def from_upbit(candles: list, market: str = None) -> pd.DataFrame:
+    """업비트 캔들 응답(list of dict)을 저장소 형식(시간순)으로 변환합니다."""
+    df = pd.DataFrame(candles)
+    if df.empty:
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
+    df = df.rename(columns=UPBIT_COLUMNS)
+    if "market" not in df.columns:
+        df["market"] = market
+    for col in CANDLE_COLUMNS:
+        if col not in df.columns:
+            df[col] = np.nan
+    return _normalize(df[CANDLE_COLUMNS])
+
+
+def to_upbit(df: pd.DataFrame) -> pd.DataFrame:
+    """저장소 형식을 업비트 응답과 같은 컬럼 이름으로 되돌립니다. (대시보드 차트용)"""
+    return df.rename(columns={v: k for k, v in UPBIT_COLUMNS.items()})
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["time"] = pd.to_datetime(df["time"])
+    return (df.sort_values("time", kind="stable")
+              .drop_duplicates(subset="time", keep="last")
+              .reset_index(drop=True))
+
+
+def unit_delta(unit) -> pd.Timedelta:
+    """캔들 하나의 길이 (분 단위 정수 또는 SECONDS)"""
+    return pd.Timedelta(seconds=1) if unit == SECONDS else pd.Timedelta(minutes=int(unit))
+
+
+def unit_label(unit) -> str:
+    return SECONDS if unit == SECONDS else f"{unit}m"
+
+
+def bucket_start(times, unit: int) -> np.ndarray:
+    """각 시각이 속한 unit분봉의 시작 시각(datetime64[ns])을 반환합니다."""
+    ns = np.asarray(pd.to_datetime(times), dtype="datetime64[ns]").astype(np.int64)
+    step = unit * 60 * 10**9
+    return ((ns - _BUCKET_OFFSET_NS) // step * step + _BUCKET_OFFSET_NS).astype("datetime64[ns]")
+
+
+def resample(df: pd.DataFrame, unit: int) -> pd.DataFrame:
+    """
+    시간순으로 정렬된 한 마켓의 1분봉을 unit분봉으로 묶습니다.
+    정렬되어 있으므로 묶음 경계만 찾아서 numpy reduceat으로 한 번에 계산합니다. (groupby 없이)
+    """
+    if df.empty or unit == 1:
+        return df.reset_index(drop=True).copy()
+
+    buckets = bucket_start(df["time"], unit)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+
+    return pd.DataFrame({
+        "time": buckets[starts],
+        "market": df["market"].to_numpy()[starts],
+        "open": df["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(), starts),
+        "close": df["close"].to_numpy()[ends],
+        "volume": np.add.reduceat(df["volume"].to_numpy(), starts),
+        "value": np.add.reduceat(df["value"].to_numpy(), starts),
+    })
+
+
+def _fetch_with_retries(fetch, label: str) -> list:
+    """
+    조회를 최대 FETCH_RETRIES 번 시도합니다.
+    모두 실패했거나 캔들 조회 회로가 차단되어 있으면(api/resilience.py) 예외를 그대로 냅니다.
+    """
+    from api.resilience import CircuitOpenError
+
+    for attempt in range(1, FETCH_RETRIES + 1):
+        try:
+            return fetch()
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            if attempt == FETCH_RETRIES:
+                raise
+            log.warning("%s 데이터 조회 실패 (%d/%d) → 재시도 대기: %s", label, attempt, FETCH_RETRIES, e)
+            time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
+
+def fetch_minute_candles(market: str, unit: int, start, end) -> list:
+    """
+    [start, end) 구간의 분봉을 200개씩 앞에서부터 차례로 가져옵니다. (시각은 KST 기준)
+    각 요청은 직전 요청의 가장 최근 캔들 다음부터 시작하므로 같은 캔들을 중복으로 받지 않습니다.
+    """
+    # 거래소 API(requests)는 실제로 받을 때만 불러옵니다. (저장된 캔들만 쓰는 백테스트/분석은 불러오지 않음)
+    from api.price import get_minute_candles
+
+    current_time = pd.to_datetime(start)
+    end_time = pd.to_datetime(end)
+    all_candles = []
+
+    while current_time < end_time:
+        # to 에 시간대를 붙이지 않으면 업비트는 UTC로 해석합니다.
+        to_time = min(current_time + timedelta(minutes=unit * 200), end_time).strftime("%Y-%m-%dT%H:%M:%S+09:00")
+        candles = _fetch_with_retries(lambda: get_minute_candles(market, unit=unit, count=200, to=to_time), "분봉")
+
+        candles = [c for c in candles if pd.Timestamp(c['candle_date_time_kst']) >= current_time]
+        if candles:
+            candles.reverse()
+            all_candles.extend(candles)
+            current_time = pd.to_datetime(candles[-1]['candle_date_time_kst']) + timedelta(minutes=unit)
+        else:
+            # 거래가 없던 구간은 건너뜁니다.
+            current_time += timedelta(minutes=unit * 200)
+        time.sleep(0.3)
+
+    return all_candles
+
+
+def iter_second_candles(market: str, start, end):
+    """
+    [start, end) 구간의 초봉을 200개(200초)씩 앞에서부터 받아, 요청마다 받은 캔들(시간순 list)을 내보냅니다.
+    전체를 모아 두지 않으므로 며칠 치를 받아도 메모리가 일정합니다.
+    """
+    from api.price import get_second_candles
+
+    current_time = pd.to_datetime(start)
+    end_time = pd.to_datetime(end)
+    while current_time < end_time:
+        to_time = min(current_time + timedelta(seconds=200), end_time).strftime("%Y-%m-%dT%H:%M:%S+09:00")
+        candles = _fetch_with_retries(lambda: get_second_candles(market, to=to_time, count=200), "초봉")
+
+        candles = [c for c in candles if pd.Timestamp(c['candle_date_time_kst']) >= current_time]
+        if candles:
+            candles.reverse()
+            current_time = pd.to_datetime(candles[-1]['candle_date_time_kst']) + timedelta(seconds=1)
+            yield candles
+        else:
+            # 거래가 없던 구간은 건너뜁니다.
+            current_time += timedelta(seconds=200)
+        time.sleep(SECOND_REQUEST_INTERVAL)
+
+
+class CandleStore:
+    """
+    # --- [캔들 저장소] ---
+    # 마켓별 1분봉만 거래소에서 받아 Parquet(data/candles/<market>/1m)으로 보관하고,
+    # 3분/5분/60분/240분 등 다른 단위는 1분봉을 묶어서(resample) 만듭니다.
+    # - 묶은 결과는 (마켓, 단위)별로 메모리에 보관합니다.
+    # - 새 1분봉이 들어오면 그 시각 이후의 묶음만 다시 계산합니다. (앞쪽 묶음은 그대로 재사용)
+    """
+
+    def __init__(self, root: str = CANDLE_DIR):
+        self.root = root
+        self._lock = threading.RLock()
+        self._base = {}        # market -> 1분봉 DataFrame (시간순)
+        self._frames = {}      # (market, unit) -> 묶은 DataFrame
+        self._stale_from = {}  # (market, unit) -> 이 시각 이후 묶음은 다시 계산해야 함
+
+    def _path(self, market: str) -> str:
+        return os.path.join(self.root, market, "1m")
+
+    def base(self, market: str) -> pd.DataFrame:
+        with self._lock:
+            if market not in self._base:
+                df = load_log(self._path(market), CANDLE_SCHEMA, markets=[market])
+                self._base[market] = _normalize(df) if not df.empty else pd.DataFrame(columns=CANDLE_COLUMNS)
+            return self._base[market]
+
+    def append(self, market: str, new_df: pd.DataFrame) -> None:
+        """새 1분봉(저장소 형식)을 저장하고, 영향을 받는 묶음만 다시 계산되도록 표시합니다."""
+        if new_df.empty:
+            return
+        new_df = _normalize(new_df)
+        first_new = new_df["time"].iloc[0]
+
+        with self._lock:
+            base = self.base(market)
+            append_log(new_df, self._path(market), CANDLE_SCHEMA)
+
+            if base.empty or new_df["time"].iloc[-1] >= base["time"].iloc[-1]:
+                # 흔한 경우: 마지막 캔들 이후(진행 중이던 마지막 캔들 포함)를 이어 붙임
+                keep = base.iloc[:base["time"].searchsorted(first_new)]
+                base = pd.concat([keep, new_df], ignore_index=True) if not keep.empty else new_df
+            else:
+                base = _normalize(pd.concat([base, new_df], ignore_index=True))
+            self._base[market] = base
+
+            for key in self._frames:
+                if key[0] == market:
+                    cut = pd.Timestamp(bucket_start([first_new], key[1])[0])
+                    previous = self._stale_from.get(key)
+                    self._stale_from[key] = cut if previous is None else min(previous, cut)
+
+    def update(self, market: str, start=None, end=None) -> int:
+        """
+        저장소에 없는 구간의 1분봉만 거래소에서 받아 추가합니다. 받은 캔들 수를 반환합니다.
+        마지막으로 저장한 캔들은 진행 중이었을 수 있으므로 다시 받습니다.
+        저장된 구간([처음, 마지막] 캔들)이 항상 이어지도록, 요청 구간이 저장된 구간과 떨어져 있으면 그 사이도 함께 받습니다.
+        (그렇지 않으면 사이에 남은 구간을 나중에 요청해도 저장된 구간 안쪽으로 보고 받지 않습니다)
+        """
+        end = pd.to_datetime(end) if end is not None else now_kst()
+        start = pd.to_datetime(start) if start is not None else None
+        base = self.base(market)
+
+        ranges = []
+        if base.empty:
+            ranges.append((start if start is not None else end - timedelta(minutes=200), end))
+        else:
+            first, last = base["time"].iloc[0], base["time"].iloc[-1]
+            if start is not None and start < first:
+                ranges.append((start, first))
+            if end > last:
+                ranges.append((last, end))
+
+        count = 0
+        for range_start, range_end in ranges:
+            candles = fetch_minute_candles(market, 1, range_start, range_end)
+            self.append(market, from_upbit(candles, market))
+            count += len(candles)
+        return count
+
+    def get_candles(self, market: str, unit: int = 1, start=None, end=None, count: int = None) -> pd.DataFrame:
+        """저장된 1분봉을 unit분봉으로 묶어 [start, end) 구간(또는 마지막 count개)을 반환합니다."""
+        with self._lock:
+            base = self.base(market)
+            key = (market, unit)
+            frame = self._frames.get(key)
+            if frame is None:
+                frame = resample(base, unit)
+            elif key in self._stale_from:
+                cut = self._stale_from.pop(key)
+                tail = resample(base.iloc[base["time"].searchsorted(cut):], unit)
+                frame = pd.concat([frame.iloc[:frame["time"].searchsorted(cut)], tail], ignore_index=True)
+            self._frames[key] = frame
+            self._stale_from.pop(key, None)
+
+        if start is not None:
+            frame = frame.iloc[frame["time"].searchsorted(pd.to_datetime(start)):]
+        if end is not None:
+            frame = frame.iloc[:frame["time"].searchsorted(pd.to_datetime(end))]
+        if count is not None:
+            frame = frame.tail(count)
+        return frame.reset_index(drop=True).copy()
+
+
+class SecondCandleStore:
+    """
+    # --- [초봉 저장소] ---
+    # 마켓별 초봉을 날짜별 Parquet 디렉터리(data/candles/<market>/1s/<YYYY-MM-DD>)에 보관합니다.
+    # 1분봉 저장소와 달리 전체를 메모리에 올리지 않고, 읽을 때도 하루씩 읽어 정해진 크기의 창(windows)으로 내보냅니다.
+    # - backfill: 없는 구간만 받아 SECOND_FLUSH_ROWS 개씩 저장합니다. 하루 전체를 받은 날은 _complete 표시를 남겨 다시 받지 않습니다.
+    """
+
+    def __init__(self, root: str = CANDLE_DIR, flush_rows: int = SECOND_FLUSH_ROWS):
+        self.root = root
+        self.flush_rows = flush_rows
+
+    def _market_path(self, market: str) -> str:
+        return os.path.join(self.root, market, SECONDS)
+
+    def _day_path(self, market: str, day: pd.Timestamp) -> str:
+        return os.path.join(self._market_path(market), day.strftime("%Y-%m-%d"))
+
+    def days(self, market: str) -> list:
+        """초봉이 저장된 날짜 목록 (시간순)"""
+        path = self._market_path(market)
+        if not os.path.isdir(path):
+            return []
+        return [pd.Timestamp(name) for name in sorted(os.listdir(path))]
+
+    def is_complete(self, market: str, day) -> bool:
+        return os.path.exists(os.path.join(self._day_path(market, pd.Timestamp(day).normalize()), "_complete"))
+
+    def _read_day(self, market: str, day: pd.Timestamp, start=None, end=None) -> pd.DataFrame:
+        df = load_log(self._day_path(market, day), CANDLE_SCHEMA, start=start, end=end)
+        return _normalize(df) if not df.empty else pd.DataFrame(columns=CANDLE_COLUMNS)
+
+    def append(self, market: str, new_df: pd.DataFrame) -> None:
+        """초봉(저장소 형식)을 날짜별 디렉터리에 나눠 저장합니다."""
+        if new_df.empty:
+            return
+        days = new_df["time"].dt.normalize()
+        for day, part in new_df.groupby(days, sort=True):
+            append_log(part, self._day_path(market, day), CANDLE_SCHEMA)
+
+    def backfill(self, market: str, start, end=None) -> int:
+        """
+        [start, end) 구간 중 저장소에 없는 초봉을 거래소에서 받아 저장합니다. 받은 캔들 수를 반환합니다.
+        날짜마다 저장된 구간([처음, 마지막] 캔들)의 앞쪽과, 마지막으로 저장한 캔들 이후만 받으므로
+        중간에 멈춰도 다시 실행하면 남은 곳만 받습니다. 1분봉 저장소(CandleStore.update)처럼
+        요청 구간이 저장된 구간과 떨어져 있으면 그 사이도 함께 받아, 날짜마다 저장된 구간이 항상 이어지게 합니다.
+        """
+        start = pd.to_datetime(start)
+        now = now_kst().floor("s")
+        end = min(pd.to_datetime(end), now) if end is not None else now
+        count = 0
+        day = start.normalize()
+        while day < end:
+            next_day = day + timedelta(days=1)
+            lo, hi = max(start, day), min(end, next_day)
+            if not self.is_complete(market, day):
+                stored = self._read_day(market, day)["time"]
+                if stored.empty:
+                    ranges = [(lo, hi)]
+                else:
+                    first, last = stored.iloc[0], stored.iloc[-1]
+                    ranges = []
+                    if lo < first:
+                        ranges.append((lo, first))
+                    if hi > last:
+                        # 마지막 캔들은 진행 중이었을 수 있으므로 다시 받습니다. (읽을 때 같은 시각은 나중 것을 사용)
+                        ranges.append((last, hi))
+                del stored
+
+                started = time.perf_counter()
+                fetched = 0
+                for range_start, range_end in ranges:
+                    fetched += self._fetch(market, range_start, range_end)
+                count += fetched
+
+                # 그날 전체([day, next_day))를 받았고 그날이 이미 지났다면 다시 받지 않도록 표시합니다.
+                # (하루 중간부터 받은 날은 앞쪽이 비어 있으므로 표시하지 않습니다)
+                if lo == day and hi == next_day and next_day <= now - timedelta(minutes=1):
+                    path = self._day_path(market, day)
+                    os.makedirs(path, exist_ok=True)
+                    open(os.path.join(path, "_complete"), "w").close()
+                log.info("📥 %s 초봉 %s: %d개 (%.1fs)", market, day.date(), fetched, time.perf_counter() - started)
+            day = next_day
+        return count
+
+    def _fetch(self, market: str, start, end) -> int:
+        """[start, end) 구간의 초봉을 받아 flush_rows 개씩 저장합니다. 받은 캔들 수를 반환합니다."""
+        buffer, fetched = [], 0
+        for candles in iter_second_candles(market, start, end):
+            buffer.extend(candles)
+            if len(buffer) >= self.flush_rows:
+                self.append(market, from_upbit(buffer, market))
+                fetched += len(buffer)
+                buffer = []
+        self.append(market, from_upbit(buffer, market))
+        return fetched + len(buffer)
+
+    def read(self, market: str, start=None, end=None) -> pd.DataFrame:
+        """[start, end) 구간의 초봉을 한 번에 읽습니다. (긴 구간은 windows 사용)"""
+        frames = list(self.windows(market, start, end))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=CANDLE_COLUMNS)
+
+    def windows(self, market: str, start=None, end=None, rows: int = 86_400):
+        """
+        [start, end) 구간의 초봉을 rows 개씩 시간순으로 내보냅니다. (마지막 창만 더 작을 수 있음)
+        하루치씩 읽으므로 구간 길이와 관계없이 메모리는 하루치 + 창 하나를 넘지 않습니다.
+        """
+        start = pd.to_datetime(start) if start is not None else None
+        end = pd.to_datetime(end) if end is not None else None
+        rest = None
+        for day in self.days(market):
+            if (start is not None and day + timedelta(days=1) <= start) or (end is not None and day >= end):
+                continue
+            df = self._read_day(market, day, start=start, end=end)
+            if rest is not None and not rest.empty:
+                df = pd.concat([rest, df], ignore_index=True)
+            full = len(df) // rows * rows
+            for i in range(0, full, rows):
+                yield df.iloc[i:i + rows].reset_index(drop=True)
+            rest = df.iloc[full:]
+        if rest is not None and not rest.empty:
+            yield rest.reset_index(drop=True)
+
+
+_default_store = None
+_default_second_store = None
+
+
+def get_candle_store() -> CandleStore:
+    """프로세스 안에서 하나의 저장소를 함께 사용합니다."""
+    global _default_store
+    if _default_store is None:
+        _default_store = CandleStore()
+    return _default_store
+
+
+def get_second_candle_store() -> SecondCandleStore:
+    global _default_second_store
+    if _default_second_store is None:
+        _default_second_store = SecondCandleStore()
+    return _default_second_store
@@ -0,0 +1,299 @@
+# data/indicators.py
+
+import threading
+import numpy as np
+import pandas as pd
+
+from data.candle_store import bucket_start, get_candle_store
+
+# 기본 지표 (대시보드 차트와 같은 구성)
+MA_WINDOWS = (5, 20)
+BB_WINDOW = 20
+BB_K = 2
+EMA_SPANS = ()
+
+# 한 번에 이만큼 넘게 새 캔들이 쌓여 있으면 한 개씩 갱신하지 않고 전체를 다시 계산합니다.
+BACKFILL_ROWS = 5_000
+# 누적 오차가 쌓이지 않도록, 이 횟수만큼 갱신할 때마다 창 안의 값으로 평균/분산을 다시 계산합니다.
+RESYNC_EVERY = 10_000
+
+
+class RollingWindow:
+    """
+    # --- [이동 창 통계] ---
+    # 최근 window개 값을 원형 버퍼에 보관하고, 평균과 분산(Welford)을 값 하나를 넣고 빼는 것만으로 갱신합니다.
+    # 창 길이와 상관없이 갱신 비용이 일정합니다. (pandas rolling의 min_periods=window, ddof=1 과 같은 결과)
+    """
+    __slots__ = ("window", "values", "pos", "count", "mean", "m2", "updates")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = np.zeros(window, dtype=np.float64)
+        self.pos = 0        # 다음에 쓸 위치
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0       # 평균과의 차이 제곱합
+        self.updates = 0
+
+    def push(self, x: float) -> None:
+        if self.count < self.window:
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+        else:
+            self._replace(self.pos, x)
+        self.values[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        self._tick()
+
+    def replace_last(self, x: float) -> None:
+        """마지막으로 넣은 값을 바꿉니다. (진행 중이던 캔들의 종가가 바뀐 경우)"""
+        last = (self.pos - 1) % self.window
+        self._replace(last, x)
+        self.values[last] = x
+        self._tick()
+
+    def _replace(self, index: int, x: float) -> None:
+        # 개수가 그대로일 때 old → x 로 바꾸는 Welford 갱신
+        old = self.values[index]
+        old_mean = self.mean
+        self.mean += (x - old) / self.count
+        self.m2 += (x - old) * (x - self.mean + old - old_mean)
+
+    def _tick(self) -> None:
+        self.updates += 1
+        if self.updates >= RESYNC_EVERY:
+            self.resync()
+
+    def resync(self) -> None:
+        values = self.filled()
+        self.mean = float(values.mean()) if len(values) else 0.0
+        self.m2 = float(((values - self.mean) ** 2).sum()) if len(values) else 0.0
+        self.updates = 0
+
+    def filled(self) -> np.ndarray:
+        """창 안의 값 (오래된 것부터)"""
+        if self.count < self.window:
+            return self.values[:self.count].copy()
+        return np.roll(self.values, -self.pos)
+
+    def seed(self, values: np.ndarray) -> None:
+        """전체 재계산 뒤, 마지막 window개 값으로 상태를 맞춥니다."""
+        values = np.asarray(values, dtype=np.float64)[-self.window:]
+        self.count = len(values)
+        self.values[:self.count] = values
+        self.pos = self.count % self.window
+        self.resync()
+
+    def full_mean(self) -> float:
+        return self.mean if self.count == self.window else np.nan
+
+    def full_std(self) -> float:
+        if self.count < self.window or self.window < 2:
+            return np.nan
+        return float(np.sqrt(max(self.m2, 0.0) / (self.window - 1)))
+
+
+class Ema:
+    """지수이동평균 (pandas ewm(span, adjust=False)와 같은 결과)"""
+    __slots__ = ("alpha", "value", "prev")
+
+    def __init__(self, span: int):
+        self.alpha = 2 / (span + 1)
+        self.value = np.nan
+        self.prev = np.nan  # 마지막 값을 넣기 전의 EMA (replace_last 용)
+
+    def push(self, x: float) -> None:
+        self.prev = self.value
+        self.value = self._next(self.prev, x)
+
+    def replace_last(self, x: float) -> None:
+        self.value = self._next(self.prev, x)
+
+    def _next(self, prev: float, x: float) -> float:
+        return x if prev != prev else prev + self.alpha * (x - prev)
+
+
+class IndicatorSeries:
+    """
+    # --- [한 (마켓, 단위)의 지표] ---
+    # 캔들이 하나 들어올 때마다 이동 창/EMA 상태를 갱신하고, 계산된 지표 값을 시간순 버퍼에 이어 붙입니다.
+    # 마지막 캔들과 같은 시각의 캔들이 다시 들어오면(진행 중이던 캔들) 마지막 값만 고칩니다.
+    """
+
+    def __init__(self, ma_windows=MA_WINDOWS, bb_window: int = BB_WINDOW, bb_k: float = BB_K,
+                 ema_spans=EMA_SPANS, capacity: int = 1024):
+        self.ma_windows = tuple(ma_windows)
+        self.bb_window = bb_window
+        self.bb_k = bb_k
+        self.ema_spans = tuple(ema_spans)
+        self.columns = ([f"ma{w}" for w in self.ma_windows] + [f"std{bb_window}", "upper_band", "lower_band"]
+                        + [f"ema{s}" for s in self.ema_spans])
+        self._windows = {w: RollingWindow(w) for w in sorted(set(self.ma_windows) | {bb_window})}
+        self._emas = [Ema(s) for s in self.ema_spans]
+        self.size = 0
+        self._time = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((len(self.columns), capacity), dtype=np.float64)
+
+    @property
+    def last_time(self):
+        return pd.Timestamp(self._time[self.size - 1]) if self.size else None
+
+    @property
+    def first_time(self):
+        return pd.Timestamp(self._time[0]) if self.size else None
+
+    # --- 한 개씩 갱신 ---
+
+    def update(self, time, close: float) -> None:
+        time_ns = pd.Timestamp(time).value
+        if self.size and time_ns == self._time[self.size - 1]:
+            for window in self._windows.values():
+                window.replace_last(close)
+            for ema in self._emas:
+                ema.replace_last(close)
+            self._values[:, self.size - 1] = self._current()
+            return
+        if self.size and time_ns < self._time[self.size - 1]:
+            raise ValueError(f"이전 캔들보다 앞선 시각입니다: {pd.Timestamp(time)} < {self.last_time}")
+
+        for window in self._windows.values():
+            window.push(close)
+        for ema in self._emas:
+            ema.push(close)
+        if self.size == self._time.shape[0]:
+            self._grow()
+        self._time[self.size] = time_ns
+        self._values[:, self.size] = self._current()
+        self.size += 1
+
+    def _current(self) -> list:
+        values = [self._windows[w].full_mean() for w in self.ma_windows]
+        bb = self._windows[self.bb_window]
+        mid, std = bb.full_mean(), bb.full_std()
+        values += [std, mid + self.bb_k * std, mid - self.bb_k * std]
+        values += [ema.value for ema in self._emas]
+        return values
+
+    def _grow(self) -> None:
+        capacity = self._time.shape[0] * 2
+        self._time = np.resize(self._time, capacity)
+        values = np.empty((len(self.columns), capacity), dtype=np.float64)
+        values[:, :self.size] = self._values[:, :self.size]
+        self._values = values
+
+    # --- 전체 재계산 ---
+
+    def backfill(self, times, closes) -> None:
+        """
+        캔들 전체로 지표를 한 번에(벡터 연산으로) 다시 계산하고,
+        이후 한 개씩 갱신할 수 있도록 마지막 값들로 상태를 맞춥니다.
+        """
+        times = np.asarray(pd.to_datetime(times), dtype="datetime64[ns]").astype(np.int64)
+        closes = pd.Series(np.asarray(closes, dtype=np.float64))
+        n = len(closes)
+
+        columns = [closes.rolling(w).mean() for w in self.ma_windows]
+        mid = closes.rolling(self.bb_window).mean()
+        std = closes.rolling(self.bb_window).std()
+        columns += [std, mid + self.bb_k * std, mid - self.bb_k * std]
+        emas = [closes.ewm(span=s, adjust=False).mean() for s in self.ema_spans]
+        columns += emas
+
+        capacity = max(1024, 1 << int(np.ceil(np.log2(max(n, 1) * 1.25))))
+        self._time = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((len(self.columns), capacity), dtype=np.float64)
+        self._time[:n] = times
+        for row, column in enumerate(columns):
+            self._values[row, :n] = column.to_numpy()
+        self.size = n
+
+        for window in self._windows.values():
+            window.seed(closes.to_numpy())
+        for ema, column in zip(self._emas, emas):
+            ema.value = column.iloc[-1] if n else np.nan
+            ema.prev = column.iloc[-2] if n > 1 else np.nan
+
+    # --- 조회 ---
+
+    def frame(self, start=None, end=None) -> pd.DataFrame:
+        times = self._time[:self.size]
+        lo = times.searchsorted(pd.Timestamp(start).value) if start is not None else 0
+        hi = times.searchsorted(pd.Timestamp(end).value) if end is not None else self.size
+        data = {"time": pd.to_datetime(times[lo:hi])}
+        for row, name in enumerate(self.columns):
+            data[name] = self._values[row, lo:hi].copy()
+        return pd.DataFrame(data)
+
+    def latest(self) -> dict:
+        if not self.size:
+            return {}
+        values = dict(zip(self.columns, self._values[:, self.size - 1].tolist()))
+        values["time"] = self.last_time
+        return values
+
+
+class IndicatorEngine:
+    """
+    # --- [지표 엔진] ---
+    # 캔들 저장소(data/candle_store.py)의 (마켓, 단위)별 캔들을 따라가며 지표를 유지합니다.
+    # - 처음 요청하거나 앞쪽 기록이 늘어나면 전체를 벡터 연산으로 다시 계산합니다.
+    # - 그 뒤에는 마지막으로 본 캔들 이후의 캔들만 한 개씩 반영하므로, 기록/창 길이와 상관없이 비용이 일정합니다.
+    # 대시보드 차트와 전략(지표 조건 진입)이 같은 엔진을 함께 씁니다.
+    """
+
+    def __init__(self, store=None, **series_options):
+        self.store = store if store is not None else get_candle_store()
+        self.series_options = series_options
+        self._lock = threading.RLock()
+        self._series = {}  # (market, unit) -> IndicatorSeries
+
+    def sync(self, market: str, unit: int = 1) -> IndicatorSeries:
+        """저장소에 새로 들어온 캔들을 지표에 반영합니다."""
+        key = (market, unit)
+        with self._lock:
+            series = self._series.get(key)
+            base = self.store.base(market)
+            if base.empty:
+                return series if series is not None else IndicatorSeries(**self.series_options)
+
+            first_bucket = pd.Timestamp(bucket_start(base["time"].iloc[:1], unit)[0])
+            if series is None or series.size == 0 or first_bucket < series.first_time:
+                return self._rebuild(key)
+
+            new = self.store.get_candles(market, unit=unit, start=series.last_time)
+            if len(new) > BACKFILL_ROWS:
+                return self._rebuild(key)
+            for time, close in zip(new["time"], new["close"].to_numpy(dtype=float)):
+                series.update(time, close)
+            return series
+
+    def _rebuild(self, key) -> IndicatorSeries:
+        market, unit = key
+        candles = self.store.get_candles(market, unit=unit)
+        series = IndicatorSeries(**self.series_options)
+        series.backfill(candles["time"], candles["close"])
+        self._series[key] = series
+        return series
+
+    def get(self, market: str, unit: int = 1, start=None, end=None) -> pd.DataFrame:
+        """[start, end) 구간의 지표 (time + 지표 컬럼)"""
+        with self._lock:
+            return self.sync(market, unit).frame(start, end)
+
+    def latest(self, market: str, unit: int = 1) -> dict:
+        """가장 최근 캔들의 지표 값 (전략에서 매 사이클 조회)"""
+        with self._lock:
+            return self.sync(market, unit).latest()
+
+
+_default_engine = None
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    """프로세스 안에서 하나의 엔진을 함께 사용합니다. (저장소도 공유)"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = IndicatorEngine()
+    return _default_engine
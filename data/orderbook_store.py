@@ -0,0 +1,518 @@
+# data/orderbook_store.py
+
+import argparse
+import heapq
+import os
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+
+from utils.log import get_logger, fields
+
+log = get_logger("data.orderbook_store")
+
+ORDERBOOK_DIR = os.path.join("data", "orderbooks")
+
+# 호가 스냅샷 한 개 = 고정 폭 배열 4개 (매도가, 매도잔량, 매수가, 매수잔량) × DEPTH 단계
+# 업비트 KRW 마켓은 15단계를 주므로 기본값도 15입니다. 단계가 모자라면 0으로 채웁니다.
+DEPTH = 15
+LEVEL_FIELDS = ("ask_price", "ask_size", "bid_price", "bid_size")
+
+# 디스크 링 버퍼: data/orderbooks/<market>/<첫 시각(ms)>.obk 세그먼트 파일
+# - 스냅샷 BLOCK_SIZE 개를 한 블록으로 압축해 세그먼트 끝에 이어 씁니다.
+# - 세그먼트 하나에 SEGMENT_BLOCKS 블록이 차면 새 세그먼트를 만들고, MAX_SEGMENTS 개를 넘으면 가장 오래된 것을 지웁니다.
+#   (기본값: 1초 간격 기록 시 세그먼트 하나가 약 10시간, 전체 약 10일)
+BLOCK_SIZE = 600
+SEGMENT_BLOCKS = 60
+MAX_SEGMENTS = 24
+
+# 블록 헤더: magic, 압축 방식, 단계 수, (예약), 첫 시각(ms), 마지막 시각(ms), 스냅샷 수, 압축된 본문 길이
+# 헤더만 읽고 본문은 건너뛸 수 있으므로, 세그먼트의 블록 헤더가 곧 시각 인덱스입니다.
+_HEADER = struct.Struct("<4sBBHqqII")
+_MAGIC = b"OBK1"
+
+DAY_MS = 24 * 3600 * 1000
+
+CODEC_ZLIB, CODEC_LZ4, CODEC_ZSTD = 1, 2, 3
+
+
+def _load_codecs() -> dict:
+    """사용할 수 있는 압축 방식 {id: (compress, decompress)}. zstd / lz4 가 설치되어 있지 않으면 zlib만 사용합니다."""
+    codecs = {CODEC_ZLIB: (lambda data: zlib.compress(data, 6), zlib.decompress)}
+    try:
+        import lz4.frame
+        codecs[CODEC_LZ4] = (lz4.frame.compress, lz4.frame.decompress)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        codecs[CODEC_ZSTD] = (zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress)
+    except ImportError:
+        pass
+    return codecs
+
+
+_codecs = None
+
+
+def get_codecs() -> dict:
+    global _codecs
+    if _codecs is None:
+        _codecs = _load_codecs()
+    return _codecs
+
+
+def to_ms(value) -> int:
+    """epoch ms(int) 또는 시각(문자열/Timestamp, 시간대가 없으면 캔들과 같은 KST로 봄)을 epoch ms로 바꿉니다."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("Asia/Seoul")
+    return int(ts.value // 10**6)
+
+
+def to_ms_array(times) -> np.ndarray:
+    """to_ms의 배열 버전 (시간대 없는 시각은 KST)"""
+    index = pd.DatetimeIndex(pd.to_datetime(times))
+    if index.tz is None:
+        index = index.tz_localize("Asia/Seoul")
+    return index.as_unit("ns").asi8 // 10**6
+
+
+def to_kst(ms: int) -> pd.Timestamp:
+    """epoch ms를 캔들 시각과 같은 형식(시간대 없는 KST)으로 바꿉니다."""
+    return pd.Timestamp(int(ms), unit="ms", tz="UTC").tz_convert("Asia/Seoul").tz_localize(None)
+
+
+class OrderbookSnapshot:
+    """
+    # --- [호가 스냅샷] ---
+    # 한 마켓의 한 시각(epoch ms) 호가 전체 단계입니다.
+    # levels: (4, depth) float64 배열 — 행 순서는 LEVEL_FIELDS (매도가, 매도잔량, 매수가, 매수잔량), 0번 열이 최우선 호가
+    """
+    __slots__ = ("market", "time", "levels")
+
+    def __init__(self, market: str, time: int, levels: np.ndarray):
+        self.market = market
+        self.time = int(time)
+        self.levels = levels
+
+    @classmethod
+    def from_upbit(cls, orderbook: dict, depth: int = DEPTH) -> "OrderbookSnapshot":
+        """업비트 호가 응답 한 마켓분을 고정 폭 스냅샷으로 바꿉니다. (depth 단계를 넘는 호가는 버림)"""
+        levels = np.zeros((len(LEVEL_FIELDS), depth))
+        for i, unit in enumerate(orderbook.get("orderbook_units", [])[:depth]):
+            for row, name in enumerate(LEVEL_FIELDS):
+                levels[row, i] = unit[name]
+        return cls(orderbook["market"], orderbook["timestamp"], levels)
+
+    def to_upbit(self) -> dict:
+        """업비트 호가 응답과 같은 모양으로 되돌립니다. (0으로 채운 단계는 뺌) 모의 거래소/재생에서 API 응답 대신 사용합니다."""
+        units = [dict(zip(LEVEL_FIELDS, map(float, self.levels[:, i])))
+                 for i in range(self.levels.shape[1]) if self.levels[0, i] > 0 or self.levels[2, i] > 0]
+        return {
+            "market": self.market,
+            "timestamp": self.time,
+            "total_ask_size": float(self.levels[1].sum()),
+            "total_bid_size": float(self.levels[3].sum()),
+            "orderbook_units": units,
+        }
+
+    @property
+    def kst(self) -> pd.Timestamp:
+        return to_kst(self.time)
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.levels[0, 0])
+
+    @property
+    def best_bid(self) -> float:
+        return float(self.levels[2, 0])
+
+    def __repr__(self):
+        return f"OrderbookSnapshot({self.market}, {self.kst}, ask={self.best_ask}, bid={self.best_bid})"
+
+
+# --- 블록 인코딩 ---
+# 시각은 직전 스냅샷과의 차이(ms), 호가 배열은 직전 스냅샷과 비트 단위 XOR로 저장합니다.
+# 호가는 대부분의 단계가 그대로이므로 XOR 결과가 거의 0이 되고, 같은 자리 바이트끼리 모아(shuffle) 압축하면 잘 줄어듭니다.
+# XOR은 되돌릴 때 오차가 없으므로 저장한 값과 읽은 값이 비트 단위로 같습니다.
+
+def _shuffle(values: np.ndarray) -> bytes:
+    return np.ascontiguousarray(values.reshape(-1).view(np.uint8).reshape(-1, 8).T).tobytes()
+
+
+def _unshuffle(data: bytes) -> np.ndarray:
+    return np.ascontiguousarray(np.frombuffer(data, np.uint8).reshape(8, -1).T).view(np.uint64).reshape(-1)
+
+
+def encode_block(times: np.ndarray, levels: np.ndarray, codec: int) -> bytes:
+    """times: (n,) int64 ms, levels: (n, 4, depth) float64 → 헤더 + 압축된 본문"""
+    count, _, depth = levels.shape
+    bits = np.ascontiguousarray(levels).view(np.uint64)
+    delta = bits.copy()
+    delta[1:] ^= bits[:-1]
+    # (단계, 필드, 스냅샷) 순서로 두어 같은 호가 칸의 시계열이 붙어 있도록 합니다.
+    body = np.diff(times, prepend=times[0]).astype("<i8").tobytes() + _shuffle(delta.transpose(1, 2, 0))
+    payload = get_codecs()[codec][0](body)
+    return _HEADER.pack(_MAGIC, codec, depth, 0, int(times[0]), int(times[-1]), count, len(payload)) + payload
+
+
+def decode_block(header: tuple, payload: bytes) -> tuple:
+    """encode_block의 반대. (times, levels)를 반환합니다."""
+    _, codec, depth, _, first, _, count, _ = header
+    if codec not in get_codecs():
+        raise RuntimeError(f"호가 블록 압축 방식({codec})을 풀 수 없습니다. (zstandard / lz4 패키지 설치 필요)")
+    body = get_codecs()[codec][1](payload)
+    times = first + np.cumsum(np.frombuffer(body[:count * 8], "<i8"))
+    delta = _unshuffle(body[count * 8:]).reshape(len(LEVEL_FIELDS), depth, count).transpose(2, 0, 1)
+    levels = np.bitwise_xor.accumulate(delta, axis=0).view(np.float64)
+    return times, levels
+
+
+class OrderbookStore:
+    """
+    # --- [호가 저장소] ---
+    # 마켓별 호가 스냅샷을 압축된 블록으로 디스크 링 버퍼(data/orderbooks/<market>/*.obk)에 보관합니다.
+    # - append()로 받은 스냅샷은 BLOCK_SIZE 개가 모이면(또는 flush() 시) 한 블록으로 기록합니다.
+    # - 읽을 때는 세그먼트 파일 이름(첫 시각)과 블록 헤더(첫/마지막 시각)로 필요한 블록만 찾아서 풉니다.
+    # - 아직 기록하지 않은 스냅샷도 읽기 결과에 포함됩니다.
+    """
+
+    def __init__(self, root: str = ORDERBOOK_DIR, depth: int = DEPTH, block_size: int = BLOCK_SIZE,
+                 segment_blocks: int = SEGMENT_BLOCKS, max_segments: int = MAX_SEGMENTS, codec: int = None):
+        self.root = root
+        self.depth = depth
+        self.block_size = block_size
+        self.segment_blocks = segment_blocks
+        self.max_segments = max_segments
+        self.codec = codec or max(get_codecs())
+        self._lock = threading.RLock()
+        self._pending = {}  # market -> [OrderbookSnapshot] (아직 기록하지 않은 것)
+        self._last = {}     # market -> 마지막으로 받은 스냅샷 시각 (같은 호가를 두 번 저장하지 않도록)
+        self._index = {}    # 세그먼트 경로 -> (파일 크기, [(첫 시각, 마지막 시각, 위치, 헤더)])
+
+    def _dir(self, market: str) -> str:
+        return os.path.join(self.root, market)
+
+    def segments(self, market: str) -> list:
+        """[(첫 시각, 경로)] 시각순"""
+        directory = self._dir(market)
+        if not os.path.isdir(directory):
+            return []
+        names = [name for name in os.listdir(directory) if name.endswith(".obk")]
+        return sorted((int(name[:-4]), os.path.join(directory, name)) for name in names)
+
+    def _blocks(self, path: str) -> list:
+        """세그먼트의 블록 헤더 목록. 파일이 그대로면 캐시를 사용하고, 끝에 잘린 블록(기록 중 종료)은 무시합니다."""
+        size = os.path.getsize(path)
+        cached = self._index.get(path)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        blocks = []
+        with open(path, "rb") as f:
+            offset = 0
+            while offset + _HEADER.size <= size:
+                f.seek(offset)
+                header = _HEADER.unpack(f.read(_HEADER.size))
+                end = offset + _HEADER.size + header[7]
+                if header[0] != _MAGIC or end > size:
+                    break
+                blocks.append((header[4], header[5], offset, header))
+                offset = end
+        self._index[path] = (size, blocks)
+        return blocks
+
+    # --- 기록 ---
+
+    def append(self, snapshot: OrderbookSnapshot) -> bool:
+        """스냅샷을 추가합니다. 직전에 받은 것보다 시각이 늦지 않으면(호가가 바뀌지 않음) 저장하지 않고 False를 반환합니다."""
+        with self._lock:
+            market = snapshot.market
+            if market not in self._last:
+                self._last[market] = self._last_written(market)
+            if snapshot.time <= self._last[market]:
+                return False
+            if snapshot.levels.shape[1] != self.depth:
+                levels = np.zeros((len(LEVEL_FIELDS), self.depth))
+                width = min(self.depth, snapshot.levels.shape[1])
+                levels[:, :width] = snapshot.levels[:, :width]
+                snapshot = OrderbookSnapshot(market, snapshot.time, levels)
+            self._last[market] = snapshot.time
+            pending = self._pending.setdefault(market, [])
+            pending.append(snapshot)
+            if len(pending) >= self.block_size:
+                self._write_block(market)
+            return True
+
+    def flush(self, market: str = None) -> None:
+        """모인 스냅샷을 블록으로 기록합니다. (market을 주지 않으면 모든 마켓)"""
+        with self._lock:
+            for name in [market] if market else list(self._pending):
+                if self._pending.get(name):
+                    self._write_block(name)
+
+    def _last_written(self, market: str) -> int:
+        segments = self.segments(market)
+        if not segments:
+            return -1
+        blocks = self._blocks(segments[-1][1])
+        return blocks[-1][1] if blocks else -1
+
+    def _write_block(self, market: str) -> None:
+        snapshots = self._pending.pop(market)
+        times = np.array([s.time for s in snapshots], dtype=np.int64)
+        levels = np.stack([s.levels for s in snapshots]).astype(np.float64)
+        block = encode_block(times, levels, self.codec)
+
+        segments = self.segments(market)
+        if not segments or len(self._blocks(segments[-1][1])) >= self.segment_blocks:
+            os.makedirs(self._dir(market), exist_ok=True)
+            path = os.path.join(self._dir(market), f"{times[0]:013d}.obk")
+            segments.append((int(times[0]), path))
+        path = segments[-1][1]
+        blocks = self._blocks(path) if os.path.exists(path) else []
+        valid = blocks[-1][2] + _HEADER.size + blocks[-1][3][7] if blocks else 0
+        with open(path, "ab") as f:
+            # 기록 도중 종료되어 끝에 잘린 블록이 남아 있으면 잘라 내고 이어 씁니다.
+            if f.tell() > valid:
+                f.truncate(valid)
+            f.write(block)
+
+        # 링 버퍼: 오래된 세그먼트부터 지웁니다.
+        for _, old in segments[:-self.max_segments]:
+            os.remove(old)
+            self._index.pop(old, None)
+        log.debug("%s 호가 블록 기록 - %d개, %d bytes", market, len(snapshots), len(block))
+
+    # --- 읽기 ---
+
+    def _read_block(self, path: str, offset: int, header: tuple) -> tuple:
+        with open(path, "rb") as f:
+            f.seek(offset + _HEADER.size)
+            return decode_block(header, f.read(header[7]))
+
+    def read_arrays(self, market: str, start=None, end=None) -> tuple:
+        """[start, end) 구간의 (times, levels) 배열. levels는 (n, 4, depth)"""
+        start_ms = to_ms(start) if start is not None else None
+        end_ms = to_ms(end) if end is not None else None
+        parts = []
+        with self._lock:
+            segments = self.segments(market)
+            for i, (first, path) in enumerate(segments):
+                # 다음 세그먼트가 start 이전에 시작하면 이 세그먼트는 통째로 건너뜁니다.
+                if start_ms is not None and i + 1 < len(segments) and segments[i + 1][0] <= start_ms:
+                    continue
+                if end_ms is not None and first >= end_ms:
+                    break
+                for block_first, block_last, offset, header in self._blocks(path):
+                    if (start_ms is not None and block_last < start_ms) or (end_ms is not None and block_first >= end_ms):
+                        continue
+                    parts.append(self._read_block(path, offset, header))
+            pending = self._pending.get(market)
+            if pending:
+                parts.append((np.array([s.time for s in pending], dtype=np.int64),
+                              np.stack([s.levels for s in pending])))
+
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(LEVEL_FIELDS), self.depth))
+        times = np.concatenate([p[0] for p in parts])
+        levels = np.concatenate([p[1] for p in parts])
+        lo = times.searchsorted(start_ms) if start_ms is not None else 0
+        hi = times.searchsorted(end_ms) if end_ms is not None else len(times)
+        return times[lo:hi], levels[lo:hi]
+
+    def read(self, market: str, start=None, end=None) -> list:
+        """[start, end) 구간의 스냅샷 목록 (시각순)"""
+        times, levels = self.read_arrays(market, start, end)
+        return [OrderbookSnapshot(market, t, lv) for t, lv in zip(times, levels)]
+
+    def at(self, market: str, when):
+        """when 시점에 보이던 호가(그 시각 이전의 마지막 스냅샷). 없으면 None"""
+        when_ms = to_ms(when)
+        with self._lock:
+            pending = [s for s in self._pending.get(market, ()) if s.time <= when_ms]
+            if pending:
+                return pending[-1]
+            # 뒤에서부터 when 이전에 시작한 첫 블록 하나만 풉니다.
+            for first, path in reversed(self.segments(market)):
+                if first > when_ms:
+                    continue
+                for block_first, _, offset, header in reversed(self._blocks(path)):
+                    if block_first <= when_ms:
+                        times, levels = self._read_block(path, offset, header)
+                        i = int(times.searchsorted(when_ms, side="right")) - 1
+                        return OrderbookSnapshot(market, times[i], levels[i])
+        return None
+
+    def last_time(self, market: str) -> int:
+        """마지막으로 받은 스냅샷 시각(ms). 없으면 -1"""
+        with self._lock:
+            pending = self._pending.get(market)
+            return pending[-1].time if pending else self._last_written(market)
+
+    def sample(self, market: str, when, max_age: int, window: int = DAY_MS) -> tuple:
+        """
+        각 시각 when[i] 에 보이던 호가 (times, levels)를 한 번에 구합니다. (시각순으로 정렬된 when)
+        max_age(ms)보다 오래된 호가밖에 없으면 times[i] = -1, levels[i] = 0 입니다.
+        window(ms) 단위로 나눠 읽으므로 긴 구간도 메모리를 그만큼만 사용합니다.
+        """
+        query = to_ms_array(when)
+        times = np.full(len(query), -1, dtype=np.int64)
+        levels = np.zeros((len(query), len(LEVEL_FIELDS), self.depth))
+        if not len(query):
+            return times, levels
+        for lo in range(int(query[0]), int(query[-1]) + 1, window):
+            picked = np.flatnonzero((query >= lo) & (query < lo + window))
+            if not len(picked):
+                continue
+            book_times, book_levels = self.read_arrays(market, lo - max_age, int(query[picked[-1]]) + 1)
+            rows = book_times.searchsorted(query[picked], side="right") - 1
+            fresh = rows >= 0
+            fresh[fresh] = query[picked][fresh] - book_times[rows[fresh]] <= max_age
+            times[picked[fresh]] = book_times[rows[fresh]]
+            levels[picked[fresh]] = book_levels[rows[fresh]]
+        return times, levels
+
+    def replay(self, markets: list, start=None, end=None):
+        """여러 마켓의 스냅샷을 시각순으로 하나씩 내보냅니다. (백테스트 / 모의 거래소 입력)"""
+        return iter(OrderbookReplay(self, markets, start, end))
+
+    def stats(self, market: str) -> dict:
+        segments = self.segments(market)
+        blocks = [b for _, path in segments for b in self._blocks(path)]
+        return {
+            "segments": len(segments),
+            "blocks": len(blocks),
+            "snapshots": sum(b[3][6] for b in blocks) + len(self._pending.get(market, [])),
+            "bytes": sum(os.path.getsize(path) for _, path in segments),
+        }
+
+
+class OrderbookReplay:
+    """
+    # --- [호가 재생] ---
+    # 저장된 호가를 구간 단위로 한 번 읽어 두고, 백테스트/모의 거래소가 시각을 앞으로 진행하며 조회합니다.
+    # - at(market, when): when 시점에 보이던 호가 (캔들 시각 등 KST 시각 또는 epoch ms)
+    # - 순회하면 모든 마켓의 스냅샷을 시각순으로 내보냅니다.
+    """
+
+    def __init__(self, store: OrderbookStore, markets: list, start=None, end=None):
+        self.markets = list(markets)
+        self.start, self.end = start, end
+        self._store = store
+        self._arrays = {market: store.read_arrays(market, start, end) for market in self.markets}
+
+    def at(self, market: str, when):
+        times, levels = self._arrays.get(market, (None, None))
+        if times is None:
+            return None
+        i = int(times.searchsorted(to_ms(when), side="right")) - 1
+        if i < 0:
+            return None
+        return OrderbookSnapshot(market, times[i], levels[i])
+
+    def __iter__(self):
+        streams = [(OrderbookSnapshot(market, t, lv) for t, lv in zip(*self._arrays[market])) for market in self.markets]
+        return heapq.merge(*streams, key=lambda snapshot: snapshot.time)
+
+    def __len__(self):
+        return sum(len(times) for times, _ in self._arrays.values())
+
+
+class OrderbookRecorder:
+    """
+    # --- [호가 기록기] ---
+    # 설정된 마켓의 호가 전체 단계를 interval 초마다 한 번의 조회로 받아 저장소에 추가합니다.
+    # 블록이 다 차지 않아도 flush_interval 초마다 기록하므로, 종료되어도 잃는 호가는 그 사이의 것뿐입니다.
+    """
+
+    def __init__(self, markets: list, store: OrderbookStore = None, interval: float = 1.0, flush_interval: float = 60.0):
+        self.markets = list(markets)
+        self.store = store or get_orderbook_store()
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.recorded = 0
+        self.errors = 0
+
+    def record_once(self) -> int:
+        """한 번 조회해서 저장합니다. 새로 저장한 스냅샷 수를 반환합니다."""
+        # 거래소 API(requests)는 실제로 기록할 때만 불러옵니다. (재생만 하는 백테스트는 불러오지 않음)
+        from api.price import get_orderbooks
+
+        count = 0
+        for orderbook in get_orderbooks(self.markets):
+            if self.store.append(OrderbookSnapshot.from_upbit(orderbook, self.store.depth)):
+                count += 1
+        self.recorded += count
+        return count
+
+    def run(self) -> None:
+        last_flush = time.monotonic()
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.record_once()
+            except Exception as e:
+                self.errors += 1
+                log.warning("호가 기록 실패: %s", e)
+            if started - last_flush >= self.flush_interval:
+                self.store.flush()
+                last_flush = started
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        self.store.flush()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="orderbook-recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        log.info("호가 기록 종료", extra=fields(recorded=self.recorded, errors=self.errors))
+
+
+_default_store = None
+
+
+def get_orderbook_store() -> OrderbookStore:
+    """프로세스 안에서 하나의 저장소를 함께 사용합니다."""
+    global _default_store
+    if _default_store is None:
+        _default_store = OrderbookStore()
+    return _default_store
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m data.orderbook_store",
+                                     description="설정된 마켓의 호가 전체 단계를 data/orderbooks 에 기록합니다.")
+    parser.add_argument("--markets", nargs="+", help="기록할 마켓 (기본: setting.csv의 마켓)")
+    parser.add_argument("--interval", type=float, default=1.0, help="조회 간격 (초)")
+    parser.add_argument("--root", default=ORDERBOOK_DIR)
+    args = parser.parse_args(argv)
+
+    markets = args.markets
+    if not markets:
+        from manager.setting_manager import SettingManager
+        markets = SettingManager("setting.csv").snapshot.markets
+
+    recorder = OrderbookRecorder(markets, OrderbookStore(args.root), args.interval)
+    log.info("호가 기록 시작", extra=fields(markets=markets, interval=args.interval))
+    recorder.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        recorder.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,15 @@
-from dotenv import load_dotenv
 import os
+from core.config import load_env
 
-load_dotenv()  # .env 파일 로딩
 
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST"),
-    "port": int(os.getenv("DB_PORT")),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    "charset": "utf8mb4"
-}
+def get_db_config() -> dict:
+    """DB 접속 정보는 처음 접속할 때 .env / 환경변수에서 읽습니다."""
+    load_env()  # .env 파일 로딩
+    return {
+        "host": os.getenv("DB_HOST"),
+        "port": int(os.getenv("DB_PORT", "3306")),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "database": os.getenv("DB_NAME"),
+        "charset": "utf8mb4"
+    }
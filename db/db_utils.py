@@ -1,12 +1,21 @@
-import pymysql
-from db.db_config import DB_CONFIG
+from db.db_config import get_db_config
+from utils.log import get_logger
+
+log = get_logger("db.db_utils")
+
+
+def _connect():
+    # pymysql은 실제로 DB에 접속할 때 불러옵니다. (DB를 쓰지 않는 도구의 시작 시간을 줄이기 위해)
+    import pymysql
+    return pymysql.connect(**get_db_config())
+
 
 def insert_order(order_data: dict, table_name: str):
     """체결 완료된 주문 정보를 DB에 저장합니다."""
     
     # DB에 이미 존재하는 컬럼만 필터링
     # 이 코드는 나중에 테이블 구조가 변경되어도 유연하게 대처할 수 있게 합니다.
-    conn = pymysql.connect(**DB_CONFIG)
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute(f"SHOW COLUMNS FROM {table_name}")
     db_columns = [column[0] for column in cursor.fetchall()]
@@ -22,9 +31,207 @@ def insert_order(order_data: dict, table_name: str):
     try:
         cursor.execute(query, list(filtered_data.values()))
         conn.commit()
-        print(f"✅ [DB] {order_data.get('market')} {table_name}에 저장 완료")
+        log.debug("✅ %s %s에 저장 완료", order_data.get("market"), table_name)
     except Exception as e:
-        print(f"❌ [DB] 데이터 저장 실패: {e}")
+        log.error("❌ 데이터 저장 실패: %s", e)
         conn.rollback()
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+# 기존에 만들어진 DB에도 주문 내역 동기화에 필요한 컬럼/인덱스를 추가합니다. (init.sql은 최초 1회만 실행되기 때문)
+ORDER_HISTORY_DDL = [
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS state VARCHAR(10)",
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS executed_volume FLOAT",
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS paid_fee FLOAT",
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_market_created ON {table} (market, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_created ON {table} (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_updated ON {table} (updated_at)",
+]
+
+ORDER_SYNC_STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS order_sync_state (
+        state VARCHAR(10) PRIMARY KEY,
+        last_uuid VARCHAR(255),
+        last_created_at DATETIME,
+        updated_at DATETIME
+    )
+"""
+
+
+def ensure_order_history_schema():
+    """주문 내역 동기화에 필요한 컬럼, 인덱스, 동기화 위치 테이블을 준비합니다."""
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            for table_name in ("buy_orders", "sell_orders"):
+                for ddl in ORDER_HISTORY_DDL:
+                    cursor.execute(ddl.format(table=table_name))
+            cursor.execute(ORDER_SYNC_STATE_DDL)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def upsert_orders(orders: list, table_name: str) -> int:
+    """
+    여러 주문을 한 번에 저장합니다. 이미 저장된 uuid는 상태/체결 정보만 갱신하므로 여러 번 실행해도 안전합니다.
+    """
+    if not orders:
+        return 0
+
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SHOW COLUMNS FROM {table_name}")
+            db_columns = [column[0] for column in cursor.fetchall() if column[0] not in ("id", "updated_at")]
+            columns = [c for c in db_columns if any(c in o for o in orders)]
+
+            updates = ", ".join(f"{c} = VALUES({c})" for c in columns if c != "uuid")
+            query = (f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join(['%s'] * len(columns))}) "
+                     f"ON DUPLICATE KEY UPDATE {updates}")
+            cursor.executemany(query, [[o.get(c) for c in columns] for o in orders])
+        conn.commit()
+        log.debug("✅ %s에 %d건 동기화 완료", table_name, len(orders))
+        return len(orders)
+    except Exception as e:
+        log.error("❌ 데이터 동기화 실패: %s", e)
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_sync_cursor(state: str):
+    """state별로 마지막으로 저장한 주문의 (uuid, created_at)을 반환합니다. 없으면 (None, None)."""
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT last_uuid, last_created_at FROM order_sync_state WHERE state = %s", (state,))
+            row = cursor.fetchone()
+        return (row[0], row[1]) if row else (None, None)
+    finally:
+        conn.close()
+
+
+def save_sync_cursor(state: str, last_uuid: str, last_created_at):
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO order_sync_state (state, last_uuid, last_created_at, updated_at) "
+                "VALUES (%s, %s, %s, NOW()) "
+                "ON DUPLICATE KEY UPDATE last_uuid = VALUES(last_uuid), "
+                "last_created_at = VALUES(last_created_at), updated_at = NOW()",
+                (state, last_uuid, last_created_at)
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def fetch_open_order_uuids() -> dict:
+    """DB에 아직 미체결(state='wait')로 남아 있는 주문의 {uuid: 테이블 이름}을 반환합니다."""
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            uuids = {}
+            for table_name in ("buy_orders", "sell_orders"):
+                cursor.execute(f"SELECT uuid FROM {table_name} WHERE state = 'wait'")
+                uuids.update({row[0]: table_name for row in cursor.fetchall()})
+        return uuids
+    finally:
+        conn.close()
+
+
+def fetch_orders(state: str = "done", market: str = None, updated_since=None) -> list:
+    """
+    로컬 DB에 저장된 매수/매도 주문을 조회합니다. (대시보드/분석용)
+    updated_since를 넘기면 그 시각 이후에 저장되거나 상태가 바뀐 주문만 가져옵니다.
+    """
+    from pymysql.cursors import DictCursor
+    conn = _connect()
+    try:
+        with conn.cursor(DictCursor) as cursor:
+            rows = []
+            for table_name in ("buy_orders", "sell_orders"):
+                query = (f"SELECT uuid, market, created_at, price, volume, side, ord_type, state, "
+                         f"executed_volume, paid_fee, updated_at FROM {table_name} WHERE state = %s")
+                params = [state]
+                if updated_since is not None:
+                    query += " AND updated_at >= %s"
+                    params.append(updated_since)
+                if market:
+                    query += " AND market = %s"
+                    params.append(market)
+                cursor.execute(query + " ORDER BY created_at DESC", params)
+                rows.extend(cursor.fetchall())
+        return rows
+    finally:
+        conn.close()
+
+
+# 엔진 → 대시보드 공유 스냅샷 (manager/market_snapshot.py)
+# 게시하는 쪽(엔진, 샤드)마다 한 행이며, 게시할 때마다 version이 1씩 올라갑니다.
+MARKET_SNAPSHOT_DDL = """
+    CREATE TABLE IF NOT EXISTS market_snapshot (
+        name VARCHAR(32) PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0,
+        published_at DOUBLE NOT NULL,
+        payload LONGTEXT
+    )
+"""
+
+
+def ensure_market_snapshot_schema():
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(MARKET_SNAPSHOT_DDL)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def save_snapshot_part(name: str, payload: str, published_at: float):
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO market_snapshot (name, version, published_at, payload) VALUES (%s, 1, %s, %s) "
+                "ON DUPLICATE KEY UPDATE version = version + 1, "
+                "published_at = VALUES(published_at), payload = VALUES(payload)",
+                (name, published_at, payload)
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def fetch_snapshot_versions() -> dict:
+    """{name: (version, published_at)} — 본문(payload)은 읽지 않습니다."""
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT name, version, published_at FROM market_snapshot")
+            return {name: (version, published_at) for name, version, published_at in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
+def fetch_snapshot_parts(names: list) -> dict:
+    """{name: (version, published_at, payload)}"""
+    if not names:
+        return {}
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"SELECT name, version, published_at, payload FROM market_snapshot "
+                f"WHERE name IN ({', '.join(['%s'] * len(names))})",
+                list(names)
+            )
+            return {name: (version, published_at, payload) for name, version, published_at, payload in cursor.fetchall()}
+    finally:
+        conn.close()
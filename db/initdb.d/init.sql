@@ -6,7 +6,14 @@ CREATE TABLE IF NOT EXISTS buy_orders (
     price FLOAT,
     volume FLOAT,
     side VARCHAR(10),
-    ord_type VARCHAR(20)
+    ord_type VARCHAR(20),
+    state VARCHAR(10),
+    executed_volume FLOAT,
+    paid_fee FLOAT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_buy_orders_market_created (market, created_at),
+    INDEX idx_buy_orders_created (created_at),
+    INDEX idx_buy_orders_updated (updated_at)
 );
 
 CREATE TABLE IF NOT EXISTS sell_orders (
@@ -17,5 +24,51 @@ CREATE TABLE IF NOT EXISTS sell_orders (
     price FLOAT,
     volume FLOAT,
     side VARCHAR(10),
-    ord_type VARCHAR(20)
+    ord_type VARCHAR(20),
+    state VARCHAR(10),
+    executed_volume FLOAT,
+    paid_fee FLOAT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_sell_orders_market_created (market, created_at),
+    INDEX idx_sell_orders_created (created_at),
+    INDEX idx_sell_orders_updated (updated_at)
+);
+
+-- 거래소 주문 내역 동기화 위치 (state별 마지막으로 저장한 주문)
+CREATE TABLE IF NOT EXISTS order_sync_state (
+    state VARCHAR(10) PRIMARY KEY,
+    last_uuid VARCHAR(255),
+    last_created_at DATETIME,
+    updated_at DATETIME
+);
+
+-- 엔진 → 대시보드 공유 스냅샷 (게시하는 쪽마다 한 행, 게시할 때마다 version + 1)
+CREATE TABLE IF NOT EXISTS market_snapshot (
+    name VARCHAR(32) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    published_at DOUBLE NOT NULL,
+    payload LONGTEXT
+);
+
+-- 백테스트 결과 (manager/simulator.py의 db 저장 위치, utils/db.py)
+-- run_key: 실행 조건(파라미터, 단위, 체결 모델 등)별 키. 같은 마켓 / 구간을 계산한 다른 실행의 결과를 구분합니다.
+CREATE TABLE IF NOT EXISTS backtest_result (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    run_key VARCHAR(32),
+    time DATETIME,
+    market VARCHAR(20),
+    open DOUBLE,
+    high DOUBLE,
+    close DOUBLE,
+    `signal` VARCHAR(255),
+    trade_amount DOUBLE,
+    avg_price DOUBLE,
+    gap_pct DOUBLE,
+    total_buy_amount DOUBLE,
+    realized_pnl DOUBLE,
+    cash DOUBLE,
+    trade_fee DOUBLE,
+    total_fee DOUBLE,
+    portfolio_value DOUBLE,
+    INDEX idx_backtest_result_run (run_key, market, time)
 );
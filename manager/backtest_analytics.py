@@ -0,0 +1,216 @@
+# manager/backtest_analytics.py
+
+import os
+import numpy as np
+import pandas as pd
+
+from manager.result_writer import SIGNAL_BUY, SIGNAL_STOP_LOSS, SIGNAL_SELL, SIGNAL_SPLIT_SELL, encode_signals
+from manager.simulator import SPLIT_SELL_LEVELS, load_results
+from utils.file_utils import load_json
+
+BUY_MASK = sum(SIGNAL_BUY.values())
+SPLIT_MASK = sum(SIGNAL_SPLIT_SELL << i for i in range(len(SPLIT_SELL_LEVELS)))
+EXIT_MASK = SIGNAL_STOP_LOSS | SIGNAL_SELL | SPLIT_MASK
+
+MINUTES_PER_YEAR = 365 * 24 * 60  # 코인 시장은 쉬는 날이 없습니다.
+
+
+def load_run(source: str, market: str = None, start=None, end=None, run_key: str = None) -> pd.DataFrame:
+    """
+    백테스트 결과 한 개를 읽습니다.
+    source가 결과 디렉터리면 Parquet(manager/simulator.py)을, "db"면 backtest_result 테이블에서
+    한 실행(run_key)의 market 결과를 읽습니다. 두 경우 모두 run_key 컬럼에 실행 키를 담습니다.
+    """
+    if source == "db":
+        if not run_key:
+            raise ValueError("DB 결과는 실행 키(run_key)를 지정해야 읽을 수 있습니다.")
+        from utils.db import fetch_backtest_results
+        df = fetch_backtest_results(market, run_key, start=start, end=end)
+        if not df.empty:
+            df["signal"] = encode_signals(df["signal"], SPLIT_SELL_LEVELS)
+            df["time"] = pd.to_datetime(df["time"])
+    else:
+        df = load_results(source, start=start, end=end)
+        if not df.empty:
+            checkpoint = load_json(os.path.join(source, "checkpoint.json"))
+            df["run_key"] = checkpoint.get("key") if checkpoint else None
+    return df.sort_values("time", kind="stable").reset_index(drop=True)
+
+
+def load_db_runs(market: str, start=None, end=None) -> dict:
+    """backtest_result 테이블에 저장된 한 마켓의 실행을 모두 읽어 {"db:<market>:<run_key>": 결과}로 반환합니다."""
+    from utils.db import fetch_backtest_runs
+    keys = fetch_backtest_runs(market)["run_key"].tolist()
+    return {f"db:{market}:{key}": load_run("db", market, start=start, end=end, run_key=key) for key in keys}
+
+
+def periods_per_year(times: pd.Series) -> float:
+    """캔들 간격(중앙값)으로 연간 캔들 수를 추정합니다."""
+    if len(times) < 2:
+        return float(MINUTES_PER_YEAR)
+    step_minutes = np.median(np.diff(times.to_numpy()).astype("timedelta64[s]").astype(np.int64)) / 60
+    return MINUTES_PER_YEAR / max(step_minutes, 1e-9)
+
+
+# --- 자산 곡선 ---
+
+def drawdowns(df: pd.DataFrame) -> pd.DataFrame:
+    """캔들별 최고점 대비 낙폭(%)을 계산합니다."""
+    equity = df["portfolio_value"].to_numpy(dtype=float)
+    peak = np.maximum.accumulate(equity)
+    return pd.DataFrame({
+        "time": df["time"].to_numpy(),
+        "equity": equity,
+        "peak": peak,
+        "drawdown_pct": (1 - equity / peak) * 100,
+    })
+
+
+def drawdown_periods(dd: pd.DataFrame) -> pd.DataFrame:
+    """최고점 아래에 머문 구간별 시작/끝/최대 낙폭을 반환합니다. (최대 낙폭 순)"""
+    underwater = dd["drawdown_pct"].to_numpy() > 0
+    if not underwater.any():
+        return pd.DataFrame(columns=["start", "end", "duration", "max_drawdown_pct"])
+    period_id = np.cumsum(~underwater)[underwater]
+    periods = dd[underwater].groupby(period_id).agg(
+        start=("time", "first"), end=("time", "last"), max_drawdown_pct=("drawdown_pct", "max"))
+    periods["duration"] = periods["end"] - periods["start"]
+    return (periods[["start", "end", "duration", "max_drawdown_pct"]]
+            .sort_values("max_drawdown_pct", ascending=False).reset_index(drop=True))
+
+
+def rolling_ratios(df: pd.DataFrame, window: int = 1440) -> pd.DataFrame:
+    """캔들 수익률로 연환산 rolling Sharpe / Sortino를 계산합니다. (무위험 수익률 0)"""
+    returns = df["portfolio_value"].pct_change()
+    annual = np.sqrt(periods_per_year(df["time"]))
+    mean = returns.rolling(window).mean()
+    std = returns.rolling(window).std()
+    downside = np.sqrt((returns.clip(upper=0) ** 2).rolling(window).mean())
+    return pd.DataFrame({
+        "time": df["time"],
+        "sharpe": mean / std.replace(0, np.nan) * annual,
+        "sortino": mean / downside.replace(0, np.nan) * annual,
+    })
+
+
+# --- 거래 단위 ---
+
+def round_trips(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    포지션이 비어 있다가 매수가 일어난 캔들부터, 매도/손절로 다시 비워지는 캔들까지를 한 번의 거래로 묶습니다.
+    ladder_depth는 그 사이에 체결된 매수(initial + flow) 횟수입니다.
+    """
+    signal = df["signal"].to_numpy().astype(np.int64)
+    total_buy = df["total_buy_amount"].to_numpy(dtype=float)
+    realized = df["realized_pnl"].to_numpy(dtype=float)
+    fees = df["total_fee"].to_numpy(dtype=float)
+    times = df["time"].to_numpy()
+
+    flat_before = np.r_[True, total_buy[:-1] == 0]
+    opens = np.flatnonzero(flat_before & (signal & BUY_MASK != 0))
+    closes = np.flatnonzero((signal & EXIT_MASK != 0) & (total_buy == 0))
+
+    # 각 진입에 대해 그 이후 첫 청산을 짝짓습니다. (아직 청산되지 않은 마지막 거래는 제외)
+    pos = np.searchsorted(closes, opens)
+    valid = pos < len(closes)
+    opens, closes = opens[valid], closes[pos[valid]]
+    if len(opens) == 0:
+        return pd.DataFrame(columns=["open_time", "close_time", "duration", "ladder_depth",
+                                     "invested", "pnl", "fee", "exit"])
+
+    buy_count = np.cumsum(np.unpackbits(
+        (signal & BUY_MASK).astype(np.uint8)[:, None], axis=1).sum(axis=1))
+    before = opens - 1
+
+    def diff(cumulative: np.ndarray) -> np.ndarray:
+        return cumulative[closes] - np.where(before >= 0, cumulative[np.maximum(before, 0)], 0)
+
+    # [open, close] 구간의 최대 누적 매수금 = 거래에 투입된 금액
+    bounds = np.column_stack([opens, closes + 1]).ravel()
+    invested = np.maximum.reduceat(np.r_[total_buy, 0.0], bounds)[::2]
+    invested = np.where(invested > 0, invested, df["trade_amount"].to_numpy(dtype=float)[opens])
+
+    exit_kind = np.where(signal[closes] & SIGNAL_STOP_LOSS, "stop_loss",
+                         np.where(signal[closes] & SIGNAL_SELL, "take_profit", "split_sell"))
+    return pd.DataFrame({
+        "open_time": times[opens],
+        "close_time": times[closes],
+        "duration": times[closes] - times[opens],
+        "ladder_depth": diff(buy_count),
+        "invested": invested,
+        "pnl": diff(realized),
+        "fee": diff(fees),
+        "exit": exit_kind,
+    })
+
+
+def ladder_depth_histogram(trips: pd.DataFrame) -> pd.Series:
+    """거래당 매수 체결 횟수 분포입니다. (깊을수록 하락을 길게 따라간 거래)"""
+    return trips["ladder_depth"].value_counts().sort_index()
+
+
+# --- 요약 / 비교 ---
+
+def summarize_run(df: pd.DataFrame, window: int = 1440) -> dict:
+    if df.empty:
+        return {}
+    dd = drawdowns(df)
+    periods = drawdown_periods(dd)
+    trips = round_trips(df)
+    ratios = rolling_ratios(df, window)
+
+    returns = df["portfolio_value"].pct_change().dropna()
+    annual = np.sqrt(periods_per_year(df["time"]))
+    downside = np.sqrt((returns.clip(upper=0) ** 2).mean())
+
+    first_value = df["portfolio_value"].iloc[0]
+    final = df.iloc[-1]
+    gross_pnl = final["realized_pnl"] + final["total_fee"]
+    return {
+        "run_key": df["run_key"].iloc[0] if "run_key" in df.columns else None,
+        "start": df["time"].iloc[0],
+        "end": df["time"].iloc[-1],
+        "candles": len(df),
+        "total_return_pct": (final["portfolio_value"] / first_value - 1) * 100,
+        "max_drawdown_pct": dd["drawdown_pct"].max(),
+        "longest_drawdown": periods["duration"].max() if not periods.empty else pd.Timedelta(0),
+        "sharpe": returns.mean() / returns.std() * annual if returns.std() > 0 else np.nan,
+        "sortino": returns.mean() / downside * annual if downside > 0 else np.nan,
+        "rolling_sharpe_median": ratios["sharpe"].median(),
+        "exposure_pct": (df["total_buy_amount"].to_numpy() > 0).mean() * 100,
+        "trips": len(trips),
+        "win_rate_pct": (trips["pnl"] > 0).mean() * 100 if len(trips) else np.nan,
+        "avg_trip_pnl": trips["pnl"].mean() if len(trips) else np.nan,
+        "max_ladder_depth": trips["ladder_depth"].max() if len(trips) else 0,
+        "stop_losses": int((trips["exit"] == "stop_loss").sum()) if len(trips) else 0,
+        "total_fee": final["total_fee"],
+        "fee_share_pct": final["total_fee"] / gross_pnl * 100 if gross_pnl > 0 else np.nan,
+    }
+
+
+def compare_runs(runs: dict, window: int = 1440) -> pd.DataFrame:
+    """{이름: 결과 DataFrame}을 받아 실행별 지표를 한 표로 비교합니다."""
+    return pd.DataFrame({name: summarize_run(df, window) for name, df in runs.items()}).T
+
+
+if __name__ == "__main__":
+    import sys
+
+    sources = sys.argv[1:]
+    if not sources:
+        print("사용법: python -m manager.backtest_analytics <결과 디렉터리 | db:<마켓>[:<run_key>]> [...]")
+        sys.exit(1)
+    runs = {}
+    for source in sources:
+        if source.startswith("db:"):
+            _, market, *key = source.split(":")
+            if key:
+                runs[source] = load_run("db", market, run_key=key[0])
+            else:
+                runs.update(load_db_runs(market))
+        else:
+            runs[source.rstrip("/").split("/")[-1]] = load_run(source)
+    print(compare_runs(runs).to_string())
+    for name, df in runs.items():
+        print(f"\n[{name}] ladder depth")
+        print(ladder_depth_histogram(round_trips(df)).to_string())
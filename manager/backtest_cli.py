@@ -0,0 +1,255 @@
+# manager/backtest_cli.py
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from data.candle_store import SECONDS, unit_delta, unit_label
+from manager.execution_model import FILL_MODELS
+from manager.simulator import CHECKPOINT_DIR, SINKS, run_backtest
+from strategy.records import SETTING_COLUMNS
+from utils.log import set_level
+
+PARAM_COLUMNS = SETTING_COLUMNS[1:]  # market을 뺀 전략 파라미터
+
+USAGE_EXAMPLE = """
+예시:
+  # setting.csv의 마켓/파라미터로 1분봉, 5분봉을 두 기간에 대해 (저장된 캔들만 사용)
+  python -m manager.backtest_cli --range 2025-01-01..2025-04-01 --range 2025-04-01..2025-07-01 --units 1 5
+
+  # 파라미터 격자(JSON)를 여러 마켓에 대해, 빠진 캔들은 먼저 받아 두고, 결과는 저장하지 않고 요약만
+  python -m manager.backtest_cli --markets KRW-BTC KRW-ETH --params grid.json --fetch --sink none --out summary.csv
+
+  # 기록된 호가(python -m data.orderbook_store)로 슬리피지와 부분 체결을 반영
+  python -m manager.backtest_cli --range 2025-04-01..2025-07-01 --fills depth
+
+  # 초봉으로 몇 주 치를 검증 (빠진 초봉은 날짜별로 받아 두고, 계산은 정해진 크기의 창으로 나눠서)
+  python -m manager.backtest_cli --markets KRW-BTC --range 2025-06-01..2025-06-22 --units 1s --fetch
+"""
+
+
+# --- 작업 목록 ---
+
+def load_param_sets(path: str) -> list:
+    """
+    파라미터 파일을 읽어 [(market 또는 None, params dict)] 목록을 만듭니다.
+    - CSV: setting.csv 형식. market 컬럼이 있으면 그 행은 해당 마켓에만 적용합니다.
+    - JSON: dict 목록, 또는 {파라미터: [값, ...]} 형식의 격자 (모든 조합을 만듭니다)
+    """
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            grid = {name: value if isinstance(value, list) else [value] for name, value in data.items()}
+            rows = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+        else:
+            rows = list(data)
+    else:
+        rows = pd.read_csv(path).to_dict("records")
+
+    param_sets = []
+    for row in rows:
+        missing = [name for name in PARAM_COLUMNS if name not in row]
+        if missing:
+            raise ValueError(f"{path}: 파라미터가 빠져 있습니다: {missing} ({row})")
+        market = row.get("market")
+        market = str(market).strip() if isinstance(market, str) and market.strip() else None
+        param_sets.append((market, {name: row[name] for name in PARAM_COLUMNS}))
+    return param_sets
+
+
+def parse_range(text: str) -> tuple:
+    """'2025-01-01..2025-03-01' → (시작, 끝)"""
+    if ".." not in text:
+        raise argparse.ArgumentTypeError(f"기간은 시작..끝 형식이어야 합니다: {text}")
+    start, end = (part.strip() for part in text.split("..", 1))
+    if pd.Timestamp(start) >= pd.Timestamp(end):
+        raise argparse.ArgumentTypeError(f"시작이 끝보다 앞서야 합니다: {text}")
+    return start, end
+
+
+def parse_unit(text: str):
+    """'1', '5' → 분 단위 정수, '1s' → 초봉"""
+    if text == SECONDS:
+        return SECONDS
+    try:
+        unit = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"캔들 단위는 분(정수) 또는 {SECONDS} 이어야 합니다: {text}")
+    if unit <= 0:
+        raise argparse.ArgumentTypeError(f"캔들 단위는 0보다 커야 합니다: {text}")
+    return unit
+
+
+def build_jobs(markets: list, ranges: list, units: list, param_sets: list) -> list:
+    """마켓 × 기간 × 단위 × 파라미터 조합마다 작업 하나를 만듭니다. (마켓이 정해진 파라미터는 그 마켓에만)"""
+    from manager.setting_manager import validate_setting_df
+
+    jobs, seen = [], set()
+    for market_filter, params in param_sets:
+        targets = [market_filter] if market_filter else markets
+        if market_filter and markets and market_filter not in markets:
+            continue
+        for market in targets:
+            # setting.csv와 같은 규칙으로 값을 검사하고 숫자형으로 맞춥니다.
+            setting = validate_setting_df(pd.DataFrame([{"market": market, **params}]))[0]
+            checked = {name: getattr(setting, name) for name in PARAM_COLUMNS}
+            for (start, end), unit in itertools.product(ranges, units):
+                # 같은 조합이 여러 파일에 있어도 한 번만 실행합니다. (두 번째는 체크포인트만 읽고 끝나므로)
+                key = (market, start, end, unit, tuple(checked.values()))
+                if key in seen:
+                    continue
+                seen.add(key)
+                jobs.append({"market": market, "start": start, "end": end, "unit": unit, "params": checked})
+    # 같은 마켓 작업을 붙여 두면 작업자 프로세스가 읽어 둔 1분봉을 다시 쓸 가능성이 높아집니다.
+    jobs.sort(key=lambda job: (job["market"], unit_delta(job["unit"]), job["start"]))
+    return jobs
+
+
+# --- 실행 ---
+
+def run_job(job: dict, sinks: tuple, resume: bool, checkpoint_dir: str, verbose: bool = False,
+            fill_model: str = "ideal") -> dict:
+    """작업자 프로세스에서 백테스트 한 건을 실행합니다. 실패해도 예외 대신 error가 담긴 요약을 반환합니다."""
+    # 병렬 실행 중에는 시뮬레이터 로그를 경고 이상만 남겨 출력 비용과 뒤섞임을 없앱니다. (진행 상황은 부모가 출력)
+    set_level("INFO" if verbose else "WARNING")
+    try:
+        return run_backtest(job["market"], job["start"], job["end"], job["unit"], job["params"],
+                            sinks=sinks, resume=resume, checkpoint_dir=checkpoint_dir, update_candles=False,
+                            fill_model=fill_model)
+    except Exception as e:
+        return {"market": job["market"], "unit": job["unit"], "start": job["start"], "end": job["end"],
+                **job["params"], "candles": 0, "seconds": 0.0, "error": f"{e}\n{traceback.format_exc()}"}
+
+
+def fetch_missing_candles(jobs: list) -> None:
+    """작업에 필요한 구간 중 캔들 저장소에 없는 1분봉(초봉 작업은 초봉)만 거래소에서 받아 둡니다. (마켓당 한 번)"""
+    from data.candle_store import get_candle_store, get_second_candle_store
+
+    spans = {}
+    for job in jobs:
+        key = (job["market"], job["unit"] == SECONDS)
+        start, end = pd.Timestamp(job["start"]), pd.Timestamp(job["end"])
+        lo, hi = spans.get(key, (start, end))
+        spans[key] = (min(lo, start), max(hi, end))
+    for (market, seconds), (start, end) in spans.items():
+        started = time.perf_counter()
+        if seconds:
+            count = get_second_candle_store().backfill(market, start, end)
+        else:
+            count = get_candle_store().update(market, start=start, end=end)
+        print(f"[backtest_cli.py] 📥 {market} {'초봉' if seconds else '1분봉'} {count:,}개 추가 "
+              f"({time.perf_counter() - started:.1f}s)")
+
+
+def _describe(result: dict) -> str:
+    params = " ".join(f"{name}={result[name]}" for name in PARAM_COLUMNS if name in result)
+    return f"{result['market']} {unit_label(result['unit'])} {result['start']}..{result['end']} {params}"
+
+
+def run_jobs(jobs: list, workers: int, sinks: tuple, resume: bool, checkpoint_dir: str,
+             verbose: bool = False, fill_model: str = "ideal") -> pd.DataFrame:
+    """작업들을 작업자 풀에서 실행하고, 끝나는 대로 진행 상황과 처리 속도를 출력합니다."""
+    started = time.perf_counter()
+    results = []
+    total_candles = 0
+
+    def report(result: dict) -> None:
+        nonlocal total_candles
+        results.append(result)
+        total_candles += result["candles"]
+        elapsed = time.perf_counter() - started
+        head = f"[{len(results)}/{len(jobs)}] {_describe(result)}"
+        if result.get("error"):
+            print(f"❌ {head} → 실패: {result['error'].splitlines()[0]}")
+            return
+        ret = f"{result['return_pct']:+.2f}%" if result.get("return_pct") is not None else "-"
+        print(f"✅ {head} → {result['candles']:,} candles, {result['candles_per_sec']:,.0f} c/s, 수익률 {ret}"
+              f" | 누적 {total_candles:,} candles, {total_candles / elapsed:,.0f} c/s")
+
+    if workers <= 1:
+        for job in jobs:
+            report(run_job(job, sinks, resume, checkpoint_dir, verbose, fill_model))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_job, job, sinks, resume, checkpoint_dir, verbose, fill_model) for job in jobs]
+            for future in as_completed(futures):
+                report(future.result())
+
+    elapsed = time.perf_counter() - started
+    print(f"[backtest_cli.py] 완료: 작업 {len(jobs)}개, 캔들 {total_candles:,}개, {elapsed:.1f}s "
+          f"→ {total_candles / elapsed if elapsed > 0 else 0:,.0f} candles/sec (작업자 {workers}개)")
+    return pd.DataFrame(results)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m manager.backtest_cli",
+        description="저장된 캔들로 여러 마켓 / 기간 / 단위 / 파라미터 조합의 백테스트를 병렬로 실행합니다.",
+        epilog=USAGE_EXAMPLE, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", nargs="+", default=[],
+                        help="대상 마켓 (생략하면 파라미터 파일의 market 컬럼 사용)")
+    parser.add_argument("--range", dest="ranges", action="append", type=parse_range, required=True,
+                        help="기간 시작..끝 (KST, 여러 번 지정 가능)")
+    parser.add_argument("--units", nargs="+", type=parse_unit, default=[1],
+                        help=f"캔들 단위(분) 또는 초봉 {SECONDS}, 기본 1")
+    parser.add_argument("--params", nargs="+", default=["setting.csv"],
+                        help="파라미터 파일 (setting.csv 형식 CSV 또는 JSON), 기본 setting.csv")
+    parser.add_argument("--sink", nargs="+", choices=list(SINKS) + ["none"], default=["parquet"],
+                        help="결과 저장 위치 (parquet / db / none), 기본 parquet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="작업자 프로세스 수, 기본 CPU 코어 수")
+    parser.add_argument("--fetch", action="store_true",
+                        help="실행 전에 저장소에 없는 1분봉을 거래소에서 받아 둡니다. (기본: 저장된 캔들만 사용)")
+    parser.add_argument("--fills", choices=FILL_MODELS, default="ideal",
+                        help="체결 방식: ideal(기준가에 전부 체결) / depth(기록된 호가로 VWAP, 부분 체결) / curve(호가 모양 곡선), 기본 ideal")
+    parser.add_argument("--no-resume", action="store_true", help="체크포인트를 무시하고 처음부터 계산")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR, help=f"결과/체크포인트 디렉터리, 기본 {CHECKPOINT_DIR}")
+    parser.add_argument("--out", help="실행별 요약을 저장할 CSV 경로")
+    parser.add_argument("--verbose", action="store_true", help="시뮬레이터 로그(INFO)도 출력 (작업자 1개일 때 권장)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sinks = () if "none" in args.sink else tuple(dict.fromkeys(args.sink))
+
+    param_sets = [p for path in args.params for p in load_param_sets(path)]
+    markets = args.markets or list(dict.fromkeys(m for m, _ in param_sets if m))
+    if not markets:
+        print("[backtest_cli.py] 대상 마켓이 없습니다. --markets 또는 market 컬럼이 있는 파라미터 파일을 지정하세요.")
+        return 2
+    jobs = build_jobs(markets, args.ranges, args.units, param_sets)
+    if not jobs:
+        print("[backtest_cli.py] 실행할 작업이 없습니다.")
+        return 2
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"[backtest_cli.py] 작업 {len(jobs)}개 (마켓 {len(markets)} × 기간 {len(args.ranges)} × 단위 {len(args.units)}"
+          f" × 파라미터 {len(param_sets)}), 작업자 {workers}개, 저장: {', '.join(sinks) or 'none'}")
+
+    if args.fetch:
+        fetch_missing_candles(jobs)
+
+    summary = run_jobs(jobs, workers, sinks, not args.no_resume, args.checkpoint_dir, args.verbose, args.fills)
+    if args.out:
+        summary.drop(columns=["error"], errors="ignore").to_csv(args.out, index=False)
+        print(f"[backtest_cli.py] 📄 요약 저장: {args.out}")
+
+    ok = summary[summary.get("error", pd.Series(index=summary.index, dtype=object)).isna()]
+    if not ok.empty and ok["return_pct"].notna().any():
+        columns = ["market", "unit", "start", "end", *PARAM_COLUMNS, "candles", "return_pct", "realized_pnl", "total_fee"]
+        if args.fills != "ideal":
+            columns += ["slippage_cost", "unfilled_amount"]
+        print(ok.sort_values("return_pct", ascending=False)[columns].head(20).to_string(index=False))
+    return 1 if len(ok) < len(summary) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
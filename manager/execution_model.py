@@ -0,0 +1,211 @@
+# manager/execution_model.py
+
+import numpy as np
+import pandas as pd
+
+from data.candle_store import unit_delta
+from utils.log import get_logger
+
+log = get_logger("manager.execution_model")
+
+# 백테스트 체결 방식
+# - ideal: 기준가(종가 / 목표가)에 주문 금액 전부 체결 (유동성 무한, 기존 방식)
+# - depth: 기록된 호가(data/orderbook_store.py)를 캔들 시점마다 찾아 단계별로 채워 VWAP과 부분 체결을 계산합니다.
+#          그 시점에 BOOK_MAX_AGE 이내의 호가가 없으면 아래 curve로 계산합니다.
+# - curve: 기록된 호가에서 마켓별 스프레드/단계 간격/단계 잔량을 구해, 같은 모양의 호가를 가정하고 계산합니다.
+FILL_MODELS = ("ideal", "depth", "curve")
+BOOK_MAX_AGE = 10 * 60 * 1000   # ms
+CURVE_WINDOW = 24 * 3600 * 1000  # 백테스트 구간에 호가가 없으면, 마지막으로 기록한 이 기간(ms)의 호가로 곡선을 구합니다.
+
+
+def walk_book(offsets: np.ndarray, notionals: np.ndarray, amounts) -> tuple:
+    """
+    주문 여러 개를 호가 단계별로 한 번에 채웁니다. (n, depth) 배열 기준, 0번 열이 최우선 호가
+    offsets: 중간가 대비 각 단계 가격의 불리한 정도 (매수: 매도호가/중간가 - 1, 매도: 1 - 매수호가/중간가)
+    notionals: 각 단계의 잔량 금액 (가격 × 수량)
+    amounts: 주문 금액 (n,)
+    → (체결 금액, 체결 금액 가중 평균 불리함) — 잔량이 모자라면 체결 금액 < 주문 금액 (부분 체결)
+    """
+    amounts = np.asarray(amounts, dtype=np.float64).reshape(-1, 1)
+    before = np.cumsum(notionals, axis=1) - notionals
+    take = np.clip(amounts - before, 0.0, notionals)
+    filled = np.minimum(take.sum(axis=1), amounts[:, 0])  # 합산 오차로 주문 금액을 넘지 않도록
+    cost = (take * offsets).sum(axis=1)
+    slip = np.divide(cost, filled, out=np.zeros_like(cost), where=filled > 0)
+    return filled, slip
+
+
+def book_sides(levels: np.ndarray) -> tuple:
+    """
+    호가 배열 (n, 4, depth) → 매수용 (offsets, notionals), 매도용 (offsets, notionals)
+    중간가는 최우선 매도/매수호가의 평균입니다. 비어 있는 단계(0)는 잔량 0으로 둡니다.
+    """
+    ask_price, ask_size, bid_price, bid_size = (levels[:, i, :] for i in range(4))
+    mid = (ask_price[:, :1] + bid_price[:, :1]) / 2
+    mid = np.where(mid > 0, mid, np.nan)
+    asks = (np.nan_to_num(ask_price / mid - 1), ask_price * ask_size)
+    bids = (np.nan_to_num(1 - bid_price / mid), bid_price * bid_size)
+    return asks, bids
+
+
+class DepthCurve:
+    """
+    # --- [호가 모양 곡선] ---
+    # 최우선 호가가 중간가에서 half_spread 떨어져 있고, 그 뒤로 level_step 간격마다 level_depth 원씩 잔량이 있는
+    # levels 단계짜리 호가를 가정합니다. walk_book과 같은 계산을 닫힌 식으로 합니다.
+    """
+    __slots__ = ("half_spread", "level_step", "level_depth", "levels")
+
+    def __init__(self, half_spread: float, level_step: float, level_depth: float, levels: int):
+        self.half_spread = half_spread
+        self.level_step = level_step
+        self.level_depth = level_depth
+        self.levels = levels
+
+    @classmethod
+    def fit(cls, levels: np.ndarray) -> "DepthCurve":
+        """기록된 호가 (n, 4, depth)의 중앙값으로 곡선을 구합니다. 양쪽(매수/매도) 호가를 함께 사용합니다."""
+        ask_price, ask_size, bid_price, bid_size = (levels[:, i, :] for i in range(4))
+        valid = (ask_price[:, 0] > 0) & (bid_price[:, 0] > 0)
+        if not valid.any():
+            raise ValueError("곡선을 구할 호가가 없습니다.")
+        ask_price, ask_size, bid_price, bid_size = (a[valid] for a in (ask_price, ask_size, bid_price, bid_size))
+        mid = (ask_price[:, 0] + bid_price[:, 0]) / 2
+
+        half_spread = np.median((ask_price[:, 0] - bid_price[:, 0]) / 2 / mid)
+        steps = np.concatenate([
+            (np.diff(ask_price, axis=1) / mid[:, None])[(ask_price[:, 1:] > 0)],
+            (-np.diff(bid_price, axis=1) / mid[:, None])[(bid_price[:, 1:] > 0)],
+        ])
+        notional = np.concatenate([(ask_price * ask_size)[ask_price > 0], (bid_price * bid_size)[bid_price > 0]])
+        count = np.median(np.minimum((ask_price > 0).sum(axis=1), (bid_price > 0).sum(axis=1)))
+        return cls(float(half_spread), float(np.median(steps)) if len(steps) else 0.0,
+                   float(np.median(notional)), int(count))
+
+    def fill(self, amounts) -> tuple:
+        """walk_book과 같은 (체결 금액, 평균 불리함)을 배열로 반환합니다."""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        filled = np.minimum(amounts, self.levels * self.level_depth)
+        full = np.floor(filled / self.level_depth)
+        rest = filled - full * self.level_depth
+        cost = filled * self.half_spread + self.level_step * (self.level_depth * full * (full - 1) / 2 + rest * full)
+        slip = np.divide(cost, filled, out=np.zeros_like(cost), where=filled > 0)
+        return filled, slip
+
+    def as_dict(self) -> dict:
+        return {"half_spread": round(self.half_spread, 8), "level_step": round(self.level_step, 8),
+                "level_depth": round(self.level_depth, 2), "levels": self.levels}
+
+    def __repr__(self):
+        return (f"DepthCurve(spread={self.half_spread * 2:.4%}, step={self.level_step:.4%}, "
+                f"depth={self.level_depth:,.0f}원 × {self.levels})")
+
+
+# --- 체결 모델 ---
+# buy(now, amount) / sell(now, amount) → (체결 금액, 불리함)
+# 시뮬레이터는 기준가 × (1 ± 불리함)을 평균 체결가로, 체결 금액만큼만 주고받습니다. (매도 금액은 기준가 기준)
+# 주문은 그 캔들에서 보이는 호가만큼만 체결되고 남은 금액은 체결되지 않은 것으로 봅니다. (IOC)
+
+class IdealFill:
+    """기존 방식: 기준가에 전부 체결"""
+    name = "ideal"
+
+    def prepare(self, times) -> None:
+        pass
+
+    def buy(self, now, amount: float) -> tuple:
+        return amount, 0.0
+
+    def sell(self, now, amount: float) -> tuple:
+        return amount, 0.0
+
+    def describe(self):
+        return None
+
+
+class CurveFill(IdealFill):
+    """마켓별로 구한 호가 곡선으로 계산합니다."""
+    name = "curve"
+
+    def __init__(self, curve: DepthCurve):
+        self.curve = curve
+
+    def buy(self, now, amount: float) -> tuple:
+        filled, slip = self.curve.fill(amount)
+        return float(filled), float(slip)
+
+    sell = buy
+
+    def describe(self):
+        return {"kind": self.name, **self.curve.as_dict()}
+
+
+class DepthFill(CurveFill):
+    """
+    # --- [호가 체결 모델] ---
+    # prepare()에서 캔들마다 그 시점(캔들 마감)에 보이던 호가를 한 번에 찾아 두고,
+    # 체결이 있을 때만 해당 캔들의 호가를 단계별로 채웁니다. (체결이 없는 캔들은 비용 없음)
+    """
+    name = "depth"
+
+    def __init__(self, store, market: str, unit, curve: DepthCurve, max_age: int = BOOK_MAX_AGE):
+        super().__init__(curve)
+        self.store = store
+        self.market = market
+        self.unit = unit
+        self.max_age = max_age
+        self._times = np.empty(0, dtype="datetime64[ns]")
+        self._found = np.empty(0, dtype=bool)
+        self._asks = self._bids = None
+
+    def prepare(self, times) -> None:
+        times = np.asarray(pd.to_datetime(times), dtype="datetime64[ns]")
+        book_times, levels = self.store.sample(self.market, times + unit_delta(self.unit).to_timedelta64(), self.max_age)
+        self._times = times
+        self._found = book_times >= 0
+        self._asks, self._bids = book_sides(levels)
+        if len(times):
+            log.info("%s 호가 체결 모델: 캔들 %d개 중 %d개에 기록된 호가 사용 (나머지는 %s)",
+                     self.market, len(times), int(self._found.sum()), self.curve)
+
+    def _fill(self, now, amount: float, side: tuple) -> tuple:
+        i = int(self._times.searchsorted(np.datetime64(pd.Timestamp(now), "ns")))
+        if i >= len(self._times) or not self._found[i]:
+            return CurveFill.buy(self, now, amount)
+        filled, slip = walk_book(side[0][i:i + 1], side[1][i:i + 1], [amount])
+        return float(filled[0]), float(slip[0])
+
+    def buy(self, now, amount: float) -> tuple:
+        return self._fill(now, amount, self._asks)
+
+    def sell(self, now, amount: float) -> tuple:
+        return self._fill(now, amount, self._bids)
+
+    def describe(self):
+        return {**super().describe(), "kind": self.name, "max_age": self.max_age}
+
+
+def make_fill_model(kind: str, market: str, unit, start=None, end=None, store=None):
+    """
+    체결 모델을 만듭니다. depth / curve 는 기록된 호가가 있어야 합니다.
+    곡선은 [start, end) 구간의 마지막 CURVE_WINDOW 기간에 기록된 호가로 구하고, 구간에 호가가 없으면
+    마지막으로 기록한 CURVE_WINDOW 기간의 호가로 구합니다. (과거 구간 백테스트에도 최근 호가 모양을 사용)
+    """
+    if kind == "ideal":
+        return IdealFill()
+    if kind not in FILL_MODELS:
+        raise ValueError(f"알 수 없는 체결 방식입니다: {kind} (가능: {FILL_MODELS})")
+
+    from data.orderbook_store import get_orderbook_store, to_ms
+    store = store or get_orderbook_store()
+    last = store.last_time(market)
+    if last < 0:
+        raise ValueError(f"{market} 기록된 호가가 없습니다. (python -m data.orderbook_store 로 먼저 기록하세요)")
+    # 곡선은 중앙값이므로 CURVE_WINDOW 만큼만 읽어도 충분합니다. (긴 구간을 통째로 읽지 않음)
+    hi = min(to_ms(end), last + 1) if end is not None else last + 1
+    lo = max(to_ms(start), hi - CURVE_WINDOW) if start is not None else hi - CURVE_WINDOW
+    _, levels = store.read_arrays(market, lo, hi) if lo < hi else (None, [])
+    if not len(levels):
+        _, levels = store.read_arrays(market, last + 1 - CURVE_WINDOW, last + 1)
+    curve = DepthCurve.fit(levels)
+    return CurveFill(curve) if kind == "curve" else DepthFill(store, market, unit, curve)
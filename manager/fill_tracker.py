@@ -0,0 +1,201 @@
+# manager/fill_tracker.py
+
+import threading
+import time
+from collections import OrderedDict
+
+from api.order import get_orders_by_uuids
+from api.order_stream import MyOrderStream
+from utils.log import get_logger, fields
+
+log = get_logger("manager.fill_tracker")
+
+TERMINAL_STATES = ("done", "cancel")
+FINISHED_HISTORY_SIZE = 1000
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _to_optional_float(value):
+    """값이 없으면(None) 0이 아니라 '알 수 없음'(None)으로 둡니다."""
+    return None if value is None else _to_float(value)
+
+
+class OpenOrder:
+    """거래소에 걸려 있는 주문 한 건의 최신 상태입니다."""
+    __slots__ = ("uuid", "market", "side", "ord_type", "price", "volume",
+                 "executed_volume", "remaining_volume", "state", "updated_at")
+
+    def __init__(self, uuid, market, side, ord_type=None, price=0.0, volume=0.0,
+                 executed_volume=0.0, remaining_volume=0.0, state="wait"):
+        self.uuid = uuid
+        self.market = market
+        self.side = side
+        self.ord_type = ord_type
+        self.price = price
+        self.volume = volume
+        self.executed_volume = executed_volume
+        self.remaining_volume = remaining_volume
+        self.state = state
+        self.updated_at = time.time()
+
+
+class FillEvent:
+    """체결(trade) / 완료(done) / 취소(cancel) 알림입니다."""
+    __slots__ = ("kind", "uuid", "market", "side", "ord_type", "price", "executed_volume", "remaining_volume",
+                 "source")
+
+    def __init__(self, kind, order: OpenOrder, source: str):
+        self.kind = kind
+        self.uuid = order.uuid
+        self.market = order.market
+        self.side = order.side
+        self.ord_type = order.ord_type
+        self.price = order.price
+        self.executed_volume = order.executed_volume
+        self.remaining_volume = order.remaining_volume
+        self.source = source
+
+    def __repr__(self):
+        return f"FillEvent({self.kind}, {self.market}, {self.side}, executed={self.executed_volume}, via={self.source})"
+
+
+def _normalize_rest_order(order: dict) -> dict:
+    return {
+        "uuid": order.get("uuid"),
+        "market": order.get("market"),
+        "side": order.get("side"),
+        "ord_type": order.get("ord_type"),
+        "price": _to_float(order.get("price")),
+        "volume": _to_float(order.get("volume")),
+        "executed_volume": _to_float(order.get("executed_volume")),
+        "remaining_volume": _to_float(order.get("remaining_volume")),
+        "state": order.get("state"),
+    }
+
+
+def _normalize_stream_order(message: dict) -> dict:
+    # 스트림에서는 부분 체결이 state="trade"로 오므로, 남은 수량으로 완료 여부를 판단합니다.
+    # 시장가 매수(price)처럼 남은 수량이 비어 있는(null) 주문은 완료 여부를 알 수 없으므로, 완료(done) 메시지를 기다립니다.
+    state = message.get("state")
+    remaining_volume = _to_optional_float(message.get("remaining_volume"))
+    if state == "trade":
+        state = "done" if remaining_volume == 0 else "wait"
+    return {
+        "uuid": message.get("uuid"),
+        "market": message.get("code"),
+        "side": (message.get("ask_bid") or "").lower(),
+        "ord_type": message.get("order_type"),
+        "price": _to_float(message.get("price")),
+        "volume": _to_float(message.get("volume")),
+        "executed_volume": _to_float(message.get("executed_volume")),
+        "remaining_volume": remaining_volume,
+        "state": state,
+    }
+
+
+class FillTracker:
+    """
+    # --- [체결 추적기] ---
+    # 우리가 낸 미체결 주문 표를 메모리에 유지하고, 체결/취소가 감지되면 등록된 리스너에게 즉시 알립니다.
+    # - 평소: private WebSocket(myOrder) 메시지로 갱신 (지연 수 ms)
+    # - 스트림이 끊겼을 때: 미체결 주문들을 REST로 100개씩 묶어서 재조회(reconcile)
+    """
+
+    def __init__(self, batch_size: int = 100):
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._orders = {}
+        self._finished = OrderedDict()  # 최근 완료/취소된 uuid (늦게 도착한 중복 메시지 무시용)
+        self._listeners = []
+        self.stream = MyOrderStream(on_order=self._on_stream_order, on_disconnect=self.reconcile)
+
+    def add_listener(self, listener) -> None:
+        """listener(FillEvent)는 스트림 스레드에서 호출되므로, 오래 걸리는 작업은 하지 않아야 합니다."""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        self.stream.start()
+
+    def stop(self) -> None:
+        self.stream.stop()
+
+    @property
+    def streaming(self) -> bool:
+        return self.stream.connected
+
+    def track(self, order: dict) -> None:
+        """send_order() 응답을 등록합니다. 이후 체결/취소는 스트림 또는 재조회로 갱신됩니다."""
+        data = _normalize_rest_order(order)
+        if data["uuid"]:
+            self._apply(data, source="rest")
+
+    def open_orders(self, market: str = None) -> list:
+        with self._lock:
+            return [o for o in self._orders.values()
+                    if o.state not in TERMINAL_STATES and (market is None or o.market == market)]
+
+    def _on_stream_order(self, message: dict) -> None:
+        self._apply(_normalize_stream_order(message), source="stream")
+
+    def _apply(self, data: dict, source: str) -> None:
+        events = []
+        with self._lock:
+            if data["uuid"] in self._finished:
+                return
+            order = self._orders.get(data["uuid"])
+            if order is None:
+                # 처음 보는 주문은 미체결 상태로 등록한 뒤, 아래에서 현재 상태를 반영합니다.
+                # (수동 주문처럼 우리가 등록하지 않은 주문도 스트림으로 들어오면 함께 추적합니다)
+                order = OpenOrder(**{**data, "executed_volume": 0.0, "state": "wait"})
+                self._orders[data["uuid"]] = order
+
+            if data["executed_volume"] > order.executed_volume:
+                order.executed_volume = data["executed_volume"]
+                order.remaining_volume = data["remaining_volume"]
+                events.append("trade")
+            if data["state"] in TERMINAL_STATES and order.state not in TERMINAL_STATES:
+                events.append(data["state"])
+            if data["state"]:
+                order.state = data["state"]
+            order.updated_at = time.time()
+
+            fill_events = [FillEvent(kind, order, source) for kind in events]
+            if order.state in TERMINAL_STATES:
+                self._orders.pop(order.uuid, None)
+                self._finished[order.uuid] = True
+                if len(self._finished) > FINISHED_HISTORY_SIZE:
+                    self._finished.popitem(last=False)
+
+        for event in fill_events:
+            log.info("🔔 %s", event, extra=fields(market=event.market, kind=event.kind, uuid=event.uuid))
+            for listener in self._listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    log.exception("리스너 처리 중 예외 발생: %s", e)
+
+    def reconcile(self) -> int:
+        """미체결 주문들의 상태를 REST로 일괄 재조회합니다. 반영한 주문 수를 반환합니다."""
+        uuids = [o.uuid for o in self.open_orders()]
+        count = 0
+        for i in range(0, len(uuids), self.batch_size):
+            try:
+                orders = get_orders_by_uuids(uuids[i:i + self.batch_size])
+            except Exception as e:
+                log.warning("주문 재조회 실패: %s", e)
+                continue
+            for order in orders:
+                self._apply(_normalize_rest_order(order), source="rest")
+                count += 1
+        return count
+
+    def reconcile_if_stream_down(self) -> None:
+        """스케줄러용: 스트림이 연결되어 있지 않을 때만 REST 재조회를 실행합니다."""
+        if not self.streaming:
+            self.reconcile()
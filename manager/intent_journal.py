@@ -0,0 +1,278 @@
+# manager/intent_journal.py
+
+import glob
+import json
+import os
+import threading
+import time
+import uuid as uuid_lib
+
+from utils.file_utils import save_json, load_json
+from utils.log import get_logger, fields
+
+log = get_logger("manager.intent_journal")
+
+JOURNAL_DIR = os.path.join("logs", "journal")
+SNAPSHOT_EVERY = 1000   # 이만큼 기록할 때마다 스냅샷을 남기고 새 세그먼트로 넘어갑니다.
+SYNC_EVERY = 64         # intent가 아닌 기록(ack 등)은 이만큼 모이면 한 번에 fsync 합니다.
+
+# 주문 한 건의 진행 상태
+INTENT = "intent"        # 주문을 내기로 했고, 거래소 응답은 아직 모름
+ACKED = "acked"          # 거래소가 접수함 (uuid 있음)
+PERSISTED = "persisted"  # DB 기록까지 끝남
+
+
+def level_key(market: str, side: str, level: str) -> str:
+    """
+    같은 사다리 단계의 주문인지 판단하는 키입니다. 단계마다 주문은 하나만 살아 있을 수 있습니다.
+    가격은 넣지 않습니다. 가격이 바뀐 주문은 기존 주문을 취소한 뒤에만 다시 낼 수 있습니다. (order_executor.begin_intents)
+    """
+    return f"{market}|{side}|{level}"
+
+
+class JournalEntry:
+    __slots__ = ("id", "key", "table", "market", "side", "level", "price", "amount", "volume",
+                 "status", "uuid", "created")
+
+    def __init__(self, id, key, table, market, side, level=None, price=None, amount=None, volume=None,
+                 status=INTENT, uuid=None, created=None):
+        self.id = id
+        self.key = key
+        self.table = table
+        self.market = market
+        self.side = side
+        self.level = level
+        self.price = price
+        self.amount = amount
+        self.volume = volume
+        self.status = status
+        self.uuid = uuid
+        self.created = created if created is not None else time.time()
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"JournalEntry({self.id}, {self.key}, {self.status}, uuid={self.uuid})"
+
+
+class IntentJournal:
+    """
+    # --- [주문 의도 저널 (write-ahead)] ---
+    # 주문을 거래소에 보내기 전에 intent를 먼저 fsync 해 두고, 이후 접수(ack) / DB 기록 / 완료를 이어 적습니다.
+    # 컨테이너가 그 사이에 재시작되어도 저널에는 "보냈을 수도 있는 주문"이 남아 있으므로,
+    # 시작할 때 거래소 주문과 맞춰 보고(manager/order_executor.recover_orders) 같은 단계의 주문을 두 번 내지 않습니다.
+    # - 파일: 한 줄에 JSON 하나씩 추가만 하는 세그먼트(journal-<seq>.log)
+    # - SNAPSHOT_EVERY 건마다 살아 있는 주문만 스냅샷(snapshot.json)으로 남기고 이전 세그먼트는 지웁니다.
+    #   재시작 시에는 스냅샷 + 그 이후 기록만 읽으므로 복구 시간이 기록 기간과 상관없이 짧습니다.
+    """
+
+    def __init__(self, root: str = JOURNAL_DIR, snapshot_every: int = SNAPSHOT_EVERY, sync_every: int = SYNC_EVERY):
+        self.root = root
+        self.snapshot_every = snapshot_every
+        self.sync_every = sync_every
+        self._lock = threading.RLock()
+        self._entries = {}   # id -> JournalEntry (살아 있는 주문만)
+        self._by_key = {}    # level key -> id
+        self._by_uuid = {}   # 거래소 uuid -> id
+        self._seq = 0
+        self._since_snapshot = 0
+        self._unsynced = 0
+        self._file = None
+
+    # --- 복구 ---
+
+    def recover(self) -> "IntentJournal":
+        """스냅샷과 그 이후 기록을 읽어 살아 있는 주문 표를 만듭니다."""
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            snapshot = load_json(self._snapshot_path()) or {"seq": 0, "entries": []}
+            self._entries, self._by_key, self._by_uuid = {}, {}, {}
+            for data in snapshot["entries"]:
+                self._add(JournalEntry(**data))
+            self._seq = snapshot["seq"]
+
+            replayed = 0
+            for path in self._segments():
+                for record in _read_records(path):
+                    if record["seq"] <= snapshot["seq"]:
+                        continue
+                    self._apply(record)
+                    self._seq = record["seq"]
+                    replayed += 1
+            self._since_snapshot = replayed
+            self._open_segment()
+            log.info("저널 복구: 진행 중 주문 %d건 (스냅샷 이후 기록 %d건)", len(self._entries), replayed,
+                     extra=fields(root=self.root))
+            return self
+
+    # --- 기록 ---
+
+    def begin(self, intents: list) -> list:
+        """
+        주문 의도들을 기록하고 한 번에 fsync 합니다. 기록한 JournalEntry 목록을 반환합니다.
+        intents: dict(table, market, side, level, price, amount, volume) 목록.
+        같은 단계의 주문이 이미 진행 중이면 그 의도는 건너뜁니다. (반환 목록에서 빠짐)
+        """
+        entries = []
+        with self._lock:
+            for intent in intents:
+                key = level_key(intent["market"], intent["side"], intent["level"])
+                if key in self._by_key:
+                    log.warning("⚠️ %s 주문이 이미 진행 중 → 스킵 (%s)", key, self._entries[self._by_key[key]])
+                    continue
+                entry = JournalEntry(uuid_lib.uuid4().hex, key, intent["table"], intent["market"], intent["side"],
+                                     intent.get("level"), intent.get("price"), intent.get("amount"), intent.get("volume"))
+                self._write({"op": "intent", **entry.as_dict()})
+                self._add(entry)
+                entries.append(entry)
+            if entries:
+                self.sync()
+            if self._since_snapshot >= self.snapshot_every:
+                self._snapshot()
+        return entries
+
+    def live(self, market: str, side: str, level: str):
+        """해당 단계에서 진행 중인 JournalEntry (없으면 None)"""
+        with self._lock:
+            entry_id = self._by_key.get(level_key(market, side, level))
+            return self._entries.get(entry_id) if entry_id is not None else None
+
+    def is_live(self, market: str, side: str, level: str) -> bool:
+        return self.live(market, side, level) is not None
+
+    def ack(self, entry_id: str, order_uuid: str) -> None:
+        self._record({"op": "ack", "id": entry_id, "uuid": order_uuid})
+
+    def persisted(self, entry_id: str) -> None:
+        self._record({"op": "persisted", "id": entry_id})
+
+    def fail(self, entry_id: str, reason: str = "") -> None:
+        """거래소에 주문이 들어가지 않았습니다. 같은 단계를 다시 낼 수 있습니다."""
+        self._record({"op": "fail", "id": entry_id, "reason": reason})
+
+    def close(self, entry_id: str, state: str = "done") -> None:
+        """주문이 완료/취소되었습니다."""
+        self._record({"op": "close", "id": entry_id, "state": state})
+
+    def close_uuid(self, order_uuid: str, state: str = "done") -> bool:
+        with self._lock:
+            entry_id = self._by_uuid.get(order_uuid)
+            if entry_id is None:
+                return False
+            self.close(entry_id, state)
+            return True
+
+    def on_fill_event(self, event) -> None:
+        """manager/fill_tracker.py 리스너: 완료/취소된 주문을 저널에서 닫습니다."""
+        if event.kind in ("done", "cancel"):
+            self.close_uuid(event.uuid, event.kind)
+
+    def entries(self, status: str = None) -> list:
+        with self._lock:
+            return [e for e in self._entries.values() if status is None or e.status == status]
+
+    def sync(self) -> None:
+        """쓰기만 하고 fsync 하지 않은 기록을 디스크에 내립니다."""
+        with self._lock:
+            if self._unsynced and self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self.sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # --- 내부 ---
+
+    def _record(self, record: dict) -> None:
+        with self._lock:
+            if record["id"] not in self._entries:
+                return
+            self._write(record)
+            self._apply(record)
+            if self._unsynced >= self.sync_every:
+                self.sync()
+            if self._since_snapshot >= self.snapshot_every:
+                self._snapshot()
+
+    def _write(self, record: dict) -> None:
+        if self._file is None:
+            self.recover()
+        self._seq += 1
+        record["seq"] = self._seq
+        # 프로세스가 죽어도 남도록 OS까지는 매번 넘기고, 디스크 fsync는 모아서 합니다.
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        self._since_snapshot += 1
+
+    def _apply(self, record: dict) -> None:
+        op = record["op"]
+        if op == "intent":
+            data = {name: record.get(name) for name in JournalEntry.__slots__}
+            self._add(JournalEntry(**data))
+            return
+        entry = self._entries.get(record["id"])
+        if entry is None:
+            return
+        if op == "ack":
+            entry.status = ACKED
+            entry.uuid = record["uuid"]
+            self._by_uuid[entry.uuid] = entry.id
+        elif op == "persisted":
+            entry.status = PERSISTED
+        elif op in ("fail", "close"):
+            self._remove(entry)
+
+    def _add(self, entry: JournalEntry) -> None:
+        self._entries[entry.id] = entry
+        self._by_key[entry.key] = entry.id
+        if entry.uuid:
+            self._by_uuid[entry.uuid] = entry.id
+
+    def _remove(self, entry: JournalEntry) -> None:
+        self._entries.pop(entry.id, None)
+        if self._by_key.get(entry.key) == entry.id:
+            del self._by_key[entry.key]
+        if entry.uuid:
+            self._by_uuid.pop(entry.uuid, None)
+
+    def _snapshot(self) -> None:
+        """살아 있는 주문만 스냅샷으로 남기고, 새 세그먼트를 연 뒤 이전 세그먼트를 지웁니다."""
+        self.sync()
+        save_json({"seq": self._seq, "entries": [e.as_dict() for e in self._entries.values()]},
+                  self._snapshot_path())
+        old_segments = self._segments()
+        self._file.close()
+        self._file = None
+        self._open_segment()
+        for path in old_segments:
+            os.remove(path)
+        self._since_snapshot = 0
+
+    def _open_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.root, f"journal-{self._seq + 1:012d}.log")
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _segments(self) -> list:
+        return sorted(glob.glob(os.path.join(self.root, "journal-*.log")))
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.root, "snapshot.json")
+
+
+def _read_records(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # 기록 도중 종료되어 잘린 마지막 줄은 무시합니다.
+                return
@@ -0,0 +1,187 @@
+# manager/ladder_store.py
+
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+from utils.file_utils import (
+    load_csv, load_log, append_log, has_log, log_lock, latest_rows, to_log_frame,
+    BUY_LOG_SCHEMA, SELL_LOG_SCHEMA,
+)
+from utils.log import get_logger, fields
+
+log = get_logger("manager.ladder_store")
+
+LADDER_DIR = "logs"
+# 사다리 한 칸을 구분하는 컬럼 (같은 값의 행은 같은 칸의 새 버전)
+BUY_KEYS = ["market", "buy_type"]
+SELL_KEYS = ["market"]
+# 접수 기록보다 먼저 도착한 완료/취소 알림을 이만큼까지 기억해 둡니다.
+EARLY_STATES_SIZE = 1000
+
+
+def ladder_state(state: str, ord_type: str = None, executed_volume=0.0) -> str:
+    """
+    거래소 주문 상태를 사다리 상태로 바꿉니다. (executed_volume은 REST 응답의 문자열이어도 됩니다)
+    시장가 매수(price)는 금액을 다 쓰고 남은 잔량이 취소(cancel)로 끝나므로, 체결된 수량이 있으면 완료로 봅니다.
+    """
+    if state == "cancel" and ord_type == "price" and float(executed_volume or 0) > 0:
+        return "done"
+    return state
+
+
+class LadderLog:
+    """매수(bid) / 매도(ask) 사다리 로그 하나의 위치와 형식입니다."""
+    __slots__ = ("path", "schema", "keys", "level_column", "uuid_column", "legacy_csv")
+
+    def __init__(self, path, schema, keys, level_column, uuid_column, legacy_csv):
+        self.path = path
+        self.schema = schema
+        self.keys = keys
+        self.level_column = level_column
+        self.uuid_column = uuid_column
+        self.legacy_csv = legacy_csv
+
+
+def _versions(df: pd.DataFrame, keys: list) -> dict:
+    """keys 값 -> 행 전체 값(비교용, 빈 값은 None)"""
+    if df is None or df.empty:
+        return {}
+    df = df.astype(object).where(df.notna(), None)
+    positions = [df.columns.get_loc(key) for key in keys]
+    return {tuple(row[i] for i in positions): row for row in df.itertuples(index=False, name=None)}
+
+
+class LadderStore:
+    """
+    # --- [사다리 저장소] ---
+    # 매수 사다리(logs/buy_log)와 매도 주문(logs/sell_log)의 현재 상태를 Parquet 로그(utils/file_utils.py)로 보관합니다.
+    # - 행을 고칠 때는 바뀐 행만 새 버전으로 추가하고, 읽을 때는 칸((market, buy_type) / market)마다 마지막 버전만 씁니다.
+    # - 전략 사이클(save), 주문 접수(acked), 체결/취소 알림(on_fill_event)이 같은 행을 고치므로,
+    #   읽고-고치고-쓰는 동안 log_lock을 잡습니다.
+    # - 로그가 아직 없으면 처음 읽을 때 기존 CSV(buy_log.csv / sell_log.csv)를 한 번 옮겨 담습니다.
+    """
+
+    def __init__(self, root: str = LADDER_DIR, legacy_dir: str = "."):
+        self.logs = {
+            "bid": LadderLog(os.path.join(root, "buy_log"), BUY_LOG_SCHEMA, BUY_KEYS, "buy_type", "buy_uuid",
+                             os.path.join(legacy_dir, "buy_log.csv")),
+            "ask": LadderLog(os.path.join(root, "sell_log"), SELL_LOG_SCHEMA, SELL_KEYS, None, "sell_uuid",
+                             os.path.join(legacy_dir, "sell_log.csv")),
+        }
+        self._migrated = set()
+        self._lock = threading.Lock()
+        self._early = OrderedDict()  # uuid -> 접수 기록 전에 도착한 완료/취소 상태
+
+    def load(self, markets: list = None) -> tuple:
+        """(매수 사다리, 매도 주문) DataFrame을 반환합니다."""
+        return self.read("bid", markets), self.read("ask", markets)
+
+    def read(self, side: str, markets: list = None) -> pd.DataFrame:
+        ladder = self.logs[side]
+        self._migrate(ladder)
+        return load_log(ladder.path, ladder.schema, markets=markets, keys=ladder.keys)
+
+    def save(self, side: str, planned: pd.DataFrame, loaded: pd.DataFrame) -> pd.DataFrame:
+        """
+        전략이 계획한 사다리(planned) 중 읽었을 때(loaded)와 달라진 행만 저장합니다.
+        그 사이 다른 곳(주문 접수 등)에서 먼저 바뀐 칸은 덮어쓰지 않고, 다음 사이클에 새 상태로 다시 계산합니다.
+        저장소와 일치하는 계획 행(건너뛴 칸 제외)을 반환합니다.
+        """
+        if planned is None or planned.empty:
+            return pd.DataFrame()
+        ladder = self.logs[side]
+        planned = to_log_frame(planned, ladder.schema)
+        before = _versions(to_log_frame(loaded, ladder.schema) if loaded is not None else None, ladder.keys)
+        planned_versions = _versions(planned, ladder.keys)
+        changed = [key for key, row in planned_versions.items() if before.get(key) != row]
+        if not changed:
+            return planned
+
+        with log_lock(ladder.path):
+            markets = sorted({key[0] for key in changed})
+            current = _versions(load_log(ladder.path, ladder.schema, markets=markets, keys=ladder.keys), ladder.keys)
+            stale = {key for key in changed if current.get(key) != before.get(key)}
+            changed_set = set(changed) - stale
+            keys = list(planned[ladder.keys].itertuples(index=False, name=None))
+            append_log(planned[[key in changed_set for key in keys]], ladder.path, ladder.schema, ladder.keys)
+
+        if stale:
+            log.info("%s 사다리 %d칸은 계획 중에 바뀌어 다음 사이클에 다시 계산합니다: %s", side, len(stale), sorted(stale))
+        log.debug("💾 %s 사다리 저장: %d칸", side, len(changed_set), extra=fields(side=side, rows=len(changed_set)))
+        return planned[[key not in stale for key in keys]].reset_index(drop=True)
+
+    def acked(self, side: str, market: str, level: str, order_uuid: str) -> bool:
+        """
+        거래소가 접수한 주문의 uuid를 해당 칸에 적고 미체결(wait) 상태로 바꿉니다.
+        그 사이 완료/취소 알림이 먼저 도착했다면 그 상태로 적습니다.
+        """
+        ladder = self.logs[side]
+        with log_lock(ladder.path):
+            with self._lock:
+                state = self._early.pop(order_uuid, "wait")
+            return self._update(ladder, market, level, None, {ladder.uuid_column: order_uuid, "filled": state})
+
+    def mark_order(self, side: str, market: str, order_uuid: str, state: str) -> bool:
+        """
+        uuid가 적힌 칸의 상태를 완료(done) / 취소(cancel)로 바꿉니다.
+        아직 uuid가 적히지 않았으면(접수 기록 전) 기억해 두었다가 acked()에서 적습니다.
+        """
+        ladder = self.logs.get(side)
+        if ladder is None or not order_uuid:
+            return False
+        with log_lock(ladder.path):
+            if self._update(ladder, market, None, order_uuid, {"filled": state}):
+                log.info("🪜 %s %s 사다리 → %s", market, order_uuid, state,
+                         extra=fields(market=market, uuid=order_uuid, filled=state))
+                return True
+            with self._lock:
+                self._early[order_uuid] = state
+                if len(self._early) > EARLY_STATES_SIZE:
+                    self._early.popitem(last=False)
+        return False
+
+    def on_fill_event(self, event) -> None:
+        """manager/fill_tracker.py 리스너: 완료/취소된 주문의 사다리 칸을 곧바로 고칩니다. (거래 사이클 실행 전)"""
+        if event.kind in ("done", "cancel"):
+            self.mark_order(event.side, event.market, event.uuid,
+                            ladder_state(event.kind, event.ord_type, event.executed_volume))
+
+    def _update(self, ladder: LadderLog, market: str, level, order_uuid, changes: dict) -> bool:
+        """
+        조건에 맞는 칸의 마지막 버전을 고쳐 새 버전으로 추가합니다. 맞는 칸이 없으면 False
+        호출하는 쪽에서 log_lock(ladder.path)을 잡고 있어야 합니다.
+        """
+        df = load_log(ladder.path, ladder.schema, markets=[market], keys=ladder.keys)
+        if ladder.level_column is not None and level is not None and not df.empty:
+            df = df[df[ladder.level_column] == level]
+        if order_uuid is not None and not df.empty:
+            df = df[df[ladder.uuid_column] == order_uuid]
+        if df.empty:
+            return False
+        append_log(df.iloc[[-1]].assign(**changes), ladder.path, ladder.schema, ladder.keys)
+        return True
+
+    def _migrate(self, ladder: LadderLog) -> None:
+        """Parquet 로그가 없고 기존 CSV에 기록이 있으면, 처음 한 번 그대로 옮겨 담습니다."""
+        if ladder.path in self._migrated:
+            return
+        with log_lock(ladder.path):
+            if not has_log(ladder.path) and os.path.exists(ladder.legacy_csv):
+                df = load_csv(ladder.legacy_csv)
+                if not df.empty:
+                    append_log(latest_rows(df, ladder.keys), ladder.path, ladder.schema, ladder.keys)
+                    log.info("기존 CSV 로그를 옮겼습니다: %s → %s (%d행)", ladder.legacy_csv, ladder.path, len(df))
+        self._migrated.add(ladder.path)
+
+
+_default_store = None
+
+
+def get_ladder_store() -> LadderStore:
+    """프로세스 안에서 하나의 저장소를 함께 사용합니다."""
+    global _default_store
+    if _default_store is None:
+        _default_store = LadderStore()
+    return _default_store
@@ -0,0 +1,194 @@
+# manager/market_snapshot.py
+
+import json
+import threading
+import time
+import pandas as pd
+
+from utils.log import get_logger, fields
+
+log = get_logger("manager.market_snapshot")
+
+# 엔진이 사이클마다 게시한 시세 / 계좌 / 미체결 주문 / 매수·매도 사다리를 대시보드가 그대로 읽습니다.
+# 대시보드는 스냅샷이 살아 있는 동안 거래소를 조회하지 않으므로, 조회 한도를 엔진 혼자 사용합니다.
+# - 조각(part): 게시하는 쪽마다 하나 (단일 엔진은 "engine", 샤드 실행은 부모 "engine" + 작업자 "shard-<번호>")
+# - SNAPSHOT_MAX_AGE 초보다 오래된 조각은 엔진이 멈춘 것으로 보고 쓰지 않습니다. (대시보드는 거래소 조회로 돌아감)
+SNAPSHOT_MAX_AGE = 180
+# 미체결 주문은 주문을 넣었거나 체결/취소 알림이 왔을 때만 다시 조회하고, 그 밖에는 이 간격(초)으로만 조회합니다.
+OPEN_ORDERS_TTL = 600
+
+
+class DbSnapshotStore:
+    """MariaDB market_snapshot 테이블 (db/db_utils.py). 두 컨테이너가 이미 함께 쓰는 DB를 사용합니다."""
+
+    def __init__(self):
+        self._schema_ready = False
+
+    def publish(self, name: str, payload: str, published_at: float) -> None:
+        from db.db_utils import ensure_market_snapshot_schema, save_snapshot_part
+        if not self._schema_ready:
+            ensure_market_snapshot_schema()
+            self._schema_ready = True
+        save_snapshot_part(name, payload, published_at)
+
+    def versions(self) -> dict:
+        from db.db_utils import fetch_snapshot_versions
+        return fetch_snapshot_versions()
+
+    def load(self, names: list) -> dict:
+        from db.db_utils import fetch_snapshot_parts
+        return fetch_snapshot_parts(names)
+
+
+class MemorySnapshotStore:
+    """같은 프로세스 안에서 쓰는 저장소 (테스트용). DbSnapshotStore와 같은 메서드를 제공합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._parts = {}  # name -> (version, published_at, payload)
+        self.loads = 0    # load()로 본문을 읽은 횟수
+
+    def publish(self, name: str, payload: str, published_at: float) -> None:
+        with self._lock:
+            version = self._parts.get(name, (0,))[0] + 1
+            self._parts[name] = (version, published_at, payload)
+
+    def versions(self) -> dict:
+        with self._lock:
+            return {name: part[:2] for name, part in self._parts.items()}
+
+    def load(self, names: list) -> dict:
+        with self._lock:
+            self.loads += 1
+            return {name: self._parts[name] for name in names if name in self._parts}
+
+
+def _records(df: pd.DataFrame) -> list:
+    # JSON에는 NaN이 없으므로 빈 값은 None으로 바꿉니다.
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def read_ladder(markets: list) -> dict:
+    """거래 기록(logs/)에서 해당 마켓의 매수 사다리와 매도 주문을 읽습니다."""
+    from manager.ladder_store import get_ladder_store
+
+    buy_log_df, sell_log_df = get_ladder_store().load(markets)
+    return {"buy": _records(buy_log_df), "sell": _records(sell_log_df)}
+
+
+class OpenOrdersCache:
+    """
+    # --- [미체결 주문 캐시] ---
+    # 거래소의 미체결 주문 목록은 주문을 넣었거나(invalidate) 체결/취소 알림이 왔을 때(FillTracker 리스너)만 다시 조회합니다.
+    # 수동으로 넣은 주문도 보이도록 ttl 초마다 한 번은 다시 조회합니다.
+    """
+
+    def __init__(self, fetch=None, ttl: float = OPEN_ORDERS_TTL):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._orders = None
+        self._fetched_at = 0.0
+        self.fetches = 0
+
+    def invalidate(self, event=None) -> None:
+        self._orders = None
+
+    def get(self) -> list:
+        with self._lock:
+            if self._orders is None or time.time() - self._fetched_at >= self.ttl:
+                if self._fetch is None:
+                    from api.order import get_orders
+                    self._fetch = lambda: get_orders(state="wait")
+                self._orders = self._fetch()
+                self._fetched_at = time.time()
+                self.fetches += 1
+            return self._orders
+
+
+class SnapshotPublisher:
+    """
+    # --- [스냅샷 게시] ---
+    # 한 조각(name)을 게시합니다. 주지 않은 항목은 조각에 넣지 않으므로, 다른 조각의 같은 항목을 덮어쓰지 않습니다.
+    # 게시에 실패해도 예외를 내지 않습니다. (대시보드 공유 때문에 거래 사이클이 멈추면 안 되므로)
+    """
+
+    def __init__(self, name: str, store=None):
+        self.name = name
+        self.store = store or DbSnapshotStore()
+
+    def publish(self, prices: dict = None, accounts: list = None, open_orders: list = None,
+                ladder: dict = None) -> bool:
+        payload = {"prices": prices, "accounts": accounts, "open_orders": open_orders, "ladder": ladder}
+        payload = {key: value for key, value in payload.items() if value is not None}
+        try:
+            self.store.publish(self.name, json.dumps(payload, ensure_ascii=False, default=str), time.time())
+        except Exception as e:
+            log.warning("스냅샷 게시 실패 (%s): %s", self.name, e)
+            return False
+        log.debug("스냅샷 게시 - %s", self.name, extra=fields(part=self.name, items=sorted(payload)))
+        return True
+
+
+class SnapshotReader:
+    """
+    # --- [스냅샷 읽기] ---
+    # 대시보드용: refresh()는 조각별 버전만 확인하고, 바뀐 조각의 본문만 다시 읽습니다.
+    # 살아 있는(SNAPSHOT_MAX_AGE 이내) 조각을 합쳐서 보여 줍니다.
+    # - 시세 / 사다리: 모든 조각을 합침 (샤드마다 맡은 마켓이 다름)
+    # - 계좌 / 미체결 주문: 가장 최근에 게시한 조각의 것
+    """
+
+    def __init__(self, store=None, max_age: float = SNAPSHOT_MAX_AGE):
+        self.store = store or DbSnapshotStore()
+        self.max_age = max_age
+        self._parts = {}  # name -> (version, published_at, payload dict)
+
+    def refresh(self) -> bool:
+        """최신 조각을 반영합니다. 계좌와 미체결 주문이 담긴 살아 있는 조각이 있으면 True"""
+        versions = self.store.versions()
+        changed = [name for name, (version, _) in versions.items()
+                   if name not in self._parts or self._parts[name][0] != version]
+        for name, (version, published_at, payload) in self.store.load(changed).items():
+            self._parts[name] = (version, published_at, json.loads(payload) if payload else {})
+        for name in set(self._parts) - set(versions):
+            del self._parts[name]
+        return self.available()
+
+    def _fresh(self) -> list:
+        now = time.time()
+        parts = [(published_at, payload) for _, published_at, payload in self._parts.values()
+                 if now - published_at <= self.max_age]
+        return [payload for _, payload in sorted(parts, key=lambda part: part[0])]
+
+    def _latest(self, key: str):
+        values = [payload[key] for payload in self._fresh() if key in payload]
+        return values[-1] if values else None
+
+    def available(self) -> bool:
+        return self._latest("accounts") is not None and self._latest("open_orders") is not None
+
+    def prices(self) -> dict:
+        prices = {}
+        for payload in self._fresh():
+            prices.update(payload.get("prices", {}))
+        return prices
+
+    def accounts(self) -> list:
+        return self._latest("accounts") or []
+
+    def open_orders(self) -> list:
+        return self._latest("open_orders") or []
+
+    def ladder(self) -> dict:
+        ladder = {"buy": [], "sell": []}
+        for payload in self._fresh():
+            for side, rows in payload.get("ladder", {}).items():
+                ladder.setdefault(side, []).extend(rows)
+        return ladder
+
+    def age(self) -> float:
+        """가장 최근 조각이 게시된 지 몇 초 지났는지 (없으면 None)"""
+        if not self._parts:
+            return None
+        return time.time() - max(published_at for _, published_at, _ in self._parts.values())
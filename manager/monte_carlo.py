@@ -0,0 +1,324 @@
+# manager/monte_carlo.py
+
+import numpy as np
+import pandas as pd
+
+from manager.simulator import (
+    INITIAL_CASH, BUY_FEE, SELL_FEE, MIN_CASH_RATIO, STOP_LOSS_PCT, SPLIT_SELL_LEVELS,
+)
+from strategy.records import Setting
+from utils.price_utils import ladder_prices, to_price_units_array, to_volume_units_array, PRICE_SCALE, VOLUME_SCALE
+
+# 한 번에 메모리에 올리는 가격 배열 크기 (paths x steps x 8바이트)
+MAX_CHUNK_BYTES = 256 * 1024 * 1024
+
+
+# --- 가격 경로 생성기 ---
+# 모든 생성기는 (paths, steps) 모양의 가격 배열을 구간별로 이어서 만들어 줍니다.
+# 마지막 가격과 내부 상태를 들고 있으므로, 구간을 나눠서 받아도 한 번에 만든 것과 같은 경로가 이어집니다.
+
+class PathModel:
+    def __init__(self, n_paths: int, start_price: float, seed: int = None):
+        self.n_paths = n_paths
+        self.rng = np.random.default_rng(seed)
+        self.last_price = np.full(n_paths, float(start_price))
+
+    def _log_returns(self, n_steps: int) -> np.ndarray:
+        raise NotImplementedError
+
+    def next_prices(self, n_steps: int) -> np.ndarray:
+        prices = self.last_price[:, None] * np.exp(np.cumsum(self._log_returns(n_steps), axis=1))
+        self.last_price = prices[:, -1].copy()
+        return prices
+
+
+class GBMPaths(PathModel):
+    """기하 브라운 운동. mu, sigma는 캔들 1개 기준 로그수익률의 평균/표준편차입니다."""
+
+    def __init__(self, n_paths: int, start_price: float, mu: float, sigma: float, seed: int = None):
+        super().__init__(n_paths, start_price, seed)
+        self.mu = mu
+        self.sigma = sigma
+
+    def _log_returns(self, n_steps: int) -> np.ndarray:
+        drift = self.mu - 0.5 * self.sigma ** 2
+        return drift + self.sigma * self.rng.standard_normal((self.n_paths, n_steps))
+
+
+class BlockBootstrapPaths(PathModel):
+    """과거 로그수익률을 block_size 길이 덩어리로 무작위로 이어 붙입니다. (변동성 군집을 어느 정도 보존)"""
+
+    def __init__(self, n_paths: int, start_price: float, returns, block_size: int = 60, seed: int = None):
+        super().__init__(n_paths, start_price, seed)
+        self.returns = np.asarray(returns, dtype=float)
+        self.returns = self.returns[np.isfinite(self.returns)]
+        if len(self.returns) < block_size:
+            raise ValueError(f"블록 크기({block_size})보다 과거 수익률이 적습니다: {len(self.returns)}개")
+        self.block_size = block_size
+        self._block_start = None  # 진행 중인 블록의 시작 위치 (paths,)
+        self._offset = 0          # 진행 중인 블록에서 이미 사용한 개수
+
+    def _log_returns(self, n_steps: int) -> np.ndarray:
+        out = np.empty((self.n_paths, n_steps))
+        filled = 0
+        while filled < n_steps:
+            if self._block_start is None or self._offset == self.block_size:
+                self._block_start = self.rng.integers(0, len(self.returns) - self.block_size + 1, self.n_paths)
+                self._offset = 0
+            take = min(self.block_size - self._offset, n_steps - filled)
+            idx = self._block_start[:, None] + self._offset + np.arange(take)
+            out[:, filled:filled + take] = self.returns[idx]
+            self._offset += take
+            filled += take
+        return out
+
+
+class RegimeSwitchingPaths(PathModel):
+    """
+    마르코프 국면 전환 모델. 국면마다 (mu, sigma)가 다르고, 매 캔들마다 transition[i][j] 확률로 국면이 바뀝니다.
+    예: 평시 / 급락장 두 국면으로 급락이 몰려오는 구간을 재현합니다.
+    """
+
+    def __init__(self, n_paths: int, start_price: float, mus, sigmas, transition, seed: int = None):
+        super().__init__(n_paths, start_price, seed)
+        self.mus = np.asarray(mus, dtype=float)
+        self.sigmas = np.asarray(sigmas, dtype=float)
+        self.cum_transition = np.cumsum(np.asarray(transition, dtype=float), axis=1)
+        self.regime = np.zeros(n_paths, dtype=np.int64)
+
+    def _log_returns(self, n_steps: int) -> np.ndarray:
+        regimes = np.empty((self.n_paths, n_steps), dtype=np.int64)
+        uniforms = self.rng.random((self.n_paths, n_steps))
+        regime = self.regime
+        for t in range(n_steps):
+            # 각 경로의 현재 국면 행에서 누적확률로 다음 국면을 고릅니다.
+            regime = (uniforms[:, t, None] > self.cum_transition[regime]).sum(axis=1)
+            regime = np.minimum(regime, len(self.mus) - 1)
+            regimes[:, t] = regime
+        self.regime = regime
+        mu, sigma = self.mus[regimes], self.sigmas[regimes]
+        return mu - 0.5 * sigma ** 2 + sigma * self.rng.standard_normal((self.n_paths, n_steps))
+
+
+def log_returns_from_candles(candle_df: pd.DataFrame, column: str = "close") -> np.ndarray:
+    """캔들(data/candle_store.py 형식)에서 부트스트랩용 로그수익률을 만듭니다."""
+    close = candle_df[column].to_numpy(dtype=float)
+    return np.diff(np.log(close))
+
+
+# --- 벡터화된 카지노 전략 ---
+
+class VectorizedCasino:
+    """
+    manager/simulator.py의 캔들별 로직(사다리 매수, 손절, 분할매도, 익절)을 여러 경로에 동시에 적용합니다.
+    코인 하나에 대한 상태를 경로 수만큼의 배열(paths,)로 들고, 캔들마다 마스크 연산으로 한 번에 갱신합니다.
+    """
+
+    def __init__(self, setting: Setting, n_paths: int, ruin_pct: float = 0.5):
+        self.setting = setting
+        self.n_paths = n_paths
+        self.ruin_value = INITIAL_CASH * ruin_pct
+
+        zeros = lambda: np.zeros(n_paths)
+        falses = lambda: np.zeros(n_paths, dtype=bool)
+
+        self.cash = np.full(n_paths, float(INITIAL_CASH))
+        self.qty = zeros()
+        self.total_buy_amount = zeros()
+        self.total_buy_volume = zeros()
+        self.realized_pnl = zeros()
+        self.cumulative_fee = zeros()
+
+        # 매수 사다리: initial / small_flow / large_flow 각각의 목표가와 미체결 여부
+        self.has_ladder = falses()
+        self.initial_target = zeros()
+        self.initial_pending = falses()
+        self.small_target = zeros()
+        self.small_pending = falses()
+        self.large_target = zeros()
+        self.large_pending = falses()
+
+        # 익절 매도 주문
+        self.sell_exists = falses()
+        self.sell_active = falses()  # "update" 상태 (체결 대기)
+        self.sell_avg = zeros()
+        self.sell_qty = zeros()
+        self.sell_target = zeros()
+
+        # 결과 통계
+        self.steps = 0
+        self.peak = np.full(n_paths, float(INITIAL_CASH))
+        self.max_drawdown = zeros()
+        self.ruin_step = np.full(n_paths, -1, dtype=np.int64)
+        self.value = np.full(n_paths, float(INITIAL_CASH))
+
+    def run(self, prices: np.ndarray) -> None:
+        """(paths, steps) 가격 구간을 이어서 계산합니다."""
+        for t in range(prices.shape[1]):
+            self._step(prices[:, t])
+
+    def _sell(self, mask, volume, p, avg) -> None:
+        fee = volume * p * SELL_FEE
+        self.cash += np.where(mask, volume * p - fee, 0.0)
+        self.cumulative_fee += np.where(mask, fee, 0.0)
+        self.realized_pnl += np.where(mask, (p - avg) * volume - fee, 0.0)
+
+    def _close_position(self, mask) -> None:
+        self.qty[mask] = 0.0
+        self.has_ladder[mask] = False
+        self.total_buy_amount[mask] = 0.0
+        self.total_buy_volume[mask] = 0.0
+
+    def _step(self, p: np.ndarray) -> None:
+        s = self.setting
+
+        # 1) 매수 계획 (plan_buy_orders)
+        new = ~self.has_ladder
+        if new.any():
+            self.initial_target[new] = p[new]
+            self.initial_pending[new] = True
+            self.small_target[new] = ladder_prices(p[new], -s.small_flow_pct, s.market)
+            self.small_pending[new] = True
+            self.large_target[new] = ladder_prices(p[new], -s.large_flow_pct, s.market)
+            self.large_pending[new] = True
+            self.has_ladder[new] = True
+
+        # 첫 매수가 체결된 경로만 하락 매수 주문을 조정합니다.
+        holding = self.has_ladder & ~new & ~self.initial_pending
+        for target, pending, pct in ((self.small_target, self.small_pending, s.small_flow_pct),
+                                     (self.large_target, self.large_pending, s.large_flow_pct)):
+            threshold = target * (pct / 2)
+            raise_price = holding & pending & (p - target > threshold)
+            if raise_price.any():
+                target[raise_price] = ladder_prices((target + threshold)[raise_price], -pct, s.market)
+            rearm = holding & ~pending
+            if rearm.any():
+                target[rearm] = ladder_prices(target[rearm], -pct, s.market)
+            pending[rearm] = True
+
+        # 2) 매수 체결 (initial → small_flow → large_flow 순서, 현금 비율 조건 포함)
+        for target, pending, amount, is_initial in (
+                (self.initial_target, self.initial_pending, s.unit_size, True),
+                (self.small_target, self.small_pending, s.unit_size * s.small_flow_units, False),
+                (self.large_target, self.large_pending, s.unit_size * s.large_flow_units, False)):
+            portfolio_value = self.cash + self.qty * p
+            cash_ratio = np.divide(self.cash, portfolio_value, out=np.ones_like(p), where=portfolio_value > 0)
+            triggered = pending if is_initial else pending & (p <= target)
+            filled = triggered & (self.cash >= amount) & (cash_ratio >= MIN_CASH_RATIO)
+            if filled.any():
+                fee = amount * BUY_FEE
+                volume = np.where(filled, (amount - fee) / np.where(filled, target, 1.0), 0.0)
+                self.cash -= np.where(filled, amount, 0.0)
+                self.cumulative_fee += np.where(filled, fee, 0.0)
+                self.total_buy_amount += np.where(filled, amount, 0.0)
+                self.total_buy_volume += volume
+                self.qty += volume
+                pending[filled] = False
+
+        # 3) 매도 (손절 → 분할매도 → 익절)
+        held = self.qty > 0
+        if held.any():
+            avg = np.divide(self.total_buy_amount, self.total_buy_volume,
+                            out=np.zeros_like(p), where=self.total_buy_volume > 0)
+            balance = self.qty.copy()
+            gain = np.divide(p - avg, avg, out=np.zeros_like(p), where=avg > 0)
+
+            stop = held & (avg > 0) & (gain <= -STOP_LOSS_PCT)
+            if stop.any():
+                self._sell(stop, self.qty, p, avg)
+                self._close_position(stop)
+                self.sell_exists[stop] = False
+
+            # 분할매도는 조건을 만족하는 첫 번째 단계만 실행합니다.
+            split_done = np.zeros(self.n_paths, dtype=bool)
+            for threshold, ratio in SPLIT_SELL_LEVELS:
+                split = held & ~split_done & (avg > 0) & (gain >= threshold)
+                if split.any():
+                    volume = self.qty * ratio
+                    self._sell(split, volume, p, avg)
+                    self.qty = np.where(split, self.qty - volume, self.qty)
+                    self._close_position(split & (self.qty <= 0.0000001))
+                    split_done |= split
+
+            # 익절 주문 계획 (plan_sell_orders): 보유 정보가 바뀐 경우에만 주문을 갱신합니다.
+            # 비교는 정수 단위로 합니다. (utils/price_utils.py)
+            avg_units = to_price_units_array(avg)
+            qty_units = to_volume_units_array(balance)
+            avg_r = avg_units / PRICE_SCALE
+            qty_r = qty_units / VOLUME_SCALE
+            target = ladder_prices(avg_r, s.take_profit_pct, s.market)
+            same = ((to_price_units_array(self.sell_avg) == avg_units) & (to_volume_units_array(self.sell_qty) == qty_units)
+                    & (to_price_units_array(self.sell_target) == to_price_units_array(target)))
+            renew = held & ~(self.sell_exists & same)
+            self.sell_avg[renew] = avg_r[renew]
+            self.sell_qty[renew] = qty_r[renew]
+            self.sell_target[renew] = target[renew]
+            self.sell_active[renew] = True
+            self.sell_exists[renew] = True
+
+            take = held & self.sell_exists & self.sell_active & (p >= self.sell_target)
+            if take.any():
+                self._sell(take, self.sell_qty, p, avg)
+                self._close_position(take)
+                self.sell_active[take] = False
+
+        # 4) 통계
+        self.value = self.cash + self.qty * p
+        np.maximum(self.peak, self.value, out=self.peak)
+        np.maximum(self.max_drawdown, 1 - self.value / self.peak, out=self.max_drawdown)
+        ruined = (self.ruin_step < 0) & (self.value <= self.ruin_value)
+        self.ruin_step[ruined] = self.steps
+        self.steps += 1
+
+    def results(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "final_value": self.value,
+            "return_pct": (self.value / INITIAL_CASH - 1) * 100,
+            "max_drawdown_pct": self.max_drawdown * 100,
+            "time_to_ruin": np.where(self.ruin_step >= 0, self.ruin_step, np.nan),
+            "realized_pnl": self.realized_pnl,
+            "total_fee": self.cumulative_fee,
+        })
+
+
+def run_monte_carlo(model: PathModel, setting: Setting, n_steps: int,
+                    ruin_pct: float = 0.5, max_chunk_bytes: int = MAX_CHUNK_BYTES) -> pd.DataFrame:
+    """
+    model이 만드는 경로 전체에 전략을 적용하고, 경로별 결과(최종 가치, 최대 낙폭, 파산까지 걸린 캔들 수)를 반환합니다.
+    가격 배열은 max_chunk_bytes 이내의 구간으로 나눠 만들기 때문에 경로 수 x 캔들 수가 커도 메모리가 일정합니다.
+    """
+    chunk_steps = max(1, min(n_steps, max_chunk_bytes // (model.n_paths * 8)))
+    engine = VectorizedCasino(setting, model.n_paths, ruin_pct=ruin_pct)
+    done = 0
+    while done < n_steps:
+        k = min(chunk_steps, n_steps - done)
+        engine.run(model.next_prices(k))
+        done += k
+    return engine.results()
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """경로별 결과의 분포(백분위)와 파산 비율을 요약합니다."""
+    quantiles = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+    summary = results[["final_value", "return_pct", "max_drawdown_pct"]].quantile(quantiles)
+    summary.index = [f"p{int(q * 100)}" for q in quantiles]
+    summary.loc["mean"] = results[["final_value", "return_pct", "max_drawdown_pct"]].mean()
+    summary["ruin_ratio"] = results["time_to_ruin"].notna().mean()
+    return summary
+
+
+if __name__ == "__main__":
+    import time
+    from manager.setting_manager import validate_setting_df
+
+    setting = validate_setting_df(pd.read_csv("setting.csv"))[0]
+    n_paths, n_steps = 1000, 10_000
+    model = RegimeSwitchingPaths(n_paths, start_price=300.0,
+                                 mus=[0.0, -0.0005], sigmas=[0.003, 0.01],
+                                 transition=[[0.999, 0.001], [0.01, 0.99]], seed=0)
+
+    started = time.perf_counter()
+    results = run_monte_carlo(model, setting, n_steps)
+    elapsed = time.perf_counter() - started
+    print(f"[monte_carlo.py] {setting.market} {n_paths} paths x {n_steps} steps - {elapsed:.1f}s")
+    print(summarize(results).round(2).to_string())
@@ -1,112 +1,322 @@
+import time
 import pandas as pd
-from api.order import send_order, get_order_results_by_uuids_safe
-from utils.price_utils import adjust_price_to_tick
+import requests
+from api.order import (
+    send_order, cancel_order, get_order_results_by_uuids_safe, get_order_by_identifier, get_orders_by_uuids,
+)
+from utils.price_utils import adjust_price_to_tick, volume_for_amount, to_price_units, to_volume_units
 from db.db_utils import insert_order
+from manager.intent_journal import INTENT, ACKED, level_key
+from manager.ladder_store import get_ladder_store, ladder_state
+from utils.log import get_logger, fields
 
-def execute_buy_orders(buy_orders_df: pd.DataFrame) -> None:
+log = get_logger("manager.order_executor")
+
+def track_order(response: dict, fill_tracker=None) -> list:
+    """
+    주문 직후 상태를 정합니다.
+    체결 추적기(fill_tracker)가 있으면 주문 응답을 그대로 사용하고 이후 체결은 실시간 알림으로 받습니다.
+    없으면 기존처럼 주문 직후 상태를 한 번 더 조회합니다.
+    """
+    if fill_tracker is not None:
+        fill_tracker.track(response)
+        return [dict(response)]
+    return get_order_results_by_uuids_safe([response["uuid"]])
+
+def persist_orders(order_statuses: list, table_name: str) -> None:
+    """주문 상태를 DB에 기록합니다."""
+    for db_data in order_statuses:
+        db_data['created_at'] = db_data['created_at'].replace('+09:00', '')
+        insert_order(db_data, table_name)
+
+def place_buy_order(market: str, price: float, amount: float, buy_type: str, identifier: str = None):
+    """매수 주문 한 건을 거래소에 넣습니다. 접수되면 주문 응답을, 건너뛰거나 실패하면 None을 반환합니다."""
+    # [안전장치] Upbit의 최소 주문 금액(5000원)보다 낮은 주문은 실행하지 않고 건너뜁니다.
+    if (buy_type == 'initial' and amount < 5000) or (buy_type != 'initial' and price * (amount / price) < 5000):
+        log.warning("⚠️ %s 매수 금액 최소 주문 금액 미달 → 스킵", market)
+        return None
+
+    log.info("🌟 신규 매수 주문: %s, amount=%s, price=%s", market, amount, price,
+             extra=fields(market=market, side="bid", buy_type=buy_type, price=price, amount=amount))
+
+    # [주문 유형 분기] 주문 유형에 따라 다른 API 파라미터를 사용합니다.
+    # initial 주문은 시장가로 즉시 체결, flow 주문은 지정가로 예약합니다.
+    if buy_type == "initial":
+        response = send_order(market=market, side="bid", ord_type="price", amount_krw=amount, identifier=identifier)
+    else:
+        # 지정가는 호가 단위에 맞추고, 수량은 주문 금액을 넘지 않도록 정수 단위로 내림합니다.
+        price = adjust_price_to_tick(price, ticker=market)
+        volume = volume_for_amount(amount, price)
+        response = send_order(market=market, side="bid", ord_type="limit", unit_price=price, volume=volume,
+                              identifier=identifier)
+    return _accepted(response)
+
+def place_sell_order(market: str, price: float, volume: float, identifier: str = None):
+    """매도 주문 한 건을 거래소에 넣습니다. 접수되면 주문 응답을, 건너뛰거나 실패하면 None을 반환합니다."""
+    # [안전장치] 최소 주문 금액 체크
+    if price * volume < 5000:
+        log.warning("⚠️ %s 매도 금액 최소 주문 금액 미달 → 스킵", market)
+        return None
+
+    # [가격 조정] Upbit의 가격 단위(호가 틱)에 맞게 주문 가격을 미세 조정합니다.
+    # 이 과정을 거치지 않으면 주문이 거부될 수 있습니다.
+    adjusted_price = adjust_price_to_tick(price, ticker=market)
+    log.info("🌟 신규 매도 주문: %s, price=%s, volume=%s", market, adjusted_price, volume,
+             extra=fields(market=market, side="ask", price=adjusted_price, volume=volume))
+
+    # [API 호출] 모든 매도 주문은 지정가(limit)로 실행됩니다.
+    response = send_order(market=market, side="ask", ord_type="limit", unit_price=adjusted_price, volume=volume,
+                          identifier=identifier)
+    return _accepted(response)
+
+def _accepted(response: dict):
+    # [결과 처리] 주문 후 받은 응답을 확인합니다.
+    if 'error' in response:
+        log.error("❌ 주문 실패: %s", response["error"]["message"])
+        return None
+    if not response.get("uuid"):
+        log.error("❌ 주문 후 UUID를 받지 못했습니다: %s", response)
+        return None
+    return response
+
+def begin_intents(journal, intents: list) -> list:
+    """
+    저널이 있으면 주문 의도를 한 번에 기록(fsync 1회)하고, 같은 단계의 주문이 이미 진행 중이면 뺍니다.
+    진행 중인 주문과 가격 / 수량이 다르면 기존 주문을 먼저 취소하고 새 주문으로 바꿉니다. (replace_live)
+    (intent, JournalEntry 또는 None) 목록을 반환합니다.
+    """
+    if journal is None:
+        return [(intent, None) for intent in intents]
+    ready = [intent for intent in intents if replace_live(journal, intent)]
+    entries = {entry.key: entry for entry in journal.begin(ready)}
+    journaled = []
+    for intent in ready:
+        entry = entries.pop(level_key(intent["market"], intent["side"], intent["level"]), None)
+        if entry is not None:
+            journaled.append((intent, entry))
+    return journaled
+
+def replace_live(journal, intent: dict) -> bool:
+    """
+    같은 단계에 진행 중인 주문이 있으면, 거래소에 실제로 나가는 가격 / 수량을 비교합니다.
+    - 같으면 이미 걸려 있는 주문이므로 보내지 않습니다. (False)
+    - 다르면 기존 주문을 취소하고 저널에서 닫은 뒤 새 주문을 보냅니다. (True)
+    - 아직 접수 확인 전이거나 취소에 실패하면(이미 체결 등) 이번에는 보내지 않고 다음 사이클에 다시 판단합니다.
+    """
+    entry = journal.live(intent["market"], intent["side"], intent["level"])
+    if entry is None:
+        return True
+    if _order_units(entry.market, entry.side, entry.level, entry.price, entry.amount, entry.volume) == \
+            _order_units(intent["market"], intent["side"], intent["level"], intent["price"], intent["amount"],
+                         intent["volume"]):
+        log.debug("%s %s 주문이 이미 같은 조건으로 걸려 있음 → 스킵", intent["market"], intent["level"])
+        return False
+    if not entry.uuid:
+        log.warning("⚠️ %s %s 기존 주문의 접수 확인 전 → 다음 사이클에 다시 시도", intent["market"], intent["level"])
+        return False
+    try:
+        cancel_order(entry.uuid)
+    except Exception as e:
+        log.warning("⚠️ %s %s 기존 주문 취소 실패 → 스킵: %s", intent["market"], intent["level"], e)
+        return False
+    journal.close(entry.id, "cancel")
+    log.info("↪️ %s %s 기존 주문 취소 후 다시 주문 (price %s → %s)", intent["market"], intent["level"],
+             entry.price, intent["price"], extra=fields(market=intent["market"], uuid=entry.uuid))
+    return True
+
+def _order_units(market: str, side: str, level: str, price, amount, volume) -> tuple:
+    """거래소에 실제로 나가는 (가격, 수량)을 정수 단위로 계산합니다. (place_buy_order / place_sell_order와 같은 보정)"""
+    if level == "initial":
+        # 시장가 주문은 체결될 때까지 마켓당 하나만 냅니다.
+        return ()
+    price = adjust_price_to_tick(price, ticker=market)
+    if side == "bid":
+        volume = volume_for_amount(amount, price)
+    return to_price_units(price), to_volume_units(volume)
+
+def submit_intent(intent: dict, entry=None, fill_tracker=None, journal=None):
+    """
+    주문 한 건을 거래소에 넣고, 저널이 있으면 접수(ack)를 적습니다.
+    접수된 주문 상태 목록을 반환합니다. (건너뛰었거나 거절되면 None)
+    """
+    identifier = entry.id if entry is not None else None
+    try:
+        if intent["side"] == "bid":
+            response = place_buy_order(intent["market"], intent["price"], intent["amount"], intent["level"], identifier)
+        else:
+            response = place_sell_order(intent["market"], intent["price"], intent["volume"], identifier)
+    except requests.RequestException:
+        # 응답을 받지 못했으므로 주문이 들어갔는지 알 수 없습니다. intent를 남겨 두고 recover_orders()에서 확인합니다.
+        raise
+    except Exception as e:
+        if entry is not None:
+            journal.fail(entry.id, str(e))
+        raise
+    if response is None:
+        if entry is not None:
+            journal.fail(entry.id, "rejected")
+        return None
+
+    if entry is not None:
+        journal.ack(entry.id, response["uuid"])
+    record_ack(intent["side"], intent["market"], intent["level"], response["uuid"])
+    return track_order(response, fill_tracker)
+
+def record_ack(side: str, market: str, level: str, order_uuid: str) -> None:
+    """접수된 주문의 uuid를 사다리(manager/ladder_store.py)에 적습니다. 실패해도 주문 처리는 계속합니다."""
+    try:
+        get_ladder_store().acked(side, market, level, order_uuid)
+    except Exception as e:
+        # 사다리가 "update"로 남으면 다음 사이클에 다시 보내려 하지만, 저널에 살아 있는 주문이라 건너뜁니다.
+        log.warning("%s %s 사다리 접수 기록 실패: %s", market, level, e)
+
+def record_fill(entry, state: str) -> None:
+    """끝난 주문의 상태를 사다리에 적습니다. 실패해도 대조는 계속합니다. (다음 대조 / 체결 알림에서 다시 적음)"""
+    try:
+        get_ladder_store().mark_order(entry.side, entry.market, entry.uuid, state)
+    except Exception as e:
+        log.warning("%s %s 사다리 상태 기록 실패: %s", entry.market, entry.level, e)
+
+def submit_within_budget(intent: dict, entry=None, fill_tracker=None, journal=None, budget=None):
+    """
+    budget(core/sharding.BudgetCoordinator)이 있으면 주문 금액을 예약한 뒤 submit_intent()로 보냅니다.
+    다른 샤드와 같은 KRW를 나눠 쓰므로, 예산이 부족하면 보내지 않고 None을 반환합니다. (다음 사이클에 다시 시도)
+    """
+    if budget is None or intent["side"] != "bid":
+        return submit_intent(intent, entry, fill_tracker, journal)
+    reservation = budget.reserve(intent["market"], intent["amount"])
+    if reservation is None:
+        if entry is not None:
+            journal.fail(entry.id, "budget")
+        return None
+    sent = False
+    try:
+        order_statuses = submit_intent(intent, entry, fill_tracker, journal)
+        sent = bool(order_statuses)
+        return order_statuses
+    except requests.RequestException:
+        # 들어갔는지 알 수 없는 주문은 들어간 것으로 보고 예산에서 뺍니다. (다음 계좌 조회에서 바로잡힘)
+        sent = True
+        raise
+    finally:
+        if sent:
+            budget.commit(reservation)
+        else:
+            budget.release(reservation)
+
+def record_intent(intent: dict, order_statuses: list, entry=None, journal=None) -> None:
+    """접수된 주문 상태를 DB에 기록하고, 저널이 있으면 기록 완료(persisted)를 적습니다."""
+    persist_orders(order_statuses, intent["table"])
+    if entry is not None:
+        journal.persisted(entry.id)
+
+def execute_buy_orders(buy_orders_df: pd.DataFrame, fill_tracker=None, journal=None, budget=None) -> None:
     """
     # --- [주문 실행 ①: 매수] ---
     # 전략(strategy) 계층에서 생성된 매수 계획(DataFrame)을 실제로 실행하는 역할입니다.
     # "너굴의 행동대장"이 "씨앗을 심어라"라는 명령을 수행하는 것과 같습니다.
+    # budget이 있으면 계좌 전체 예산 안에서만 주문을 보냅니다. (샤드 실행)
     """
-    print(f"[Executor] 매수 주문 실행 시작: {len(buy_orders_df)}건")
+    log.debug("매수 주문 실행 시작: %d건", len(buy_orders_df))
     if buy_orders_df.empty:
         return
 
-    # 실행해야 할 주문 목록을 하나씩 처리합니다.
-    for _, order in buy_orders_df.iterrows():
-        market = order["market"]
-        price = order["target_price"]
-        amount = order["buy_amount"]
-        buy_type = order["buy_type"]
+    intents = [buy_intent(order["market"], order["target_price"], order["buy_amount"], order["buy_type"])
+               for order in buy_orders_df.to_dict("records")]
 
+    # 실행해야 할 주문 목록을 하나씩 처리합니다.
+    for intent, entry in begin_intents(journal, intents):
+        market = intent["market"]
         try:
-            # [안전장치] Upbit의 최소 주문 금액(5000원)보다 낮은 주문은 실행하지 않고 건너뜁니다.
-            if (buy_type == 'initial' and amount < 5000) or (buy_type != 'initial' and price * (amount / price) < 5000):
-                print(f"⚠️ [Executor] {market} 매수 금액 최소 주문 금액 미달 → 스킵")
-                continue
-
-            print(f"🌟 [Executor] 신규 매수 주문: {market}, amount={amount}, price={price}")
-            
-            # [주문 유형 분기] 주문 유형에 따라 다른 API 파라미터를 사용합니다.
-            # initial 주문은 시장가로 즉시 체결, flow 주문은 지정가로 예약합니다.
-            if buy_type == "initial":
-                response = send_order(market=market, side="bid", ord_type="price", amount_krw=amount)
-            else:
-                volume = round(amount / price, 8)
-                response = send_order(market=market, side="bid", ord_type="limit", unit_price=price, volume=volume)
-
-            # [결과 처리] 주문 후 받은 응답을 확인합니다.
-            if 'error' in response:
-                print(f"❌ [Executor] 주문 실패: {response['error']['message']}")
-                continue
-
-            uuid = response.get("uuid")
-            if not uuid:
-                print(f"❌ [Executor] 주문 후 UUID를 받지 못했습니다: {response}")
-                continue
-
             # [기록] 주문이 성공적으로 체결되었다면, 그 결과를 데이터베이스에 영구적으로 기록합니다.
             # "부엉의 박물관"에 화석을 기증하는 과정입니다.
-            final_order_status = get_order_results_by_uuids_safe([uuid])
-            # print(final_order_status)
-            # if final_order_status and final_order_status[0].get("state") == "done":
-            #     db_data = final_order_status[0]
+            final_order_status = submit_within_budget(intent, entry, fill_tracker, journal, budget)
             if final_order_status:
-                print(f"✅ [Executor] {market} 매수 주문 체결 완료")
-                for db_data in final_order_status:
-                    db_data['created_at'] = db_data['created_at'].replace('+09:00', '')
-                    insert_order(db_data, 'buy_orders')
+                record_intent(intent, final_order_status, entry, journal)
+                log.info("✅ %s 매수 주문 접수 완료 (상태: %s)", market, final_order_status[0].get("state"),
+                         extra=fields(market=market, uuid=final_order_status[0].get("uuid")))
 
         except Exception as e:
-            print(f"🚨 [Executor] 매수 주문 처리 중 예외 발생: {e}")
+            log.exception("🚨 매수 주문 처리 중 예외 발생: %s", e)
 
-def execute_sell_orders(sell_orders_df: pd.DataFrame) -> None:
+def execute_sell_orders(sell_orders_df: pd.DataFrame, fill_tracker=None, journal=None) -> None:
     """
     # --- [주문 실행 ②: 매도] ---
     # 전략(strategy) 계층에서 생성된 매도 계획(DataFrame)을 실제로 실행하는 역할입니다.
     # "너굴의 행동대장"이 "열매를 수확해라"라는 명령을 수행하는 것과 같습니다.
     """
-    print(f"[Executor] 매도 주문 실행 시작: {len(sell_orders_df)}건")
+    log.debug("매도 주문 실행 시작: %d건", len(sell_orders_df))
     if sell_orders_df.empty:
         return
 
-    for _, order in sell_orders_df.iterrows():
-        market = order["market"]
-        price = order["target_sell_price"]
-        volume = order["quantity"]
+    intents = [sell_intent(order["market"], order["target_sell_price"], order["quantity"])
+               for order in sell_orders_df.to_dict("records")]
 
+    for intent, entry in begin_intents(journal, intents):
+        market = intent["market"]
         try:
-            # [안전장치] 최소 주문 금액 체크
-            if price * volume < 5000:
-                print(f"⚠️ [Executor] {market} 매도 금액 최소 주문 금액 미달 → 스킵")
-                continue
-
-            # [가격 조정] Upbit의 가격 단위(호가 틱)에 맞게 주문 가격을 미세 조정합니다.
-            # 이 과정을 거치지 않으면 주문이 거부될 수 있습니다.
-            adjusted_price = adjust_price_to_tick(price, ticker=market)
-            print(f"🌟 [Executor] 신규 매도 주문: {market}, price={adjusted_price}, volume={volume}")
-            
-            # [API 호출] 모든 매도 주문은 지정가(limit)로 실행됩니다.
-            response = send_order(market=market, side="ask", ord_type="limit", unit_price=adjusted_price, volume=volume)
-
-            if 'error' in response:
-                print(f"❌ [Executor] 주문 실패: {response['error']['message']}")
-                continue
-
-            uuid = response.get("uuid")
-            if not uuid:
-                print(f"❌ [Executor] 주문 후 UUID를 받지 못했습니다: {response}")
-                continue
-
             # [기록] 주문이 성공적으로 체결되었다면, 그 결과를 데이터베이스에 기록합니다.
-            final_order_status = get_order_results_by_uuids_safe([uuid])
+            final_order_status = submit_intent(intent, entry, fill_tracker, journal)
             if final_order_status:
-                print(f"ℹ️ [Executor] {market} 매도 주문 상태: {final_order_status[0].get('state')}")
-                print(f"✅ [Executor] {market} 매도 주문 정보 DB에 저장")
-                for db_data in final_order_status:
-                    db_data['created_at'] = db_data['created_at'].replace('+09:00', '')
-                    insert_order(db_data, 'sell_orders')
+                record_intent(intent, final_order_status, entry, journal)
+                log.info("✅ %s 매도 주문 접수 및 DB 저장 (상태: %s)", market, final_order_status[0].get("state"),
+                         extra=fields(market=market, uuid=final_order_status[0].get("uuid")))
 
         except Exception as e:
-            print(f"🚨 [Executor] 매도 주문 처리 중 예외 발생: {e}")
\ No newline at end of file
+            log.exception("🚨 매도 주문 처리 중 예외 발생: %s", e)
+
+def buy_intent(market: str, price: float, amount: float, buy_type: str) -> dict:
+    return {"table": "buy_orders", "market": market, "side": "bid", "level": buy_type,
+            "price": price, "amount": amount, "volume": None}
+
+def sell_intent(market: str, price: float, volume: float) -> dict:
+    return {"table": "sell_orders", "market": market, "side": "ask", "level": "sell",
+            "price": price, "amount": None, "volume": volume}
+
+def recover_orders(journal, fill_tracker=None, min_age: float = 0.0) -> dict:
+    """
+    # --- [저널 복구 / 대조] ---
+    # 저널에 남아 있는 주문을 거래소 주문과 맞춰 봅니다. (시작할 때 한 번, 이후 주기적으로)
+    # - 응답을 받지 못한 intent: identifier로 거래소에서 찾아 있으면 접수로, 없으면 실패로 정리합니다.
+    # - 접수됐지만 DB 기록 전이었던 주문: 현재 상태를 DB에 기록합니다.
+    # - 아직 미체결인 주문은 체결 추적기에 다시 등록하고, 완료/취소된 주문은 저널에서 닫습니다.
+    # min_age 초보다 최근에 기록된 주문은 처리 중일 수 있으므로 건너뜁니다.
+    """
+    counts = {"acked": 0, "failed": 0, "persisted": 0, "open": 0, "closed": 0}
+    now = time.time()
+    tracked = {o.uuid for o in fill_tracker.open_orders()} if fill_tracker is not None and min_age > 0 else set()
+
+    for entry in journal.entries(INTENT):
+        if now - entry.created < min_age:
+            continue
+        order = get_order_by_identifier(entry.id)
+        if order is None:
+            journal.fail(entry.id, "거래소에 없음")
+            counts["failed"] += 1
+        else:
+            journal.ack(entry.id, order["uuid"])
+            record_ack(entry.side, entry.market, entry.level, order["uuid"])
+            counts["acked"] += 1
+
+    entries = [e for e in journal.entries() if e.uuid and e.uuid not in tracked and now - e.created >= min_age]
+    for i in range(0, len(entries), 100):
+        batch = {e.uuid: e for e in entries[i:i + 100]}
+        for order in get_orders_by_uuids(list(batch)):
+            entry = batch[order["uuid"]]
+            if entry.status == ACKED:
+                persist_orders([dict(order)], entry.table)
+                journal.persisted(entry.id)
+                counts["persisted"] += 1
+            if order.get("state") in ("done", "cancel"):
+                journal.close(entry.id, order["state"])
+                # 체결 알림을 받지 못한 주문(샤드 작업자, 스트림 끊김)도 사다리 칸을 완료/취소로 고칩니다.
+                record_fill(entry, ladder_state(order["state"], order.get("ord_type"), order.get("executed_volume")))
+                counts["closed"] += 1
+            else:
+                if fill_tracker is not None:
+                    fill_tracker.track(order)
+                counts["open"] += 1
+    journal.sync()
+    if any(counts.values()):
+        log.info("저널 대조 결과: %s", counts, extra=fields(**counts))
+    return counts
@@ -0,0 +1,105 @@
+# manager/order_sync.py
+
+import pandas as pd
+
+from api.order import iter_orders, get_orders_by_uuids
+from db.db_utils import (
+    ensure_order_history_schema, upsert_orders, get_sync_cursor, save_sync_cursor, fetch_open_order_uuids,
+)
+from utils.log import get_logger
+
+log = get_logger("manager.order_sync")
+
+SYNC_STATES = ("done", "cancel")
+TABLES = {"bid": "buy_orders", "ask": "sell_orders"}
+
+_schema_ready = False
+
+
+def _to_db_row(order: dict) -> dict:
+    row = dict(order)
+    if row.get("created_at"):
+        row["created_at"] = row["created_at"].replace("+09:00", "")
+    return row
+
+
+def sync_state(state: str, max_pages: int = None) -> int:
+    """
+    한 가지 상태(done/cancel)의 주문 내역을 최신 주문부터 거꾸로 넘기며,
+    지난번에 마지막으로 저장한 주문을 만날 때까지의 새 주문만 DB에 저장합니다.
+    처음 실행할 때는 거래소에 남아 있는 전체 내역을 모두 저장합니다.
+    """
+    last_uuid, last_created_at = get_sync_cursor(state)
+    last_created_at = pd.Timestamp(last_created_at) if last_created_at is not None else None
+
+    new_orders = []
+    for order in iter_orders(state, max_pages=max_pages):
+        if order.get("uuid") == last_uuid:
+            break
+        row = _to_db_row(order)
+        # 같은 시각에 생성된 주문이 여러 개일 수 있으므로, 저장 시각보다 '이전'인 주문에서만 멈춥니다.
+        if last_created_at is not None and pd.Timestamp(row["created_at"]) < last_created_at:
+            break
+        new_orders.append(row)
+
+    if not new_orders:
+        log.debug("%s 새 주문 없음", state)
+        return 0
+
+    _upsert(new_orders)
+
+    # 저장이 끝난 뒤에 위치를 기록하므로, 중간에 실패해도 다음 실행에서 다시 저장됩니다. (uuid 기준 중복 없음)
+    newest = new_orders[0]
+    save_sync_cursor(state, newest["uuid"], newest["created_at"])
+    log.info("%s 주문 %d건 동기화 완료", state, len(new_orders))
+    return len(new_orders)
+
+
+def _upsert(rows: list) -> None:
+    for side, table_name in TABLES.items():
+        upsert_orders([o for o in rows if o.get("side") == side], table_name)
+
+
+def sync_open_orders(batch_size: int = 100) -> int:
+    """
+    sync_state()는 커서(마지막으로 저장한 주문)에서 멈추므로, 커서보다 먼저 생성된 지정가 주문이
+    나중에 체결/취소되면 보지 못합니다. 그래서 미체결 주문은 따로 맞춥니다.
+    - 거래소의 미체결 주문을 모두 DB에 저장합니다. (수동 주문 포함 → 이후 체결도 아래에서 확인됨)
+    - DB에 'wait'로 남아 있지만 더 이상 미체결이 아닌 주문은 uuid로 현재 상태를 조회해 갱신합니다.
+    """
+    open_orders = [_to_db_row(o) for o in iter_orders("wait")]
+    _upsert(open_orders)
+
+    still_open = {o["uuid"] for o in open_orders}
+    stale = [uuid for uuid in fetch_open_order_uuids() if uuid not in still_open]
+    updated = []
+    for i in range(0, len(stale), batch_size):
+        updated.extend(_to_db_row(o) for o in get_orders_by_uuids(stale[i:i + batch_size]))
+    _upsert(updated)
+
+    if updated:
+        log.info("미체결로 남아 있던 주문 %d건 상태 갱신", len(updated))
+    return len(updated)
+
+
+def sync_order_history(states=SYNC_STATES, max_pages: int = None) -> dict:
+    """거래소의 체결/취소 주문 내역을 로컬 DB(buy_orders, sell_orders)에 동기화합니다."""
+    global _schema_ready
+    if not _schema_ready:
+        ensure_order_history_schema()
+        _schema_ready = True
+    counts = {state: sync_state(state, max_pages=max_pages) for state in states}
+    counts["wait"] = sync_open_orders()
+    return counts
+
+
+def run_order_sync_job() -> None:
+    """스케줄러용 래퍼입니다. 동기화 실패가 거래 사이클에 영향을 주지 않도록 예외를 기록만 합니다."""
+    try:
+        sync_order_history()
+    except Exception as e:
+        log.exception("주문 내역 동기화 실패: %s", e)
+
+
+if __name__ == "__main__":
+    print(sync_order_history())
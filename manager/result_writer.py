@@ -0,0 +1,129 @@
+# manager/result_writer.py
+
+import numpy as np
+import pandas as pd
+
+# --- 신호 코드 ---
+# 한 캔들에서 여러 신호가 동시에 날 수 있으므로 비트 플래그로 저장합니다. (0 = 보유)
+# 비트 순서는 시뮬레이터에서 신호가 발생하는 순서와 같아서, 문자열로 되돌릴 때 기존 표기와 동일합니다.
+SIGNAL_HOLD = 0
+SIGNAL_BUY = {"initial": 1, "small_flow": 2, "large_flow": 4}
+SIGNAL_STOP_LOSS = 8
+SIGNAL_SPLIT_SELL = 16  # 분할매도 i단계는 SIGNAL_SPLIT_SELL << i
+SIGNAL_SELL = 1 << 12
+
+# Parquet / backtest_result 테이블 컬럼 (순서 동일)
+RESULT_COLUMNS = [
+    "time", "market", "open", "high", "close", "signal",
+    "trade_amount", "avg_price", "gap_pct", "total_buy_amount",
+    "realized_pnl", "cash", "trade_fee", "total_fee", "portfolio_value",
+]
+_FLOAT_COLUMNS = [
+    "open", "high", "close", "trade_amount", "avg_price", "gap_pct", "total_buy_amount",
+    "realized_pnl", "cash", "trade_fee", "total_fee", "portfolio_value",
+]
+_ROUNDED_COLUMNS = [
+    "trade_amount", "avg_price", "total_buy_amount", "realized_pnl",
+    "cash", "trade_fee", "total_fee", "portfolio_value",
+]
+
+# 엑셀 내보내기용 (기존 결과 파일 헤더)
+KOREAN_COLUMNS = {
+    "time": "시간", "market": "마켓", "open": "시가", "high": "고가", "close": "종가", "signal": "신호",
+    "trade_amount": "매매금액", "avg_price": "현재 평단가", "gap_pct": "현재 종가와 평단가의 gap(%)",
+    "total_buy_amount": "누적 매수금", "realized_pnl": "실현 손익", "cash": "보유 현금",
+    "trade_fee": "거래시 수수료", "total_fee": "총 누적 수수료", "portfolio_value": "총 포트폴리오 가치",
+}
+
+
+def signal_label(code: int, split_levels) -> str:
+    """신호 코드를 기존 문자열 표기("initial 매수 / 손절" 등)로 바꿉니다."""
+    if code == SIGNAL_HOLD:
+        return "보유"
+    labels = [f"{buy_type} 매수" for buy_type, flag in SIGNAL_BUY.items() if code & flag]
+    if code & SIGNAL_STOP_LOSS:
+        labels.append("손절")
+    for i, (threshold, ratio) in enumerate(split_levels):
+        if code & (SIGNAL_SPLIT_SELL << i):
+            labels.append(f"분할매도: +{int(threshold * 100)}% {int(ratio * 100)}% 매도")
+    if code & SIGNAL_SELL:
+        labels.append("매도")
+    return " / ".join(labels)
+
+
+def decode_signals(codes: pd.Series, split_levels) -> pd.Series:
+    """코드 종류는 몇 개 되지 않으므로, 종류별로 한 번만 변환해서 매핑합니다."""
+    labels = {code: signal_label(int(code), split_levels) for code in codes.unique()}
+    return codes.map(labels)
+
+
+def encode_signals(labels: pd.Series, split_levels) -> pd.Series:
+    """decode_signals()의 반대입니다. (DB에 문자열로 저장된 신호를 코드로 되돌릴 때 사용)"""
+    flags = {f"{buy_type} 매수": flag for buy_type, flag in SIGNAL_BUY.items()}
+    flags["손절"] = SIGNAL_STOP_LOSS
+    flags["매도"] = SIGNAL_SELL
+    for i, (threshold, ratio) in enumerate(split_levels):
+        flags[f"분할매도: +{int(threshold * 100)}% {int(ratio * 100)}% 매도"] = SIGNAL_SPLIT_SELL << i
+
+    def encode(label: str) -> int:
+        if label == "보유":
+            return SIGNAL_HOLD
+        return sum(flags[part] for part in label.split(" / "))
+
+    codes = {label: encode(label) for label in labels.unique()}
+    return labels.map(codes).astype(np.int16)
+
+
+def to_korean(df: pd.DataFrame, split_levels) -> pd.DataFrame:
+    out = df.copy()
+    out["signal"] = decode_signals(out["signal"], split_levels)
+    return out.rename(columns=KOREAN_COLUMNS)
+
+
+class ResultWriter:
+    """
+    # --- [백테스트 결과 기록기] ---
+    # 캔들별 결과를 미리 할당한 numpy 버퍼(float64 / int16 / int64)에 채우고,
+    # capacity 만큼 모이거나 flush()가 호출되면 DataFrame 한 덩어리로 만들어 sink들에 넘깁니다.
+    # 버퍼를 재사용하므로 실행 기간이 길어져도 메모리 사용량이 늘지 않습니다.
+    """
+
+    def __init__(self, market: str, capacity: int, sinks=()):
+        self.market = market
+        self.capacity = capacity
+        self.sinks = list(sinks)
+        self.size = 0
+        self._time = np.empty(capacity, dtype=np.int64)
+        self._signal = np.empty(capacity, dtype=np.int16)
+        self._floats = np.empty((len(_FLOAT_COLUMNS), capacity), dtype=np.float64)
+
+    def append(self, time, open_price, high_price, close_price, signal, trade_amount, avg_price, gap_pct,
+               total_buy_amount, realized_pnl, cash, trade_fee, total_fee, portfolio_value) -> None:
+        i = self.size
+        self._time[i] = time.value
+        self._signal[i] = signal
+        self._floats[:, i] = (open_price, high_price, close_price, trade_amount, avg_price, gap_pct,
+                              total_buy_amount, realized_pnl, cash, trade_fee, total_fee, portfolio_value)
+        self.size = i + 1
+        if self.size == self.capacity:
+            self.flush()
+
+    def flush(self):
+        """버퍼 내용을 sink들에 넘기고 비웁니다. 넘긴 DataFrame을 반환합니다. (비어 있으면 None)"""
+        if self.size == 0:
+            return None
+        n = self.size
+        data = {
+            "time": pd.to_datetime(self._time[:n]),
+            "market": self.market,
+            "signal": self._signal[:n].copy(),
+        }
+        for row, name in enumerate(_FLOAT_COLUMNS):
+            data[name] = self._floats[row, :n].copy()
+        chunk = pd.DataFrame(data)[RESULT_COLUMNS]
+        chunk[_ROUNDED_COLUMNS] = chunk[_ROUNDED_COLUMNS].round(2)
+        self.size = 0
+
+        for sink in self.sinks:
+            sink(chunk)
+        return chunk
@@ -0,0 +1,194 @@
+# manager/setting_manager.py
+
+import os
+import threading
+import pandas as pd
+from watchdog.events import FileSystemEventHandler, EVENT_TYPE_CLOSED, EVENT_TYPE_CREATED, EVENT_TYPE_MODIFIED, EVENT_TYPE_MOVED
+from watchdog.observers import Observer
+
+from strategy.records import Setting, SETTING_COLUMNS, settings_to_df
+from utils.log import get_logger
+
+log = get_logger("manager.setting_manager")
+
+
+class SettingSnapshot:
+    """
+    검증이 끝난 setting.csv 한 버전입니다. 생성 후에는 수정하지 않으므로 여러 스레드에서 그대로 읽어도 안전합니다.
+    """
+    __slots__ = ("version", "settings", "by_market", "setting_df")
+
+    def __init__(self, version: int, settings: list):
+        self.version = version
+        self.settings = tuple(settings)
+        self.by_market = {s.market: s for s in settings}
+        self.setting_df = settings_to_df(settings)
+
+    @property
+    def markets(self) -> list:
+        return list(self.by_market)
+
+
+def validate_setting_df(setting_df: pd.DataFrame) -> list:
+    """setting.csv 내용을 검사하고 Setting 레코드 목록으로 변환합니다. 문제가 있으면 ValueError를 발생시킵니다."""
+    missing = [col for col in SETTING_COLUMNS if col not in setting_df.columns]
+    if missing:
+        raise ValueError(f"setting.csv에 필요한 컬럼이 없습니다: {missing}")
+
+    settings = []
+    seen = set()
+    for row in setting_df.to_dict("records"):
+        market = str(row["market"]).strip()
+        if not market.startswith("KRW-"):
+            raise ValueError(f"지원하지 않는 마켓입니다: {market}")
+        if market in seen:
+            raise ValueError(f"중복된 마켓이 있습니다: {market}")
+        seen.add(market)
+
+        try:
+            setting = Setting(
+                market=market,
+                unit_size=float(row["unit_size"]),
+                small_flow_pct=float(row["small_flow_pct"]),
+                small_flow_units=int(row["small_flow_units"]),
+                large_flow_pct=float(row["large_flow_pct"]),
+                large_flow_units=int(row["large_flow_units"]),
+                take_profit_pct=float(row["take_profit_pct"]),
+            )
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{market} 설정값을 숫자로 변환할 수 없습니다: {e}")
+
+        if setting.unit_size <= 0:
+            raise ValueError(f"{market} unit_size는 0보다 커야 합니다: {setting.unit_size}")
+        for name in ("small_flow_pct", "large_flow_pct", "take_profit_pct"):
+            value = getattr(setting, name)
+            if not 0 < value < 1:
+                raise ValueError(f"{market} {name}는 0과 1 사이여야 합니다: {value}")
+        if setting.small_flow_units < 0 or setting.large_flow_units < 0:
+            raise ValueError(f"{market} flow_units는 음수일 수 없습니다.")
+        settings.append(setting)
+    return settings
+
+
+class _SettingFileHandler(FileSystemEventHandler):
+    # 파일을 읽기만 하는 이벤트(opened, closed_no_write)는 무시합니다.
+    WRITE_EVENTS = {EVENT_TYPE_CLOSED, EVENT_TYPE_CREATED, EVENT_TYPE_MODIFIED, EVENT_TYPE_MOVED}
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def on_any_event(self, event):
+        if event.event_type not in self.WRITE_EVENTS:
+            return
+        paths = {getattr(event, "src_path", None), getattr(event, "dest_path", None)}
+        if self.manager.abs_path in {os.path.abspath(p) for p in paths if p}:
+            self.manager.check()
+
+
+class SettingManager:
+    """
+    # --- [설정 관리자] ---
+    # setting.csv를 한 번만 읽고 검증한 뒤 메모리에 보관합니다.
+    # 파일이 바뀌면(watchdog) 새 버전을 검증하고, 통과한 경우에만 스냅샷을 통째로 교체합니다.
+    # 잘못된 파일이 저장되면 기존 설정을 그대로 유지합니다.
+    """
+
+    def __init__(self, path: str = "setting.csv"):
+        self.path = path
+        self.abs_path = os.path.abspath(path)
+        self._lock = threading.Lock()
+        self._snapshot = SettingSnapshot(0, [])
+        self._file_stamp = None
+        self._previous = {}
+        self._removed_markets = set()
+        self._observer = None
+        self.reload()
+        self.pop_changes()
+
+    @property
+    def snapshot(self) -> SettingSnapshot:
+        return self._snapshot
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def reload(self) -> bool:
+        """파일을 다시 읽어 검증합니다. 새 설정이 적용되었으면 True를 반환합니다."""
+        with self._lock:
+            self._file_stamp = self._stat()
+            try:
+                setting_df = pd.read_csv(self.path)
+                new_settings = validate_setting_df(setting_df)
+            except FileNotFoundError:
+                log.error("❌ 파일 없음: %s", self.path)
+                return False
+            except Exception as e:
+                log.warning("⚠️ 설정 검증 실패 → 기존 설정 유지: %s", e)
+                return False
+
+            old = self._snapshot.by_market
+            merged = []
+            changed = {}
+            for setting in new_settings:
+                previous = old.get(setting.market)
+                if previous is not None and previous == setting:
+                    # 바뀌지 않은 마켓은 기존 레코드를 그대로 사용합니다.
+                    merged.append(previous)
+                else:
+                    merged.append(setting)
+                    changed[setting.market] = previous
+            removed = set(old) - {s.market for s in new_settings}
+
+            if not changed and not removed and self._snapshot.version > 0:
+                return False
+
+            # 스냅샷은 참조 하나만 바꿔 끼우므로, 읽는 쪽은 항상 완전한 이전/새 버전 중 하나를 보게 됩니다.
+            self._snapshot = SettingSnapshot(self._snapshot.version + 1, merged)
+            for market, previous in changed.items():
+                # 여러 번 바뀌었더라도 마지막 pop 이후 최초의 이전 설정을 기준으로 삼습니다.
+                self._previous.setdefault(market, previous)
+            for market in removed:
+                self._previous.pop(market, None)
+            self._removed_markets |= removed
+            log.info("✅ 설정 적용 (v%d) - 변경: %s, 제거: %s", self._snapshot.version, sorted(changed), sorted(removed))
+            return True
+
+    def check(self) -> bool:
+        """
+        파일 수정 시각/크기만 확인하여, 바뀐 경우에만 다시 읽습니다.
+        (도커 bind mount 파일은 편집기에 따라 watchdog 이벤트가 전달되지 않을 수 있어 함께 사용합니다.)
+        """
+        if self._stat() != self._file_stamp:
+            return self.reload()
+        return False
+
+    def pop_changes(self) -> tuple:
+        """
+        마지막 호출 이후 바뀐 마켓을 반환하고 초기화합니다.
+        반환값: ({변경된 마켓: 이전 Setting 또는 None(신규)}, {제거된 마켓})
+        """
+        with self._lock:
+            changed, removed = self._previous, self._removed_markets
+            self._previous, self._removed_markets = {}, set()
+        return changed, removed
+
+    def start(self) -> None:
+        """파일 감시를 시작합니다."""
+        if self._observer is not None:
+            return
+        observer = Observer()
+        observer.schedule(_SettingFileHandler(self), os.path.dirname(self.abs_path), recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        log.info("👀 설정 파일 감시 시작: %s", self.path)
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
@@ -1,157 +1,238 @@
 import pandas as pd
-import pymysql
+import numpy as np
 import os
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
 import time
-
-from api.price import get_minute_candles
-from strategy.casino_strategy import generate_buy_orders, generate_sell_orders
-
-# 환경 변수 로딩 (.env에서)
-load_dotenv()
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = int(os.getenv("DB_PORT"))
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_NAME = os.getenv("DB_NAME")
+import hashlib
+import json
+from datetime import datetime
+
+from data.candle_store import (
+    SECONDS, get_candle_store, get_second_candle_store, now_kst, unit_delta, unit_label,
+)
+from strategy.casino_strategy import plan_buy_orders, plan_sell_orders
+from strategy.records import Setting, OrderBook, BuyOrder, SellOrder
+from strategy.limits import MIN_CASH_RATIO
+from manager.execution_model import IdealFill, make_fill_model
+from manager.result_writer import (
+    ResultWriter, SIGNAL_BUY, SIGNAL_STOP_LOSS, SIGNAL_SPLIT_SELL, SIGNAL_SELL,
+    decode_signals, to_korean,
+)
+from utils.file_utils import save_json, load_json, save_parquet
+from utils.log import get_logger, fields
+
+log = get_logger("manager.simulator")
 
 INITIAL_CASH = 10_000_000
 BUY_FEE = 0.0005
 SELL_FEE = 0.0005
 
-MIN_CASH_RATIO = 0.3     # 전체 자산 중 최소 보유 현금 비율
 STOP_LOSS_PCT = 0.05     # 손절 기준 5%
 
+# (수익률 기준, 매도 비율)
+SPLIT_SELL_LEVELS = [
+    (0.02, 0.3),
+    (0.04, 0.3),
+    (0.06, 1.0)
+]
 
-def save_to_db(df: pd.DataFrame):
-    conn = pymysql.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        db=DB_NAME,
-        charset='utf8mb4'
-    )
-    cursor = conn.cursor()
-
-    insert_query = """
-        INSERT INTO backtest_result (
-            time, market, open, high, close, `signal`,
-            trade_amount, avg_price, gap_pct, total_buy_amount,
-            realized_pnl, cash, trade_fee, total_fee, portfolio_value
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
+# --- 체크포인트 ---
+# 같은 파라미터로 종료일만 늘려서 다시 실행하면, 마지막 체크포인트 이후의 캔들만 계산합니다.
+CHECKPOINT_DIR = "backtests"
+CHECKPOINT_VERSION = 3   # 시뮬레이션 로직이 바뀌면 올려서 기존 체크포인트를 무효화합니다. (3: 사다리 가격을 호가 단위에 맞춤)
+CHUNK_SIZE = 10_000      # 체크포인트 저장 간격 (캔들 수)
+SINKS = ("parquet", "db")  # 결과 저장 위치 (둘 다 빼면 결과를 저장하지 않고 요약만 반환)
 
-    for _, row in df.iterrows():
-        cursor.execute(insert_query, (
-            row["시간"], row["마켓"], row["시가"], row["고가"], row["종가"],
-            row["신호"], row["매매금액"], row["현재 평단가"],
-            row["현재 종가와 평단가의 gap(%)"], row["누적 매수금"],
-            row["실현 손익"], row["보유 현금"], row["거래시 수수료"],
-            row["총 누적 수수료"], row["총 포트폴리오 가치"]
-        ))
 
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print("✅ 시뮬레이션 결과 DB 저장 완료")
+class SimulationState:
+    """
+    캔들 사이에서 이어지는 시뮬레이션 상태 전체입니다.
+    청크가 끝날 때마다 JSON으로 저장해 두었다가, 다음 실행에서 그대로 이어서 계산합니다.
+    """
+    __slots__ = ("cash", "holdings", "buy_book", "sell_book", "realized_pnl",
+                 "total_buy_amount", "total_buy_volume", "cumulative_fee",
+                 "last_trade_fee", "last_trade_amount", "last_time", "result_parts",
+                 "slippage_cost", "unfilled_amount")
+
+    def __init__(self):
+        self.cash = INITIAL_CASH
+        self.holdings = {}
+        self.buy_book = OrderBook()
+        self.sell_book = OrderBook()
+        self.realized_pnl = 0.0
+        self.total_buy_amount = 0.0
+        self.total_buy_volume = 0.0
+        self.cumulative_fee = 0.0
+        self.last_trade_fee = 0.0
+        self.last_trade_amount = 0.0
+        self.last_time = None       # 마지막으로 계산한 캔들 시각
+        self.result_parts = []      # 지금까지 저장한 결과 파일 이름 (순서대로)
+        self.slippage_cost = 0.0    # 기준가 대비 체결가 차이로 더 낸 금액 (체결 모델이 ideal이면 0)
+        self.unfilled_amount = 0.0  # 호가 잔량이 모자라 체결되지 않은 주문 금액
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["buy_book"] = [o.as_dict() for o in self.buy_book]
+        data["sell_book"] = [o.as_dict() for o in self.sell_book]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SimulationState":
+        state = cls()
+        for name in cls.__slots__:
+            # 예전 체크포인트에 없는 값은 기본값을 사용합니다.
+            if name in data:
+                setattr(state, name, data[name])
+        state.buy_book = OrderBook(BuyOrder(**o) for o in data["buy_book"])
+        state.sell_book = OrderBook(SellOrder(**o) for o in data["sell_book"])
+        state.last_time = pd.Timestamp(data["last_time"]) if data["last_time"] else None
+        return state
+
+
+def _json_default(value):
+    # 시뮬레이션 값에는 numpy 숫자와 Timestamp가 섞여 있습니다.
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"JSON으로 저장할 수 없는 값입니다: {type(value)}")
+
+
+def run_key(market: str, start: str, unit: int, params: dict, fills: dict = None) -> str:
+    """
+    종료일을 제외한 실행 조건(파라미터, 수수료 등 상수 포함)이 같으면 같은 키가 나옵니다.
+    fills: 체결 모델 설명 (ideal이면 None이므로 기존 실행의 키가 그대로 유지됩니다)
+    """
+    spec = {
+        "version": CHECKPOINT_VERSION,
+        "market": market,
+        "start": pd.Timestamp(start).isoformat(),
+        "unit": unit,
+        "params": params,
+        "constants": [INITIAL_CASH, BUY_FEE, SELL_FEE, MIN_CASH_RATIO, STOP_LOSS_PCT, SPLIT_SELL_LEVELS],
+    }
+    if fills:
+        spec["fills"] = fills
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def load_checkpoint(run_dir: str, key: str, sinks=None):
+    """체크포인트가 없거나 다른 조건(또는 다른 저장 위치)의 것이면 None을 반환합니다."""
+    data = load_json(os.path.join(run_dir, "checkpoint.json"))
+    if not data or data.get("key") != key:
+        return None
+    if sinks is not None and sorted(data.get("sinks", SINKS)) != sorted(sinks):
+        # 저장 위치가 다르면 앞부분 결과가 새 위치에 없으므로 처음부터 다시 계산합니다.
+        return None
+    state = SimulationState.from_dict(data["state"])
+    if any(not os.path.exists(os.path.join(run_dir, p)) for p in state.result_parts):
+        log.warning("⚠️ 결과 파일 일부가 없어 체크포인트를 사용하지 않습니다: %s", run_dir)
+        return None
+    return state
+
+
+def save_checkpoint(run_dir: str, key: str, params: dict, state: SimulationState, sinks=SINKS) -> None:
+    data = {"key": key, "params": params, "sinks": list(sinks), "state": state.to_dict()}
+    save_json(data, os.path.join(run_dir, "checkpoint.json"), default=_json_default)
+
+
+def fetch_candles(market: str, unit: int, start, end, update: bool = True) -> pd.DataFrame:
+    """
+    [start, end) 구간의 unit분봉을 반환합니다. (시각은 KST 기준)
+    캔들 저장소(data/candle_store.py)에 없는 구간의 1분봉만 거래소에서 받고, unit분봉은 1분봉을 묶어서 만듭니다.
+    update=False 이면 거래소에 묻지 않고 저장소에 있는 캔들만 사용합니다.
+    """
+    store = get_candle_store()
+    if update:
+        store.update(market, start=start, end=end)
+    return _simulator_frame(store.get_candles(market, unit, start=start, end=end), market)
 
 
-def simulate_with_strategy(market: str, start: str, end: str, unit: int,
-                            unit_size: float, small_flow_pct: float, small_flow_units: int,
-                            large_flow_pct: float, large_flow_units: int, take_profit_pct: float,
-                            filename: str = None):
+def _simulator_frame(df: pd.DataFrame, market: str) -> pd.DataFrame:
+    df = df[["time", "open", "high", "low", "close"]].set_axis(["시간", "시가", "고가", "저가", "종가"], axis=1)
+    return df.assign(마켓=market)
 
-    print(f"[simulator] ⏱️ 시뮬레이션 시작 - {market}, {start} ~ {end}, unit: {unit}분")
 
-    current_time = pd.to_datetime(start)
-    end_time = pd.to_datetime(end)
-    all_candles = []
-
-    while current_time < end_time:
-        to_time = (current_time + timedelta(minutes=unit * 200)).strftime("%Y-%m-%d %H:%M:%S")
-        try:
-            candles = get_minute_candles(market, unit=unit, count=200, to=to_time)
-            if not candles:
-                break
-            candles.reverse()
-            all_candles.extend(candles)
-            last_dt = pd.to_datetime(candles[0]['candle_date_time_kst'])
-            current_time = last_dt + timedelta(minutes=unit)
-            time.sleep(0.3)
-        except Exception as e:
-            print(f"[경고] 분봉 데이터 조회 실패 → 재시도 대기: {e}")
-            time.sleep(5)
-
-    df = pd.DataFrame(all_candles)
-    df["시간"] = pd.to_datetime(df["candle_date_time_kst"])
-    df = df[["시간", "opening_price", "high_price", "low_price", "trade_price"]]
-    df.columns = ["시간", "시가", "고가", "저가", "종가"]
-    df["마켓"] = market
-
-    setting_df = pd.DataFrame([{
-        "market": market,
-        "unit_size": unit_size,
-        "small_flow_pct": small_flow_pct,
-        "small_flow_units": small_flow_units,
-        "large_flow_pct": large_flow_pct,
-        "large_flow_units": large_flow_units,
-        "take_profit_pct": take_profit_pct
-    }])
-
-    cash = INITIAL_CASH
-    holdings = {}
-    buy_log_df = pd.DataFrame(columns=[
-        "time", "market", "target_price", "buy_amount", "buy_units", "buy_type", "buy_uuid", "filled"
-    ])
-    sell_log_df = pd.DataFrame(columns=[
-        "market", "avg_buy_price", "quantity", "target_sell_price", "sell_uuid", "filled"
-    ])
-
-    realized_pnl = 0.0
-    total_buy_amount = 0.0
-    total_buy_volume = 0.0
-    cumulative_fee = 0.0
-    last_trade_fee = 0.0
-    last_trade_amount = 0.0
-    logs = []
-
-    for _, row in df.iterrows():
-        now = row["시간"]
-        current_price = row["종가"]
-        events = []
+def iter_candles(market: str, unit, start, end, update: bool = True, rows: int = CHUNK_SIZE):
+    """
+    [start, end) 구간의 캔들을 rows 개씩 나눠 시뮬레이터 형식으로 내보냅니다.
+    초봉(SECONDS)은 초봉 저장소에서 하루치씩 읽어 내보내므로, 몇 주 치여도 메모리가 창 크기만큼만 듭니다.
+    """
+    if unit == SECONDS:
+        store = get_second_candle_store()
+        if update:
+            store.backfill(market, start, end)
+        for window in store.windows(market, start, end, rows=rows):
+            yield _simulator_frame(window, market)
+        return
+    df = fetch_candles(market, unit, start, end, update=update)
+    for i in range(0, len(df), rows):
+        yield df.iloc[i:i + rows]
+
+
+def _simulate_chunk(state: SimulationState, settings: list, market: str, df: pd.DataFrame,
+                    writer: ResultWriter, fills=None) -> None:
+    """
+    캔들 묶음 하나를 state에서 이어서 계산하고, 캔들별 결과를 writer에 기록합니다.
+    fills: 체결 모델 (manager/execution_model.py). 주지 않으면 기준가에 전부 체결합니다.
+    """
+    # 반복문 안에서는 지역 변수로 계산하고, 끝난 뒤 state에 되돌려 놓습니다.
+    cash = state.cash
+    holdings = state.holdings
+    buy_book = state.buy_book
+    sell_book = state.sell_book
+    realized_pnl = state.realized_pnl
+    total_buy_amount = state.total_buy_amount
+    total_buy_volume = state.total_buy_volume
+    cumulative_fee = state.cumulative_fee
+    last_trade_fee = state.last_trade_fee
+    last_trade_amount = state.last_trade_amount
+    slippage_cost = state.slippage_cost
+    unfilled_amount = state.unfilled_amount
+    write = writer.append
+    fills = fills or IdealFill()
+    fill_buy, fill_sell = fills.buy, fills.sell
+
+    for now, open_price, high_price, current_price in zip(df["시간"], df["시가"], df["고가"], df["종가"]):
+        signal = 0
 
         current_prices = {market: current_price}
-        buy_log_df = generate_buy_orders(setting_df, buy_log_df, current_prices)
+        buy_book = plan_buy_orders(settings, buy_book, current_prices)
 
-        for idx, r in buy_log_df.iterrows():
-            if r["filled"] in ["update", "wait"] and r["market"] == market:
-                price = r["target_price"]
-                amount = r["buy_amount"]
-                buy_type = r["buy_type"]
+        for r in buy_book.for_market(market):
+            if r.filled in ("update", "wait"):
+                price = r.target_price
+                amount = r.buy_amount
+                buy_type = r.buy_type
 
                 portfolio_value = cash + holdings.get(market, 0) * current_price
                 cash_ratio = cash / portfolio_value if portfolio_value > 0 else 1
 
                 if buy_type == "initial" or current_price <= price:
                     if cash >= amount and cash_ratio >= MIN_CASH_RATIO:
-                        fee = amount * BUY_FEE
-                        volume = (amount - fee) / price
-                        cash -= amount
-                        cumulative_fee += fee
-                        total_buy_amount += amount
-                        total_buy_volume += volume
-                        holdings[market] = holdings.get(market, 0) + volume
-                        buy_log_df.at[idx, "filled"] = "done"
-                        last_trade_amount = amount
-                        last_trade_fee = fee
-
-                        events.append(f"{buy_type} 매수")
+                        # 호가 잔량만큼만 체결되고, 남은 금액은 체결되지 않은 것으로 봅니다.
+                        spent, slip = fill_buy(now, amount)
+                        unfilled_amount += amount - spent
+                        if spent > 0:
+                            fill_price = price * (1 + slip)
+                            fee = spent * BUY_FEE
+                            volume = (spent - fee) / fill_price
+                            cash -= spent
+                            cumulative_fee += fee
+                            slippage_cost += (fill_price - price) * volume
+                            total_buy_amount += spent
+                            total_buy_volume += volume
+                            holdings[market] = holdings.get(market, 0) + volume
+                            r.filled = "done"
+                            last_trade_amount = spent
+                            last_trade_fee = fee
+
+                            signal |= SIGNAL_BUY[buy_type]
+                        else:
+                            r.filled = "wait"
                     else:
-                        buy_log_df.at[idx, "filled"] = "wait"
+                        r.filled = "wait"
                 else:
-                    buy_log_df.at[idx, "filled"] = "wait"
+                    r.filled = "wait"
 
         if market in holdings and holdings[market] > 0:
             balance = holdings[market]
@@ -159,21 +240,34 @@ def simulate_with_strategy(market: str, start: str, end: str, unit: int,
 
             if avg_buy_price > 0 and (current_price - avg_buy_price) / avg_buy_price <= -STOP_LOSS_PCT:
                 volume = holdings[market]
-                fee = volume * current_price * SELL_FEE
-                proceeds = volume * current_price - fee
-                pnl = (current_price - avg_buy_price) * volume
-
-                cash += proceeds
-                cumulative_fee += fee
-                realized_pnl += pnl - fee
-                holdings[market] = 0
-                sell_log_df = sell_log_df[sell_log_df["market"] != market]
-                buy_log_df = buy_log_df[buy_log_df["market"] != market]
-                total_buy_amount = 0.0
-                total_buy_volume = 0.0
-                last_trade_amount = proceeds
-                last_trade_fee = fee
-                events.append("손절")
+                notional = volume * current_price
+                sold, slip = fill_sell(now, notional)
+                if sold > 0:
+                    if sold < notional:
+                        # 일부만 체결되면 남은 수량은 다음 캔들에서 다시 손절합니다.
+                        volume *= sold / notional
+                        unfilled_amount += notional - sold
+                    fill_price = current_price * (1 - slip)
+                    fee = volume * fill_price * SELL_FEE
+                    proceeds = volume * fill_price - fee
+                    pnl = (fill_price - avg_buy_price) * volume
+
+                    cash += proceeds
+                    cumulative_fee += fee
+                    slippage_cost += (current_price - fill_price) * volume
+                    realized_pnl += pnl - fee
+                    holdings[market] -= volume
+                    if holdings[market] <= 0.0000001:
+                        holdings[market] = 0
+                        sell_book.remove_market(market)
+                        buy_book.remove_market(market)
+                        total_buy_amount = 0.0
+                        total_buy_volume = 0.0
+                    last_trade_amount = proceeds
+                    last_trade_fee = fee
+                    signal |= SIGNAL_STOP_LOSS
+                else:
+                    unfilled_amount += notional
 
             holdings_info = {
                 market: {
@@ -184,90 +278,249 @@ def simulate_with_strategy(market: str, start: str, end: str, unit: int,
                 }
             }
 
-            split_sell_levels = [
-                (0.02, 0.3),
-                (0.04, 0.3),
-                (0.06, 1.0)
-            ]
-
-            for threshold, ratio in split_sell_levels:
+            for level, (threshold, ratio) in enumerate(SPLIT_SELL_LEVELS):
                 if avg_buy_price > 0 and (current_price - avg_buy_price) / avg_buy_price >= threshold:
                     volume = holdings[market] * ratio
-                    fee = volume * current_price * SELL_FEE
-                    proceeds = volume * current_price - fee
-                    pnl = (current_price - avg_buy_price) * volume
+                    notional = volume * current_price
+                    sold, slip = fill_sell(now, notional)
+                    unfilled_amount += notional - sold
+                    if sold <= 0:
+                        break
+                    if sold < notional:
+                        volume *= sold / notional
+                    fill_price = current_price * (1 - slip)
+                    fee = volume * fill_price * SELL_FEE
+                    proceeds = volume * fill_price - fee
+                    pnl = (fill_price - avg_buy_price) * volume
 
                     cash += proceeds
                     cumulative_fee += fee
+                    slippage_cost += (current_price - fill_price) * volume
                     realized_pnl += pnl - fee
                     holdings[market] -= volume
                     last_trade_amount = proceeds
                     last_trade_fee = fee
-                    events.append(f"분할매도: +{int(threshold * 100)}% {int(ratio * 100)}% 매도")
+                    signal |= SIGNAL_SPLIT_SELL << level
 
                     if holdings[market] <= 0.0000001:
                         holdings[market] = 0
-                        buy_log_df = buy_log_df[buy_log_df["market"] != market]
+                        buy_book.remove_market(market)
                         total_buy_amount = 0.0
                         total_buy_volume = 0.0
                     break
 
-            sell_log_df = generate_sell_orders(setting_df, holdings_info, sell_log_df)
+            sell_book = plan_sell_orders(settings, holdings_info, sell_book)
 
-            for idx, r in sell_log_df.iterrows():
-                if r["filled"] == "update" and r["market"] == market:
-                    target_price = r["target_sell_price"]
+            for r in sell_book.for_market(market):
+                if r.filled == "update":
+                    target_price = r.target_sell_price
                     if current_price >= target_price:
-                        volume = r["quantity"]
-                        fee = volume * current_price * SELL_FEE
-                        proceeds = volume * current_price - fee
-                        pnl = (current_price - avg_buy_price) * volume
+                        volume = r.quantity
+                        notional = volume * current_price
+                        sold, slip = fill_sell(now, notional)
+                        unfilled_amount += notional - sold
+                        if sold <= 0:
+                            continue
+                        fill_price = current_price * (1 - slip)
+                        if sold < notional:
+                            # 일부만 체결되면 남은 수량은 주문에 남겨 두고 다음 캔들에서 다시 매도합니다.
+                            volume *= sold / notional
+                            r.quantity -= volume
+                            holdings[market] -= volume
+                        else:
+                            holdings[market] = 0
+                            r.filled = "done"
+                        fee = volume * fill_price * SELL_FEE
+                        proceeds = volume * fill_price - fee
+                        pnl = (fill_price - avg_buy_price) * volume
 
                         cash += proceeds
                         cumulative_fee += fee
+                        slippage_cost += (current_price - fill_price) * volume
                         realized_pnl += pnl - fee
-                        holdings[market] = 0
-                        sell_log_df.at[idx, "filled"] = "done"
-                        buy_log_df = buy_log_df[buy_log_df["market"] != market]
-                        total_buy_amount = 0.0
-                        total_buy_volume = 0.0
+                        if holdings[market] <= 0.0000001:
+                            holdings[market] = 0
+                            buy_book.remove_market(market)
+                            total_buy_amount = 0.0
+                            total_buy_volume = 0.0
                         last_trade_amount = proceeds
                         last_trade_fee = fee
-                        events.append("매도")
+                        signal |= SIGNAL_SELL
 
         quantity = holdings.get(market, 0)
         avg_price = total_buy_amount / total_buy_volume if total_buy_volume > 0 else 0
         gap_pct = round((current_price - avg_price) / avg_price * 100, 2) if avg_price > 0 else 0
         portfolio_value = cash + quantity * current_price
-        signal_str = " / ".join(events) if events else "보유"
-
-        logs.append({
-            "시간": now,
-            "마켓": market,
-            "시가": row["시가"],
-            "고가": row["고가"],
-            "종가": current_price,
-            "신호": signal_str,
-            "매매금액": round(last_trade_amount, 2),
-            "현재 평단가": round(avg_price, 2),
-            "현재 종가와 평단가의 gap(%)": gap_pct,
-            "누적 매수금": round(total_buy_amount, 2),
-            "실현 손익": round(realized_pnl, 2),
-            "보유 현금": round(cash, 2),
-            "거래시 수수료": round(last_trade_fee, 2),
-            "총 누적 수수료": round(cumulative_fee, 2),
-            "총 포트폴리오 가치": round(portfolio_value, 2)
-        })
-
-    result_df = pd.DataFrame(logs)
-    save_to_db(result_df)
 
-    filename = filename or f"전략_시뮬_{market}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    result_df.to_excel(filename, index=False)
-    print(f"[simulator] ✅ 시뮬레이션 완료 → 결과 저장: {filename}")
+        write(now, open_price, high_price, current_price, signal, last_trade_amount, avg_price, gap_pct,
+              total_buy_amount, realized_pnl, cash, last_trade_fee, cumulative_fee, portfolio_value)
 
+    state.cash = cash
+    state.buy_book = buy_book
+    state.sell_book = sell_book
+    state.realized_pnl = realized_pnl
+    state.total_buy_amount = total_buy_amount
+    state.total_buy_volume = total_buy_volume
+    state.cumulative_fee = cumulative_fee
+    state.last_trade_fee = last_trade_fee
+    state.last_trade_amount = last_trade_amount
+    state.slippage_cost = slippage_cost
+    state.unfilled_amount = unfilled_amount
+    if len(df):
+        state.last_time = df["시간"].iloc[-1]
 
-    # ✅ DB에도 저장
-    from utils.db import insert_backtest_result_to_db
-    insert_backtest_result_to_db(result_df)
 
+def simulate_with_strategy(market: str, start: str, end: str, unit: int,
+                            unit_size: float, small_flow_pct: float, small_flow_units: int,
+                            large_flow_pct: float, large_flow_units: int, take_profit_pct: float,
+                            filename: str = None, resume: bool = True, checkpoint_dir: str = CHECKPOINT_DIR,
+                            save_db: bool = True):
+    params = {
+        "unit_size": unit_size, "small_flow_pct": small_flow_pct, "small_flow_units": small_flow_units,
+        "large_flow_pct": large_flow_pct, "large_flow_units": large_flow_units, "take_profit_pct": take_profit_pct,
+    }
+    sinks = SINKS if save_db else ("parquet",)
+    summary = run_backtest(market, start, end, unit, params, sinks=sinks, resume=resume,
+                           checkpoint_dir=checkpoint_dir)
+    run_dir = summary["run_dir"]
+
+    # 엑셀은 파일 이름을 지정한 경우에만 만듭니다.
+    if filename:
+        export_excel(run_dir, filename, start=start, end=end)
+    return run_dir
+
+
+def run_backtest(market: str, start: str, end: str, unit: int, params: dict, sinks=("parquet",),
+                 resume: bool = True, checkpoint_dir: str = CHECKPOINT_DIR, update_candles: bool = True,
+                 fill_model: str = "ideal") -> dict:
+    """
+    한 마켓 / 한 파라미터 조합의 백테스트를 실행하고 요약(dict)을 반환합니다.
+    unit: 캔들 단위(분) 또는 SECONDS("1s") — 초봉은 CHUNK_SIZE 개씩 읽으며 계산합니다. (data/candle_store.SecondCandleStore)
+    sinks: "parquet"(결과 디렉터리), "db"(backtest_result 테이블) 중 결과를 남길 곳. 비어 있으면 저장 없이 요약만 계산합니다.
+    fill_model: 체결 방식 ideal / depth / curve (manager/execution_model.py)
+    """
+    started = time.perf_counter()
+    log.info("⏱️ 시뮬레이션 시작 - %s, %s ~ %s, unit: %s", market, start, end, unit_label(unit))
+
+    sinks = tuple(sinks)
+    unknown = set(sinks) - set(SINKS)
+    if unknown:
+        raise ValueError(f"알 수 없는 결과 저장 위치입니다: {sorted(unknown)} (가능: {SINKS})")
+    # 결과를 어디에도 남기지 않으면 이어서 계산할 이유가 없으므로 체크포인트도 만들지 않습니다.
+    keep_checkpoint = bool(sinks)
+
+    # 체결 모델이 다르면 결과가 다르므로 키에 포함합니다. (ideal은 기존 키 그대로)
+    fills = make_fill_model(fill_model, market, unit, start, end)
+    key = run_key(market, start, unit, params, fills.describe())
+    run_dir = os.path.join(checkpoint_dir, f"{market}_{unit_label(unit)}_{key}") if keep_checkpoint else None
+
+    end_time = pd.to_datetime(end)
+    state = load_checkpoint(run_dir, key, sinks) if resume and keep_checkpoint else None
+    if state is not None and state.last_time is not None and state.last_time >= end_time:
+        # 더 늦은 종료일까지 계산해 둔 체크포인트는 되돌릴 수 없습니다. 그대로 쓰면 요청 구간 밖의 결과가 나오고,
+        # 처음부터 다시 쓰면 긴 실행의 결과를 덮어쓰므로, 이 종료일 전용 디렉터리에서 따로 계산합니다.
+        log.info("↪️ 체크포인트(%s)가 종료일(%s) 이후까지 계산되어 있어 별도 디렉터리에서 계산합니다.",
+                 state.last_time, end_time)
+        run_dir = f"{run_dir}_until_{end_time:%Y%m%dT%H%M%S}"
+        state = load_checkpoint(run_dir, key, sinks)
+    if state is None:
+        state = SimulationState()
+        fetch_from = pd.to_datetime(start)
+    else:
+        fetch_from = state.last_time + unit_delta(unit)
+        log.info("♻️ 체크포인트에서 이어서 계산 - %s 이후 캔들만 조회", state.last_time)
+
+    # 아직 끝나지 않은 캔들은 값이 바뀔 수 있으므로 체크포인트에 넣지 않습니다.
+    closed_until = now_kst() - unit_delta(unit)
+
+    # 시뮬레이션 중에는 DataFrame 대신 레코드(strategy.records)로 상태를 유지합니다.
+    settings = [Setting(market, params["unit_size"], params["small_flow_pct"], params["small_flow_units"],
+                        params["large_flow_pct"], params["large_flow_units"], params["take_profit_pct"])]
+
+    def write_parquet(chunk: pd.DataFrame) -> None:
+        part = f"results-{len(state.result_parts):05d}.parquet"
+        save_parquet(chunk, os.path.join(run_dir, part))
+        state.result_parts.append(part)
+
+    def write_db(chunk: pd.DataFrame) -> None:
+        _write_db(chunk, key)
+
+    if "db" in sinks:
+        from utils.db import ensure_backtest_result_schema
+        ensure_backtest_result_schema()
+
+    writers = {"parquet": write_parquet, "db": write_db}
+    writer = ResultWriter(market, CHUNK_SIZE, [writers[name] for name in sinks])
+
+    last_chunk = None
+    candles = 0
+    for chunk in iter_candles(market, unit, fetch_from, end_time, update=update_candles):
+        chunk = chunk[chunk["시간"] <= closed_until]
+        if chunk.empty:
+            continue
+        fills.prepare(chunk["시간"])
+        _simulate_chunk(state, settings, market, chunk, writer, fills)
+        candles += len(chunk)
+        # 결과를 먼저 저장한 뒤 체크포인트를 갱신합니다. 그 사이에 종료되면 다음 실행이 같은 구간을 다시 저장하지만,
+        # 결과 파일은 같은 이름으로 덮어쓰고 DB는 같은 실행 키(run_key)의 같은 구간만 지운 뒤 넣으므로(utils/db.py)
+        # 중복되지 않고, 같은 마켓 / 구간을 계산하는 다른 실행의 행도 지우지 않습니다.
+        last_chunk = writer.flush()
+        if keep_checkpoint:
+            save_checkpoint(run_dir, key, params, state, sinks)
+            log.debug("💾 체크포인트 저장 - %s까지 계산", state.last_time)
+
+    elapsed = time.perf_counter() - started
+    log.info("✅ 시뮬레이션 완료 → %s (새로 계산한 캔들: %d, %.1fs)", run_dir, candles, elapsed,
+             extra=fields(market=market, unit=unit, candles=candles, seconds=round(elapsed, 3)))
+    if last_chunk is None and state.result_parts:
+        # 새로 계산한 캔들이 없으면 마지막으로 저장한 결과 파일에서 평가금액을 읽습니다.
+        last_chunk = pd.read_parquet(os.path.join(run_dir, state.result_parts[-1]), columns=["portfolio_value"])
+    final_value = float(last_chunk["portfolio_value"].iloc[-1]) if last_chunk is not None else None
+    return {
+        "market": market,
+        "unit": unit,
+        "run_key": key,
+        "start": str(start),
+        "end": str(end),
+        **params,
+        "candles": candles,
+        "seconds": elapsed,
+        "candles_per_sec": candles / elapsed if elapsed > 0 else 0.0,
+        "final_value": final_value,
+        "return_pct": (final_value / INITIAL_CASH - 1) * 100 if final_value is not None else None,
+        "realized_pnl": state.realized_pnl,
+        "total_fee": state.cumulative_fee,
+        "fills": fill_model,
+        "slippage_cost": state.slippage_cost,
+        "unfilled_amount": state.unfilled_amount,
+        "last_time": state.last_time,
+        "run_dir": run_dir,
+    }
+
+
+def _write_db(chunk: pd.DataFrame, key: str) -> None:
+    from utils.db import insert_backtest_result_to_db
+    insert_backtest_result_to_db(chunk.assign(signal=decode_signals(chunk["signal"], SPLIT_SELL_LEVELS)), key)
+
+
+def load_results(run_dir: str, start=None, end=None) -> pd.DataFrame:
+    """체크포인트에 기록된 결과 파일들을 [start, end) 구간만 읽어 하나로 합칩니다."""
+    data = load_json(os.path.join(run_dir, "checkpoint.json"))
+    parts = data["state"]["result_parts"] if data else []
+    filters = []
+    if start is not None:
+        filters.append(("time", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("time", "<", pd.Timestamp(end)))
+    frames = [pd.read_parquet(os.path.join(run_dir, p), filters=filters or None) for p in parts]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def export_excel(run_dir: str, filename: str = None, start=None, end=None) -> str:
+    """저장된 결과를 기존 엑셀 형식(한글 컬럼, 신호 문자열)으로 내보냅니다."""
+    result_df = load_results(run_dir, start=start, end=end)
+    market = result_df["market"].iloc[0] if not result_df.empty else "empty"
+    filename = filename or f"전략_시뮬_{market}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    to_korean(result_df, SPLIT_SELL_LEVELS).to_excel(filename, index=False)
+    log.info("📄 엑셀 저장: %s, %d rows", filename, len(result_df))
+    return filename
@@ -1,94 +1,92 @@
 import pandas as pd
+from strategy.records import (
+    BuyOrder, SellOrder, OrderBook, is_missing,
+    settings_from_df, buy_orders_from_df, buy_orders_to_df,
+    sell_orders_from_df, sell_orders_to_df,
+)
+from utils.price_utils import ladder_price, to_price_units, from_price_units, to_volume_units, from_volume_units
+from utils.log import get_logger
 
-def generate_buy_orders(setting_df: pd.DataFrame, buy_log_df: pd.DataFrame, current_prices: dict) -> pd.DataFrame:
+log = get_logger("strategy.casino_strategy")
+
+
+def _units(value, convert):
+    """기록된 값을 정수 단위로 바꿉니다. (비어 있으면 None → 어떤 값과도 같지 않음)"""
+    return None if is_missing(value) else convert(value)
+
+
+def plan_buy_orders(settings: list, buy_book: OrderBook, current_prices: dict) -> OrderBook:
     """
     # --- [전략의 핵심 ①: 매수 전략] ---
     # "하락 추종 분할 매수" 전략에 따라 매수 주문을 생성하거나, 기존 주문을 조정합니다.
     # 이 함수는 시스템의 두뇌 역할을 하며, 모든 매수 관련 의사결정을 담당합니다.
+    # DataFrame 대신 레코드(strategy.records)를 직접 수정하므로, 매 사이클 비용이 행 수에 비례해 작습니다.
     """
-    print("[casino_strategy.py] generate_buy_orders() 호출됨")
+    log.debug("plan_buy_orders() 호출됨")
 
     new_logs = []
 
     # 설정 파일(setting.csv)에 정의된 모든 코인에 대해 개별적으로 전략을 적용합니다.
-    for _, setting in setting_df.iterrows():
-        market = setting["market"]
-        unit_size = setting["unit_size"]
-        small_pct = setting["small_flow_pct"]
-        small_units = setting["small_flow_units"]
-        large_pct = setting["large_flow_pct"]
-        large_units = setting["large_flow_units"]
+    for setting in settings:
+        market = setting.market
+        unit_size = setting.unit_size
+        small_pct = setting.small_flow_pct
+        small_units = setting.small_flow_units
+        large_pct = setting.large_flow_pct
+        large_units = setting.large_flow_units
 
         current_price = current_prices.get(market)
         if current_price is None:
-            print(f"❌ 현재 가격 없음 → {market}")
+            log.warning("❌ 현재 가격 없음 → %s", market)
             continue
 
         # --- [상황 판단] --- #
         # 현재 해당 코인의 거래 기록이 있는지 확인하여, 어떤 상태인지 판단합니다.
-        coin_logs = buy_log_df[buy_log_df["market"] == market]
-        initial_logs = coin_logs[coin_logs["buy_type"] == "initial"]
-        flow_logs = coin_logs[coin_logs["buy_type"].isin(["small_flow", "large_flow"])]
+        coin_logs = buy_book.for_market(market)
 
         # ✅ [상황 1: 신규 진입] - 해당 코인을 보유하고 있지 않을 때
-        if coin_logs.empty:
+        if not coin_logs:
             # 이 코인에 대한 첫 거래이므로, 3가지 종류의 주문을 한 번에 계획합니다.
-            print(f"📌 {market} → 상황1: 최초 주문 생성")
+            log.debug("📌 %s → 상황1: 최초 주문 생성", market)
+            now = pd.Timestamp.now()
 
             # 1. 현재가 매수 (Initial Buy): 리스크 관리를 위해 소액으로 즉시 시장에 진입합니다.
-            new_logs.append({
-                "time": pd.Timestamp.now(),
-                "market": market,
-                "target_price": current_price,
-                "buy_amount": unit_size,
-                "buy_units": 1,
-                "buy_type": "initial",
-                "buy_uuid": None,
-                "filled": "update"  # "update" 상태는 이 주문을 거래소로 전송해야 함을 의미합니다.
-            })
+            # "update" 상태는 이 주문을 거래소로 전송해야 함을 의미합니다.
+            new_logs.append(BuyOrder(now, market, current_price, unit_size, 1, "initial", None, "update"))
 
             # 2. 1차 하락 매수 (Small Flow): 첫 매수 가격보다 일정 비율 하락 시, 추가 매수할 주문을 미리 계획합니다.
-            small_price = round(current_price * (1 - small_pct))
-            new_logs.append({
-                "time": pd.Timestamp.now(),
-                "market": market,
-                "target_price": small_price,
-                "buy_amount": unit_size * small_units,
-                "buy_units": small_units,
-                "buy_type": "small_flow",
-                "buy_uuid": None,
-                "filled": "update"
-            })
+            small_price = ladder_price(current_price, -small_pct, market)
+            new_logs.append(BuyOrder(now, market, small_price, unit_size * small_units, small_units,
+                                     "small_flow", None, "update"))
 
             # 3. 2차 하락 매수 (Large Flow): 더 큰 하락에 대비한, 더 많은 수량의 추가 매수 주문을 계획합니다.
-            large_price = round(current_price * (1 - large_pct))
-            new_logs.append({
-                "time": pd.Timestamp.now(),
-                "market": market,
-                "target_price": large_price,
-                "buy_amount": unit_size * large_units,
-                "buy_units": large_units,
-                "buy_type": "large_flow",
-                "buy_uuid": None,
-                "filled": "update"
-            })
+            large_price = ladder_price(current_price, -large_pct, market)
+            new_logs.append(BuyOrder(now, market, large_price, unit_size * large_units, large_units,
+                                     "large_flow", None, "update"))
+
+        # ✅ [상황 1-1: 첫 매수 취소] - 시장가 첫 매수가 체결 없이 취소되었을 때 다시 보냅니다.
+        elif any(o.buy_type == "initial" and o.filled == "cancel" for o in coin_logs):
+            log.debug("📌 %s → 첫 매수 취소됨 → 다시 주문", market)
+            for order in coin_logs:
+                if order.buy_type == "initial":
+                    order.buy_uuid = None
+                    order.filled = "update"
 
         # ✅ [상황 2: 보유 중] - 이미 첫 매수(initial)가 체결되었을 때
-        elif not initial_logs.empty and any(initial_logs["filled"] == "done"):
-            print(f"📌 {market} → 수정된 상황2: flow 주문 개별 처리 시작")
+        elif any(o.buy_type == "initial" and o.filled == "done" for o in coin_logs):
+            log.debug("📌 %s → 수정된 상황2: flow 주문 개별 처리 시작", market)
 
             # 미리 계획해둔 하락 매수 주문(flow)들의 상태를 하나씩 점검합니다.
-            for _, row in flow_logs.iterrows():
-                buy_type = row["buy_type"]
-                target_price = row["target_price"]
-                raw_filled = row["filled"]
-                filled = "" if pd.isna(raw_filled) else str(raw_filled).strip()
-                row_index = row.name
+            for order in coin_logs:
+                buy_type = order.buy_type
+                if buy_type not in ("small_flow", "large_flow"):
+                    continue
+                filled = order.filled
 
-                if pd.isna(target_price) or pd.isna(row["buy_amount"]) or pd.isna(row["buy_units"]):
-                    raise ValueError(f"[❌ 에러] {market} - {buy_type} 주문에 누락된 값이 있습니다. 행: {row.to_dict()}")
+                if is_missing(order.target_price) or is_missing(order.buy_amount) or is_missing(order.buy_units):
+                    raise ValueError(f"[❌ 에러] {market} - {buy_type} 주문에 누락된 값이 있습니다. 행: {order.as_dict()}")
 
-                target_price = float(target_price)
+                target_price = float(order.target_price)
                 unit_pct = small_pct if buy_type == "small_flow" else large_pct
 
                 # Case 1: (미체결 상태) 가격이 올라서 매수 기회를 놓칠 것 같을 때
@@ -97,113 +95,157 @@ def generate_buy_orders(setting_df: pd.DataFrame, buy_log_df: pd.DataFrame, curr
                     # 현재 가격에 맞춰 예약 매수 가격을 약간 상향 조정하여, 체결 가능성을 높입니다.
                     threshold = target_price * (unit_pct / 2)
                     if current_price - target_price > threshold:
-                        new_price = round((target_price + threshold) * (1 - unit_pct))
-                        print(f"↗ {market} {buy_type} 가격 재조정: {target_price} → {new_price}")
-                        buy_log_df.loc[row_index, "target_price"] = new_price
-                        buy_log_df.loc[row_index, "filled"] = "update"
+                        new_price = ladder_price(target_price + threshold, -unit_pct, market)
+                        log.debug("↗ %s %s 가격 재조정: %s → %s", market, buy_type, target_price, new_price)
+                        order.target_price = new_price
+                        order.filled = "update"
 
                 # Case 2: (체결 완료) 추가 매수에 성공했을 때
                 elif filled == "done":
                     # "좋았어, 땅이 촉촉해졌군! 그럼 이제 더 깊은 곳에 새 물뿌리개를 또 설치하자!"
                     # 현재 체결된 가격을 기준으로, 동일한 하락 비율을 적용하여 더 낮은 가격에 새로운 추가 매수 주문을 생성합니다.
                     # 이것이 바로 "하락을 따라가며 계속 매수"하는 이 전략의 핵심입니다.
-                    buy_log_df.at[row_index, "buy_uuid"] = None
+                    order.buy_uuid = None
 
-                    new_price = round(target_price * (1 - unit_pct))
-                    print(f"🔁 {market} {buy_type} 연속 주문: {target_price} → {new_price}")
-                    buy_log_df.loc[row_index, "target_price"] = new_price
-                    buy_log_df.loc[row_index, "filled"] = "update"
+                    new_price = ladder_price(target_price, -unit_pct, market)
+                    log.debug("🔁 %s %s 연속 주문: %s → %s", market, buy_type, target_price, new_price)
+                    order.target_price = new_price
+                    order.filled = "update"
 
                 # Case 3: (신규 또는 수동 입력) 로그는 있지만 아직 거래소에 전송되지 않았을 때
-                elif pd.isna(filled) or filled == "":
+                elif filled == "":
                     # "흠, 이건 내가 직접 설치한 물뿌리개로군. 고장 나진 않았는지 점검만 해봐야겠다!"
                     # 주문에 필요한 모든 정보가 올바르게 있는지 확인하고, "update" 상태로 만들어 거래소로 전송될 수 있게 합니다.
-                    print(f"📝 {market} {buy_type} 수동 주문 → 필드 유효성 검사")
+                    log.debug("📝 %s %s 수동 주문 → 필드 유효성 검사", market, buy_type)
                     required_columns = ["market", "target_price", "buy_amount", "buy_units", "buy_type"]
-                    missing_columns = [col for col in required_columns if pd.isna(row[col]) or row[col] == ""]
+                    missing_columns = [col for col in required_columns if is_missing(getattr(order, col))]
 
                     if missing_columns:
                         raise ValueError(f"[❌ 에러] {market} - {buy_type} 수동 주문에 누락된 필드가 있습니다: {missing_columns}")
 
-                    buy_log_df.loc[row_index, "filled"] = "update"
+                    order.filled = "update"
+
+                # Case 4: (전송 대기) 저장된 계획이 아직 접수되지 않았을 때 (거절, 최소 금액 미달, 예산 부족 등)
+                elif filled == "update":
+                    # 같은 조건으로 다시 전송합니다.
+                    log.debug("⏳ %s %s 미전송 주문 → 다시 전송", market, buy_type)
+
+                # Case 5: (취소됨) 거래소에서 주문이 취소되었을 때 (교체 중 전송 실패, 수동 취소 등)
+                elif filled == "cancel":
+                    # 같은 자리에 물뿌리개를 다시 설치합니다.
+                    log.debug("♻️ %s %s 취소된 주문 → 다시 주문", market, buy_type)
+                    order.buy_uuid = None
+                    order.filled = "update"
 
-                # Case 4: 예기치 않은 상태일 경우 오류를 발생시켜 문제를 파악합니다.
+                # Case 6: 예기치 않은 상태일 경우 오류를 발생시켜 문제를 파악합니다.
                 else:
                     raise ValueError(f"[❌ 에러] {market} - {buy_type} 주문의 filled 상태가 예외적입니다: '{filled}'")
 
-    # 새로운 주문이 있다면 기존 로그와 결합하여 최종 주문 목록을 만듭니다.
-    if new_logs:
-        new_rows = buy_log_df.to_dict('records') + new_logs
-        buy_log_df = pd.DataFrame(new_rows)
+    # 새로운 주문이 있다면 기존 주문 목록 뒤에 이어 붙입니다.
+    for order in new_logs:
+        buy_book.append(order)
 
-    return buy_log_df
+    return buy_book
 
-def generate_sell_orders(setting_df: pd.DataFrame, holdings: dict, sell_log_df: pd.DataFrame) -> pd.DataFrame:
+
+def plan_sell_orders(settings: list, holdings: dict, sell_book: OrderBook) -> OrderBook:
     """
     # --- [전략의 핵심 ②: 매도 전략] ---
     # "기계적 이익 실현" 전략에 따라 매도 주문을 생성하거나, 기존 주문을 조정합니다.
     # 보유한 코인의 평균 매입 단가를 기준으로, 정해진 수익률에 도달하면 즉시 매도합니다.
     """
-    print("[casino_strategy.py] generate_sell_orders() 호출됨")
+    log.debug("plan_sell_orders() 호출됨")
 
-    updated_df = sell_log_df.copy()
-
-    for _, row in setting_df.iterrows():
-        market = row["market"]
+    for setting in settings:
+        market = setting.market
 
         # 보유 중인 코인이 아니면 매도 전략을 실행하지 않습니다.
         if market not in holdings:
             continue
 
         # --- [매도 가격 계산] --- #
-        # 보유 코인의 평균 매입 단가(평단)와 수량을 가져옵니다.
+        # 보유 코인의 평균 매입 단가(평단)와 수량을 가져옵니다. 비교는 정수 단위(utils/price_utils.py)로 합니다.
+        # 걸려 있는 매도 주문에 묶인 수량(locked)도 포함합니다. 주문을 바꿀 때는 기존 주문을 취소하고 전체 수량으로 다시 냅니다.
         h = holdings[market]
-        avg_buy_price = round(h["avg_price"], 8)
-        quantity = round(h["balance"], 8)
-        
-        # 설정된 목표 수익률(예: 0.5%)을 바탕으로 목표 매도 가격을 계산합니다.
-        take_profit_pct = row["take_profit_pct"]
-        target_price = round(avg_buy_price * (1 + take_profit_pct), 2)
+        avg_units = to_price_units(h["avg_price"])
+        quantity_units = to_volume_units(h["balance"] + h.get("locked", 0))
+        avg_buy_price = from_price_units(avg_units)
+        quantity = from_volume_units(quantity_units)
+
+        # 설정된 목표 수익률(예: 0.5%)을 바탕으로 목표 매도 가격을 호가 단위에 맞춰 계산합니다.
+        target_price = ladder_price(avg_buy_price, setting.take_profit_pct, market)
 
         # --- [매도 주문 생성/수정] --- #
         # 이미 매도 주문이 나가있는지 확인합니다.
-        existing_idx = updated_df[updated_df["market"] == market].index
-
-        if not existing_idx.empty:
-            idx = existing_idx[0]
-            existing = updated_df.loc[idx]
+        existing = sell_book.first(market)
 
+        if existing is not None:
             # 기존 매도 주문이 있고, 보유 현황에 변경이 없다면 아무것도 하지 않습니다.
             is_same = (
-                round(existing["avg_buy_price"], 8) == avg_buy_price and
-                round(existing["quantity"], 8) == quantity and
-                round(existing["target_sell_price"], 2) == target_price
+                _units(existing.avg_buy_price, to_price_units) == avg_units and
+                _units(existing.quantity, to_volume_units) == quantity_units and
+                _units(existing.target_sell_price, to_price_units) == to_price_units(target_price)
             )
 
-            if is_same:
-                print(f"✅ {market} → 보유 정보와 동일 → 유지")
+            # 아직 보내지 않았거나(빈 값) 거래소에서 취소된 주문은 같은 조건으로 다시 냅니다.
+            if is_same and existing.filled not in ("", "cancel"):
+                log.debug("✅ %s → 보유 정보와 동일 → 유지", market)
                 continue
 
             # 만약 추가 매수로 평단이나 수량이 바뀌었다면, 새로운 목표가로 매도 주문을 수정합니다.
-            print(f"✏️ {market} → 기존과 차이 있음 → 수정")
-            updated_df.loc[idx, "avg_buy_price"] = avg_buy_price
-            updated_df.loc[idx, "quantity"] = quantity
-            updated_df.loc[idx, "target_sell_price"] = target_price
-            updated_df.loc[idx, "filled"] = "update"
+            log.debug("✏️ %s → 기존과 차이 있음 → 수정", market)
+            existing.avg_buy_price = avg_buy_price
+            existing.quantity = quantity
+            existing.target_sell_price = target_price
+            existing.filled = "update"
 
         # 기존 매도 주문이 없다면, 새로 계산된 목표가로 신규 매도 주문을 생성합니다.
         else:
-            print(f"🆕 {market} → 새로운 sell_log 생성")
-            new_row = {
-                "market": market,
-                "avg_buy_price": avg_buy_price,
-                "quantity": quantity,
-                "target_sell_price": target_price,
-                "sell_uuid": None,
-                "filled": "update"
-            }
-            new_rows = updated_df.to_dict('records')
-            new_rows.append(new_row)
-            updated_df = pd.DataFrame(new_rows)
-
-    return updated_df
\ No newline at end of file
+            log.debug("🆕 %s → 새로운 sell_log 생성", market)
+            sell_book.append(SellOrder(market, avg_buy_price, quantity, target_price, None, "update"))
+
+    return sell_book
+
+
+def replan_market(setting, buy_book: OrderBook, previous=None) -> None:
+    """
+    설정이 바뀐 마켓의 미체결 매수 주문만 새 설정으로 다시 계산합니다.
+    이미 체결된(done) 주문과 다른 마켓의 주문은 건드리지 않습니다.
+    """
+    for order in buy_book.for_market(setting.market):
+        if order.filled == "done":
+            continue
+
+        if order.buy_type == "initial":
+            order.buy_amount = setting.unit_size
+        elif order.buy_type in ("small_flow", "large_flow"):
+            units = setting.small_flow_units if order.buy_type == "small_flow" else setting.large_flow_units
+            order.buy_units = units
+            order.buy_amount = setting.unit_size * units
+
+            # 하락 비율이 바뀌었다면, 기존 목표가에서 기준가를 역산해 새 비율로 다시 계산합니다.
+            if previous is not None and not is_missing(order.target_price):
+                old_pct = previous.flow_pct(order.buy_type)
+                new_pct = setting.flow_pct(order.buy_type)
+                if old_pct != new_pct:
+                    reference_price = float(order.target_price) / (1 - old_pct)
+                    order.target_price = ladder_price(reference_price, -new_pct, setting.market)
+
+        # 이미 거래소에 걸려 있는 지정가 주문은 새 조건으로 바꿔 전송되도록 합니다. (기존 주문은 취소 후 교체)
+        # 시장가 initial 주문은 바꿀 수 없으므로 그대로 둡니다.
+        if order.filled == "wait" and order.buy_type != "initial":
+            order.filled = "update"
+
+    log.info("🔧 %s → 설정 변경으로 미체결 주문 재계산", setting.market)
+
+
+def generate_buy_orders(setting_df: pd.DataFrame, buy_log_df: pd.DataFrame, current_prices: dict) -> pd.DataFrame:
+    """DataFrame 입출력용 래퍼입니다. 실제 로직은 plan_buy_orders()에 있습니다."""
+    buy_book = plan_buy_orders(settings_from_df(setting_df), buy_orders_from_df(buy_log_df), current_prices)
+    return buy_orders_to_df(buy_book)
+
+
+def generate_sell_orders(setting_df: pd.DataFrame, holdings: dict, sell_log_df: pd.DataFrame) -> pd.DataFrame:
+    """DataFrame 입출력용 래퍼입니다. 실제 로직은 plan_sell_orders()에 있습니다."""
+    sell_book = plan_sell_orders(settings_from_df(setting_df), holdings, sell_orders_from_df(sell_log_df))
+    return sell_orders_to_df(sell_book)
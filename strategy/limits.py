@@ -0,0 +1,6 @@
+# strategy/limits.py
+
+# 실거래(core/sharding.py 예산 관리)와 백테스트(manager/simulator.py)가 함께 쓰는 자금 규칙입니다.
+# 실거래 프로세스가 백테스트 스택(캔들 저장소, pyarrow 등)을 불러오지 않도록 다른 모듈을 import하지 않습니다.
+
+MIN_CASH_RATIO = 0.3     # 전체 자산 중 최소 보유 현금 비율
@@ -0,0 +1,192 @@
+# strategy/records.py
+
+import pandas as pd
+
+# CSV/DB 경계에서 사용하는 컬럼 순서입니다. (buy_log.csv, sell_log.csv, setting.csv 헤더와 동일)
+SETTING_COLUMNS = [
+    "market", "unit_size", "small_flow_pct", "small_flow_units",
+    "large_flow_pct", "large_flow_units", "take_profit_pct"
+]
+BUY_LOG_COLUMNS = ["time", "market", "target_price", "buy_amount", "buy_units", "buy_type", "buy_uuid", "filled"]
+SELL_LOG_COLUMNS = ["market", "avg_buy_price", "quantity", "target_sell_price", "sell_uuid", "filled"]
+
+
+def is_missing(value) -> bool:
+    """CSV/Parquet에서 읽은 빈 값(None, NaN, 빈 문자열)인지 확인합니다."""
+    return value is None or value == "" or (isinstance(value, float) and value != value)
+
+
+def _clean_filled(value) -> str:
+    return "" if is_missing(value) else str(value).strip()
+
+
+def _clean_uuid(value):
+    return None if is_missing(value) else value
+
+
+class Setting:
+    """setting.csv 한 줄(코인 하나)의 매매 설정입니다."""
+    __slots__ = tuple(SETTING_COLUMNS)
+
+    def __init__(self, market, unit_size=0.0, small_flow_pct=0.0, small_flow_units=0,
+                 large_flow_pct=0.0, large_flow_units=0, take_profit_pct=0.0):
+        self.market = market
+        self.unit_size = unit_size
+        self.small_flow_pct = small_flow_pct
+        self.small_flow_units = small_flow_units
+        self.large_flow_pct = large_flow_pct
+        self.large_flow_units = large_flow_units
+        self.take_profit_pct = take_profit_pct
+
+    def flow_pct(self, buy_type: str) -> float:
+        return self.small_flow_pct if buy_type == "small_flow" else self.large_flow_pct
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, Setting) and self.as_tuple() == other.as_tuple()
+
+    # 값으로 비교하지만 필드를 바꿀 수 있으므로 dict 키 / set 원소로는 쓰지 않습니다. (마켓 이름을 키로 사용)
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Setting({self.market}, unit_size={self.unit_size}, take_profit_pct={self.take_profit_pct})"
+
+
+class BuyOrder:
+    """매수 사다리(initial / small_flow / large_flow)의 주문 한 칸입니다."""
+    __slots__ = tuple(BUY_LOG_COLUMNS)
+
+    def __init__(self, time, market, target_price, buy_amount, buy_units, buy_type, buy_uuid=None, filled=""):
+        self.time = time
+        self.market = market
+        self.target_price = target_price
+        self.buy_amount = buy_amount
+        self.buy_units = buy_units
+        self.buy_type = buy_type
+        self.buy_uuid = buy_uuid
+        self.filled = filled
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"BuyOrder({self.market}, {self.buy_type}, {self.target_price}, filled={self.filled!r})"
+
+
+class SellOrder:
+    """코인별 익절 매도 주문입니다."""
+    __slots__ = tuple(SELL_LOG_COLUMNS)
+
+    def __init__(self, market, avg_buy_price, quantity, target_sell_price, sell_uuid=None, filled=""):
+        self.market = market
+        self.avg_buy_price = avg_buy_price
+        self.quantity = quantity
+        self.target_sell_price = target_sell_price
+        self.sell_uuid = sell_uuid
+        self.filled = filled
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"SellOrder({self.market}, {self.target_sell_price}, filled={self.filled!r})"
+
+
+class OrderBook:
+    """
+    주문 레코드를 입력 순서대로 보관하면서, 마켓별 인덱스를 함께 유지합니다.
+    DataFrame으로 변환할 때는 기존 로그의 행 순서가 그대로 유지됩니다.
+    """
+    __slots__ = ("orders", "_by_market")
+
+    def __init__(self, orders=None):
+        self.orders = []
+        self._by_market = {}
+        for order in orders or ():
+            self.append(order)
+
+    def append(self, order) -> None:
+        self.orders.append(order)
+        self._by_market.setdefault(order.market, []).append(order)
+
+    def for_market(self, market: str) -> list:
+        return self._by_market.get(market, [])
+
+    def first(self, market: str):
+        orders = self._by_market.get(market)
+        return orders[0] if orders else None
+
+    def has_market(self, market: str) -> bool:
+        return market in self._by_market
+
+    def markets(self) -> list:
+        return list(self._by_market)
+
+    def remove_market(self, market: str) -> None:
+        if self._by_market.pop(market, None) is not None:
+            self.orders = [o for o in self.orders if o.market != market]
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __iter__(self):
+        return iter(self.orders)
+
+
+# --- DataFrame 변환 (I/O 경계 전용) ---
+
+def _records(df: pd.DataFrame) -> list:
+    if df is None or df.empty:
+        return []
+    return df.to_dict("records")
+
+
+def settings_from_df(setting_df: pd.DataFrame) -> list:
+    settings = []
+    for row in _records(setting_df):
+        settings.append(Setting(**{name: row[name] for name in SETTING_COLUMNS if name in row}))
+    return settings
+
+
+def settings_to_df(settings) -> pd.DataFrame:
+    return pd.DataFrame([s.as_tuple() for s in settings], columns=SETTING_COLUMNS)
+
+
+def buy_orders_from_df(buy_log_df: pd.DataFrame) -> OrderBook:
+    book = OrderBook()
+    for row in _records(buy_log_df):
+        book.append(BuyOrder(
+            time=row.get("time"),
+            market=row.get("market"),
+            target_price=row.get("target_price"),
+            buy_amount=row.get("buy_amount"),
+            buy_units=row.get("buy_units"),
+            buy_type=row.get("buy_type"),
+            buy_uuid=_clean_uuid(row.get("buy_uuid")),
+            filled=_clean_filled(row.get("filled")),
+        ))
+    return book
+
+
+def buy_orders_to_df(book: OrderBook) -> pd.DataFrame:
+    return pd.DataFrame([o.as_dict() for o in book], columns=BUY_LOG_COLUMNS)
+
+
+def sell_orders_from_df(sell_log_df: pd.DataFrame) -> OrderBook:
+    book = OrderBook()
+    for row in _records(sell_log_df):
+        book.append(SellOrder(
+            market=row.get("market"),
+            avg_buy_price=row.get("avg_buy_price"),
+            quantity=row.get("quantity"),
+            target_sell_price=row.get("target_sell_price"),
+            sell_uuid=_clean_uuid(row.get("sell_uuid")),
+            filled=_clean_filled(row.get("filled")),
+        ))
+    return book
+
+
+def sell_orders_to_df(book: OrderBook) -> pd.DataFrame:
+    return pd.DataFrame([o.as_dict() for o in book], columns=SELL_LOG_COLUMNS)
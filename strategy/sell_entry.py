@@ -2,10 +2,14 @@ import pandas as pd
 from api.account import get_accounts
 from api.price import get_current_ask_price
 from strategy.casino_strategy import generate_sell_orders
+from utils.log import get_logger, frame
 
-def get_current_holdings(setting_df: pd.DataFrame) -> dict:
-    """현재 보유 자산 정보를 조회하고, 각 자산의 상세 정보를 계산합니다."""
-    accounts = get_accounts()
+log = get_logger("strategy.sell_entry")
+
+def get_current_holdings(setting_df: pd.DataFrame, accounts: list = None) -> dict:
+    """현재 보유 자산 정보를 조회하고, 각 자산의 상세 정보를 계산합니다. (accounts가 있으면 조회하지 않음)"""
+    if accounts is None:
+        accounts = get_accounts()
     holdings = {}
 
     for acc in accounts:
@@ -30,18 +34,19 @@ def get_current_holdings(setting_df: pd.DataFrame) -> dict:
         }
     return holdings
 
-def run_sell_entry_flow(setting_df: pd.DataFrame, sell_log_df: pd.DataFrame) -> pd.DataFrame:
+def run_sell_entry_flow(setting_df: pd.DataFrame, sell_log_df: pd.DataFrame, accounts: list = None) -> pd.DataFrame:
     """매도 진입 흐름을 실행하고, 생성된 매도 주문 목록을 반환합니다."""
-    print("\n[Flow] 매도 전략 실행")
-    holdings = get_current_holdings(setting_df)
+    log.debug("매도 전략 실행")
+    holdings = get_current_holdings(setting_df, accounts)
 
     if not holdings:
-        print("[Flow] 매도할 코인이 없습니다.")
+        log.debug("매도할 코인이 없습니다.")
         return pd.DataFrame()
     
-    print(f"[Flow] 현재 보유 코인: {list(holdings.keys())}")
+    log.debug("현재 보유 코인: %s", list(holdings))
     sell_orders_df = generate_sell_orders(setting_df, holdings, sell_log_df)
-    print(f"[Flow] 생성된 매도 주문: {len(sell_orders_df)}건")
+    log.debug("생성된 매도 주문: %d건", len(sell_orders_df))
+    # 주문 표 전체 출력은 DEBUG 일 때만 만듭니다.
     if not sell_orders_df.empty:
-        print(sell_orders_df.to_string())
+        log.debug("매도 주문 목록\n%s", frame(sell_orders_df))
     return sell_orders_df
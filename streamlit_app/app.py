@@ -5,7 +5,6 @@ import pandas as pd
 import os
 import sys
 import random
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
@@ -14,9 +13,20 @@ from plotly.subplots import make_subplots
 
 # 프로젝트 루트 경로를 시스템 경로에 추가하여 다른 모듈(api, utils 등)을 임포트할 수 있도록 함
 sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
-from api.order import get_orders
-from api.account import get_accounts
-from api.price import get_minute_candles, get_current_ask_price
+from streamlit_app.data_service import DashboardDataService
+from manager.market_snapshot import SnapshotReader
+from streamlit_app.chart_data import downsample_ohlc, downsample_line, clip_markers, price_range, max_bars
+from data.candle_store import now_kst
+from data.indicators import get_indicator_engine
+
+# 차트 기간 선택지
+CHART_RANGES = {
+    "6시간": pd.Timedelta(hours=6),
+    "1일": pd.Timedelta(days=1),
+    "1주": pd.Timedelta(weeks=1),
+    "1개월": pd.Timedelta(days=30),
+    "3개월": pd.Timedelta(days=90),
+}
 
 def setup_page():
     """Streamlit 페이지의 기본 설정을 구성합니다."""
@@ -38,14 +48,17 @@ def load_css(file_path):
 
 # --- 2. 데이터 로딩 및 처리 ---
 
-@st.cache_data(ttl=60)  # 60초마다 데이터 갱신
+@st.cache_resource
+def get_data_service():
+    """모든 세션이 공유하는 데이터 서비스입니다. 엔진이 게시한 스냅샷을 읽고, 엔진이 멈췄을 때만 거래소를 조회합니다."""
+    return DashboardDataService(refresh_interval=60, snapshot_reader=SnapshotReader())  # 60초마다 데이터 갱신
+
 def load_all_data():
     """거래소 API로부터 모든 필요한 데이터를 로드하고, 로드 실패 시 더미 데이터를 반환합니다."""
     try:
-        done_orders = get_orders(state='done')
-        wait_orders = get_orders(state='wait')
-        accounts_info = get_accounts()
-        return pd.DataFrame(done_orders), pd.DataFrame(wait_orders), accounts_info
+        service = get_data_service()
+        service.refresh()
+        return service.done_df(), service.wait_df(), service.accounts()
     except Exception as e:
         st.error(f"API 데이터 로딩 중 오류 발생: {e}. 데모용 더미 데이터로 표시됩니다.")
         dummy_done = []
@@ -73,10 +86,10 @@ def process_data(done_df, accounts_info):
         investment = avg_buy_price * balance
         total_investment += investment
         
-        try:
-            current_price = get_current_ask_price(f"KRW-{asset['currency']}")
+        current_price = get_data_service().get_price(f"KRW-{asset['currency']}")
+        if current_price is not None:
             total_valuation += current_price * balance
-        except Exception:
+        else:
             total_valuation += investment # 현재가 조회 실패 시 매수 금액으로 평가
 
     total_profit = total_valuation - total_investment
@@ -85,7 +98,6 @@ def process_data(done_df, accounts_info):
     return buy_df, sell_df, assets, total_investment, total_valuation, total_profit, profit_rate
 
 
-import docker
 
 # --- 3. UI 렌더링 함수 ---
 
@@ -93,6 +105,7 @@ def render_docker_status():
     """현재 실행 중인 Docker 컨테이너 목록을 가져와 대시보드에 표시합니다."""
     st.sidebar.subheader("🐳 도커 컨테이너 현황")
     try:
+        import docker  # 사이드바를 그릴 때만 필요하므로 시작 시에는 불러오지 않습니다.
         client = docker.from_env()
         containers = client.containers.list()
         
@@ -231,6 +244,7 @@ def render_portfolio_pie_chart(assets):
         asset_df['avg_buy_price'] = pd.to_numeric(asset_df['avg_buy_price'])
         asset_df['valuation'] = asset_df['avg_buy_price'] * asset_df['balance']
         
+        import plotly.express as px  # 파이 차트에서만 쓰므로 필요할 때 불러옵니다.
         fig = px.pie(asset_df, values='valuation', names='currency', title='코인별 자산 비중', hole=.3,
                      color_discrete_sequence=px.colors.sequential.Aggrnyl)
         fig.update_traces(textposition='inside', textinfo='percent+label')
@@ -250,48 +264,56 @@ def render_trading_chart(done_df, buy_df, sell_df, assets):
         default_market_index = 0 if market_list.size > 0 else None
         selected_market = st.selectbox('분석할 마켓을 선택하세요:', market_list, index=default_market_index)
         
+        # 보이는 기간과 표시 방식 선택 (긴 기간도 화면 폭에 맞춰 묶어서 보내므로 브라우저가 느려지지 않습니다)
+        range_col, style_col = st.columns([3, 1])
+        with range_col:
+            range_label = st.radio('기간', list(CHART_RANGES), index=1, horizontal=True)
+        with style_col:
+            chart_style = st.radio('표시', ['캔들', '라인'], horizontal=True)
+
         if selected_market:
             try:
-                candles = get_minute_candles(market=selected_market, unit=5, count=200)
-                candle_df = pd.DataFrame(candles)
-                
-                numeric_cols = ['opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']
-                candle_df[numeric_cols] = candle_df[numeric_cols].apply(pd.to_numeric)
-                candle_df['candle_date_time_kst'] = pd.to_datetime(candle_df['candle_date_time_kst'])
-                candle_df = candle_df.sort_values(by='candle_date_time_kst')
-
-                candle_df['ma5'] = candle_df['trade_price'].rolling(window=5).mean()
-                candle_df['ma20'] = candle_df['trade_price'].rolling(window=20).mean()
-
-                # 볼린저 밴드 계산 (20일 기준)
-                window_size = 20
-                candle_df['stddev'] = candle_df['trade_price'].rolling(window=window_size).std()
-                candle_df['upper_band'] = candle_df['ma20'] + 2 * candle_df['stddev']
-                candle_df['lower_band'] = candle_df['ma20'] - 2 * candle_df['stddev']
-
-                market_buy_df = buy_df[buy_df['market'] == selected_market]
-                market_sell_df = sell_df[sell_df['market'] == selected_market]
+                end = now_kst()
+                start = end - CHART_RANGES[range_label]
+                minute_df = get_data_service().get_minute_candles(selected_market, start)
+                if minute_df.empty:
+                    st.info("표시할 캔들 데이터가 없습니다.")
+                    return
+                candle_df, unit = downsample_ohlc(minute_df, start, end, max_bars())
+
+                # 이동평균선 / 볼린저 밴드 (20개 기준): 지표 엔진이 새 캔들만 반영해 두므로 다시 계산하지 않습니다.
+                indicator_df = get_indicator_engine().get(selected_market, unit, start=candle_df['time'].iloc[0], end=end)
+                candle_df = candle_df.merge(indicator_df, on='time', how='left')
+
+                market_buy_df = clip_markers(buy_df[buy_df['market'] == selected_market], start, end)
+                market_sell_df = clip_markers(sell_df[sell_df['market'] == selected_market], start, end)
                 
                 fig = make_subplots(rows=2, cols=1, shared_xaxes=True, 
-                                    vertical_spacing=0.05, subplot_titles=(f'{selected_market} 가격', '거래량'), 
+                                    vertical_spacing=0.05, subplot_titles=(f'{selected_market} 가격 ({unit}분봉)', '거래량'), 
                                     row_heights=[0.7, 0.3])
 
-                # 캔들스틱 차트
-                fig.add_trace(go.Candlestick(x=candle_df['candle_date_time_kst'],
-                                             open=candle_df['opening_price'],
-                                             high=candle_df['high_price'],
-                                             low=candle_df['low_price'],
-                                             close=candle_df['trade_price'],
-                                             name='캔들',
-                                             increasing_line_color='rgb(30, 150, 255)', decreasing_line_color='rgb(255, 80, 80)'), row=1, col=1)
+                if chart_style == '캔들':
+                    # 캔들스틱 차트
+                    fig.add_trace(go.Candlestick(x=candle_df['time'],
+                                                 open=candle_df['open'],
+                                                 high=candle_df['high'],
+                                                 low=candle_df['low'],
+                                                 close=candle_df['close'],
+                                                 name='캔들',
+                                                 increasing_line_color='rgb(30, 150, 255)', decreasing_line_color='rgb(255, 80, 80)'), row=1, col=1)
+                else:
+                    # 종가 라인 (1분봉 종가를 LTTB로 줄여서 모양을 유지)
+                    line_df = downsample_line(minute_df['time'], minute_df['close'], max_bars() * 2)
+                    fig.add_trace(go.Scatter(x=line_df['time'], y=line_df['value'], mode='lines', name='종가',
+                                             line=dict(color='rgb(30, 150, 255)', width=1.5)), row=1, col=1)
                 
                 # 이동평균선
-                fig.add_trace(go.Scatter(x=candle_df['candle_date_time_kst'], y=candle_df['ma5'], mode='lines', name='MA5', line=dict(color='rgb(0, 150, 136)', width=1)), row=1, col=1)
-                fig.add_trace(go.Scatter(x=candle_df['candle_date_time_kst'], y=candle_df['ma20'], mode='lines', name='MA20', line=dict(color='rgb(156, 39, 176)', width=1)), row=1, col=1)
+                fig.add_trace(go.Scatter(x=candle_df['time'], y=candle_df['ma5'], mode='lines', name='MA5', line=dict(color='rgb(0, 150, 136)', width=1)), row=1, col=1)
+                fig.add_trace(go.Scatter(x=candle_df['time'], y=candle_df['ma20'], mode='lines', name='MA20', line=dict(color='rgb(156, 39, 176)', width=1)), row=1, col=1)
 
                 # 볼린저 밴드
-                fig.add_trace(go.Scatter(x=candle_df['candle_date_time_kst'], y=candle_df['upper_band'], mode='lines', name='Upper Band', line=dict(color='rgba(150, 150, 150, 0.5)', width=1)), row=1, col=1)
-                fig.add_trace(go.Scatter(x=candle_df['candle_date_time_kst'], y=candle_df['lower_band'], mode='lines', name='Lower Band', line=dict(color='rgba(150, 150, 150, 0.5)', width=1), fill='tonexty', fillcolor='rgba(150, 150, 150, 0.1)'), row=1, col=1)
+                fig.add_trace(go.Scatter(x=candle_df['time'], y=candle_df['upper_band'], mode='lines', name='Upper Band', line=dict(color='rgba(150, 150, 150, 0.5)', width=1)), row=1, col=1)
+                fig.add_trace(go.Scatter(x=candle_df['time'], y=candle_df['lower_band'], mode='lines', name='Lower Band', line=dict(color='rgba(150, 150, 150, 0.5)', width=1), fill='tonexty', fillcolor='rgba(150, 150, 150, 0.1)'), row=1, col=1)
 
                 # 매수 마커 강조
                 if not market_buy_df.empty:
@@ -307,15 +329,16 @@ def render_trading_chart(done_df, buy_df, sell_df, assets):
                                              hovertext=market_sell_df.apply(lambda row: f"매도: {row['market']}<br>가격: {row['price']:,}<br>수량: {row['volume']:.8f}<br>시간: {row['created_at']}", axis=1)), row=1, col=1)
 
                 # 현재가 라인 추가
-                try:
-                    current_price_val = get_current_ask_price(selected_market)
+                current_price_val = get_data_service().get_price(selected_market)
+                if current_price_val is not None:
                     fig.add_hline(y=current_price_val, line_dash="dash", line_color="rgb(0, 120, 215)", name="현재가",
                                   annotation_text=f"현재가: {current_price_val:,.2f}",
                                   annotation_position="top right", row=1, col=1)
-                except Exception as e:
-                    st.warning(f"현재가 정보를 가져올 수 없습니다: {e}")
+                else:
+                    st.warning("현재가 정보를 가져올 수 없습니다.")
 
                 # 평균 매수 가격 라인 추가
+                avg_buy_price = None
                 holding_asset = next((asset for asset in assets if f"KRW-{asset['currency']}" == selected_market), None)
                 if holding_asset and float(holding_asset.get('balance', 0)) > 0:
                     avg_buy_price = float(holding_asset.get('avg_buy_price', 0))
@@ -324,15 +347,20 @@ def render_trading_chart(done_df, buy_df, sell_df, assets):
                                   annotation_position="bottom right", row=1, col=1)
 
                 # 거래량 차트
-                fig.add_trace(go.Bar(x=candle_df['candle_date_time_kst'], y=candle_df['candle_acc_trade_volume'], name='거래량', marker_color='rgb(150, 150, 150)'), row=2, col=1)
+                fig.add_trace(go.Bar(x=candle_df['time'], y=candle_df['volume'], name='거래량', marker_color='rgb(150, 150, 150)'), row=2, col=1)
 
                 fig.update_layout(title_text=f'{selected_market} 매매 시점 분석', template='plotly_white',
-                                  xaxis_rangeslider_visible=True, 
+                                  xaxis_rangeslider_visible=False,
                                   legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
                                   height=800,
-                                  xaxis_range=[candle_df['candle_date_time_kst'].iloc[-5], candle_df['candle_date_time_kst'].iloc[-1]] if len(candle_df) >= 5 else None
+                                  xaxis_range=[start, end]
                                  )
-                fig.update_yaxes(title_text="가격 (KRW)", range=[280, 330], row=1, col=1)
+                # y축은 보이는 캔들/마커/기준선에 맞춰 자동으로 정합니다.
+                marker_prices = pd.to_numeric(pd.concat([market_buy_df.get('price', pd.Series(dtype=float)),
+                                                         market_sell_df.get('price', pd.Series(dtype=float))]), errors='coerce')
+                y_range = price_range(candle_df['low'], candle_df['high'],
+                                      extra=[marker_prices.min(), marker_prices.max(), current_price_val, avg_buy_price])
+                fig.update_yaxes(title_text="가격 (KRW)", range=y_range, row=1, col=1)
                 fig.update_yaxes(title_text="거래량", row=2, col=1)
                 
                 st.plotly_chart(fig, use_container_width=True)
@@ -343,9 +371,9 @@ def render_trading_chart(done_df, buy_df, sell_df, assets):
         st.info("분석할 거래 기록이 없습니다.")
 
 
-def render_data_tabs(wait_df, done_df):
-    """주문 대기열과 전체 거래 기록을 탭 형태로 렌더링합니다."""
-    tab1, tab2 = st.tabs(["⏳ 주문 대기열", "📚 전체 거래 기록"])
+def render_data_tabs(wait_df, done_df, ladder_df=None):
+    """주문 대기열, 전체 거래 기록, 엔진의 매수 사다리를 탭 형태로 렌더링합니다."""
+    tab1, tab2, tab3 = st.tabs(["⏳ 주문 대기열", "📚 전체 거래 기록", "🪜 매수 사다리"])
 
     with tab1:
         if not wait_df.empty:
@@ -360,6 +388,12 @@ def render_data_tabs(wait_df, done_df):
     with tab2:
         st.dataframe(done_df, use_container_width=True, hide_index=True)
 
+    with tab3:
+        if ladder_df is not None and not ladder_df.empty:
+            st.dataframe(ladder_df, use_container_width=True, hide_index=True)
+        else:
+            st.info("엔진이 게시한 매수 사다리가 없습니다.")
+
 
 # --- 4. 메인 애플리케이션 실행 ---
 
@@ -383,7 +417,7 @@ def main():
     with tab1:
         render_trading_chart(done_df, buy_df, sell_df, assets)
     with tab2:
-        render_data_tabs(wait_df, done_df)
+        render_data_tabs(wait_df, done_df, get_data_service().ladder_df("buy"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+# streamlit_app/chart_data.py
+
+import numpy as np
+import pandas as pd
+
+from data.candle_store import resample
+
+# --- 차트 데이터 파이프라인 ---
+# 브라우저로 보내는 점 개수를 화면 픽셀 폭에 맞춰 제한합니다.
+# - 캔들: 보이는 기간 / 막대 수에 맞는 단위로 1분봉을 묶음 (시가/고가/저가/종가 보존)
+# - 선: LTTB(Largest-Triangle-Three-Buckets)로 모양을 유지하면서 점을 줄임
+# - 매매 마커: 보이는 기간 안의 것만, 최대 개수까지
+
+CHART_WIDTH_PX = 1200
+PX_PER_BAR = 4
+MAX_MARKERS = 300
+
+# 묶음 단위 후보 (분). 업비트 캔들 단위와 같고, 하루(1440분) 이상은 하루의 배수로 묶습니다.
+NICE_UNITS = [1, 3, 5, 10, 15, 30, 60, 240, 1440]
+
+
+def max_bars(width_px: int = CHART_WIDTH_PX, px_per_bar: int = PX_PER_BAR) -> int:
+    return max(10, width_px // px_per_bar)
+
+
+def choose_unit(start, end, bars: int) -> int:
+    """[start, end) 구간을 bars개 이하의 막대로 그릴 수 있는 가장 작은 단위(분)를 고릅니다."""
+    minutes = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds() / 60
+    need = minutes / bars
+    for unit in NICE_UNITS:
+        if unit >= need:
+            return unit
+    return int(np.ceil(need / 1440)) * 1440
+
+
+def downsample_ohlc(candles: pd.DataFrame, start, end, bars: int) -> tuple:
+    """1분봉(data/candle_store.py 형식)에서 [start, end) 구간을 bars개 이하의 막대로 묶습니다. (막대, 단위) 반환"""
+    times = candles["time"]
+    visible = candles.iloc[times.searchsorted(pd.Timestamp(start)):times.searchsorted(pd.Timestamp(end))]
+    unit = choose_unit(start, end, bars)
+    return resample(visible.reset_index(drop=True), unit), unit
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """
+    선 그래프용 LTTB 다운샘플링입니다. 남길 점의 인덱스를 반환합니다. (처음/마지막 점은 항상 포함)
+    구간 수만큼만 반복하고, 각 구간 안의 계산은 numpy로 한 번에 합니다.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def downsample_line(times: pd.Series, values: pd.Series, n_out: int) -> pd.DataFrame:
+    x = pd.to_datetime(times).to_numpy().astype("datetime64[ns]").astype(np.int64)
+    idx = lttb(x, values.to_numpy(dtype=float), n_out)
+    return pd.DataFrame({"time": times.to_numpy()[idx], "value": values.to_numpy()[idx]})
+
+
+def clip_markers(markers: pd.DataFrame, start, end, time_col: str = "created_at",
+                 limit: int = MAX_MARKERS) -> pd.DataFrame:
+    """보이는 구간의 매매 마커만 남기고, 너무 많으면 고르게 솎아냅니다."""
+    if markers.empty:
+        return markers
+    times = pd.to_datetime(markers[time_col])
+    if getattr(times.dt, "tz", None) is not None:
+        times = times.dt.tz_localize(None)
+    visible = markers[(times >= pd.Timestamp(start)) & (times < pd.Timestamp(end))]
+    if len(visible) > limit:
+        visible = visible.iloc[np.linspace(0, len(visible) - 1, limit).astype(np.int64)]
+    return visible
+
+
+def price_range(lows, highs, extra=(), pad: float = 0.02):
+    """보이는 데이터의 최저/최고가에 여유(pad)를 더한 y축 범위입니다."""
+    values = [np.nanmin(lows), np.nanmax(highs)] + [v for v in extra if v is not None and np.isfinite(v)]
+    lo, hi = min(values), max(values)
+    margin = (hi - lo) * pad or abs(hi) * pad
+    return [lo - margin, hi + margin]
@@ -0,0 +1,168 @@
+# streamlit_app/data_service.py
+
+import threading
+import time
+from datetime import timedelta
+import pandas as pd
+
+from api.order import get_orders
+from api.account import get_accounts
+from api.price import get_current_ask_prices
+from data.candle_store import get_candle_store, now_kst, to_upbit
+from utils.log import get_logger
+
+log = get_logger("streamlit_app.data_service")
+
+
+class DashboardDataService:
+    """
+    # --- [대시보드 데이터 서비스] ---
+    # 모든 브라우저 세션이 하나의 인스턴스를 공유합니다. (app.py의 st.cache_resource)
+    # 거래소 조회는 refresh_interval 마다 한 번만 일어나고, 그 사이의 요청은 메모리 데이터를 그대로 사용합니다.
+    # - 계좌 / 미체결 주문 / 현재가 / 사다리: 엔진이 사이클마다 게시한 스냅샷(manager/market_snapshot.py)을 읽습니다.
+    #             스냅샷이 오래됐거나(엔진 정지) 읽을 수 없을 때만 거래소를 조회합니다.
+    # - 체결 주문: 로컬 DB(manager/order_sync.py가 동기화)에서 마지막 조회 이후 바뀐 주문만 읽습니다.
+    #             DB를 쓸 수 없으면 거래소에서 이미 본 uuid가 나올 때까지의 새 주문만 가져옵니다.
+    # - 현재가: 필요한 마켓을 모아 한 번의 호가 조회로 가져옵니다.
+    # - 캔들: 마켓별 1분봉만 받아 두고(data/candle_store.py), 차트 단위는 1분봉을 묶어서 만듭니다.
+    """
+
+    def __init__(self, refresh_interval: int = 60, max_pages: int = 10, snapshot_reader=None):
+        self.refresh_interval = refresh_interval
+        self.max_pages = max_pages
+        self.snapshot_reader = snapshot_reader
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._done_orders = {}  # uuid -> 주문 (최신 주문이 앞쪽)
+        self._wait_orders = []
+        self._accounts = []
+        self._prices = {}
+        self._ladder = {"buy": [], "sell": []}
+        self._done_df = pd.DataFrame()
+        self._db_updated_since = None
+        self.candle_store = get_candle_store()
+        self._candles_fetched_at = {}  # market -> (1분봉 갱신 시각, 가장 앞쪽으로 받아 둔 시각)
+
+    # --- 데이터 갱신 ---
+
+    def refresh(self, force: bool = False) -> None:
+        with self._lock:
+            if not force and time.time() - self._last_refresh < self.refresh_interval:
+                return
+            try:
+                self._load_new_done_orders_from_db()
+            except Exception as e:
+                log.warning("DB 주문 조회 실패 → 거래소 조회로 대체: %s", e)
+                self._fetch_new_done_orders()
+            if self._read_snapshot():
+                self._wait_orders = self.snapshot_reader.open_orders()
+                self._accounts = self.snapshot_reader.accounts()
+                self._ladder = self.snapshot_reader.ladder()
+                self._prices = self._fetch_prices(self.snapshot_reader.prices())
+            else:
+                self._wait_orders = get_orders(state='wait')
+                self._accounts = get_accounts()
+                self._prices = self._fetch_prices()
+            self._last_refresh = time.time()
+
+    def _read_snapshot(self) -> bool:
+        if self.snapshot_reader is None:
+            return False
+        try:
+            if self.snapshot_reader.refresh():
+                return True
+            log.warning("엔진 스냅샷이 없거나 오래됨 (경과: %.0f초) → 거래소 조회로 대체", self.snapshot_reader.age() or 0)
+        except Exception as e:
+            log.warning("스냅샷 조회 실패 → 거래소 조회로 대체: %s", e)
+        return False
+
+    def _load_new_done_orders_from_db(self) -> None:
+        # DB 설정이 없는 환경에서도 대시보드가 뜰 수 있도록 여기서 불러옵니다.
+        from db.db_utils import fetch_orders
+
+        rows = fetch_orders(state="done", updated_since=self._db_updated_since)
+        if not rows:
+            return
+        self._db_updated_since = max(r["updated_at"] for r in rows)
+        for r in rows:
+            r.pop("updated_at", None)
+            r["created_at"] = pd.Timestamp(r["created_at"]).tz_localize("Asia/Seoul").isoformat()
+        self._merge_done_orders(rows)
+
+    def _merge_done_orders(self, new_orders: list) -> None:
+        merged = {o["uuid"]: o for o in new_orders}
+        for uuid, order in self._done_orders.items():
+            merged.setdefault(uuid, order)
+        merged = dict(sorted(merged.items(), key=lambda item: str(item[1].get("created_at")), reverse=True))
+        self._done_orders = merged
+        self._done_df = pd.DataFrame(list(merged.values()))
+
+    def _fetch_new_done_orders(self) -> None:
+        """최신 주문부터 페이지를 넘기며, 이미 받은 uuid를 만나면 멈춥니다."""
+        new_orders = []
+        for page in range(1, self.max_pages + 1):
+            orders = get_orders(state='done', page=page)
+            fresh = [o for o in orders if o.get("uuid") not in self._done_orders]
+            new_orders.extend(fresh)
+            # 처음 조회할 때는 첫 페이지만 가져옵니다. (기존 대시보드와 동일한 범위)
+            if len(fresh) < len(orders) or len(orders) < 100 or not self._done_orders:
+                break
+
+        if new_orders:
+            self._merge_done_orders(new_orders)
+
+    def _fetch_prices(self, known: dict = None) -> dict:
+        """필요한 마켓의 현재가. known(스냅샷의 현재가)에 없는 마켓만 한 번에 조회합니다."""
+        known = dict(known or {})
+        markets = {f"KRW-{a['currency']}" for a in self._accounts if a.get('currency') != 'KRW'}
+        markets |= {o["market"] for o in self._wait_orders if "market" in o}
+        markets |= {o["market"] for o in self._done_orders.values() if "market" in o}
+        missing = sorted(markets - set(known))
+        if not missing:
+            return known
+        try:
+            return {**known, **get_current_ask_prices(missing)}
+        except Exception as e:
+            log.warning("현재가 일괄 조회 실패: %s", e)
+            return {**self._prices, **known}
+
+    # --- 조회 (호출한 쪽에서 수정해도 공유 데이터가 바뀌지 않도록 복사본을 반환합니다) ---
+
+    def done_df(self) -> pd.DataFrame:
+        return self._done_df.copy()
+
+    def wait_df(self) -> pd.DataFrame:
+        return pd.DataFrame(self._wait_orders)
+
+    def accounts(self) -> list:
+        return [dict(a) for a in self._accounts]
+
+    def get_price(self, market: str):
+        return self._prices.get(market)
+
+    def ladder_df(self, side: str = "buy") -> pd.DataFrame:
+        """엔진이 게시한 매수 사다리(buy) / 매도 주문(sell) 기록 (스냅샷을 쓸 수 없으면 빈 표)"""
+        return pd.DataFrame(self._ladder.get(side, []))
+
+    def _ensure_candles(self, market: str, start) -> None:
+        """refresh_interval 마다, 또는 더 앞쪽 기간이 필요할 때만 캔들 저장소를 갱신합니다."""
+        with self._lock:
+            fetched_at, fetched_from = self._candles_fetched_at.get(market, (0.0, None))
+            if time.time() - fetched_at >= self.refresh_interval or fetched_from is None or start < fetched_from:
+                self.candle_store.update(market, start=start)
+                earliest = start if fetched_from is None else min(start, fetched_from)
+                self._candles_fetched_at[market] = (time.time(), earliest)
+
+    def get_candles(self, market: str, unit: int = 5, count: int = 200) -> pd.DataFrame:
+        """
+        캔들 저장소의 1분봉을 마지막 캔들 이후만 갱신한 뒤, 원하는 단위로 묶어서 반환합니다.
+        단위를 바꿔도 거래소 조회가 추가로 일어나지 않습니다. (더 긴 기간이 필요할 때만 앞부분을 받음)
+        """
+        self._ensure_candles(market, now_kst() - timedelta(minutes=unit * count))
+        return to_upbit(self.candle_store.get_candles(market, unit=unit, count=count))
+
+    def get_minute_candles(self, market: str, start) -> pd.DataFrame:
+        """start 이후의 1분봉을 저장소 형식 그대로 반환합니다. (차트에서 보이는 기간에 맞게 묶어서 사용)"""
+        start = pd.Timestamp(start)
+        self._ensure_candles(market, start)
+        return self.candle_store.get_candles(market, unit=1, start=start)
@@ -0,0 +1,51 @@
+# tests/test_auth.py
+
+import hashlib
+import jwt
+
+import core.config as config
+from api.auth import generate_jwt_token
+
+
+SECRET = "test-secret-key-for-hs256-signing-only"
+
+
+def run_auth_test():
+    print("[TEST] api.auth 테스트 시작")
+
+    saved = {name: config.__dict__[name] for name in ("ACCESS_KEY", "SECRET_KEY") if name in config.__dict__}
+    config.ACCESS_KEY, config.SECRET_KEY = "test-access", SECRET
+    try:
+        def payload(query=None) -> dict:
+            token = generate_jwt_token(query)
+            assert token.startswith("Bearer ")
+            return jwt.decode(token[len("Bearer "):], SECRET, algorithms=["HS256"])
+
+        def sha512(text: str) -> str:
+            return hashlib.sha512(text.encode()).hexdigest()
+
+        # 쿼리가 없으면 해시를 넣지 않습니다.
+        plain = payload()
+        assert plain["access_key"] == "test-access" and "query_hash" not in plain
+
+        # 배열 파라미터는 키를 반복하고, 이스케이프하지 않은 문자열(업비트 규격)을 해시합니다.
+        signed = payload({"uuids[]": ["a", "b"], "state": "done"})
+        assert signed["query_hash"] == sha512("uuids[]=a&uuids[]=b&state=done")
+        assert signed["query_hash_alg"] == "SHA512"
+
+        # 한글 값도 퍼센트 인코딩하지 않은 원문으로 해시합니다.
+        assert payload({"market": "KRW-BTC", "identifier": "매수-1"})["query_hash"] == \
+            sha512("market=KRW-BTC&identifier=매수-1")
+
+        # 요청마다 nonce가 달라야 합니다.
+        assert payload()["nonce"] != payload()["nonce"]
+    finally:
+        for name in ("ACCESS_KEY", "SECRET_KEY"):
+            config.__dict__.pop(name, None)
+        config.__dict__.update(saved)
+
+    print("[TEST] ✅ 인증 토큰 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_auth_test()
@@ -0,0 +1,138 @@
+# tests/test_backtest_analytics.py
+
+import numpy as np
+import pandas as pd
+import utils.db as db
+from manager.backtest_analytics import (
+    round_trips, drawdowns, drawdown_periods, ladder_depth_histogram, compare_runs, load_run, load_db_runs,
+)
+from manager.result_writer import SIGNAL_BUY, SIGNAL_STOP_LOSS, SIGNAL_SELL
+
+
+def _run(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=["signal", "total_buy_amount", "realized_pnl", "total_fee", "portfolio_value"])
+    df["time"] = pd.date_range("2025-04-10 09:00", periods=len(df), freq="1min")
+    df["trade_amount"] = 5000.0
+    return df
+
+
+def run_backtest_analytics_test():
+    print("[TEST] manager.backtest_analytics 테스트 시작")
+
+    initial, small, large = SIGNAL_BUY["initial"], SIGNAL_BUY["small_flow"], SIGNAL_BUY["large_flow"]
+    df = _run([
+        # 거래 1: initial → small_flow → 익절
+        (initial, 5000, 0, 2.5, 1000),
+        (0, 5000, 0, 2.5, 990),
+        (small, 15000, 0, 7.5, 980),
+        (SIGNAL_SELL, 0, 120, 15.0, 1100),
+        # 거래 2: initial + large_flow 동시 → 손절
+        (initial | large, 40000, 120, 35.0, 1050),
+        (SIGNAL_STOP_LOSS, 0, -900, 55.0, 900),
+        # 거래 3: 아직 청산되지 않음 (제외)
+        (initial, 5000, -900, 57.5, 900),
+    ])
+
+    trips = round_trips(df)
+    assert len(trips) == 2
+    assert trips["ladder_depth"].tolist() == [2, 2]
+    assert trips["pnl"].tolist() == [120, -1020]
+    assert trips["fee"].tolist() == [15.0, 40.0]
+    assert trips["invested"].tolist() == [15000, 40000]
+    assert trips["exit"].tolist() == ["take_profit", "stop_loss"]
+    assert ladder_depth_histogram(trips).to_dict() == {2: 2}
+
+    dd = drawdowns(df)
+    assert np.isclose(dd["drawdown_pct"].max(), (1 - 900 / 1100) * 100)
+    periods = drawdown_periods(dd)
+    assert periods["start"].iloc[0] == df["time"].iloc[4]
+
+    table = compare_runs({"a": df, "b": df.iloc[:4]}, window=2)
+    assert list(table.index) == ["a", "b"]
+    assert table.loc["b", "trips"] == 1
+
+    print("[TEST] ✅ 백테스트 분석 테스트 통과")
+
+
+class FakeCursor:
+    """backtest_result 조회 흉내: 실행 목록(GROUP BY) 또는 run_key / market으로 거른 행을 돌려줍니다."""
+
+    columns = ["run_key", "time", "market", "signal", "total_buy_amount", "realized_pnl", "total_fee",
+               "portfolio_value", "trade_amount"]
+
+    def __init__(self, table: list, queries: list):
+        self.table = table
+        self.queries = queries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.queries.append((query, list(params)))
+        if "GROUP BY" in query:
+            keys = sorted({row[0] for row in self.table if row[2] == params[0]})
+            self.description = [("run_key",)]
+            self.rows = [(key,) for key in keys]
+        else:
+            self.description = [(c,) for c in self.columns]
+            self.rows = [row for row in self.table if row[0] == params[0] and row[2] == params[1]]
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, table: list, queries: list):
+        self.table = table
+        self.queries = queries
+
+    def cursor(self):
+        return FakeCursor(self.table, self.queries)
+
+    def close(self):
+        pass
+
+
+def run_load_db_run_test():
+    print("[TEST] manager.backtest_analytics DB 실행 비교 테스트 시작")
+
+    times = pd.date_range("2025-04-10 09:00", periods=3, freq="1min")
+    table = [(key, t.to_pydatetime(), market, label, 0.0, 0.0, 0.0, value, 0.0)
+             for key, market, values in [("k1", "KRW-AAA", [1000, 1010, 1020]),
+                                         ("k2", "KRW-AAA", [1000, 990, 980]),
+                                         ("k1", "KRW-BBB", [1000, 1000, 1000])]
+             for t, label, value in zip(times, ["보유"] * 3, values)]
+    queries = []
+    original = db._connect
+    db._connect = lambda: FakeConnection(table, queries)
+    try:
+        # DB 결과는 실행 키 없이 읽지 않습니다. (다른 파라미터의 결과가 섞이므로)
+        try:
+            load_run("db", "KRW-AAA")
+            raise AssertionError("ValueError가 나야 합니다.")
+        except ValueError:
+            pass
+
+        # 한 실행의 한 마켓만 읽습니다.
+        run = load_run("db", "KRW-AAA", run_key="k2")
+        assert run["portfolio_value"].tolist() == [1000, 990, 980] and set(run["run_key"]) == {"k2"}
+        assert "run_key = %s AND market = %s" in queries[-1][0] and queries[-1][1] == ["k2", "KRW-AAA"]
+
+        # 마켓의 실행을 모두 읽어 나란히 비교하고, 표에 실행 키를 함께 보여 줍니다.
+        runs = load_db_runs("KRW-AAA")
+        assert list(runs) == ["db:KRW-AAA:k1", "db:KRW-AAA:k2"]
+        table = compare_runs(runs, window=2)
+        assert table["run_key"].tolist() == ["k1", "k2"]
+        assert table.loc["db:KRW-AAA:k1", "total_return_pct"] > 0 > table.loc["db:KRW-AAA:k2", "total_return_pct"]
+    finally:
+        db._connect = original
+
+    print("[TEST] ✅ DB 실행 비교 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_backtest_analytics_test()
+    run_load_db_run_test()
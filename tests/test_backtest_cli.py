@@ -0,0 +1,74 @@
+# tests/test_backtest_cli.py
+
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import data.candle_store as candle_store
+from data.candle_store import CandleStore
+from manager.backtest_cli import build_jobs, load_param_sets, parse_range, run_jobs
+
+PARAMS = {"unit_size": 5000, "small_flow_pct": 0.01, "small_flow_units": 2,
+          "large_flow_pct": 0.03, "large_flow_units": 5, "take_profit_pct": 0.005}
+
+
+def _minute_candles(market: str, start: str, n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1000 + rng.normal(0, 5, n).cumsum()
+    return pd.DataFrame({
+        "time": pd.date_range(start, periods=n, freq="1min"),
+        "market": market,
+        "open": close, "high": close + 3, "low": close - 3, "close": close,
+        "volume": rng.uniform(0, 10, n), "value": rng.uniform(0, 10000, n),
+    })
+
+
+def run_backtest_cli_test():
+    print("[TEST] manager.backtest_cli 테스트 시작")
+
+    with tempfile.TemporaryDirectory() as root:
+        # JSON 격자는 모든 조합으로 펼치고, CSV의 market 컬럼은 그 마켓에만 적용합니다.
+        grid_path = os.path.join(root, "grid.json")
+        with open(grid_path, "w") as f:
+            json.dump({**PARAMS, "take_profit_pct": [0.005, 0.01], "small_flow_units": [2, 3]}, f)
+        grid = load_param_sets(grid_path)
+        assert len(grid) == 4 and all(market is None for market, _ in grid)
+
+        csv_path = os.path.join(root, "setting.csv")
+        pd.DataFrame([{"market": "KRW-AAA", **PARAMS}]).to_csv(csv_path, index=False)
+        assert load_param_sets(csv_path) == [("KRW-AAA", PARAMS)]
+
+        ranges = [parse_range("2025-04-10 00:00..2025-04-11 00:00")]
+        jobs = build_jobs(["KRW-AAA", "KRW-BBB"], ranges, [1, 5], grid + load_param_sets(csv_path))
+        assert len(jobs) == 2 * 2 * 4  # CSV 행은 격자의 첫 조합과 같으므로 한 번만 실행합니다.
+
+        # 저장된 캔들만으로 실행합니다. (거래소에 묻지 않음) 캔들이 없는 마켓은 0개로 요약에 남습니다.
+        candle_store._default_store = CandleStore(os.path.join(root, "candles"))
+        candle_store._default_store.append("KRW-AAA", _minute_candles("KRW-AAA", "2025-04-10 00:00", 1440))
+        try:
+            jobs = build_jobs(["KRW-AAA", "KRW-ZZZ"], ranges, [1, 5], grid[:2])
+            summary = run_jobs(jobs, 1, ("parquet",), True, os.path.join(root, "runs"))
+            assert "error" not in summary, summary
+            aaa = summary[summary["market"] == "KRW-AAA"]
+            assert set(aaa[aaa["unit"] == 1]["candles"]) == {1440}
+            assert set(aaa[aaa["unit"] == 5]["candles"]) == {288}
+            assert aaa["run_dir"].map(os.path.isdir).all()
+            assert (summary[summary["market"] == "KRW-ZZZ"]["candles"] == 0).all()
+
+            # 다시 실행하면 체크포인트에서 이어서 계산하므로 새로 처리할 캔들이 없습니다.
+            again = run_jobs(jobs, 1, ("parquet",), True, os.path.join(root, "runs"))
+            assert again["candles"].sum() == 0
+            assert list(again[again["market"] == "KRW-AAA"]["final_value"]) == list(aaa["final_value"])
+
+            # 결과를 남기지 않으면 체크포인트도 만들지 않습니다.
+            summary = run_jobs(jobs[:1], 1, (), True, os.path.join(root, "none"))
+            assert summary["run_dir"].isna().all() and not os.path.exists(os.path.join(root, "none"))
+        finally:
+            candle_store._default_store = None
+
+    print("[TEST] ✅ 백테스트 CLI 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_backtest_cli_test()
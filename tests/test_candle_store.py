@@ -0,0 +1,117 @@
+# tests/test_candle_store.py
+
+import tempfile
+import numpy as np
+import pandas as pd
+import data.candle_store as candle_store
+from data.candle_store import CandleStore, resample
+
+
+def _minute_candles(start: str, n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1000 + rng.normal(0, 5, n).cumsum()
+    return pd.DataFrame({
+        "time": pd.date_range(start, periods=n, freq="1min"),
+        "market": "KRW-AAA",
+        "open": close + rng.normal(0, 1, n),
+        "high": close + 3,
+        "low": close - 3,
+        "close": close,
+        "volume": rng.uniform(0, 10, n),
+        "value": rng.uniform(0, 10000, n),
+    })
+
+
+def _expected(df: pd.DataFrame, unit: int) -> pd.DataFrame:
+    # 업비트 기준(UTC 00:00 정렬)으로 pandas resample 결과를 만들어 비교합니다.
+    grouped = df.set_index("time").resample(f"{unit}min", offset="9h")
+    out = grouped.agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum", "value": "sum"})
+    return out.dropna(subset=["open"]).reset_index()
+
+
+def run_candle_store_test():
+    print("[TEST] data.candle_store 리샘플링 테스트 시작")
+
+    # 거래가 없는 구간(빈 1분봉)이 있어도 같은 결과가 나와야 합니다.
+    base = _minute_candles("2025-04-10 08:00", 2000)
+    base = base.drop(index=range(300, 340)).reset_index(drop=True)
+
+    for unit in (3, 5, 15, 60, 240):
+        result = resample(base, unit)
+        expected = _expected(base, unit)
+        assert len(result) == len(expected), unit
+        for col in ("open", "high", "low", "close", "volume", "value"):
+            assert np.allclose(result[col].to_numpy(), expected[col].to_numpy()), (unit, col)
+        assert (result["time"].to_numpy() == expected["time"].to_numpy()).all(), unit
+
+    # 240분봉은 KST 09시, 13시 ... 에 시작합니다.
+    assert resample(base, 240)["time"].iloc[1] == pd.Timestamp("2025-04-10 09:00")
+
+    # 새 1분봉이 들어오면(진행 중이던 마지막 캔들 갱신 포함) 캐시된 묶음도 바뀌어야 합니다.
+    full = _minute_candles("2025-04-10 08:00", 1500, seed=1)
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        store.append("KRW-AAA", full.iloc[:1000])
+        before = store.get_candles("KRW-AAA", 15)
+        store.append("KRW-AAA", full.iloc[999:])
+        after = store.get_candles("KRW-AAA", 15)
+        assert len(after) > len(before)
+        assert np.allclose(after["close"].to_numpy(), resample(full, 15)["close"].to_numpy())
+        assert after.iloc[:len(before) - 1].equals(before.iloc[:-1])
+
+        # 저장한 1분봉은 새 인스턴스에서도 그대로 읽힙니다.
+        reloaded = CandleStore(root).get_candles("KRW-AAA", 5, count=10)
+        assert reloaded.equals(store.get_candles("KRW-AAA", 5, count=10))
+
+    print("[TEST] ✅ 캔들 저장소 테스트 통과")
+
+
+def run_candle_update_test():
+    print("[TEST] data.candle_store.CandleStore.update 테스트 시작")
+
+    source = _minute_candles("2025-04-10 00:00", 6 * 60)
+    calls = []
+
+    def fake_fetch(market, unit, start, end):
+        calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        rows = source[(source["time"] >= start) & (source["time"] < end)]
+        return [{"market": market, "candle_date_time_kst": t.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "opening_price": o, "high_price": h, "low_price": l, "trade_price": c,
+                 "candle_acc_trade_volume": v, "candle_acc_trade_price": p}
+                for t, o, h, l, c, v, p in zip(rows["time"], rows["open"], rows["high"], rows["low"],
+                                               rows["close"], rows["volume"], rows["value"])]
+
+    original = candle_store.fetch_minute_candles
+    candle_store.fetch_minute_candles = fake_fetch
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            store = CandleStore(root)
+            store.update("KRW-AAA", "2025-04-10 00:00", "2025-04-10 01:00")
+            assert len(store.get_candles("KRW-AAA")) == 60
+
+            # 저장된 구간 뒤로 떨어진 구간을 요청하면 그 사이도 함께 받습니다.
+            store.update("KRW-AAA", "2025-04-10 05:00", "2025-04-10 06:00")
+            assert calls[-1] == (pd.Timestamp("2025-04-10 00:59"), pd.Timestamp("2025-04-10 06:00"))
+
+            # 그래서 나중에 사이 구간을 요청하면 이미 저장되어 있습니다. (다시 받지 않음)
+            calls.clear()
+            store.update("KRW-AAA", "2025-04-10 03:00", "2025-04-10 04:00")
+            assert calls == []
+            assert len(store.get_candles("KRW-AAA", 1, "2025-04-10 03:00", "2025-04-10 04:00")) == 60
+
+        # 저장된 구간 앞쪽으로 떨어진 구간도 처음 캔들까지 이어서 받습니다.
+        with tempfile.TemporaryDirectory() as root:
+            store = CandleStore(root)
+            store.update("KRW-AAA", "2025-04-10 04:00", "2025-04-10 06:00")
+            store.update("KRW-AAA", "2025-04-10 00:00", "2025-04-10 01:00")
+            assert calls[-1] == (pd.Timestamp("2025-04-10 00:00"), pd.Timestamp("2025-04-10 04:00"))
+            assert store.get_candles("KRW-AAA")["time"].tolist() == source["time"].tolist()
+    finally:
+        candle_store.fetch_minute_candles = original
+
+    print("[TEST] ✅ 캔들 저장소 구간 보충 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_candle_store_test()
+    run_candle_update_test()
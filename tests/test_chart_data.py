@@ -0,0 +1,55 @@
+# tests/test_chart_data.py
+
+import numpy as np
+import pandas as pd
+from streamlit_app.chart_data import choose_unit, downsample_ohlc, lttb, clip_markers, price_range
+
+
+def run_chart_data_test():
+    print("[TEST] streamlit_app.chart_data 테스트 시작")
+
+    # 1. 90일치 1분봉(약 13만 개)을 300개 이하의 막대로 묶어도 최고/최저가는 그대로여야 합니다.
+    n = 90 * 24 * 60
+    rng = np.random.default_rng(0)
+    close = 300 + rng.normal(0, 0.5, n).cumsum()
+    candles = pd.DataFrame({
+        "time": pd.date_range("2025-01-01", periods=n, freq="1min"),
+        "market": "KRW-AAA",
+        "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "volume": 1.0, "value": 1.0,
+    })
+    start, end = candles["time"].iloc[0], candles["time"].iloc[-1] + pd.Timedelta(minutes=1)
+    bars, unit = downsample_ohlc(candles, start, end, 300)
+    assert unit == choose_unit(start, end, 300) == 1440
+    assert len(bars) <= 300
+    assert bars["high"].max() == candles["high"].max()
+    assert bars["low"].min() == candles["low"].min()
+    assert bars["volume"].sum() == n
+
+    assert choose_unit(start, start + pd.Timedelta(hours=6), 300) == 3
+
+    # 2. LTTB는 처음/마지막 점과 뾰족한 극값을 남겨야 합니다.
+    y = np.zeros(10_000)
+    y[4321] = 100
+    idx = lttb(np.arange(10_000), y, 200)
+    assert len(idx) == 200 and idx[0] == 0 and idx[-1] == 9_999
+    assert 4321 in idx
+    assert (np.diff(idx) > 0).all()
+
+    # 3. 마커는 보이는 구간만, 최대 개수까지
+    markers = pd.DataFrame({
+        "created_at": [t.isoformat() + "+09:00" for t in pd.date_range("2025-01-01", periods=1000, freq="1h")],
+        "price": 300.0,
+    })
+    visible = clip_markers(markers, "2025-01-10", "2025-01-20", limit=100)
+    assert len(visible) == 100
+    assert pd.to_datetime(visible["created_at"]).dt.tz_localize(None).min() >= pd.Timestamp("2025-01-10")
+
+    lo, hi = price_range(pd.Series([290.0]), pd.Series([310.0]), extra=[320.0, None])
+    assert lo < 290 and hi > 320
+
+    print("[TEST] ✅ 차트 데이터 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_chart_data_test()
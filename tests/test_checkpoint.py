@@ -0,0 +1,120 @@
+# tests/test_checkpoint.py
+
+import json
+import os
+import tempfile
+from collections import Counter
+import data.candle_store as candle_store
+import manager.simulator as simulator
+import utils.db as db
+from data.candle_store import CandleStore
+from manager.simulator import run_backtest
+from tests.test_backtest_cli import PARAMS, _minute_candles
+
+
+class FakeCursor:
+    """backtest_result 테이블 대신 (run_key, market, time) 행 목록에 DELETE / INSERT를 반영합니다."""
+
+    def __init__(self, table: list):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if not sql.lstrip().startswith("DELETE"):
+            return  # 테이블 / 컬럼 준비(DDL)
+        key, market, start, end = params
+        self.table[:] = [row for row in self.table
+                         if not (row[0] == key and row[1] == market and start <= row[2] <= end)]
+
+    def executemany(self, sql, rows):
+        self.table.extend((row[0], row[2], row[1].to_pydatetime()) for row in rows)
+
+
+class FakeConnection:
+    def __init__(self, table: list):
+        self.table = table
+
+    def cursor(self):
+        return FakeCursor(self.table)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _checkpoint(run_dir: str) -> dict:
+    with open(os.path.join(run_dir, "checkpoint.json")) as f:
+        return json.load(f)
+
+
+def run_checkpoint_test():
+    print("[TEST] manager.simulator 체크포인트 테스트 시작")
+
+    with tempfile.TemporaryDirectory() as root:
+        candle_store._default_store = CandleStore(os.path.join(root, "candles"))
+        candle_store._default_store.append("KRW-AAA", _minute_candles("KRW-AAA", "2025-04-10 00:00", 2880))
+        original_connect, original_save = db._connect, simulator.save_checkpoint
+        try:
+            def run(end, runs="runs", sinks=("parquet",)):
+                return run_backtest("KRW-AAA", "2025-04-10 00:00", end, 1, PARAMS, sinks=sinks,
+                                    checkpoint_dir=os.path.join(root, runs), update_candles=False)
+
+            # 1. 더 늦은 종료일까지 계산된 체크포인트는 이어 쓰지 않고, 종료일 전용 디렉터리에서 따로 계산합니다.
+            long = run("2025-04-12 00:00")
+            saved = _checkpoint(long["run_dir"])
+            short = run("2025-04-11 00:00")
+            fresh = run("2025-04-11 00:00", runs="fresh")
+            assert short["run_dir"] != long["run_dir"] and short["candles"] == 1440
+            assert str(short["last_time"]) == "2025-04-10 23:59:00"
+            assert short["final_value"] == fresh["final_value"] != long["final_value"]
+            assert _checkpoint(long["run_dir"]) == saved
+
+            # 같은 종료일로 다시 실행하면 그 디렉터리의 체크포인트에서 이어서 계산합니다.
+            again = run("2025-04-11 00:00")
+            assert again["run_dir"] == short["run_dir"] and again["candles"] == 0
+            assert again["final_value"] == short["final_value"]
+
+            # 2. DB 결과는 같은 실행의 같은 구간을 지운 뒤 넣으므로, 결과 저장 후 체크포인트 저장 전에 종료되어도 중복되지 않습니다.
+            table = []
+            db._connect = lambda: FakeConnection(table)
+
+            def crash(*args, **kwargs):
+                raise RuntimeError("체크포인트 저장 전 종료")
+            simulator.save_checkpoint = crash
+            try:
+                run("2025-04-11 00:00", runs="db", sinks=("db",))
+                raise AssertionError("종료되지 않았습니다")
+            except RuntimeError:
+                pass
+            assert len(table) == 1440
+
+            simulator.save_checkpoint = original_save
+            resumed = run("2025-04-11 00:00", runs="db", sinks=("db",))
+            assert resumed["candles"] == 1440 and resumed["final_value"] == fresh["final_value"]
+            assert len(table) == len(set(table)) == 1440 and {row[0] for row in table} == {resumed["run_key"]}
+
+            # 같은 마켓 / 구간이라도 파라미터가 다른 실행의 행은 지우지 않습니다.
+            other = run_backtest("KRW-AAA", "2025-04-10 00:00", "2025-04-11 00:00", 1,
+                                 {**PARAMS, "take_profit_pct": 0.01}, sinks=("db",),
+                                 checkpoint_dir=os.path.join(root, "db"), update_candles=False)
+            assert other["run_key"] != resumed["run_key"]
+            assert sorted(Counter(row[0] for row in table).values()) == [1440, 1440]
+        finally:
+            db._connect, simulator.save_checkpoint = original_connect, original_save
+            candle_store._default_store = None
+
+    print("[TEST] ✅ 체크포인트 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_checkpoint_test()
@@ -0,0 +1,104 @@
+# tests/test_data_service.py
+
+import db.db_utils
+import streamlit_app.data_service as data_service
+from streamlit_app.data_service import DashboardDataService
+
+
+def _order(uuid: str, market: str = "KRW-AAA", hour: int = 9) -> dict:
+    return {"uuid": uuid, "market": market, "state": "done", "created_at": f"2025-04-10T{hour:02d}:00:00+09:00"}
+
+
+class FakeExchange:
+    """거래소 조회 흉내: done 주문은 최신순으로 한 페이지 100개씩 돌려줍니다."""
+
+    def __init__(self, done_orders: list):
+        self.done_orders = done_orders
+        self.pages = []
+        self.price_calls = []
+
+    def get_orders(self, state, page=1, **kwargs):
+        if state == "wait":
+            return [{"uuid": "w1", "market": "KRW-BBB", "state": "wait"}]
+        self.pages.append(page)
+        return self.done_orders[(page - 1) * 100:page * 100]
+
+    def get_accounts(self):
+        return [{"currency": "KRW", "balance": "1000"}, {"currency": "CCC", "balance": "1"}]
+
+    def get_current_ask_prices(self, markets):
+        self.price_calls.append(list(markets))
+        return {market: 10.0 for market in markets}
+
+
+def run_data_service_test():
+    print("[TEST] streamlit_app.data_service 테스트 시작")
+
+    exchange = FakeExchange([_order(f"d{i}", hour=9 + i % 10) for i in range(250)])
+    patched = ("get_orders", "get_accounts", "get_current_ask_prices")
+    originals = {name: getattr(data_service, name) for name in patched}
+    original_fetch = db.db_utils.fetch_orders
+    for name in patched:
+        setattr(data_service, name, getattr(exchange, name))
+    try:
+        # 1. DB를 쓸 수 없으면 거래소 조회로 대체합니다. 처음에는 첫 페이지만 받습니다.
+        def broken_fetch(**kwargs):
+            raise ConnectionError("DB 연결 실패")
+        db.db_utils.fetch_orders = broken_fetch
+
+        service = DashboardDataService(refresh_interval=3600)
+        service.refresh(force=True)
+        assert exchange.pages == [1] and len(service.done_df()) == 100
+        assert service.wait_df()["uuid"].tolist() == ["w1"]
+
+        # 현재가는 보유 / 미체결 / 체결 마켓을 모아 한 번에 조회합니다.
+        assert exchange.price_calls == [["KRW-AAA", "KRW-BBB", "KRW-CCC"]]
+        assert service.get_price("KRW-CCC") == 10.0
+
+        # refresh_interval 안에서는 다시 조회하지 않습니다.
+        service.refresh()
+        assert exchange.pages == [1]
+
+        # 새 주문이 생기면 이미 받은 uuid를 만나는 페이지에서 멈춥니다.
+        exchange.done_orders = [_order("new1", hour=23), _order("new2", hour=22)] + exchange.done_orders
+        exchange.pages.clear()
+        service.refresh(force=True)
+        assert exchange.pages == [1] and len(service.done_df()) == 102
+        assert service.done_df()["uuid"].tolist()[:2] == ["new1", "new2"]
+
+        # 2. DB를 쓸 수 있으면 마지막 updated_at 이후의 주문만 읽습니다.
+        cursors = []
+
+        def fetch(state="done", market=None, updated_since=None):
+            cursors.append(updated_since)
+            if updated_since is None:
+                return [{**_order("db1"), "updated_at": "2025-04-10 09:00:01", "created_at": "2025-04-10 09:00:00"}]
+            return []
+        db.db_utils.fetch_orders = fetch
+
+        service = DashboardDataService(refresh_interval=0)
+        exchange.pages.clear()
+        service.refresh(force=True)
+        service.refresh(force=True)
+        assert cursors == [None, "2025-04-10 09:00:01"] and exchange.pages == []
+        done = service.done_df()
+        assert done["uuid"].tolist() == ["db1"] and "updated_at" not in done.columns
+        assert done["created_at"].iloc[0] == "2025-04-10T09:00:00+09:00"
+
+        # 3. 현재가 일괄 조회에 실패하면 직전 현재가를 그대로 씁니다.
+        def broken_prices(markets):
+            raise ConnectionError("호가 조회 실패")
+        data_service.get_current_ask_prices = broken_prices
+        previous = dict(service._prices)
+        service.refresh(force=True)
+        assert service._prices == previous and service.get_price("KRW-AAA") == 10.0
+    finally:
+        db.db_utils.fetch_orders = original_fetch
+        for name, original in originals.items():
+            setattr(data_service, name, original)
+
+    print("[TEST] ✅ 대시보드 데이터 서비스 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_data_service_test()
@@ -0,0 +1,98 @@
+# tests/test_execution_model.py
+
+import tempfile
+import numpy as np
+import pandas as pd
+import data.candle_store as candle_store
+import data.orderbook_store as orderbook_store
+from data.candle_store import CandleStore
+from data.orderbook_store import DEPTH, OrderbookSnapshot, OrderbookStore, to_ms
+from manager.execution_model import DepthCurve, book_sides, make_fill_model, walk_book
+from manager.simulator import run_backtest
+
+PARAMS = {"unit_size": 50000, "small_flow_pct": 0.01, "small_flow_units": 2,
+          "large_flow_pct": 0.03, "large_flow_units": 5, "take_profit_pct": 0.005}
+
+
+def _uniform_levels(mid: float, half_spread: float, step: float, depth_krw: float, levels: int = DEPTH) -> np.ndarray:
+    """중간가에서 half_spread 떨어진 곳부터 step 간격으로 단계마다 depth_krw 원씩 있는 호가"""
+    offsets = half_spread + step * np.arange(levels)
+    ask, bid = mid * (1 + offsets), mid * (1 - offsets)
+    return np.array([ask, depth_krw / ask, bid, depth_krw / bid])
+
+
+def run_execution_model_test():
+    print("[TEST] manager.execution_model 테스트 시작")
+
+    # 1. 단계별 채우기: 100원짜리 잔량 3단계 (불리함 0.1%, 0.2%, 0.3%)
+    offsets = np.array([[0.001, 0.002, 0.003]])
+    notionals = np.array([[100.0, 100.0, 100.0]])
+    filled, slip = walk_book(np.repeat(offsets, 3, axis=0), np.repeat(notionals, 3, axis=0), [50, 150, 1000])
+    assert np.allclose(filled, [50, 150, 300])  # 마지막 주문은 잔량이 모자라 부분 체결
+    assert np.allclose(slip, [0.001, (100 * 0.001 + 50 * 0.002) / 150, 0.002])
+
+    # 2. 곡선은 같은 모양의 호가를 단계별로 채운 것과 같고, 기록된 호가에서 그 모양을 다시 구합니다.
+    levels = np.stack([_uniform_levels(1000 + i, 0.0005, 0.001, 2_000_000) for i in range(50)])
+    curve = DepthCurve.fit(levels)
+    assert np.isclose(curve.half_spread, 0.0005) and np.isclose(curve.level_step, 0.001, rtol=1e-3)
+    assert np.isclose(curve.level_depth, 2_000_000) and curve.levels == DEPTH
+    amounts = np.array([1e5, 2e6, 7.5e6, 1e9])
+    ask_offsets, ask_notionals = book_sides(levels[:1])[0]
+    expected = walk_book(np.repeat(ask_offsets, 4, axis=0), np.repeat(ask_notionals, 4, axis=0), amounts)
+    assert np.allclose(curve.fill(amounts), expected, rtol=1e-6)
+
+    # 3. 백테스트: 호가가 두꺼우면 기존 결과와 거의 같고, 얇으면 비용이 늘고 일부가 체결되지 않습니다.
+    n = 3000
+    rng = np.random.default_rng(3)
+    close = 1000 * np.exp(rng.normal(0, 0.004, n).cumsum())
+    candles = pd.DataFrame({"time": pd.date_range("2025-04-10 00:00", periods=n, freq="1min"), "market": "KRW-AAA",
+                            "open": close, "high": close, "low": close, "close": close, "volume": 1.0, "value": 1.0})
+
+    with tempfile.TemporaryDirectory() as root:
+        candle_store._default_store = CandleStore(f"{root}/candles")
+        candle_store._default_store.append("KRW-AAA", candles)
+        try:
+            results = {}
+            for name, depth_krw in (("thick", 1e12), ("thin", 10_000)):
+                store = OrderbookStore(f"{root}/{name}")
+                orderbook_store._default_store = store
+                # 캔들 마감 시각마다 그 종가 주변의 호가를 기록해 둡니다. (처음 1000개 캔들만)
+                ends = candles["time"][:1000] + pd.Timedelta(minutes=1)
+                for end, price in zip(ends, close[:1000]):
+                    store.append(OrderbookSnapshot("KRW-AAA", to_ms(end), _uniform_levels(price, 0.0005, 0.001, depth_krw)))
+                store.flush()
+
+                results[name] = {kind: run_backtest("KRW-AAA", "2025-04-10 00:00", "2025-04-12 02:00", 1, PARAMS,
+                                                    sinks=("parquet",), checkpoint_dir=f"{root}/runs",
+                                                    update_candles=False, fill_model=kind)
+                                 for kind in ("ideal", "depth", "curve")}
+        finally:
+            candle_store._default_store = None
+            orderbook_store._default_store = None
+
+    ideal = results["thick"]["ideal"]
+    assert ideal["slippage_cost"] == 0 and ideal["unfilled_amount"] == 0
+    for name in ("thick", "thin"):
+        for kind in ("depth", "curve"):
+            result = results[name][kind]
+            # 체결 모델이 다르면 다른 실행으로 저장합니다.
+            assert result["run_dir"] != ideal["run_dir"] and result["candles"] == n
+            assert result["slippage_cost"] > 0, (name, kind)
+    thick, thin = results["thick"]["depth"], results["thin"]["depth"]
+    assert thick["unfilled_amount"] == 0
+    assert abs(thick["final_value"] - ideal["final_value"]) < 0.01 * ideal["final_value"]
+    assert thin["unfilled_amount"] > 0 and thin["slippage_cost"] > thick["slippage_cost"]
+
+    # 기록된 호가가 없으면 depth / curve 는 만들 수 없습니다.
+    with tempfile.TemporaryDirectory() as root:
+        try:
+            make_fill_model("depth", "KRW-AAA", 1, store=OrderbookStore(root))
+            raise AssertionError("호가 없이 만들어지면 안 됩니다.")
+        except ValueError:
+            pass
+
+    print("[TEST] ✅ 체결 모델 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_execution_model_test()
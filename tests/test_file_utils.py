@@ -0,0 +1,89 @@
+# tests/test_file_utils.py
+
+import glob
+import os
+import tempfile
+import pandas as pd
+
+import utils.file_utils as file_utils
+from utils.file_utils import (
+    append_log, save_log, compact_log, load_log, latest_rows, BUY_LOG_SCHEMA, SELL_LOG_SCHEMA,
+)
+
+
+def _buy_row(market: str, buy_type: str, price: float, filled: str = "update", day: int = 10) -> dict:
+    return {"time": pd.Timestamp(f"2025-04-{day:02d} 09:00:00"), "market": market, "target_price": price,
+            "buy_amount": 5000.123456789, "buy_units": 1, "buy_type": buy_type, "buy_uuid": None, "filled": filled}
+
+
+def run_file_utils_test():
+    print("[TEST] utils.file_utils 테스트 시작")
+
+    with tempfile.TemporaryDirectory() as root:
+        # 1. 타입이 있는 스키마: decimal은 소수 8자리로, enum은 허용된 값만, 빈 문자열은 None으로 저장됩니다.
+        path = os.path.join(root, "buy_log")
+        append_log(pd.DataFrame([_buy_row("KRW-AAA", "initial", 0.1 + 0.2, "done"),
+                                 _buy_row("KRW-BBB", "small_flow", 980, "")]), path, BUY_LOG_SCHEMA)
+        df = load_log(path, BUY_LOG_SCHEMA)
+        assert list(df.columns) == BUY_LOG_SCHEMA.names
+        assert df["target_price"].tolist() == [0.3, 980.0] and df["buy_amount"].iloc[0] == 5000.12345679
+        assert df["filled"].tolist() == ["done", None] and df["buy_type"].tolist() == ["initial", "small_flow"]
+        assert df["time"].iloc[0] == pd.Timestamp("2025-04-10 09:00:00")
+        try:
+            append_log(pd.DataFrame([_buy_row("KRW-AAA", "initial", 1, "filled")]), path, BUY_LOG_SCHEMA)
+            raise AssertionError("허용되지 않은 filled 값은 저장하면 안 됩니다.")
+        except ValueError:
+            pass
+
+        # 2. 마켓 / 시간 조건은 읽기 전에 적용됩니다. (end는 포함하지 않음)
+        append_log(pd.DataFrame([_buy_row("KRW-AAA", "small_flow", 900, day=11),
+                                 _buy_row("KRW-CCC", "large_flow", 800, day=12)]), path, BUY_LOG_SCHEMA)
+        assert load_log(path, BUY_LOG_SCHEMA, markets=["KRW-AAA"])["target_price"].tolist() == [0.3, 900.0]
+        assert load_log(path, BUY_LOG_SCHEMA, start="2025-04-11", end="2025-04-12")["market"].tolist() == ["KRW-AAA"]
+        assert load_log(path, BUY_LOG_SCHEMA, markets=["KRW-CCC"], end="2025-04-12").empty
+
+        # 3. 세그먼트가 COMPACT_THRESHOLD를 넘으면 하나의 base로 합쳐지고, 내용과 순서는 그대로입니다.
+        before = load_log(path, BUY_LOG_SCHEMA)
+        original_threshold = file_utils.COMPACT_THRESHOLD
+        file_utils.COMPACT_THRESHOLD = 3
+        try:
+            append_log(pd.DataFrame([_buy_row("KRW-DDD", "initial", 700)]), path, BUY_LOG_SCHEMA)
+            append_log(pd.DataFrame([_buy_row("KRW-EEE", "initial", 600)]), path, BUY_LOG_SCHEMA)
+        finally:
+            file_utils.COMPACT_THRESHOLD = original_threshold
+        segments = sorted(os.path.basename(f) for f in glob.glob(os.path.join(path, "*.parquet")))
+        assert len(segments) == 1 and segments[0].startswith("base-")
+        after = load_log(path, BUY_LOG_SCHEMA)
+        assert after["market"].tolist() == before["market"].tolist() + ["KRW-DDD", "KRW-EEE"]
+
+        # base 이후의 part만 함께 읽고, save_log는 기존 세그먼트를 모두 대체합니다.
+        append_log(pd.DataFrame([_buy_row("KRW-FFF", "initial", 500)]), path, BUY_LOG_SCHEMA)
+        assert load_log(path, BUY_LOG_SCHEMA)["market"].iloc[-1] == "KRW-FFF"
+        save_log(after.head(1), path, BUY_LOG_SCHEMA)
+        assert len(glob.glob(os.path.join(path, "*.parquet"))) == 1
+        assert load_log(path, BUY_LOG_SCHEMA)["market"].tolist() == ["KRW-AAA"]
+
+        # 4. keys가 있으면 같은 칸의 마지막 버전만 읽고, 순서는 칸이 처음 나온 순서를 따릅니다.
+        path = os.path.join(root, "sell_log")
+        keys = ["market"]
+        for market, price in (("KRW-AAA", 1000), ("KRW-BBB", 2000), ("KRW-AAA", 1100)):
+            append_log(pd.DataFrame([{"market": market, "avg_buy_price": 900, "quantity": 1,
+                                      "target_sell_price": price, "sell_uuid": None, "filled": "update"}]),
+                       path, SELL_LOG_SCHEMA, keys)
+        df = load_log(path, SELL_LOG_SCHEMA, keys=keys)
+        assert df["market"].tolist() == ["KRW-AAA", "KRW-BBB"] and df["target_sell_price"].tolist() == [1100, 2000]
+        assert len(load_log(path, SELL_LOG_SCHEMA)) == 3
+
+        # 압축할 때도 마지막 버전만 남깁니다.
+        compact_log(path, SELL_LOG_SCHEMA, keys)
+        assert load_log(path, SELL_LOG_SCHEMA).equals(df)
+
+    # latest_rows: 빈 값이 있는 keys도 하나의 칸으로 봅니다.
+    df = pd.DataFrame({"market": ["A", "B", "A", None, None], "v": [1, 2, 3, 4, 5]})
+    assert latest_rows(df, ["market"])["v"].tolist() == [3, 2, 5]
+
+    print("[TEST] ✅ Parquet 로그 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_file_utils_test()
@@ -0,0 +1,104 @@
+# tests/test_fill_tracker.py
+
+import json
+
+from manager.fill_tracker import FillTracker
+from api.order_stream import MyOrderStream
+
+
+def _stream(uuid: str, state: str, executed: str, remaining, ord_type: str = "limit", side: str = "BID") -> dict:
+    return {"type": "myOrder", "uuid": uuid, "code": "KRW-AAA", "ask_bid": side, "order_type": ord_type,
+            "price": "1000", "volume": "10", "executed_volume": executed, "remaining_volume": remaining,
+            "state": state}
+
+
+def run_fill_tracker_test():
+    print("[TEST] manager.fill_tracker 테스트 시작")
+
+    tracker = FillTracker()
+    events = []
+    tracker.add_listener(events.append)
+
+    def broken(event):
+        raise RuntimeError("리스너 오류")
+    tracker.add_listener(broken)
+
+    # 1. 지정가 주문: 부분 체결(trade)은 미체결로 남고, 남은 수량이 0이 되면 완료(done)입니다.
+    tracker.track({"uuid": "l1", "market": "KRW-AAA", "side": "bid", "ord_type": "limit", "price": "1000",
+                   "volume": "10", "executed_volume": "0", "remaining_volume": "10", "state": "wait"})
+    assert [o.uuid for o in tracker.open_orders()] == ["l1"] and events == []
+    tracker._on_stream_order(_stream("l1", "trade", "4", "6"))
+    assert [(e.kind, e.executed_volume, e.remaining_volume) for e in events] == [("trade", 4.0, 6.0)]
+    assert tracker.open_orders()[0].state == "wait"
+    tracker._on_stream_order(_stream("l1", "trade", "10", "0"))
+    assert [e.kind for e in events] == ["trade", "trade", "done"] and tracker.open_orders() == []
+
+    # 끝난 주문의 늦게 도착한 중복 메시지는 무시합니다. (리스너 오류도 다른 리스너를 막지 않음)
+    tracker._on_stream_order(_stream("l1", "done", "10", "0"))
+    assert len(events) == 3
+
+    # 2. 시장가 매수(price)는 남은 수량이 비어(null) 오므로, 첫 체결로 완료 처리하지 않습니다.
+    events.clear()
+    tracker._on_stream_order(_stream("m1", "trade", "2", None, ord_type="price"))
+    assert [(e.kind, e.remaining_volume) for e in events] == [("trade", None)]
+    assert [o.uuid for o in tracker.open_orders()] == ["m1"]
+    tracker._on_stream_order(_stream("m1", "trade", "5", None, ord_type="price"))
+    assert [o.executed_volume for o in tracker.open_orders()] == [5.0]
+    # 금액을 다 쓰고 남은 잔량은 취소(cancel)로 끝납니다. 알림에는 주문 유형과 체결 수량이 함께 실립니다.
+    tracker._on_stream_order(_stream("m1", "cancel", "5", None, ord_type="price"))
+    last = events[-1]
+    assert (last.kind, last.ord_type, last.executed_volume) == ("cancel", "price", 5.0)
+    assert tracker.open_orders() == []
+
+    # 3. REST 재조회 결과도 같은 경로로 반영됩니다.
+    events.clear()
+    tracker.track({"uuid": "l2", "market": "KRW-AAA", "side": "ask", "ord_type": "limit", "state": "wait",
+                   "executed_volume": "0", "remaining_volume": "3"})
+    tracker.track({"uuid": "l2", "market": "KRW-AAA", "side": "ask", "ord_type": "limit", "state": "cancel",
+                   "executed_volume": "0", "remaining_volume": "3"})
+    assert [(e.kind, e.source) for e in events] == [("cancel", "rest")]
+
+    print("[TEST] ✅ 체결 추적기 테스트 통과")
+
+
+def run_order_stream_test():
+    print("[TEST] api.order_stream 테스트 시작")
+
+    orders, assets = [], []
+    stream = MyOrderStream(on_order=orders.append, on_asset=assets.append)
+
+    # myOrder / myAsset 메시지를 각각의 콜백으로 넘깁니다. (바이너리 프레임도 같은 JSON)
+    stream._handle_message(None, json.dumps(_stream("l1", "wait", "0", "10")))
+    stream._handle_message(None, json.dumps({"type": "myAsset", "assets": []}).encode("utf-8"))
+    stream._handle_message(None, json.dumps({"type": "ticker"}))
+    assert [o["uuid"] for o in orders] == ["l1"] and assets == [{"type": "myAsset", "assets": []}]
+
+    # on_asset이 없으면 자산 메시지는 버립니다.
+    MyOrderStream(on_order=orders.append)._handle_message(None, json.dumps({"type": "myAsset"}))
+    assert len(orders) == 1
+
+    # 연결된 뒤 끊겼을 때만 on_disconnect(REST 재조회)를 부릅니다.
+    disconnects = []
+    stream = MyOrderStream(on_order=orders.append, on_disconnect=lambda: disconnects.append(1))
+    stream._handle_close(None, 1006, "closed")
+    assert disconnects == []
+
+    class FakeWs:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, message):
+            self.sent.append(json.loads(message))
+
+    ws = FakeWs()
+    stream._handle_open(ws)
+    assert stream.connected and {m.get("type") for m in ws.sent[0]} >= {"myOrder", "myAsset"}
+    stream._handle_close(None, 1006, "closed")
+    assert disconnects == [1] and not stream.connected
+
+    print("[TEST] ✅ 주문 스트림 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_fill_tracker_test()
+    run_order_stream_test()
@@ -0,0 +1,94 @@
+# tests/test_import_time.py
+
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+
+# 진입점별 import 시간 예산 (초, 새 인터프리터 시작 포함)
+# - 백테스트/분석 도구: 거래소 키 없이 바로 실행되어야 하고, 거래소/DB 모듈을 불러오지 않아야 합니다.
+# - 컨테이너(core/main.py) / 대시보드: 전체 스택을 불러오지만 시작 시간은 예산 안이어야 합니다.
+IMPORT_BUDGETS = {
+    "manager.simulator": 1.5,
+    "manager.backtest_analytics": 1.5,
+    "manager.monte_carlo": 1.5,
+    "manager.backtest_cli": 1.5,
+    "core.main": 3.0,
+    "streamlit_app.app": 4.0,
+}
+
+# 오프라인 도구가 import 시점에 불러오면 안 되는 모듈
+OFFLINE_ENTRY_POINTS = ("manager.simulator", "manager.backtest_analytics", "manager.monte_carlo",
+                        "manager.backtest_cli")
+ONLINE_ONLY_MODULES = ("requests", "jwt", "pymysql", "dotenv")
+
+# 실거래 런타임이 import 시점에 불러오면 안 되는 백테스트 스택
+LIVE_ENTRY_POINTS = ("core.sharding",)
+BACKTEST_ONLY_MODULES = ("manager.simulator", "data.candle_store", "manager.execution_model",
+                         "manager.result_writer", "pyarrow")
+
+# 해당 진입점을 불러오는 데 필요한 외부 패키지 (설치되어 있지 않으면 측정을 건너뜁니다)
+REQUIRED_PACKAGES = {
+    "core.main": ("apscheduler", "dotenv", "jwt", "requests"),
+    "streamlit_app.app": ("streamlit", "plotly"),
+}
+
+_PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = [name for name in {watch!r} if name in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def _clean_env() -> dict:
+    # 거래소 키 없이도 import가 되어야 하므로 키를 지운 환경에서 측정합니다.
+    env = {k: v for k, v in os.environ.items() if not k.startswith("UPBIT_OPEN_API_")}
+    env["PYTHONPATH"] = os.getcwd()
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def measure_import(module: str, runs: int = 3, watch: tuple = ONLINE_ONLY_MODULES) -> tuple:
+    """새 인터프리터에서 module을 불러오는 시간(여러 번 중 최솟값, 인터프리터 시작 포함)과 불러온 watch 모듈 목록"""
+    best, loaded = None, []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, watch=watch)],
+                                capture_output=True, text=True, env=_clean_env(), cwd=os.getcwd())
+        total = time.perf_counter() - started
+        if result.returncode != 0:
+            raise AssertionError(f"{module} import 실패:\n{result.stderr[-2000:]}")
+        line = result.stdout.strip().splitlines()[-1]
+        _, names = line.split(" ", 1) if " " in line else (line, "")
+        loaded = [name for name in names.split(",") if name]
+        best = total if best is None else min(best, total)
+    return best, loaded
+
+
+def _available(module: str) -> bool:
+    return all(importlib.util.find_spec(name) is not None for name in REQUIRED_PACKAGES.get(module, ()))
+
+
+def run_import_time_test():
+    print("[TEST] 진입점 import 시간 테스트 시작")
+    for module, budget in IMPORT_BUDGETS.items():
+        if not _available(module):
+            print(f"  - {module}: 필요한 패키지가 없어 건너뜀 {REQUIRED_PACKAGES[module]}")
+            continue
+        elapsed, loaded = measure_import(module)
+        print(f"  - {module}: {elapsed:.2f}s (예산 {budget:.1f}s)")
+        assert elapsed <= budget, f"{module} import {elapsed:.2f}s > 예산 {budget:.1f}s"
+        if module in OFFLINE_ENTRY_POINTS:
+            assert not loaded, f"{module} 가 온라인 전용 모듈을 불러옴: {loaded}"
+    for module in LIVE_ENTRY_POINTS:
+        _, loaded = measure_import(module, runs=1, watch=BACKTEST_ONLY_MODULES)
+        assert not loaded, f"{module} 가 백테스트 모듈을 불러옴: {loaded}"
+    print("[TEST] ✅ import 시간 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_import_time_test()
@@ -0,0 +1,73 @@
+# tests/test_indicators.py
+
+import tempfile
+import numpy as np
+import pandas as pd
+from data.candle_store import CandleStore, resample
+from data.indicators import IndicatorEngine, IndicatorSeries
+from tests.test_candle_store import _minute_candles
+
+
+def _pandas_indicators(closes: pd.Series) -> pd.DataFrame:
+    # 대시보드가 예전에 매번 계산하던 방식
+    std = closes.rolling(20).std()
+    ma20 = closes.rolling(20).mean()
+    return pd.DataFrame({
+        "ma5": closes.rolling(5).mean(),
+        "ma20": ma20,
+        "std20": std,
+        "upper_band": ma20 + 2 * std,
+        "lower_band": ma20 - 2 * std,
+        "ema12": closes.ewm(span=12, adjust=False).mean(),
+    })
+
+
+def _assert_same(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    for col in expected.columns:
+        assert np.allclose(result[col].to_numpy(), expected[col].to_numpy(), equal_nan=True, rtol=1e-9), col
+
+
+def run_indicators_test():
+    print("[TEST] data.indicators 테스트 시작")
+    candles = _minute_candles("2025-04-10 08:00", 3000, seed=2)
+    expected = _pandas_indicators(candles["close"])
+
+    # 한 개씩 갱신한 결과 == 전체 재계산 결과 == pandas rolling
+    incremental = IndicatorSeries(ema_spans=(12,))
+    for time, close in zip(candles["time"], candles["close"]):
+        incremental.update(time, close)
+    _assert_same(incremental.frame(), expected)
+
+    backfilled = IndicatorSeries(ema_spans=(12,))
+    backfilled.backfill(candles["time"], candles["close"])
+    _assert_same(backfilled.frame(), expected)
+
+    # 전체 재계산 뒤에 이어서 갱신해도 같아야 합니다. (진행 중이던 마지막 캔들의 종가가 바뀌는 경우 포함)
+    resumed = IndicatorSeries(ema_spans=(12,))
+    resumed.backfill(candles["time"].iloc[:2000], candles["close"].iloc[:2000])
+    resumed.update(candles["time"].iloc[1999], candles["close"].iloc[1999] + 50)
+    for time, close in zip(candles["time"].iloc[1999:], candles["close"].iloc[1999:]):
+        resumed.update(time, close)
+    _assert_same(resumed.frame(), expected)
+    assert resumed.latest()["time"] == candles["time"].iloc[-1]
+
+    # 엔진은 저장소의 묶은 캔들을 따라갑니다.
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        store.append("KRW-AAA", candles.iloc[:2000])
+        engine = IndicatorEngine(store)
+        first = engine.get("KRW-AAA", 15)
+        assert len(first) == len(store.get_candles("KRW-AAA", 15))
+
+        store.append("KRW-AAA", candles.iloc[1999:])
+        start = candles["time"].iloc[1500]
+        result = engine.get("KRW-AAA", 15, start=start)
+        bars = resample(candles, 15)
+        expected_15 = _pandas_indicators(bars["close"])[bars["time"] >= start].reset_index(drop=True)
+        _assert_same(result, expected_15.drop(columns="ema12"))
+
+    print("[TEST] ✅ 지표 엔진 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_indicators_test()
@@ -0,0 +1,74 @@
+# tests/test_intent_journal.py
+
+import glob
+import os
+import tempfile
+import time
+from manager.intent_journal import IntentJournal, INTENT, ACKED, PERSISTED
+
+
+def _intent(market: str, level: str, price: float) -> dict:
+    return {"table": "buy_orders", "market": market, "side": "bid", "level": level,
+            "price": price, "amount": 10000, "volume": None}
+
+
+def run_intent_journal_test():
+    print("[TEST] manager.intent_journal 테스트 시작")
+
+    with tempfile.TemporaryDirectory() as root:
+        journal = IntentJournal(root).recover()
+        entries = journal.begin([_intent("KRW-AAA", "small_flow", 990), _intent("KRW-AAA", "large_flow", 950)])
+        assert len(entries) == 2
+
+        # 같은 단계의 주문은 진행 중인 동안 가격이 달라도 다시 내지 않습니다. (같은 묶음 안의 중복 포함)
+        assert journal.begin([_intent("KRW-AAA", "small_flow", 990)]) == []
+        assert journal.begin([_intent("KRW-AAA", "small_flow", 980.0)]) == []
+        again = journal.begin([_intent("KRW-BBB", "initial", 100), _intent("KRW-BBB", "initial", 101)])
+        assert len(again) == 1
+
+        small, large = entries
+        journal.ack(small.id, "uuid-small")
+        journal.persisted(small.id)
+        journal.ack(large.id, "uuid-large")
+        journal.fail(again[0].id, "rejected")
+
+        # 종료 처리 없이(컨테이너 재시작) 새 인스턴스로 복구합니다. 마지막 줄이 잘려 있어도 읽을 수 있어야 합니다.
+        with open(sorted(glob.glob(os.path.join(root, "journal-*.log")))[-1], "a") as f:
+            f.write('{"op": "ack", "id": "tor')
+        recovered = IntentJournal(root).recover()
+        status = {e.key: e.status for e in recovered.entries()}
+        assert status == {"KRW-AAA|bid|small_flow": PERSISTED, "KRW-AAA|bid|large_flow": ACKED}
+        assert recovered.is_live("KRW-AAA", "bid", "large_flow")
+        assert recovered.live("KRW-AAA", "bid", "large_flow").uuid == "uuid-large"
+        assert not recovered.is_live("KRW-BBB", "bid", "initial")
+
+        # 완료 알림으로 닫힌 단계는 다시 낼 수 있습니다.
+        assert recovered.close_uuid("uuid-large", "done")
+        assert len(recovered.begin([_intent("KRW-AAA", "large_flow", 950)])) == 1
+        recovered.shutdown()
+        assert len(IntentJournal(root).recover().entries(INTENT)) == 1
+
+    # 스냅샷 이후에는 이전 세그먼트를 지우고, 복구 시에는 스냅샷 이후 기록만 다시 읽습니다.
+    with tempfile.TemporaryDirectory() as root:
+        journal = IntentJournal(root, snapshot_every=200).recover()
+        for i in range(5000):
+            entry = journal.begin([_intent(f"KRW-A{i}", "small_flow", 1000 - i)])[0]
+            journal.ack(entry.id, f"uuid-{i}")
+            if i < 4990:
+                journal.close_uuid(f"uuid-{i}")
+        assert len(glob.glob(os.path.join(root, "journal-*.log"))) == 1
+
+        started = time.perf_counter()
+        recovered = IntentJournal(root, snapshot_every=200).recover()
+        elapsed = time.perf_counter() - started
+        assert len(recovered.entries(ACKED)) == 10
+        assert recovered._since_snapshot < 200
+        assert elapsed < 0.5, elapsed
+        recovered.shutdown()
+        journal.shutdown()
+
+    print("[TEST] ✅ 주문 의도 저널 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_intent_journal_test()
@@ -0,0 +1,108 @@
+# tests/test_ladder_store.py
+
+import os
+import tempfile
+import pandas as pd
+
+from manager.ladder_store import LadderStore, ladder_state
+from strategy.records import BUY_LOG_COLUMNS
+from strategy.casino_strategy import generate_buy_orders, generate_sell_orders
+
+
+class Event:
+    """manager/fill_tracker.FillEvent와 같은 필드"""
+
+    def __init__(self, kind, uuid, side="bid", ord_type="limit", executed_volume=1.0, market="KRW-BBB"):
+        self.kind = kind
+        self.uuid = uuid
+        self.side = side
+        self.market = market
+        self.ord_type = ord_type
+        self.executed_volume = executed_volume
+
+
+def run_ladder_store_test():
+    print("[TEST] manager.ladder_store 테스트 시작")
+
+    with tempfile.TemporaryDirectory() as root:
+        # 1. Parquet 로그가 없으면 기존 CSV를 한 번 옮겨 담습니다.
+        pd.DataFrame([["2025-04-10", "KRW-AAA", 1000, 5000, 1, "initial", "u0", "done"]],
+                     columns=BUY_LOG_COLUMNS).to_csv(os.path.join(root, "buy_log.csv"), index=False)
+        store = LadderStore(os.path.join(root, "logs"), legacy_dir=root)
+        buy_df, sell_df = store.load(["KRW-AAA", "KRW-BBB"])
+        assert buy_df["buy_uuid"].tolist() == ["u0"] and sell_df.empty
+        os.remove(os.path.join(root, "buy_log.csv"))
+        assert LadderStore(os.path.join(root, "logs"), legacy_dir=root).read("bid")["buy_uuid"].tolist() == ["u0"]
+
+        # 2. 전략이 계획한 사다리를 저장하고, 다음 사이클에는 저장된 상태에서 시작합니다.
+        setting_df = pd.DataFrame([{"market": "KRW-BBB", "unit_size": 5000, "small_flow_pct": 0.1,
+                                    "small_flow_units": 1, "large_flow_pct": 0.2, "large_flow_units": 2,
+                                    "take_profit_pct": 0.01}])
+        loaded = store.read("bid", ["KRW-BBB"])
+        planned = store.save("bid", generate_buy_orders(setting_df, loaded, {"KRW-BBB": 1000}), loaded)
+        assert planned["buy_type"].tolist() == ["initial", "small_flow", "large_flow"]
+        assert set(planned["filled"]) == {"update"}
+        assert store.read("bid", ["KRW-BBB"])["target_price"].tolist() == [1000, 900, 800]
+
+        # 바뀐 칸이 없으면 아무것도 추가하지 않습니다.
+        loaded = store.read("bid", ["KRW-BBB"])
+        files = len(os.listdir(store.logs["bid"].path))
+        store.save("bid", loaded, loaded)
+        assert len(os.listdir(store.logs["bid"].path)) == files
+
+        # 3. 주문이 접수되면 해당 칸에 uuid를 적고 wait로 바꿉니다.
+        assert store.acked("bid", "KRW-BBB", "small_flow", "u1")
+        assert not store.acked("bid", "KRW-ZZZ", "small_flow", "u9")
+        row = store.read("bid", ["KRW-BBB"]).set_index("buy_type").loc["small_flow"]
+        assert row["buy_uuid"] == "u1" and row["filled"] == "wait"
+
+        # 4. 계획하는 동안 다른 곳에서 먼저 바뀐 칸은 덮어쓰지 않고 실행 대상에서도 뺍니다.
+        stale = loaded.copy()
+        stale["target_price"] = [1000, 950, 850]
+        result = store.save("bid", stale, loaded)
+        assert result["buy_type"].tolist() == ["initial", "large_flow"]
+        ladder = store.read("bid", ["KRW-BBB"]).set_index("buy_type")
+        assert ladder.loc["small_flow", "target_price"] == 900 and ladder.loc["large_flow", "target_price"] == 850
+
+        # 매도 주문은 마켓마다 한 칸입니다.
+        sell = pd.DataFrame([{"market": "KRW-BBB", "avg_buy_price": 1000, "quantity": 5, "target_sell_price": 1010,
+                              "sell_uuid": None, "filled": "update"}])
+        store.save("ask", sell, store.read("ask"))
+        assert store.acked("ask", "KRW-BBB", "sell", "s1")
+        assert store.read("ask")[["sell_uuid", "filled"]].values.tolist() == [["s1", "wait"]]
+
+        # 5. 체결 알림(리스너)은 uuid가 같은 칸만 곧바로 done으로 고치고, 다음 계획은 그 상태에서 시작합니다.
+        store.on_fill_event(Event("trade", "u1"))
+        store.on_fill_event(Event("done", "u-other"))
+        assert store.read("bid", ["KRW-BBB"]).set_index("buy_type").loc["small_flow", "filled"] == "wait"
+        store.on_fill_event(Event("done", "u1"))
+        loaded = store.read("bid", ["KRW-BBB"])
+        assert loaded.set_index("buy_type").loc["small_flow", "filled"] == "done"
+        loaded.loc[loaded["buy_type"] == "initial", "filled"] = "done"
+        planned = generate_buy_orders(setting_df, loaded, {"KRW-BBB": 900}).set_index("buy_type")
+        assert planned.loc["small_flow", "target_price"] == 810 and planned.loc["small_flow", "filled"] == "update"
+
+        # 접수 기록보다 먼저 도착한 완료 알림은 접수를 적을 때 반영합니다.
+        store.on_fill_event(Event("done", "u7"))
+        assert store.acked("bid", "KRW-BBB", "large_flow", "u7")
+        assert store.read("bid", ["KRW-BBB"]).set_index("buy_type").loc["large_flow", "filled"] == "done"
+
+        # 시장가 매수는 남은 금액이 취소로 끝나므로, 체결된 수량이 있으면 done입니다.
+        assert ladder_state("cancel", "price", "0.5") == "done"
+        assert ladder_state("cancel", "price", 0) == "cancel" and ladder_state("cancel", "limit", 1) == "cancel"
+        store.on_fill_event(Event("cancel", "s1", side="ask"))
+        assert store.read("ask")["filled"].tolist() == ["cancel"]
+
+        # 6. 취소된 칸은 다음 계획에서 다시 보냅니다. (매수 flow / 매도 모두)
+        loaded.loc[loaded["buy_type"] == "small_flow", "filled"] = "cancel"
+        planned = generate_buy_orders(setting_df, loaded, {"KRW-BBB": 1000}).set_index("buy_type")
+        assert planned.loc["small_flow", "filled"] == "update" and planned.loc["small_flow", "buy_uuid"] is None
+        holdings = {"KRW-BBB": {"avg_price": 1000, "balance": 0, "locked": 5}}
+        resent = generate_sell_orders(setting_df.assign(take_profit_pct=0.01), holdings, store.read("ask"))
+        assert resent["filled"].tolist() == ["update"]
+
+    print("[TEST] ✅ 사다리 저장소 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_ladder_store_test()
@@ -0,0 +1,75 @@
+# tests/test_log.py
+
+import io
+import json
+import threading
+import time
+from utils.log import Lazy, fields, flush, get_logger, setup_logging
+
+
+class _SlowStream(io.StringIO):
+    """쓰기마다 오래 걸리는 출력 (느린 터미널 / 로그 수집기 흉내)"""
+
+    def write(self, text):
+        time.sleep(0.01)
+        return super().write(text)
+
+
+def run_log_test():
+    print("[TEST] utils.log 테스트 시작")
+    log = get_logger("tests.log")
+
+    try:
+        # JSON 한 줄에 메시지와 구조화된 값이 함께 들어갑니다.
+        stream = io.StringIO()
+        setup_logging(level="INFO", fmt="json", stream=stream)
+        log.info("주문 접수 %s", "KRW-BTC", extra=fields(market="KRW-BTC", price=1000))
+        try:
+            raise ValueError("테스트 예외")
+        except ValueError:
+            log.exception("처리 실패")
+        flush()
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert lines[0]["msg"] == "주문 접수 KRW-BTC" and lines[0]["market"] == "KRW-BTC" and lines[0]["price"] == 1000
+        assert lines[0]["level"] == "INFO" and lines[0]["logger"] == "cointrade.tests.log"
+        assert "ValueError" in lines[1]["exc"]
+
+        # 꺼진 레벨의 메시지는 인자를 문자열로 만들지 않습니다. (DataFrame 출력 등)
+        calls = []
+        expensive = Lazy(lambda: calls.append(1) or "큰 표")
+        log.debug("%s", expensive)
+        flush()
+        assert calls == []
+        setup_logging(level="DEBUG", fmt="text", stream=stream)
+        log.debug("%s", expensive)
+        flush()
+        assert calls == [1] and stream.getvalue().rstrip().endswith("[cointrade.tests.log] 큰 표")
+
+        # 문자열 만들기와 쓰기는 백그라운드 스레드에서 하므로, 출력이 느려도 호출한 쪽은 기다리지 않습니다.
+        slow = _SlowStream()
+        setup_logging(level="INFO", fmt="json", stream=slow)
+        caller = threading.current_thread().name
+        started = time.perf_counter()
+        for i in range(50):
+            log.info("사이클 %d %s", i, Lazy(lambda: threading.current_thread().name))
+        elapsed = time.perf_counter() - started
+        assert elapsed < 0.1, elapsed  # 출력만 0.5초 걸립니다.
+        flush()
+        lines = [json.loads(line) for line in slow.getvalue().splitlines()]
+        assert len(lines) == 50 and all(not line["msg"].endswith(caller) for line in lines)
+
+        # INFO 에서 DEBUG 호출 비용 (백테스트에서 캔들마다 호출됨)
+        started = time.perf_counter()
+        for i in range(100_000):
+            log.debug("캔들 %d", i)
+        per_call = (time.perf_counter() - started) / 100_000
+        print(f"  - 꺼진 DEBUG 호출: {per_call * 1e9:.0f}ns")
+        assert per_call < 2e-6, per_call
+    finally:
+        setup_logging()
+
+    print("[TEST] ✅ 로그 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_log_test()
@@ -0,0 +1,98 @@
+# tests/test_market_snapshot.py
+
+import json
+import time
+import streamlit_app.data_service as data_service
+from manager.market_snapshot import MemorySnapshotStore, OpenOrdersCache, SnapshotPublisher, SnapshotReader
+from streamlit_app.data_service import DashboardDataService
+
+ACCOUNTS = [{"currency": "KRW", "balance": "100000", "avg_buy_price": "0"},
+            {"currency": "AAA", "balance": "10", "avg_buy_price": "1000"}]
+OPEN_ORDERS = [{"uuid": "u1", "market": "KRW-AAA", "side": "bid", "price": "990", "volume": "1"}]
+
+
+def _exchange_called(*args, **kwargs):
+    raise AssertionError("스냅샷이 살아 있으면 거래소를 조회하면 안 됩니다.")
+
+
+def run_market_snapshot_test():
+    print("[TEST] manager.market_snapshot 테스트 시작")
+
+    # 1. 게시한 조각마다 버전이 오르고, 읽는 쪽은 바뀐 조각의 본문만 다시 읽습니다.
+    store = MemorySnapshotStore()
+    engine = SnapshotPublisher("engine", store)
+    shard = SnapshotPublisher("shard-1", store)
+    assert engine.publish(prices={"KRW-AAA": 1000.0}, accounts=ACCOUNTS, open_orders=OPEN_ORDERS,
+                          ladder={"buy": [{"market": "KRW-AAA", "buy_level": 1, "target_price": 990.0}], "sell": []})
+    assert shard.publish(prices={"KRW-BBB": 50.0}, ladder={"buy": [{"market": "KRW-BBB", "buy_level": 1}]})
+    assert store.versions()["engine"][0] == 1
+
+    reader = SnapshotReader(store)
+    assert reader.refresh()
+    # 시세 / 사다리는 조각을 합치고, 계좌 / 미체결 주문은 그것을 게시한 조각의 것을 씁니다.
+    assert reader.prices() == {"KRW-AAA": 1000.0, "KRW-BBB": 50.0}
+    assert reader.accounts() == ACCOUNTS and reader.open_orders() == OPEN_ORDERS
+    assert {row["market"] for row in reader.ladder()["buy"]} == {"KRW-AAA", "KRW-BBB"}
+    loads = store.loads
+    reader.refresh()
+    assert store.loads == loads + 1 and reader.prices()["KRW-BBB"] == 50.0  # 바뀐 조각이 없으면 빈 조회
+
+    engine.publish(prices={"KRW-AAA": 1010.0}, accounts=ACCOUNTS, open_orders=[])
+    assert reader.refresh() and store.versions()["engine"][0] == 2
+    assert reader.prices()["KRW-AAA"] == 1010.0 and reader.open_orders() == []
+
+    # 2. 오래된 조각은 쓰지 않습니다. (엔진 정지 → 대시보드가 거래소 조회로 돌아감)
+    store.publish("engine", store.load(["engine"])["engine"][2], time.time() - 3600)
+    assert not reader.refresh() and reader.prices() == {"KRW-BBB": 50.0}
+
+    # 3. 게시에 실패해도 예외를 내지 않습니다.
+    class BrokenStore(MemorySnapshotStore):
+        def publish(self, name, payload, published_at):
+            raise ConnectionError("DB 연결 실패")
+    assert not SnapshotPublisher("engine", BrokenStore()).publish(prices={"KRW-AAA": 1.0})
+
+    # 4. 미체결 주문은 무효화(주문 전송 / 체결 알림)되거나 ttl이 지났을 때만 다시 조회합니다.
+    cache = OpenOrdersCache(fetch=lambda: list(OPEN_ORDERS), ttl=600)
+    for _ in range(5):
+        assert cache.get() == OPEN_ORDERS
+    cache.invalidate(object())
+    cache.get()
+    assert cache.fetches == 2
+
+    # 5. 대시보드: 스냅샷이 살아 있으면 계좌 / 미체결 주문 / 현재가를 거래소에서 조회하지 않습니다.
+    store = MemorySnapshotStore()
+    SnapshotPublisher("engine", store).publish(prices={"KRW-AAA": 1000.0}, accounts=ACCOUNTS,
+                                               open_orders=OPEN_ORDERS, ladder={"buy": [{"market": "KRW-AAA"}]})
+    patched = ("get_orders", "get_accounts", "get_current_ask_prices")
+    originals = {name: getattr(data_service, name) for name in patched}
+    for name in patched:
+        setattr(data_service, name, _exchange_called)
+    try:
+        service = DashboardDataService(refresh_interval=0, snapshot_reader=SnapshotReader(store))
+        service._load_new_done_orders_from_db = lambda: None  # 체결 주문은 로컬 DB에서 읽음
+        service.refresh(force=True)
+        assert service.accounts() == ACCOUNTS and service.get_price("KRW-AAA") == 1000.0
+        assert service.wait_df()["uuid"].tolist() == ["u1"] and len(service.ladder_df("buy")) == 1
+
+        # 스냅샷에 없는 마켓의 현재가만 한 번에 조회합니다.
+        calls = []
+        data_service.get_current_ask_prices = lambda markets: calls.append(markets) or {m: 7.0 for m in markets}
+        service._merge_done_orders([{"uuid": "d1", "market": "KRW-CCC", "created_at": "2025-04-10T09:00:00+09:00"}])
+        service.refresh(force=True)
+        assert calls == [["KRW-CCC"]] and service.get_price("KRW-CCC") == 7.0 and service.get_price("KRW-AAA") == 1000.0
+
+        # 스냅샷이 오래되면 예전처럼 거래소를 조회합니다.
+        store.publish("engine", json.dumps({"accounts": []}), time.time() - 3600)
+        data_service.get_orders = lambda state, **kwargs: []
+        data_service.get_accounts = lambda: ACCOUNTS[:1]
+        service.refresh(force=True)
+        assert service.accounts() == ACCOUNTS[:1] and service.wait_df().empty
+    finally:
+        for name, original in originals.items():
+            setattr(data_service, name, original)
+
+    print("[TEST] ✅ 시장 스냅샷 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_market_snapshot_test()
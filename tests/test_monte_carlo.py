@@ -0,0 +1,49 @@
+# tests/test_monte_carlo.py
+
+import numpy as np
+import pandas as pd
+from manager.monte_carlo import GBMPaths, RegimeSwitchingPaths, BlockBootstrapPaths, VectorizedCasino, run_monte_carlo
+from manager.result_writer import ResultWriter
+from manager.simulator import SimulationState, _simulate_chunk
+from strategy.records import Setting
+
+
+def run_monte_carlo_test():
+    print("[TEST] manager.monte_carlo 테스트 시작")
+
+    setting = Setting("KRW-AAA", 5000, 0.02, 2, 0.05, 7, 0.00375)
+
+    # 1. 벡터화 엔진은 경로마다 simulator의 캔들별 로직과 같은 결과를 내야 합니다.
+    models = [
+        GBMPaths(4, 300.0, mu=0.0, sigma=0.006, seed=1),
+        RegimeSwitchingPaths(4, 300.0, mus=[0.0, -0.001], sigmas=[0.003, 0.015],
+                             transition=[[0.995, 0.005], [0.02, 0.98]], seed=2),
+    ]
+    for model in models:
+        prices = model.next_prices(1500)
+        engine = VectorizedCasino(setting, model.n_paths)
+        engine.run(prices)
+
+        for i in range(model.n_paths):
+            state = SimulationState()
+            candles = pd.DataFrame({
+                "시간": pd.date_range("2025-04-10", periods=prices.shape[1], freq="1min"),
+                "시가": prices[i], "고가": prices[i], "종가": prices[i],
+            })
+            _simulate_chunk(state, [setting], "KRW-AAA", candles, ResultWriter("KRW-AAA", len(candles)))
+            value = state.cash + state.holdings.get("KRW-AAA", 0) * prices[i, -1]
+            assert np.isclose(engine.value[i], value), (type(model).__name__, i, engine.value[i], value)
+            assert np.isclose(engine.cumulative_fee[i], state.cumulative_fee)
+
+    # 2. 구간을 나눠 계산해도 한 번에 계산한 것과 결과가 같아야 합니다.
+    returns = np.random.default_rng(0).normal(0, 0.005, 5000)
+    whole = run_monte_carlo(BlockBootstrapPaths(50, 300.0, returns, block_size=30, seed=3), setting, 900)
+    chunked = run_monte_carlo(BlockBootstrapPaths(50, 300.0, returns, block_size=30, seed=3), setting, 900,
+                              max_chunk_bytes=50 * 8 * 70)
+    assert np.allclose(whole.to_numpy(), chunked.to_numpy(), equal_nan=True)
+
+    print("[TEST] ✅ 몬테카를로 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_monte_carlo_test()
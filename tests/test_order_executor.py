@@ -0,0 +1,96 @@
+# tests/test_order_executor.py
+
+import os
+import tempfile
+import pandas as pd
+
+import manager.ladder_store as ladder_store
+import manager.order_executor as order_executor
+from manager.intent_journal import IntentJournal
+from manager.ladder_store import LadderStore
+from manager.order_executor import begin_intents, submit_intent, buy_intent, sell_intent
+
+
+class FakeExchange:
+    """주문 접수 / 취소 흉내"""
+
+    def __init__(self):
+        self.sent = []
+        self.cancelled = []
+        self.cancel_error = None
+
+    def send_order(self, market, side, ord_type, unit_price=None, volume=None, amount_krw=None, identifier=None):
+        self.sent.append((market, side, ord_type, unit_price, volume))
+        return {"uuid": f"u{len(self.sent)}", "market": market, "side": side, "state": "wait"}
+
+    def cancel_order(self, uuid):
+        if self.cancel_error is not None:
+            raise self.cancel_error
+        self.cancelled.append(uuid)
+        return {"uuid": uuid}
+
+
+def _submit(journal, intents: list) -> list:
+    return [submit_intent(intent, entry, None, journal) for intent, entry in begin_intents(journal, intents)]
+
+
+def run_order_executor_test():
+    print("[TEST] manager.order_executor 테스트 시작")
+
+    exchange = FakeExchange()
+    patched = ("send_order", "cancel_order", "track_order")
+    originals = {name: getattr(order_executor, name) for name in patched}
+    original_store = ladder_store._default_store
+    order_executor.send_order = exchange.send_order
+    order_executor.cancel_order = exchange.cancel_order
+    order_executor.track_order = lambda response, fill_tracker=None: [dict(response)]
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            ladder_store._default_store = LadderStore(os.path.join(root, "logs"), legacy_dir=root)
+            journal = IntentJournal(os.path.join(root, "journal")).recover()
+
+            # 1. 처음 주문은 그대로 보냅니다.
+            _submit(journal, [buy_intent("KRW-AAA", 990, 10000, "small_flow"), sell_intent("KRW-AAA", 1100, 10)])
+            assert len(exchange.sent) == 2
+            small = journal.live("KRW-AAA", "bid", "small_flow")
+            assert small.uuid == "u1"
+
+            # 2. 호가 단위로 맞춘 가격 / 수량이 같으면 이미 걸려 있는 주문이므로 다시 보내지 않습니다.
+            assert _submit(journal, [buy_intent("KRW-AAA", 990.0, 10000.0, "small_flow"),
+                                     sell_intent("KRW-AAA", 1100.4, 10)]) == []
+            assert len(exchange.sent) == 2 and exchange.cancelled == []
+
+            # 3. 가격이 바뀌면 기존 주문을 취소한 뒤 새 주문을 보냅니다. (매도 수량이 바뀐 경우도 같음)
+            _submit(journal, [buy_intent("KRW-AAA", 1000, 10000, "small_flow"), sell_intent("KRW-AAA", 1100, 12)])
+            assert exchange.cancelled == ["u1", "u2"] and len(exchange.sent) == 4
+            assert journal.live("KRW-AAA", "bid", "small_flow").uuid == "u3"
+            assert journal.live("KRW-AAA", "ask", "sell").uuid == "u4"
+
+            # 4. 취소에 실패하면(이미 체결 등) 새 주문을 보내지 않습니다.
+            exchange.cancel_error = Exception("❌ 주문 취소 실패: 400")
+            assert _submit(journal, [buy_intent("KRW-AAA", 1010, 10000, "small_flow")]) == []
+            assert len(exchange.sent) == 4 and journal.live("KRW-AAA", "bid", "small_flow").uuid == "u3"
+            exchange.cancel_error = None
+
+            # 5. 접수 확인 전(uuid 없음)인 주문은 취소할 수 없으므로 다음 사이클까지 기다립니다.
+            pending = journal.begin([buy_intent("KRW-AAA", 950, 10000, "large_flow")])[0]
+            assert _submit(journal, [buy_intent("KRW-AAA", 940, 10000, "large_flow")]) == []
+            assert journal.live("KRW-AAA", "bid", "large_flow") is pending
+
+            # 접수된 주문은 사다리에도 uuid와 wait로 적힙니다.
+            store = ladder_store._default_store
+            store.save("ask", pd.DataFrame([{"market": "KRW-BBB", "avg_buy_price": 1000, "quantity": 10,
+                                             "target_sell_price": 1100, "sell_uuid": None, "filled": "update"}]), None)
+            _submit(journal, [sell_intent("KRW-BBB", 1100, 10)])
+            assert store.read("ask", ["KRW-BBB"])[["sell_uuid", "filled"]].values.tolist() == [["u5", "wait"]]
+            journal.shutdown()
+    finally:
+        ladder_store._default_store = original_store
+        for name, original in originals.items():
+            setattr(order_executor, name, original)
+
+    print("[TEST] ✅ 주문 실행 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_order_executor_test()
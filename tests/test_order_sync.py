@@ -0,0 +1,90 @@
+# tests/test_order_sync.py
+
+import manager.order_sync as order_sync
+
+
+def _order(uuid: str, state: str, minute: int, side: str = "bid") -> dict:
+    return {"uuid": uuid, "market": "KRW-AAA", "side": side, "state": state, "ord_type": "limit",
+            "created_at": f"2025-04-10T09:{minute:02d}:00+09:00"}
+
+
+class FakeBackend:
+    """거래소(최신순 주문 목록) + 로컬 DB(buy_orders / sell_orders / order_sync_state) 흉내"""
+
+    def __init__(self, orders: list):
+        self.orders = {o["uuid"]: dict(o) for o in orders}
+        self.tables = {"buy_orders": {}, "sell_orders": {}}
+        self.cursors = {}
+        self.polled = []
+
+    # 거래소
+    def iter_orders(self, state, max_pages=None):
+        rows = [o for o in self.orders.values() if o["state"] == state]
+        return iter(sorted(rows, key=lambda o: o["created_at"], reverse=True))
+
+    def get_orders_by_uuids(self, uuids):
+        self.polled.append(list(uuids))
+        return [dict(self.orders[uuid]) for uuid in uuids if uuid in self.orders]
+
+    # DB
+    def upsert_orders(self, orders, table_name):
+        for o in orders:
+            self.tables[table_name][o["uuid"]] = dict(o)
+        return len(orders)
+
+    def get_sync_cursor(self, state):
+        return self.cursors.get(state, (None, None))
+
+    def save_sync_cursor(self, state, last_uuid, last_created_at):
+        self.cursors[state] = (last_uuid, last_created_at)
+
+    def fetch_open_order_uuids(self):
+        return {uuid: name for name, rows in self.tables.items() for uuid, o in rows.items() if o["state"] == "wait"}
+
+    def state(self, uuid):
+        return next(rows[uuid]["state"] for rows in self.tables.values() if uuid in rows)
+
+
+def run_order_sync_test():
+    print("[TEST] manager.order_sync 테스트 시작")
+
+    # w1 / a1(지정가)은 마지막으로 저장한 체결 주문(d1)보다 먼저 생성된 주문입니다.
+    backend = FakeBackend([_order("w1", "wait", 1), _order("a1", "wait", 2, "ask"), _order("d1", "done", 3),
+                           _order("c1", "cancel", 4)])
+    patched = ("iter_orders", "get_orders_by_uuids", "upsert_orders", "get_sync_cursor", "save_sync_cursor",
+               "fetch_open_order_uuids", "ensure_order_history_schema")
+    originals = {name: getattr(order_sync, name) for name in patched}
+    for name in patched:
+        setattr(order_sync, name, getattr(backend, name, lambda: None))
+    try:
+        # 1. 처음에는 체결/취소 내역 전체와 현재 미체결 주문을 저장합니다.
+        assert order_sync.sync_order_history() == {"done": 1, "cancel": 1, "wait": 0}
+        assert backend.cursors["done"][0] == "d1" and backend.state("w1") == "wait"
+        assert "a1" in backend.tables["sell_orders"]
+
+        # 2. 커서 이후 새 주문이 없으면 커서에서 멈춥니다.
+        assert order_sync.sync_state("done") == 0
+
+        # 3. 커서보다 먼저 생성된 지정가 주문이 나중에 체결/취소되어도 DB에 반영됩니다.
+        backend.orders["d2"] = _order("d2", "done", 5)
+        backend.orders["w1"]["state"] = "done"
+        backend.orders["a1"]["state"] = "cancel"
+        counts = order_sync.sync_order_history()
+        assert counts == {"done": 1, "cancel": 0, "wait": 2}
+        assert backend.state("w1") == "done" and backend.state("a1") == "cancel" and backend.state("d2") == "done"
+        assert sorted(backend.polled[-1]) == ["a1", "w1"]
+
+        # 4. 여전히 미체결인 주문은 uuid로 다시 조회하지 않습니다.
+        backend.orders["w2"] = _order("w2", "wait", 6)
+        polls = len(backend.polled)
+        assert order_sync.sync_open_orders() == 0 and len(backend.polled) == polls
+        assert backend.state("w2") == "wait"
+    finally:
+        for name, original in originals.items():
+            setattr(order_sync, name, original)
+
+    print("[TEST] ✅ 주문 내역 동기화 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_order_sync_test()
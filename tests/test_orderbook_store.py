@@ -0,0 +1,96 @@
+# tests/test_orderbook_store.py
+
+import os
+import tempfile
+import numpy as np
+from data.orderbook_store import DEPTH, OrderbookReplay, OrderbookSnapshot, OrderbookStore, to_ms
+
+START_MS = to_ms("2025-04-10 09:00")
+
+
+def _orderbooks(market: str, n: int, seed: int = 0) -> list:
+    """1초 간격 업비트 호가 응답. 대부분의 단계는 그대로이고 일부 잔량/가격만 바뀝니다."""
+    rng = np.random.default_rng(seed)
+    mid = 1000 + np.round(rng.normal(0, 0.3, n).cumsum())
+    sizes = rng.uniform(1, 100, (4 * DEPTH,))
+    books = []
+    for i in range(n):
+        changed = rng.random(sizes.shape) < 0.1
+        sizes = np.where(changed, rng.uniform(1, 100, sizes.shape), sizes)
+        books.append({
+            "market": market,
+            "timestamp": START_MS + i * 1000,
+            "orderbook_units": [{
+                "ask_price": float(mid[i] + 1 + level), "ask_size": float(sizes[level]),
+                "bid_price": float(mid[i] - level), "bid_size": float(sizes[DEPTH + level]),
+            } for level in range(DEPTH)],
+        })
+    return books
+
+
+def run_orderbook_store_test():
+    print("[TEST] data.orderbook_store 테스트 시작")
+
+    books = _orderbooks("KRW-AAA", 1000)
+    with tempfile.TemporaryDirectory() as root:
+        store = OrderbookStore(root, block_size=100, segment_blocks=3, max_segments=100)
+        for book in books:
+            assert store.append(OrderbookSnapshot.from_upbit(book))
+        # 같은 시각(호가가 바뀌지 않음)은 다시 저장하지 않습니다.
+        assert not store.append(OrderbookSnapshot.from_upbit(books[-1]))
+        store.flush()
+
+        # 기록한 값과 읽은 값이 비트 단위로 같아야 합니다. (업비트 응답 모양으로 되돌려도 같음)
+        snapshots = store.read("KRW-AAA")
+        assert [s.time for s in snapshots] == [b["timestamp"] for b in books]
+        assert all(s.to_upbit()["orderbook_units"] == b["orderbook_units"] for s, b in zip(snapshots, books))
+        stats = store.stats("KRW-AAA")
+        assert stats["blocks"] == 10 and stats["segments"] == 4 and stats["snapshots"] == 1000
+        raw = 1000 * (8 + 4 * DEPTH * 8)
+        assert stats["bytes"] < raw / 2, stats
+
+        # 구간 조회 [start, end) 와 시점 조회 (그 시각 이전의 마지막 호가)
+        part = store.read("KRW-AAA", START_MS + 250_000, START_MS + 260_000)
+        assert [s.time for s in part] == [START_MS + i * 1000 for i in range(250, 260)]
+        assert store.at("KRW-AAA", START_MS + 499_999).time == START_MS + 499_000
+        assert store.at("KRW-AAA", "2025-04-10 09:05:00").time == START_MS + 300_000
+        assert store.at("KRW-AAA", START_MS - 1) is None
+
+        # 재시작한 저장소도 마지막 시각을 알고 있고, 기록 중 잘린 블록은 무시하고 이어 씁니다.
+        last_segment = store.segments("KRW-AAA")[-1][1]
+        with open(last_segment, "ab") as f:
+            f.write(b"OBK1-partial")
+        reopened = OrderbookStore(root, block_size=100, segment_blocks=3, max_segments=100)
+        assert not reopened.append(OrderbookSnapshot.from_upbit(books[500]))
+        more = _orderbooks("KRW-AAA", 1100)[1000:]
+        for book in more:
+            reopened.append(OrderbookSnapshot.from_upbit(book))
+        reopened.flush()
+        assert len(reopened.read("KRW-AAA")) == 1100
+
+    # 링 버퍼: 세그먼트 수가 max_segments를 넘으면 가장 오래된 것부터 지웁니다.
+    with tempfile.TemporaryDirectory() as root:
+        store = OrderbookStore(root, block_size=100, segment_blocks=2, max_segments=2)
+        for book in books:
+            store.append(OrderbookSnapshot.from_upbit(book))
+        store.flush()
+        assert len(os.listdir(os.path.join(root, "KRW-AAA"))) == 2
+        kept = store.read("KRW-AAA")
+        assert [s.time for s in kept] == [b["timestamp"] for b in books[600:]]
+
+    # 재생: 여러 마켓을 시각순으로 섞어서 내보내고, 캔들 시각(KST)으로 그 시점의 호가를 찾습니다.
+    with tempfile.TemporaryDirectory() as root:
+        store = OrderbookStore(root, block_size=64)
+        for book in _orderbooks("KRW-AAA", 300) + _orderbooks("KRW-BBB", 300, seed=1):
+            store.append(OrderbookSnapshot.from_upbit(book))
+        replay = OrderbookReplay(store, ["KRW-AAA", "KRW-BBB"], "2025-04-10 09:01", "2025-04-10 09:03")
+        times = [s.time for s in replay]
+        assert len(replay) == 240 and times == sorted(times)
+        assert replay.at("KRW-BBB", "2025-04-10 09:02:30.5").time == START_MS + 150_000
+        assert replay.at("KRW-AAA", "2025-04-10 09:00:30") is None
+
+    print("[TEST] ✅ 호가 저장소 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_orderbook_store_test()
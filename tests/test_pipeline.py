@@ -0,0 +1,86 @@
+# tests/test_pipeline.py
+
+import threading
+import time
+from core.pipeline import Channel, Pipeline, Stage, STOP
+
+
+def run_pipeline_test():
+    print("[TEST] core.pipeline 테스트 시작")
+
+    # 최신 값만 남기는 큐는 가득 차도 기다리지 않고 오래된 메시지를 버립니다.
+    channel = Channel("ticks", maxsize=2, conflate=True)
+    for i in range(5):
+        channel.put(i)
+    assert [channel.get(), channel.get()] == [3, 4]
+    assert channel.dropped == 3
+    channel.put(5)
+    channel.put(STOP)
+    channel.put(6)
+    assert channel.get() is STOP and channel.get() == 6
+
+    # 느린 실행 단계가 있어도 source / 전략 단계는 멈추지 않고, 같은 마켓의 주문은 순서대로 처리됩니다.
+    ticks = iter(range(1000))
+    executed = {}
+    persisted = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def source():
+        return next(ticks)
+
+    def strategy(tick, emit):
+        for market in ("KRW-AAA", "KRW-BBB", "KRW-CCC"):
+            emit((market, tick))
+
+    def execute(order, emit):
+        release.wait()
+        time.sleep(0.001)
+        with lock:
+            executed.setdefault(order[0], []).append(order[1])
+        emit(order)
+
+    def persist(order, emit):
+        persisted.append(order)
+
+    stages = [
+        Stage("strategy", strategy, maxsize=1, conflate=True),
+        Stage("executor", execute, workers=3, maxsize=4, key=lambda order: order[0]),
+        Stage("persist", persist, maxsize=100),
+    ]
+    pipeline = Pipeline(source, stages, interval=0.002)
+    pipeline.start()
+    time.sleep(0.2)
+    # 실행 단계가 막혀 있는 동안 전략 단계 앞에는 최신 시세만 남고, 실행 단계 큐는 크기를 넘지 않습니다.
+    assert stages[0].inboxes[0].dropped > 0
+    assert all(inbox.qsize() <= 4 for inbox in stages[1].inboxes)
+    release.set()
+    pipeline.stop(timeout=10)
+
+    stats = {s["stage"]: s for s in pipeline.stats()}
+    assert stats["executor"]["processed"] == stats["strategy"]["processed"] * 3
+    assert stats["persist"]["processed"] == stats["executor"]["processed"]
+    assert all(s["queued"] == 0 for s in stats.values())
+    for market, order_ticks in executed.items():
+        assert order_ticks == sorted(order_ticks), market
+
+    # 처리 중 예외가 나도 다음 메시지는 계속 처리합니다.
+    seen = []
+
+    def flaky(message, emit):
+        if message == 1:
+            raise ValueError("boom")
+        seen.append(message)
+
+    stage = Stage("flaky", flaky)
+    stage.start()
+    for i in range(3):
+        stage.put(i)
+    stage.close()
+    assert seen == [0, 2] and stage.failed == 1
+
+    print("[TEST] ✅ 파이프라인 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_pipeline_test()
@@ -0,0 +1,48 @@
+# tests/test_price_utils.py
+
+import pandas as pd
+from utils.price_utils import (
+    adjust_price_to_tick, get_tick_units, ladder_price, snap_to_tick_units,
+    to_price_units, volume_for_amount,
+)
+from strategy.casino_strategy import generate_buy_orders, generate_sell_orders
+
+
+def run_price_utils_test():
+    print("[TEST] utils.price_utils 테스트 시작")
+
+    # 1. 정수 단위 변환과 호가 단위 (get_tick_size와 같은 규칙)
+    assert to_price_units(0.475) == 47_500_000 and to_price_units(1650.0000000000002) == 165_000_000_000
+    assert get_tick_units(to_price_units(12345)) == to_price_units(10)
+    assert get_tick_units(to_price_units(1234), "KRW-ADA") == to_price_units(0.5)
+    assert snap_to_tick_units(to_price_units(12345), rounding="down") == to_price_units(12340)
+    assert snap_to_tick_units(to_price_units(12341), rounding="up") == to_price_units(12350)
+    assert adjust_price_to_tick(12345) == 12350 and adjust_price_to_tick(0.123456) == 0.1235
+
+    # 2. 사다리 가격은 호가 단위에 맞춰지고, 1원 미만 코인도 0원이 되지 않습니다.
+    assert ladder_price(1000, -0.05) == 950 and ladder_price(12345, -0.01) == 12220
+    assert ladder_price(0.5, -0.05) == 0.475 and ladder_price(0.0123, -0.03) == 0.01193
+    assert ladder_price(1500, 0.10) == 1650
+
+    # 3. 지정가 매수 수량은 주문 금액을 넘지 않습니다.
+    volume = volume_for_amount(10000, 3)
+    assert volume == 3333.33333333 and volume * 3 <= 10000
+
+    # 4. 전략: 1원 미만 코인의 하락 매수 가격
+    setting_df = pd.DataFrame([{"market": "KRW-DDD", "unit_size": 10000, "small_flow_pct": 0.05, "small_flow_units": 2,
+                                "large_flow_pct": 0.10, "large_flow_units": 3, "take_profit_pct": 0.10}])
+    buy_df = generate_buy_orders(setting_df, pd.DataFrame(), {"KRW-DDD": 0.5})
+    assert buy_df.set_index("buy_type")["target_price"].to_dict() == {"initial": 0.5, "small_flow": 0.475,
+                                                                        "large_flow": 0.45}
+
+    # 평단/수량이 같으면 부동소수점 표현이 조금 달라도 같은 주문으로 봅니다.
+    sell_log_df = pd.DataFrame([{"market": "KRW-DDD", "avg_buy_price": 0.1 + 0.2, "quantity": 100.000000001,
+                                 "target_sell_price": 0.33, "sell_uuid": "uuid-ddd", "filled": "wait"}])
+    sell_df = generate_sell_orders(setting_df, {"KRW-DDD": {"avg_price": 0.3, "balance": 100}}, sell_log_df)
+    assert sell_df.iloc[0]["filled"] == "wait"
+
+    print("[TEST] ✅ 가격 단위 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_price_utils_test()
@@ -0,0 +1,46 @@
+# tests/test_records.py
+
+import pandas as pd
+from strategy.records import buy_orders_from_df, buy_orders_to_df, is_missing, Setting, BUY_LOG_COLUMNS
+
+
+def run_records_roundtrip_test():
+    print("[TEST] strategy.records 변환 테스트 시작")
+
+    buy_log_df = pd.DataFrame([
+        {"time": "2025-04-10", "market": "KRW-BBB", "target_price": 1000, "buy_amount": 5000, "buy_units": 1,
+         "buy_type": "initial", "buy_uuid": "uuid1", "filled": "done"},
+        {"time": "2025-04-10", "market": "KRW-AAA", "target_price": 980, "buy_amount": 5000, "buy_units": 1,
+         "buy_type": "small_flow", "buy_uuid": None, "filled": None},
+        {"time": "2025-04-10", "market": "KRW-BBB", "target_price": 950, "buy_amount": 10000, "buy_units": 2,
+         "buy_type": "large_flow", "buy_uuid": "uuid3", "filled": " wait "},
+    ])
+
+    book = buy_orders_from_df(buy_log_df)
+
+    # 마켓별 인덱스는 원래 행 순서를 유지해야 합니다.
+    assert [o.buy_type for o in book.for_market("KRW-BBB")] == ["initial", "large_flow"]
+    assert book.for_market("KRW-AAA")[0].filled == ""
+    assert book.for_market("KRW-BBB")[1].filled == "wait"
+
+    book.remove_market("KRW-AAA")
+    assert not book.has_market("KRW-AAA")
+
+    result_df = buy_orders_to_df(book)
+    assert list(result_df.columns) == BUY_LOG_COLUMNS
+    assert result_df["market"].tolist() == ["KRW-BBB", "KRW-BBB"]
+    assert result_df["target_price"].tolist() == [1000, 950]
+
+    # 빈 값 판정은 한 곳(records.is_missing)에서만 합니다. 빈 문자열 uuid는 None으로 읽습니다.
+    assert all(is_missing(v) for v in (None, float("nan"), "")) and not is_missing(0)
+    assert buy_orders_from_df(buy_log_df.assign(buy_uuid="")).first("KRW-BBB").buy_uuid is None
+
+    # Setting은 값으로 비교하지만 해시할 수 없습니다.
+    assert Setting("KRW-AAA", 5000) == Setting("KRW-AAA", 5000)
+    try:
+        {Setting("KRW-AAA", 5000)}
+        raise AssertionError("Setting은 해시할 수 없어야 합니다.")
+    except TypeError:
+        pass
+
+    print("✅ strategy.records 변환 테스트 통과")
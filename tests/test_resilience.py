@@ -0,0 +1,166 @@
+# tests/test_resilience.py
+
+import threading
+import time
+import requests
+import api.price
+import api.resilience as resilience
+import data.candle_store as candle_store
+from api.resilience import CircuitBreaker, CircuitOpenError, Endpoint, LatencyHistogram
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def _warm_up(endpoint: Endpoint, seconds: float, n: int = 100) -> None:
+    for _ in range(n):
+        endpoint.latency.record(seconds)
+
+
+def run_resilience_test():
+    print("[TEST] api.resilience 테스트 시작")
+
+    # 1. 지연 시간 분포: 분위수는 기록한 값을 포함하는 칸의 상한 (칸 폭 2^(1/4) 배 이내)
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.95) is None
+    for i in range(1, 101):
+        histogram.record(i / 1000)  # 1ms ~ 100ms
+    p50, p95 = histogram.quantile(0.5), histogram.quantile(0.95)
+    assert 0.050 <= p50 < 0.050 * 2 ** 0.25 and 0.095 <= p95 < 0.095 * 2 ** 0.25
+    histogram.record(500.0)  # 범위를 넘는 값은 마지막 칸
+    assert histogram.quantile(1.0) == LatencyHistogram.bound(LatencyHistogram.BUCKETS)
+
+    # 2. 회로 차단기: 연속 실패 → 차단 → 대기 후 시험 요청 하나만 → 성공하면 복구, 실패하면 다시 차단
+    clock = FakeClock()
+    breaker = CircuitBreaker("orderbook", failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(2):
+        breaker.allow()
+        breaker.on_failure()
+    breaker.allow()
+    breaker.on_success()  # 성공하면 연속 실패 횟수가 초기화됨
+    for _ in range(3):
+        breaker.allow()
+        breaker.on_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    try:
+        breaker.allow()
+        raise AssertionError("차단 중에는 요청을 보내면 안 됩니다.")
+    except CircuitOpenError:
+        pass
+    clock.now = 30
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    try:
+        breaker.allow()
+        raise AssertionError("시험 요청은 하나만 보냅니다.")
+    except CircuitOpenError:
+        pass
+    breaker.on_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 60
+    breaker.allow()
+    breaker.on_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.rejected == 2
+
+    # 3. 제한 시간은 p99에서 정하고(기본값 이하), 기록이 모자라면 기본값을 씁니다.
+    endpoint = Endpoint("accounts", timeout=5.0, hedge=True)
+    assert endpoint.timeout() == 5.0 and endpoint.hedge_delay() is None
+    _warm_up(endpoint, 0.2)
+    assert resilience.MIN_TIMEOUT <= endpoint.timeout() < 5.0
+    assert 0.2 <= endpoint.hedge_delay() < 0.2 * 2 ** 0.25
+
+    # 4. 중복 요청: 첫 요청이 p95 안에 오지 않으면 같은 요청을 한 번 더 보내고 먼저 온 응답을 씁니다.
+    endpoint = Endpoint("orderbook", timeout=5.0, hedge=True)
+    _warm_up(endpoint, 0.01)
+    calls = []
+    release = threading.Event()
+
+    def slow_then_fast(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            release.wait(2)  # 첫 요청만 느림 (꼬리 지연)
+            return "slow"
+        return "fast"
+
+    started = time.perf_counter()
+    assert endpoint.call(slow_then_fast) == "fast"
+    assert time.perf_counter() - started < 1.0
+    release.set()
+    assert endpoint.hedged == 1 and endpoint.hedge_wins == 1 and len(calls) == 2
+
+    # 빠른 요청에는 중복 요청을 보내지 않고, 중복 요청을 허용하지 않는 엔드포인트도 보내지 않습니다.
+    assert endpoint.call(lambda timeout: "ok") == "ok" and endpoint.hedged == 1
+    plain = Endpoint("orders", hedge=False)
+    _warm_up(plain, 0.01)
+    assert plain.hedge_delay() is None
+
+    # 5. get(): 제한 시간을 넘기고, 5xx/429와 예외만 실패로 셉니다. 인증 헤더는 요청마다 새로 만듭니다.
+    sent = []
+    statuses = iter([404, 500, 500, 500, 500, 500])
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        sent.append((headers, timeout))
+        return FakeResponse(next(statuses))
+
+    original = (resilience.requests.get, dict(resilience._endpoints))
+    resilience.requests.get = fake_get
+    resilience._endpoints.clear()
+    try:
+        tokens = iter(range(100))
+        response = resilience.get("orders", "https://example.invalid", headers=lambda: {"Authorization": next(tokens)})
+        assert response.status_code == 404 and sent[-1] == ({"Authorization": 0}, 10.0)
+        assert resilience.get_endpoint("orders").breaker.failures == 0
+        for _ in range(5):
+            resilience.get("orders", "https://example.invalid", headers=lambda: {"Authorization": next(tokens)})
+        try:
+            resilience.get("orders", "https://example.invalid")
+            raise AssertionError("연속 실패 후에는 차단되어야 합니다.")
+        except CircuitOpenError:
+            pass
+        assert len(sent) == 6 and resilience.endpoint_stats()["orders"]["state"] == CircuitBreaker.OPEN
+    finally:
+        resilience.requests.get = original[0]
+        resilience._endpoints.clear()
+        resilience._endpoints.update(original[1])
+
+    # 6. 분봉 조회는 실패해도 끝없이 재시도하지 않고, 회로가 차단되면 곧바로 멈춥니다.
+    attempts = []
+
+    def failing(market, unit=1, count=200, to=None):
+        attempts.append(to)
+        raise requests.ConnectionError("연결 실패")
+
+    def circuit_open(market, unit=1, count=200, to=None):
+        attempts.append(to)
+        raise CircuitOpenError("candles 회로 차단 중")
+
+    original = (api.price.get_minute_candles, candle_store.RETRY_BACKOFF)
+    candle_store.RETRY_BACKOFF = 0
+    try:
+        for fake, expected in ((failing, candle_store.FETCH_RETRIES), (circuit_open, 1)):
+            api.price.get_minute_candles = fake
+            attempts.clear()
+            try:
+                candle_store.fetch_minute_candles("KRW-AAA", 1, "2025-04-10 09:00", "2025-04-10 12:00")
+                raise AssertionError("조회 실패가 전달되어야 합니다.")
+            except (requests.ConnectionError, CircuitOpenError):
+                pass
+            assert len(attempts) == expected
+    finally:
+        api.price.get_minute_candles, candle_store.RETRY_BACKOFF = original
+
+    print("[TEST] ✅ API 보호 장치 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_resilience_test()
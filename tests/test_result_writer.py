@@ -0,0 +1,38 @@
+# tests/test_result_writer.py
+
+import pandas as pd
+from manager.result_writer import ResultWriter, SIGNAL_BUY, SIGNAL_SPLIT_SELL, SIGNAL_SELL, decode_signals, to_korean
+
+SPLIT_LEVELS = [(0.02, 0.3), (0.04, 0.3), (0.06, 1.0)]
+
+
+def run_result_writer_test():
+    print("[TEST] manager.result_writer 테스트 시작")
+
+    chunks = []
+    writer = ResultWriter("KRW-AAA", capacity=3, sinks=[chunks.append])
+    signals = [0, SIGNAL_BUY["initial"], SIGNAL_BUY["small_flow"] | SIGNAL_BUY["large_flow"],
+               SIGNAL_SPLIT_SELL | SIGNAL_SELL, 0]
+    for i, signal in enumerate(signals):
+        writer.append(pd.Timestamp("2025-04-10 09:00") + pd.Timedelta(minutes=i), 100.0, 101.0, 100.5, signal,
+                      5000.123, 100.456, -0.5, 5000.0, 0.0, 995000.0, 2.5, 2.5, 999999.999)
+
+    # capacity만큼 차면 자동으로, 나머지는 flush() 시점에 sink로 넘어가야 합니다.
+    assert [len(c) for c in chunks] == [3]
+    writer.flush()
+    assert [len(c) for c in chunks] == [3, 2]
+
+    result = pd.concat(chunks, ignore_index=True)
+    assert result["signal"].dtype == "int16"
+    assert result["trade_amount"].iloc[0] == 5000.12
+    assert result["time"].iloc[4] == pd.Timestamp("2025-04-10 09:04")
+
+    labels = decode_signals(result["signal"], SPLIT_LEVELS).tolist()
+    assert labels == ["보유", "initial 매수", "small_flow 매수 / large_flow 매수", "분할매도: +2% 30% 매도 / 매도", "보유"]
+    assert "총 포트폴리오 가치" in to_korean(result, SPLIT_LEVELS).columns
+
+    print("[TEST] ✅ 결과 기록기 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_result_writer_test()
@@ -0,0 +1,138 @@
+# tests/test_second_candles.py
+
+import tempfile
+import numpy as np
+import pandas as pd
+import api.price
+import data.candle_store as candle_store
+from data.candle_store import SECONDS, SecondCandleStore
+from manager.simulator import SimulationState, _simulate_chunk, _simulator_frame, run_backtest
+from manager.result_writer import ResultWriter
+from strategy.records import Setting
+
+PARAMS = {"unit_size": 50000, "small_flow_pct": 0.002, "small_flow_units": 2,
+          "large_flow_pct": 0.006, "large_flow_units": 5, "take_profit_pct": 0.00375}
+
+
+def _second_candles(start: str, n: int, seed: int = 0) -> pd.DataFrame:
+    """거래가 없는 초(빈 초봉)가 섞인 초봉"""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, periods=n, freq="1s")
+    close = np.round(1000 * np.exp(rng.normal(0, 0.0004, n).cumsum()), 1)
+    df = pd.DataFrame({"time": times, "market": "KRW-AAA", "open": close, "high": close, "low": close,
+                       "close": close, "volume": 1.0, "value": close})
+    return df[rng.random(n) > 0.2].reset_index(drop=True)
+
+
+class FakeSecondApi:
+    """업비트 초봉 API 흉내: to(미포함) 이전의 최근 count개를 최신순으로 돌려줍니다."""
+
+    def __init__(self, df: pd.DataFrame, fail_after: int = None):
+        self.df = df
+        self.times = df["time"].to_numpy()
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def __call__(self, market, to=None, count=1):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise KeyboardInterrupt  # 재시도 없이 받기를 멈춥니다. (프로세스 중단 흉내)
+        to = pd.Timestamp(to).tz_convert("Asia/Seoul").tz_localize(None)
+        hi = self.times.searchsorted(np.datetime64(to))
+        rows = self.df.iloc[max(0, hi - count):hi]
+        return [{"market": market, "candle_date_time_kst": t.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "opening_price": o, "high_price": h, "low_price": l, "trade_price": c,
+                 "candle_acc_trade_volume": v, "candle_acc_trade_price": p}
+                for t, o, h, l, c, v, p in zip(rows["time"], rows["open"], rows["high"], rows["low"],
+                                               rows["close"], rows["volume"], rows["value"])][::-1]
+
+
+def run_second_candles_test():
+    print("[TEST] 초봉 저장소 / 스트리밍 백테스트 테스트 시작")
+
+    # 이틀에 걸친 30시간 치 초봉 (하루 경계 포함)
+    source = _second_candles("2025-04-10 18:00", 30 * 3600)
+    start, end = "2025-04-10 18:00", "2025-04-12 00:00"
+    original = (api.price.get_second_candles, candle_store.SECOND_REQUEST_INTERVAL)
+    candle_store.SECOND_REQUEST_INTERVAL = 0
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            store = SecondCandleStore(f"{root}/candles", flush_rows=5000)
+
+            # 1. 받는 도중 멈춰도 저장한 곳부터 이어 받아, 결과는 한 번에 받은 것과 같습니다.
+            api.price.get_second_candles = FakeSecondApi(source, fail_after=120)
+            try:
+                store.backfill("KRW-AAA", start, end)
+                raise AssertionError("중단되어야 합니다.")
+            except KeyboardInterrupt:
+                pass
+            partial = len(store.read("KRW-AAA"))
+            assert 0 < partial < len(source)
+
+            api.price.get_second_candles = resumed = FakeSecondApi(source)
+            store.backfill("KRW-AAA", start, end)
+            stored = store.read("KRW-AAA")
+            assert stored["time"].tolist() == source["time"].tolist()
+            assert np.array_equal(stored["close"].to_numpy(), source["close"].to_numpy())
+            assert resumed.calls < (len(source) - partial) / 150  # 받은 구간은 다시 받지 않음
+            assert [d.strftime("%Y-%m-%d") for d in store.days("KRW-AAA")] == ["2025-04-10", "2025-04-11"]
+            # 하루 전체를 받은 날만 완료로 표시합니다. (18시부터 받은 첫날은 앞쪽이 비어 있음)
+            assert not store.is_complete("KRW-AAA", "2025-04-10") and store.is_complete("KRW-AAA", "2025-04-11")
+
+            # 완료된 날은 다시 조회하지 않고, 나머지 날도 마지막 캔들 이후만 다시 받습니다.
+            api.price.get_second_candles = again = FakeSecondApi(source)
+            assert store.backfill("KRW-AAA", start, end) <= 1 and again.calls == 1
+
+            # 저장된 구간 앞쪽은 따로 받고, 하루를 다 채워야 완료로 표시합니다.
+            gaps = SecondCandleStore(f"{root}/gaps", flush_rows=5000)
+            gaps.backfill("KRW-AAA", "2025-04-11 12:00", "2025-04-11 12:10")
+            gaps.backfill("KRW-AAA", "2025-04-11 11:00", "2025-04-11 12:10")
+            expected = source[(source["time"] >= "2025-04-11 11:00") & (source["time"] < "2025-04-11 12:10")]
+            assert gaps.read("KRW-AAA")["time"].tolist() == expected["time"].tolist()
+            gaps.backfill("KRW-AAA", "2025-04-11 13:00", "2025-04-11 13:10")
+            assert len(gaps.read("KRW-AAA", "2025-04-11 12:10", "2025-04-11 13:00")) > 0  # 사이 구간도 함께 받음
+            assert not gaps.is_complete("KRW-AAA", "2025-04-11")
+            gaps.backfill("KRW-AAA", "2025-04-11 00:00", "2025-04-12 00:00")
+            assert gaps.is_complete("KRW-AAA", "2025-04-11")
+            expected = source[source["time"] >= "2025-04-11"]
+            assert gaps.read("KRW-AAA")["time"].tolist() == expected["time"].tolist()
+
+            # 2. 창은 정해진 크기로 나뉘고(마지막만 작음), 이어 붙이면 구간 전체와 같습니다.
+            windows = list(store.windows("KRW-AAA", "2025-04-10 20:00", "2025-04-11 20:00", rows=7000))
+            assert all(len(w) == 7000 for w in windows[:-1]) and 0 < len(windows[-1]) <= 7000
+            joined = pd.concat(windows, ignore_index=True)
+            expected = source[(source["time"] >= "2025-04-10 20:00") & (source["time"] < "2025-04-11 20:00")]
+            assert joined["time"].tolist() == expected["time"].tolist()
+
+            # 3. 초봉 백테스트는 창 단위로 계산해도 한 번에 계산한 결과와 같습니다.
+            candle_store._default_second_store = store
+            try:
+                result = run_backtest("KRW-AAA", start, end, SECONDS, PARAMS, sinks=("parquet",),
+                                      checkpoint_dir=f"{root}/runs", update_candles=False)
+                assert result["candles"] == len(source) and result["run_dir"].split("/")[-1].startswith("KRW-AAA_1s_")
+
+                state = SimulationState()
+                settings = [Setting("KRW-AAA", *PARAMS.values())]
+                _simulate_chunk(state, settings, "KRW-AAA", _simulator_frame(source, "KRW-AAA"),
+                                ResultWriter("KRW-AAA", len(source)))
+                assert state.realized_pnl != 0
+                assert np.isclose(result["realized_pnl"], state.realized_pnl)
+                assert np.isclose(result["total_fee"], state.cumulative_fee)
+
+                # 종료일만 늘리면 체크포인트 이후의 초봉만 계산합니다.
+                first = run_backtest("KRW-AAA", start, "2025-04-11 06:00", SECONDS, PARAMS, sinks=("parquet",),
+                                     checkpoint_dir=f"{root}/resume", update_candles=False)
+                rest = run_backtest("KRW-AAA", start, end, SECONDS, PARAMS, sinks=("parquet",),
+                                    checkpoint_dir=f"{root}/resume", update_candles=False)
+                assert first["candles"] + rest["candles"] == len(source)
+                assert np.isclose(rest["final_value"], result["final_value"])
+            finally:
+                candle_store._default_second_store = None
+    finally:
+        api.price.get_second_candles, candle_store.SECOND_REQUEST_INTERVAL = original
+
+    print("[TEST] ✅ 초봉 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_second_candles_test()
@@ -0,0 +1,109 @@
+# tests/test_setting_manager.py
+
+import os
+import tempfile
+import pandas as pd
+
+from manager.setting_manager import SettingManager, validate_setting_df
+from strategy.casino_strategy import replan_market
+from strategy.records import Setting, BuyOrder, OrderBook, SETTING_COLUMNS
+
+
+def _setting_row(market: str = "KRW-AAA", **overrides) -> dict:
+    row = {"market": market, "unit_size": 10000, "small_flow_pct": 0.1, "small_flow_units": 1,
+           "large_flow_pct": 0.2, "large_flow_units": 2, "take_profit_pct": 0.05}
+    row.update(overrides)
+    return row
+
+
+def _write(path: str, rows: list, stamp: int) -> None:
+    pd.DataFrame(rows, columns=SETTING_COLUMNS).to_csv(path, index=False)
+    # 같은 초 안에 다시 저장해도 check()가 알아차리도록 수정 시각을 바꿔 둡니다.
+    os.utime(path, ns=(stamp, stamp))
+
+
+def _rejects(setting_df: pd.DataFrame) -> bool:
+    try:
+        validate_setting_df(setting_df)
+    except ValueError:
+        return True
+    return False
+
+
+def run_setting_manager_test():
+    print("[TEST] manager.setting_manager 테스트 시작")
+
+    # 1. validate_setting_df: 통과한 행은 Setting으로, 잘못된 파일은 ValueError로 거절합니다.
+    settings = validate_setting_df(pd.DataFrame([_setting_row(" KRW-AAA ", small_flow_units="3")]))
+    assert settings == [Setting("KRW-AAA", 10000.0, 0.1, 3, 0.2, 2, 0.05)]
+    assert _rejects(pd.DataFrame([_setting_row()]).drop(columns=["take_profit_pct"]))
+    assert _rejects(pd.DataFrame([_setting_row("BTC-AAA")]))
+    assert _rejects(pd.DataFrame([_setting_row(), _setting_row()]))
+    assert _rejects(pd.DataFrame([_setting_row(unit_size="many")]))
+    assert _rejects(pd.DataFrame([_setting_row(unit_size=0)]))
+    assert _rejects(pd.DataFrame([_setting_row(small_flow_pct=1.5)]))
+    assert _rejects(pd.DataFrame([_setting_row(large_flow_units=-1)]))
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "setting.csv")
+        _write(path, [_setting_row("KRW-AAA"), _setting_row("KRW-BBB")], 1_000_000_000)
+
+        # 2. 처음 읽은 설정은 변경으로 보지 않습니다.
+        manager = SettingManager(path)
+        first = manager.snapshot
+        assert first.version == 1 and first.markets == ["KRW-AAA", "KRW-BBB"]
+        assert manager.pop_changes() == ({}, set())
+        assert not manager.check()
+
+        # 3. 바뀐 마켓만 이전 설정과 함께 알려 주고, 바뀌지 않은 마켓은 기존 레코드를 그대로 씁니다.
+        _write(path, [_setting_row("KRW-AAA", small_flow_pct=0.05), _setting_row("KRW-CCC")], 2_000_000_000)
+        assert manager.check()
+        changed, removed = manager.pop_changes()
+        assert changed == {"KRW-AAA": first.by_market["KRW-AAA"], "KRW-CCC": None} and removed == {"KRW-BBB"}
+        assert manager.snapshot.version == 2 and manager.pop_changes() == ({}, set())
+
+        # 여러 번 바뀌어도 마지막 pop 이후 최초의 이전 설정을 기준으로 삼습니다.
+        _write(path, [_setting_row("KRW-AAA", small_flow_pct=0.03), _setting_row("KRW-CCC")], 3_000_000_000)
+        assert manager.check()
+        _write(path, [_setting_row("KRW-AAA", small_flow_pct=0.02), _setting_row("KRW-CCC")], 4_000_000_000)
+        assert manager.check()
+        assert manager.pop_changes()[0]["KRW-AAA"].small_flow_pct == 0.05
+
+        # 4. 잘못된 파일이 저장되면 기존 스냅샷을 그대로 유지합니다.
+        current = manager.snapshot
+        _write(path, [_setting_row("KRW-AAA", unit_size=-1)], 5_000_000_000)
+        assert not manager.check()
+        assert manager.snapshot is current and manager.pop_changes() == ({}, set())
+
+    print("[TEST] ✅ 설정 관리자 테스트 통과")
+
+
+def run_replan_market_test():
+    print("[TEST] strategy.casino_strategy.replan_market 테스트 시작")
+
+    previous = Setting("KRW-AAA", 10000, 0.1, 1, 0.2, 2, 0.05)
+    setting = Setting("KRW-AAA", 20000, 0.05, 2, 0.2, 3, 0.05)
+    now = pd.Timestamp("2025-04-10")
+    book = OrderBook([
+        BuyOrder(now, "KRW-AAA", 1000, 10000, 1, "initial", "u0", "wait"),
+        BuyOrder(now, "KRW-AAA", 900, 10000, 1, "small_flow", "u1", "wait"),
+        BuyOrder(now, "KRW-AAA", 800, 20000, 2, "large_flow", "u2", "done"),
+        BuyOrder(now, "KRW-BBB", 900, 10000, 1, "small_flow", "u3", "wait"),
+    ])
+    replan_market(setting, book, previous)
+    initial, small, large = book.for_market("KRW-AAA")
+
+    # 시장가 initial은 금액만 새 설정으로 바꾸고 다시 보내지 않습니다.
+    assert initial.buy_amount == 20000 and initial.filled == "wait"
+    # 걸려 있는 지정가 주문은 기준가(1000)에서 새 비율로 다시 계산해 교체 대상(update)이 됩니다.
+    assert (small.target_price, small.buy_units, small.buy_amount, small.filled) == (950, 2, 40000, "update")
+    # 체결된 주문과 다른 마켓의 주문은 그대로 둡니다.
+    assert (large.target_price, large.buy_amount, large.filled) == (800, 20000, "done")
+    assert book.first("KRW-BBB").filled == "wait" and book.first("KRW-BBB").target_price == 900
+
+    print("[TEST] ✅ 설정 변경 재계산 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_setting_manager_test()
+    run_replan_market_test()
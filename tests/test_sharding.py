@@ -0,0 +1,88 @@
+# tests/test_sharding.py
+
+import time
+from core.sharding import HashRing, BudgetCoordinator, ShardedRuntime
+from manager.setting_manager import SettingSnapshot
+from strategy.records import Setting
+
+MARKET_DELAY = 0.01  # 마켓 하나를 처리하는 데 걸리는 시간 (시세 조회 / 주문 흉내)
+
+
+def _accounts(krw: float, krw_locked: float = 0.0, coin_value: float = 0.0) -> list:
+    accounts = [{"currency": "KRW", "balance": str(krw), "locked": str(krw_locked), "avg_buy_price": "0"}]
+    if coin_value:
+        accounts.append({"currency": "AAA", "balance": "1", "locked": "0", "avg_buy_price": str(coin_value)})
+    return accounts
+
+
+def _handler(shard, tick, budget):
+    for market in tick.snapshot.markets:
+        if market == "KRW-BAD":
+            raise ValueError("잘못된 마켓")
+        time.sleep(MARKET_DELAY)
+        rid = budget.reserve(market, 100_000)
+        if rid is not None:
+            budget.commit(rid)
+
+
+def run_sharding_test():
+    print("[TEST] core.sharding 테스트 시작")
+
+    # 마켓은 샤드에 고르게 나뉘고, 샤드를 하나 늘리면 새 샤드 몫의 마켓만 옮겨 갑니다.
+    markets = [f"KRW-C{i:03d}" for i in range(300)]
+    ring = HashRing(list(range(4)))
+    sizes = [len(v) for v in ring.assign(markets).values()]
+    assert sum(sizes) == 300 and min(sizes) > 45 and max(sizes) < 110, sizes
+    bigger = HashRing(list(range(5)))
+    moved = [m for m in markets if ring.owner(m) != bigger.owner(m)]
+    assert all(bigger.owner(m) == 4 for m in moved)
+    assert 0.1 < len(moved) / len(markets) < 0.35, len(moved)
+
+    # 예산: 시뮬레이터와 같이 (현금 >= 주문 금액, 현금 비율 >= 최소 비율) 일 때만 허용합니다.
+    budget = BudgetCoordinator(min_cash_ratio=0.3)
+    assert budget.reserve("KRW-AAA", 1000) is None  # 계좌 조회 전
+    budget.refresh(_accounts(1_000_000, coin_value=1_000_000), as_of=time.time())
+    first = budget.reserve("KRW-AAA", 400_000)
+    second = budget.reserve("KRW-BBB", 300_000)
+    assert first is not None and second is not None
+    assert budget.reserve("KRW-CCC", 10_000) is None  # 남은 현금 300,000 / 총자산 2,000,000 < 30%
+    budget.release(second)
+    budget.commit(first)
+    assert budget.available() == 600_000
+    # 확정된 주문은 다음 계좌 조회(locked)에 반영되므로 중복으로 빼지 않습니다.
+    budget.refresh(_accounts(600_000, krw_locked=400_000, coin_value=1_000_000), as_of=time.time() + 1)
+    assert budget.available() == 600_000 and budget.stats()["committed"] == 0
+
+    # 샤드 실행기: 마켓은 한 번씩만 처리되고, 샤드끼리 병렬로 돌며, 예산은 모든 샤드가 함께 씁니다.
+    settings = [Setting(f"KRW-M{i:02d}", 5000, 0.01, 1, 0.03, 1, 0.005) for i in range(30)]
+    snapshot = SettingSnapshot(1, settings + [Setting("KRW-BAD", 5000, 0.01, 1, 0.03, 1, 0.005)])
+    runtime = ShardedRuntime(3, _handler, lambda: (snapshot, {}), lambda: _accounts(1_000_000), min_cash_ratio=0.0)
+    runtime.start(dispatcher=False)
+    try:
+        started = time.perf_counter()
+        sent = runtime.dispatch()
+        assert runtime.wait_idle(timeout=10)
+        elapsed = time.perf_counter() - started
+        assert sorted(m for ms in sent.values() for m in ms) == sorted(snapshot.markets)
+
+        stats = runtime.stats()
+        assert stats["budget"]["granted"] == 10 and stats["budget"]["denied"] == 20, stats["budget"]
+        shards = stats["shards"]
+        assert sum(s["cycles"] for s in shards.values()) == 3
+        assert sum(s["failed"] for s in shards.values()) == 1
+        serial = len(settings) * MARKET_DELAY
+        print(f"  - 마켓 {len(settings)}개, 샤드 3개: {elapsed:.3f}s (한 프로세스: {serial:.3f}s 이상)")
+        assert elapsed < serial, (elapsed, serial)
+
+        # 처리 중인 샤드에는 새 틱을 보내지 않고 건너뜁니다.
+        runtime.dispatch()
+        assert runtime.dispatch() == {}
+        assert runtime.wait_idle(timeout=10)
+    finally:
+        runtime.stop(timeout=10)
+
+    print("[TEST] ✅ 샤드 실행기 테스트 통과")
+
+
+if __name__ == "__main__":
+    run_sharding_test()
@@ -1,40 +1,143 @@
-import pymysql
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-def insert_backtest_result_to_db(df):
-    conn = pymysql.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        port=int(os.getenv("DB_PORT")),
-        database=os.getenv("DB_NAME"),
-        charset='utf8mb4'
+import pandas as pd
+
+from db.db_config import get_db_config
+from utils.log import get_logger
+
+log = get_logger("utils.db")
+
+
+def _connect():
+    import pymysql
+    return pymysql.connect(**get_db_config())
+
+
+# 백테스트 결과 테이블 (db/initdb.d/init.sql과 동일)
+# run_key는 manager/simulator.run_key()로, 파라미터 / 단위 / 체결 모델이 다른 실행의 결과를 구분합니다.
+BACKTEST_RESULT_DDL = """
+    CREATE TABLE IF NOT EXISTS backtest_result (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        run_key VARCHAR(32),
+        time DATETIME,
+        market VARCHAR(20),
+        open DOUBLE,
+        high DOUBLE,
+        close DOUBLE,
+        `signal` VARCHAR(255),
+        trade_amount DOUBLE,
+        avg_price DOUBLE,
+        gap_pct DOUBLE,
+        total_buy_amount DOUBLE,
+        realized_pnl DOUBLE,
+        cash DOUBLE,
+        trade_fee DOUBLE,
+        total_fee DOUBLE,
+        portfolio_value DOUBLE,
+        INDEX idx_backtest_result_run (run_key, market, time)
     )
-    cursor = conn.cursor()
+"""
+
+# 기존에 만들어진 테이블에도 run_key 컬럼/인덱스를 추가합니다. (init.sql은 최초 1회만 실행되기 때문)
+BACKTEST_RESULT_MIGRATIONS = [
+    "ALTER TABLE backtest_result ADD COLUMN IF NOT EXISTS run_key VARCHAR(32)",
+    "CREATE INDEX IF NOT EXISTS idx_backtest_result_run ON backtest_result (run_key, market, time)",
+]
+
+
+def ensure_backtest_result_schema():
+    """backtest_result 테이블과 run_key 컬럼/인덱스를 준비합니다."""
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(BACKTEST_RESULT_DDL)
+            for ddl in BACKTEST_RESULT_MIGRATIONS:
+                cursor.execute(ddl)
+        conn.commit()
+    finally:
+        conn.close()
+
 
+def insert_backtest_result_to_db(df, run_key: str):
+    """
+    백테스트 결과 한 묶음(영문 컬럼, 신호는 문자열)을 실행 키(run_key)와 함께 backtest_result 테이블에 저장합니다.
+    같은 실행의 같은 구간을 지우고 넣는 것을 한 트랜잭션으로 처리하므로, 체크포인트 저장 전에 종료되어
+    같은 묶음을 다시 저장해도 행이 중복되지 않습니다. 다른 실행(run_key)의 행은 건드리지 않습니다.
+    """
+    if df.empty:
+        return
+    delete_sql = "DELETE FROM backtest_result WHERE run_key = %s AND market = %s AND time >= %s AND time <= %s"
     insert_sql = """
     INSERT INTO backtest_result (
-        time, market, open, high, close, `signal`, trade_amount,
+        run_key, time, market, open, high, close, `signal`, trade_amount,
         avg_price, gap_pct, total_buy_amount, realized_pnl,
         cash, trade_fee, total_fee, portfolio_value
     ) VALUES (
-        %s, %s, %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s, %s, %s, %s,
         %s, %s, %s, %s,
         %s, %s, %s, %s
     )
     """
 
-    for _, row in df.iterrows():
-        cursor.execute(insert_sql, (
-            row["시간"], row["마켓"], row["시가"], row["고가"], row["종가"], row["신호"], row["매매금액"],
-            row["현재 평단가"], row["현재 종가와 평단가의 gap(%)"], row["누적 매수금"], row["실현 손익"],
-            row["보유 현금"], row["거래시 수수료"], row["총 누적 수수료"], row["총 포트폴리오 가치"]
-        ))
-
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print("✅ 백테스트 결과가 DB에 저장되었습니다.")
+    # 결과 기록기(manager/result_writer.py)의 컬럼 순서 그대로 한 번에 넣습니다.
+    columns = ["time", "market", "open", "high", "close", "signal", "trade_amount",
+               "avg_price", "gap_pct", "total_buy_amount", "realized_pnl",
+               "cash", "trade_fee", "total_fee", "portfolio_value"]
+    rows = [(run_key, *row) for row in df[columns].itertuples(index=False, name=None)]
+
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            for market, times in df.groupby("market")["time"]:
+                cursor.execute(delete_sql, (run_key, market, pd.Timestamp(times.min()).to_pydatetime(),
+                                            pd.Timestamp(times.max()).to_pydatetime()))
+            cursor.executemany(insert_sql, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    log.debug("✅ 백테스트 결과가 DB에 저장되었습니다. (%s, %d rows)", run_key, len(rows))
+
+
+def fetch_backtest_results(market: str, run_key: str, start=None, end=None) -> pd.DataFrame:
+    """backtest_result 테이블에서 한 실행(run_key)의 한 마켓 [start, end) 구간을 시간순으로 읽습니다."""
+    query = """
+    SELECT run_key, time, market, open, high, close, `signal`, trade_amount,
+           avg_price, gap_pct, total_buy_amount, realized_pnl,
+           cash, trade_fee, total_fee, portfolio_value
+    FROM backtest_result WHERE run_key = %s AND market = %s
+    """
+    params = [run_key, market]
+    if start is not None:
+        query += " AND time >= %s"
+        params.append(pd.Timestamp(start).to_pydatetime())
+    if end is not None:
+        query += " AND time < %s"
+        params.append(pd.Timestamp(end).to_pydatetime())
+    query += " ORDER BY time"
+
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+    finally:
+        conn.close()
+
+
+def fetch_backtest_runs(market: str) -> pd.DataFrame:
+    """backtest_result 테이블에 저장된 한 마켓의 실행(run_key)별 구간과 행 수를 반환합니다."""
+    query = """
+    SELECT run_key, MIN(time) AS `start`, MAX(time) AS `end`, COUNT(*) AS `rows`
+    FROM backtest_result WHERE market = %s AND run_key IS NOT NULL
+    GROUP BY run_key ORDER BY `start`, run_key
+    """
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(query, (market,))
+            columns = [c[0] for c in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+    finally:
+        conn.close()
@@ -2,15 +2,279 @@
 
 import pandas as pd
 import os
+import glob
+import json
+import fcntl
+import tempfile
+import contextlib
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from utils.log import get_logger
+
+log = get_logger("utils.file_utils")
+
+# --- 컬럼형(Parquet) 로그 스키마 ---
+# 가격/금액은 부동소수 오차가 없도록 decimal로, 상태값은 정해진 값만 허용하는 enum(dictionary)으로 저장합니다.
+DECIMAL_TYPE = pa.decimal128(24, 8)
+ENUM_TYPE = pa.dictionary(pa.int8(), pa.string())
+
+BUY_TYPES = ("initial", "small_flow", "large_flow")
+FILLED_STATES = ("update", "wait", "done", "cancel")
+ENUM_VALUES = {"buy_type": BUY_TYPES, "filled": FILLED_STATES}
+
+BUY_LOG_SCHEMA = pa.schema([
+    ("time", pa.timestamp("us")),
+    ("market", pa.string()),
+    ("target_price", DECIMAL_TYPE),
+    ("buy_amount", DECIMAL_TYPE),
+    ("buy_units", pa.int32()),
+    ("buy_type", ENUM_TYPE),
+    ("buy_uuid", pa.string()),
+    ("filled", ENUM_TYPE),
+])
+
+SELL_LOG_SCHEMA = pa.schema([
+    ("market", pa.string()),
+    ("avg_buy_price", DECIMAL_TYPE),
+    ("quantity", DECIMAL_TYPE),
+    ("target_sell_price", DECIMAL_TYPE),
+    ("sell_uuid", pa.string()),
+    ("filled", ENUM_TYPE),
+])
+
+# 세그먼트 파일이 이 개수를 넘으면 append 시 자동으로 하나로 합칩니다.
+COMPACT_THRESHOLD = 64
+
 
 def load_csv(path: str) -> pd.DataFrame:
     if not os.path.exists(path):
-        print(f"[file_utils.py] ❌ 파일 없음: {path}")
+        log.warning("❌ 파일 없음: %s", path)
         return pd.DataFrame()
     df = pd.read_csv(path)
-    print(f"[file_utils.py] ✅ 파일 로드 완료: {path}, {len(df)} rows")
+    log.debug("✅ 파일 로드 완료: %s, %d rows", path, len(df))
     return df
 
 def save_csv(df: pd.DataFrame, path: str):
-    df.to_csv(path, index=False)
-    print(f"[file_utils.py] 💾 파일 저장 완료: {path}, {len(df)} rows")
+    # 임시 파일에 먼저 쓰고 rename 하므로, 저장 도중 종료되어도 기존 파일이 깨지지 않습니다.
+    _atomic_write(path, lambda tmp_path: df.to_csv(tmp_path, index=False))
+    log.debug("💾 파일 저장 완료: %s, %d rows", path, len(df))
+
+
+def save_json(obj, path: str, default=None) -> None:
+    _atomic_write(path, lambda tmp_path: _write_json(obj, tmp_path, default))
+
+
+def _write_json(obj, path: str, default) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, default=default)
+
+
+def load_json(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_parquet(df: pd.DataFrame, path: str) -> None:
+    _atomic_write(path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+
+
+def _atomic_write(path: str, write_fn) -> None:
+    """같은 디렉터리의 임시 파일에 쓴 뒤 os.replace로 교체합니다."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    try:
+        write_fn(tmp_path)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _to_arrow_column(series: pd.Series, name: str, field_type: pa.DataType) -> pa.Array:
+    if field_type == ENUM_TYPE:
+        allowed = ENUM_VALUES[name]
+        values = [None if pd.isna(v) or str(v).strip() == "" else str(v).strip() for v in series]
+        invalid = sorted({v for v in values if v is not None and v not in allowed})
+        if invalid:
+            raise ValueError(f"[file_utils.py] {name} 컬럼에 허용되지 않은 값이 있습니다: {invalid}")
+        dictionary = pa.array(allowed, type=pa.string())
+        indices = pa.array([None if v is None else allowed.index(v) for v in values], type=pa.int8())
+        return pa.DictionaryArray.from_arrays(indices, dictionary)
+    if pa.types.is_timestamp(field_type):
+        return pa.array(pd.to_datetime(series, errors="coerce"), type=field_type)
+    if pa.types.is_decimal(field_type):
+        return pa.array(pd.to_numeric(series, errors="coerce"), type=pa.float64()).cast(field_type)
+    if pa.types.is_integer(field_type):
+        return pa.array(pd.to_numeric(series, errors="coerce").astype("Int64"), type=pa.int64()).cast(field_type)
+    if pa.types.is_floating(field_type):
+        return pa.array(pd.to_numeric(series, errors="coerce"), type=field_type)
+    return pa.array([None if pd.isna(v) or v == "" else str(v) for v in series], type=field_type)
+
+
+def _to_arrow_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    columns = []
+    for field in schema:
+        series = df[field.name] if field.name in df.columns else pd.Series([None] * len(df), dtype=object)
+        columns.append(_to_arrow_column(series, field.name, field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _to_pandas(table: pa.Table) -> pd.DataFrame:
+    """decimal은 float64로, enum은 문자열로 풀어서 기존 CSV 로드 결과와 같은 형태로 돌려줍니다."""
+    columns = []
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_decimal(field.type):
+            column = column.cast(pa.float64())
+        elif pa.types.is_dictionary(field.type):
+            column = column.cast(pa.string())
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.schema.names).to_pandas()
+
+
+def _log_files(path: str) -> list:
+    """
+    현재 유효한 세그먼트 목록을 반환합니다.
+    base-<stem>.parquet 는 <stem> 이하의 part 파일을 모두 합친 결과이므로, 해당 part 들은 읽지 않습니다.
+    """
+    bases = sorted(glob.glob(os.path.join(path, "base-*.parquet")))
+    parts = sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+    if not bases:
+        return parts
+    latest_base = bases[-1]
+    covered = os.path.basename(latest_base)[len("base-"):]
+    return [latest_base] + [p for p in parts if os.path.basename(p)[len("part-"):] > covered]
+
+
+def has_log(path: str) -> bool:
+    """Parquet 로그 세그먼트가 하나라도 있는지 확인합니다."""
+    return os.path.isdir(path) and bool(_log_files(path))
+
+
+@contextlib.contextmanager
+def log_lock(path: str):
+    """
+    로그 디렉터리의 .lock 파일을 잠가, 같은 로그를 읽고-고치고-쓰는 작업이 스레드 / 프로세스 사이에 겹치지 않게 합니다.
+    (flock은 open()마다 따로 잡히므로 같은 프로세스의 다른 스레드끼리도 기다립니다.)
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, ".lock"), "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def latest_rows(df: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """
+    같은 keys 값을 가진 행 중 마지막(가장 최근에 추가된) 행만 남깁니다.
+    행 순서는 각 keys 값이 처음 나온 순서를 유지합니다.
+    """
+    if df.empty:
+        return df
+    order = df.groupby(keys, sort=False, dropna=False).ngroup()
+    latest = df.drop_duplicates(subset=keys, keep="last")
+    return latest.iloc[order[latest.index].argsort(kind="stable")].reset_index(drop=True)
+
+
+def append_log(df: pd.DataFrame, path: str, schema: pa.Schema, keys: list = None) -> None:
+    """
+    새 행만 별도의 Parquet 세그먼트로 추가합니다.
+    기존 기록을 다시 쓰지 않으므로, 저장 비용은 누적 기록 크기와 무관합니다.
+    keys가 있으면 같은 keys의 기존 행을 고친 새 버전으로 보고, 읽을 때 / 압축할 때 마지막 버전만 남깁니다.
+    """
+    if df.empty:
+        return
+    table = _to_arrow_table(df, schema)
+    os.makedirs(path, exist_ok=True)
+    segment = os.path.join(path, f"part-{pd.Timestamp.now().value:020d}-{os.getpid()}.parquet")
+    _atomic_write(segment, lambda tmp_path: pq.write_table(table, tmp_path))
+    log.debug("💾 로그 추가 완료: %s, %d rows", path, len(df))
+
+    if len(_log_files(path)) > COMPACT_THRESHOLD:
+        compact_log(path, schema, keys)
+
+
+def save_log(df: pd.DataFrame, path: str, schema: pa.Schema) -> None:
+    """기존 세그먼트를 모두 대체하여 df 전체를 하나의 세그먼트로 저장합니다."""
+    table = _to_arrow_table(df, schema)
+    os.makedirs(path, exist_ok=True)
+    stem = f"{pd.Timestamp.now().value:020d}-{os.getpid()}.parquet"
+    _atomic_write(os.path.join(path, f"base-{stem}"), lambda tmp_path: pq.write_table(table, tmp_path))
+    _remove_stale_segments(path)
+    log.debug("💾 로그 저장 완료: %s, %d rows", path, len(df))
+
+
+def compact_log(path: str, schema: pa.Schema, keys: list = None) -> None:
+    """
+    여러 세그먼트를 하나의 base 세그먼트로 합칩니다. 도중에 종료되어도 중복/유실이 없습니다.
+    keys가 있으면 keys별 마지막 버전만 남깁니다.
+    """
+    files = _log_files(path)
+    if len(files) <= 1:
+        return
+    table = ds.dataset(files, format="parquet", schema=schema).to_table()
+    if keys:
+        table = _to_arrow_table(latest_rows(_to_pandas(table), keys), schema)
+    covered = os.path.basename(files[-1]).split("-", 1)[1]
+    _atomic_write(os.path.join(path, f"base-{covered}"), lambda tmp_path: pq.write_table(table, tmp_path))
+    _remove_stale_segments(path)
+    log.info("🗜️ 로그 압축 완료: %s, %d개 세그먼트 → 1개", path, len(files))
+
+
+def _remove_stale_segments(path: str) -> None:
+    live = set(_log_files(path))
+    for f in glob.glob(os.path.join(path, "*.parquet")):
+        if f not in live:
+            os.remove(f)
+
+
+def to_log_frame(df: pd.DataFrame, schema: pa.Schema) -> pd.DataFrame:
+    """df를 schema로 저장했다가 다시 읽은 것과 같은 형태(decimal 반올림, enum 검증 포함)로 바꿉니다."""
+    return _to_pandas(_to_arrow_table(df, schema))
+
+
+def load_log(path: str, schema: pa.Schema, markets: list = None,
+             start=None, end=None, legacy_csv: str = None, keys: list = None) -> pd.DataFrame:
+    """
+    Parquet 로그를 읽습니다. markets / start / end 조건은 파일을 읽기 전에 적용되어 필요한 행만 로드합니다.
+    로그 디렉터리가 아직 없으면 legacy_csv(기존 CSV 로그)를 대신 읽습니다.
+    keys가 있으면 keys별 마지막 버전만 돌려줍니다. (append_log 참고)
+    """
+    files = _log_files(path) if os.path.isdir(path) else []
+    if not files:
+        if legacy_csv and os.path.exists(legacy_csv):
+            df = load_csv(legacy_csv)
+            if markets is not None and "market" in df.columns:
+                df = df[df["market"].isin(markets)]
+            return df
+        return pd.DataFrame(columns=schema.names)
+
+    conditions = []
+    if markets is not None:
+        conditions.append(pc.field("market").isin(list(markets)))
+    if "time" in schema.names:
+        time_type = schema.field("time").type
+        if start is not None:
+            conditions.append(pc.field("time") >= pa.scalar(pd.Timestamp(start), type=time_type))
+        if end is not None:
+            conditions.append(pc.field("time") < pa.scalar(pd.Timestamp(end), type=time_type))
+    condition = None
+    for expr in conditions:
+        condition = expr if condition is None else condition & expr
+
+    table = ds.dataset(files, format="parquet", schema=schema).to_table(filter=condition)
+    df = _to_pandas(table)
+    if keys:
+        df = latest_rows(df, keys)
+    log.debug("✅ 로그 로드 완료: %s, %d rows", path, len(df))
+    return df
@@ -0,0 +1,153 @@
+# utils/log.py
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+# 로그 설정 (환경변수)
+# - LOG_LEVEL: DEBUG / INFO / WARNING ... (기본 INFO). DEBUG 에서만 계좌 전체, 주문 표 같은 큰 내용을 출력합니다.
+# - LOG_FORMAT: json(기본, 한 줄에 JSON 하나) / text(사람이 읽기 쉬운 한 줄)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+ROOT_LOGGER = "cointrade"
+
+_lock = threading.Lock()
+_listener = None
+_settings = None
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 JSON 하나: ts, level, logger, msg + extra=fields(...)로 넘긴 값 (+ 예외)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """2025-01-01 12:00:00 INFO [manager.order_executor] 메시지 market=KRW-BTC ..."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(name)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return text
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # 기본 QueueHandler는 큐에 넣기 전에 호출한 스레드에서 메시지를 만듭니다.
+    # 여기서는 레코드를 그대로 넘겨 문자열 만들기(DataFrame 출력 포함)와 JSON 변환, 쓰기를 모두 백그라운드 스레드에서 합니다.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class Lazy:
+    """str()이 필요할 때(=해당 레벨이 켜져 있어 실제로 출력할 때)만 fn()을 호출합니다."""
+    __slots__ = ("fn",)
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __str__(self) -> str:
+        return str(self.fn())
+
+
+def frame(df) -> Lazy:
+    """DataFrame 전체 출력은 비싸므로, 로그가 실제로 출력될 때만 to_string()을 호출합니다."""
+    return Lazy(df.to_string)
+
+
+def fields(**values) -> dict:
+    """log.info("...", extra=fields(market=..., price=...)) 처럼 JSON에 들어갈 구조화된 값을 넘깁니다."""
+    return {"fields": values}
+
+
+def setup_logging(level: str = None, fmt: str = None, stream=None) -> None:
+    """
+    cointrade.* 로거가 큐를 거쳐 백그라운드 스레드에서 출력하도록 설정합니다. 여러 번 호출해도 됩니다. (마지막 설정 적용)
+    호출한 스레드는 레코드를 큐에 넣기만 하므로, 출력(stdout) 속도가 매매 루프를 늦추지 않습니다.
+    """
+    global _listener, _settings
+    with _lock:
+        _settings = (level or LOG_LEVEL, fmt or LOG_FORMAT, stream)
+        _start(*_settings)
+
+
+def _start(level: str, fmt: str, stream) -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(TextFormatter() if fmt == "text" else JsonFormatter())
+    records = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [_DeferredQueueHandler(records)]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.propagate = False
+
+
+def _restart_in_child() -> None:
+    # fork로 만든 작업자 프로세스(core/sharding.py)에는 출력 스레드가 없으므로 새로 띄웁니다.
+    global _listener
+    if _settings is not None:
+        _listener = None
+        _start(*_settings)
+
+
+def flush() -> None:
+    """큐에 쌓인 로그를 모두 출력합니다. (프로세스 종료 전)"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            if _settings is not None:
+                _start(*_settings)
+
+
+def shutdown() -> None:
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def set_level(level) -> None:
+    logging.getLogger(ROOT_LOGGER).setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """모듈별 로거 (cointrade.<name>). 처음 호출할 때 환경변수 설정으로 출력을 시작합니다."""
+    if _settings is None:
+        setup_logging()
+    if name.startswith(ROOT_LOGGER + ".") or name == ROOT_LOGGER:
+        return logging.getLogger(name)
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+atexit.register(shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_in_child)
@@ -1,16 +1,40 @@
 # utils/price_utils.py
 
-from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+
+# 가격과 수량은 거래소/로그 경계에서는 원(float) 단위를 쓰고, 계산과 비교는 정수 단위로 합니다.
+# - 가격 1 단위 = 0.00000001원 (업비트의 가장 작은 호가 단위), 수량 1 단위 = 0.00000001개 (주문 수량 소수점 8자리)
+# - 정수로 바꾼 뒤에는 반올림 오차가 없으므로, 호가 단위 맞춤과 같은 값인지 비교가 정확합니다. (1원 미만 코인 포함)
+PRICE_SCALE = 10 ** 8
+VOLUME_SCALE = 10 ** 8
+
+SPECIAL_TICKERS_100_1000 = {
+    'ADA', 'ALGO', 'BLUR', 'CELO', 'ELF', 'EOS', 'GRS', 'GRT', 'ICX',
+    'MANA', 'MINA', 'POL', 'SAND', 'SEI', 'STG', 'TRX'
+}
+
+# (이 가격 이상일 때, 호가 단위, 100~1000원 특수 종목의 호가 단위) — 모두 정수 단위
+_TICK_UNITS = tuple((int(floor * PRICE_SCALE), round(tick * PRICE_SCALE), round(special * PRICE_SCALE)) for floor, tick, special in (
+    (2_000_000, 1000, 1000),
+    (1_000_000, 500, 500),
+    (500_000, 100, 100),
+    (100_000, 50, 50),
+    (10_000, 10, 10),
+    (1_000, 1, 0.5),
+    (100, 1, 0.1),
+    (10, 0.01, 0.01),
+    (1, 0.001, 0.001),
+    (0.1, 0.0001, 0.0001),
+    (0.01, 0.00001, 0.00001),
+    (0.001, 0.000001, 0.000001),
+    (0.0001, 0.0000001, 0.0000001),
+))
+
 
 def get_tick_size(price: float, market: str = "KRW", ticker: str = "") -> float:
     """
     입력된 가격에 따라 업비트의 호가 단위를 반환합니다.
     """
-    special_tickers_100_1000 = {
-        'ADA', 'ALGO', 'BLUR', 'CELO', 'ELF', 'EOS', 'GRS', 'GRT', 'ICX',
-        'MANA', 'MINA', 'POL', 'SAND', 'SEI', 'STG', 'TRX'
-    }
-
     base_ticker = ticker.replace("KRW-", "")
 
     if market != "KRW":
@@ -27,9 +51,9 @@ def get_tick_size(price: float, market: str = "KRW", ticker: str = "") -> float:
     elif price >= 10_000:
         return 10
     elif price >= 1_000:
-        return 0.5 if base_ticker in special_tickers_100_1000 else 1
+        return 0.5 if base_ticker in SPECIAL_TICKERS_100_1000 else 1
     elif price >= 100:
-        return 0.1 if base_ticker in special_tickers_100_1000 else 1
+        return 0.1 if base_ticker in SPECIAL_TICKERS_100_1000 else 1
     elif price >= 10:
         return 0.01
     elif price >= 1:
@@ -46,11 +70,104 @@ def get_tick_size(price: float, market: str = "KRW", ticker: str = "") -> float:
         return 0.00000001
 
 
+# --- 정수 단위 변환 ---
+
+def to_price_units(price: float) -> int:
+    return int(round(float(price) * PRICE_SCALE))
+
+
+def from_price_units(units: int) -> float:
+    return units / PRICE_SCALE
+
+
+def to_volume_units(volume: float) -> int:
+    return int(round(float(volume) * VOLUME_SCALE))
+
+
+def from_volume_units(units: int) -> float:
+    return units / VOLUME_SCALE
+
+
+def get_tick_units(units: int, ticker: str = "") -> int:
+    """정수 단위 가격의 호가 단위 (정수 단위). get_tick_size와 같은 규칙입니다."""
+    special = ticker.replace("KRW-", "") in SPECIAL_TICKERS_100_1000
+    for floor, tick, special_tick in _TICK_UNITS:
+        if units >= floor:
+            return special_tick if special else tick
+    return 1
+
+
+def snap_to_tick_units(units: int, ticker: str = "", rounding: str = "half_up") -> int:
+    """
+    정수 단위 가격을 호가 단위에 맞춥니다.
+    rounding: "half_up"(반올림, 기본) / "down"(내림) / "up"(올림)
+    """
+    tick = get_tick_units(units, ticker)
+    if rounding == "down":
+        return units // tick * tick
+    if rounding == "up":
+        return -(-units // tick) * tick
+    return (2 * units + tick) // (2 * tick) * tick
+
+
 def adjust_price_to_tick(price: float, market: str = "KRW", ticker: str = "") -> float:
     """
     호가 단위를 기반으로 가격을 반올림하여 보정합니다.
     """
-    tick_size = Decimal(str(get_tick_size(price, market, ticker)))
-    decimal_price = Decimal(str(price))
-    adjusted = (decimal_price / tick_size).quantize(Decimal('1'), rounding=ROUND_HALF_UP) * tick_size
-    return float(adjusted)
+    if market != "KRW":
+        raise ValueError("현재는 KRW 마켓만 지원됩니다.")
+    return from_price_units(snap_to_tick_units(to_price_units(price), ticker))
+
+
+def ladder_price(price: float, pct: float, ticker: str = "", rounding: str = "half_up") -> float:
+    """
+    price × (1 + pct)를 호가 단위에 맞춘 가격. (하락 매수는 pct < 0)
+    정수 단위로 계산하므로 1원 미만 코인도 0원으로 뭉개지지 않습니다.
+    """
+    units = round(to_price_units(price) * (1 + pct))
+    return from_price_units(snap_to_tick_units(units, ticker, rounding))
+
+
+def volume_for_amount(amount: float, price: float) -> float:
+    """주문 금액을 넘지 않는 최대 주문 수량 (소수점 8자리)"""
+    price_units = to_price_units(price)
+    if price_units <= 0:
+        return 0.0
+    return from_volume_units(to_price_units(amount) * VOLUME_SCALE // price_units)
+
+
+# --- 배열 버전 (manager/monte_carlo.py처럼 경로 여러 개를 한 번에 계산할 때) ---
+
+# 오름차순 경계와 그 구간의 호가 단위 (가장 낮은 구간은 1 단위)
+_TICK_FLOORS = np.array([0] + [floor for floor, _, _ in reversed(_TICK_UNITS)], dtype=np.int64)
+_TICK_STEPS = np.array([1] + [tick for _, tick, _ in reversed(_TICK_UNITS)], dtype=np.int64)
+_TICK_STEPS_SPECIAL = np.array([1] + [special for _, _, special in reversed(_TICK_UNITS)], dtype=np.int64)
+
+
+def to_price_units_array(prices) -> np.ndarray:
+    return np.rint(np.asarray(prices, dtype=np.float64) * PRICE_SCALE).astype(np.int64)
+
+
+def to_volume_units_array(volumes) -> np.ndarray:
+    return np.rint(np.asarray(volumes, dtype=np.float64) * VOLUME_SCALE).astype(np.int64)
+
+
+def get_tick_units_array(units: np.ndarray, ticker: str = "") -> np.ndarray:
+    steps = _TICK_STEPS_SPECIAL if ticker.replace("KRW-", "") in SPECIAL_TICKERS_100_1000 else _TICK_STEPS
+    return steps[np.searchsorted(_TICK_FLOORS, units, side="right") - 1]
+
+
+def snap_to_tick_units_array(units: np.ndarray, ticker: str = "", rounding: str = "half_up") -> np.ndarray:
+    """snap_to_tick_units의 배열 버전"""
+    tick = get_tick_units_array(units, ticker)
+    if rounding == "down":
+        return units // tick * tick
+    if rounding == "up":
+        return -(-units // tick) * tick
+    return (2 * units + tick) // (2 * tick) * tick
+
+
+def ladder_prices(prices, pct: float, ticker: str = "", rounding: str = "half_up") -> np.ndarray:
+    """ladder_price의 배열 버전"""
+    units = np.rint(to_price_units_array(prices) * (1 + pct)).astype(np.int64)
+    return snap_to_tick_units_array(units, ticker, rounding) / PRICE_SCALE